@@ -8,6 +8,7 @@ Contains:
 - CollectionAdmin
 - CollectionItemAdmin
 - NotificationAdmin
+- BroadcastNotificationAdmin
 """
 from django.contrib import admin
 
@@ -16,8 +17,17 @@ from prompts.models import (
     Collection,
     CollectionItem,
     Notification,
+    BroadcastNotification,
 )
 
+from prompts.services.notifications import (
+    delete_notifications,
+    delete_system_notification_batch,
+    mark_counts_stale,
+)
+from prompts.services.prompt_detail import refresh_approved_comment_counts
+from prompts.utils import cache_dependencies
+
 from .inlines import CollectionItemInline
 
 
@@ -29,7 +39,15 @@ class CommentAdmin(admin.ModelAdmin):
     actions = ['approve_comments']
 
     def approve_comments(self, request, queryset):
+        rows = list(queryset.values_list('prompt_id', 'author_id'))
         queryset.update(approved=True)
+        # update() bypasses the Comment signals — refresh counts and caches
+        prompt_ids = {prompt_id for prompt_id, _ in rows}
+        refresh_approved_comment_counts(prompt_ids)
+        cache_dependencies.invalidate(
+            *(cache_dependencies.prompt_key(pid) for pid in prompt_ids),
+            *(cache_dependencies.user_key(uid) for _, uid in rows),
+        )
     approve_comments.short_description = "Approve selected comments"
 
 
@@ -151,3 +169,41 @@ class NotificationAdmin(admin.ModelAdmin):
     raw_id_fields = ['recipient', 'sender']
     readonly_fields = ['created_at']
     list_per_page = 50
+
+    # Admin edits bypass the notification service; keep unread counters in step
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        if change:
+            mark_counts_stale([obj.recipient_id])
+
+    def delete_model(self, request, obj):
+        delete_notifications(Notification.objects.filter(pk=obj.pk))
+
+    def delete_queryset(self, request, queryset):
+        delete_notifications(queryset)
+
+
+@admin.register(BroadcastNotification)
+class BroadcastNotificationAdmin(admin.ModelAdmin):
+    """System notifications sent to every user (one row per blast)."""
+    list_display = ['batch_id', 'title', 'recipient_count', 'click_count', 'is_expired', 'created_at']
+    list_filter = ['is_expired']
+    search_fields = ['batch_id', 'title']
+    readonly_fields = ['batch_id', 'recipient_count', 'click_count', 'created_by', 'created_at']
+    list_per_page = 50
+
+    def has_add_permission(self, request):
+        # Sent from the System Notifications dashboard
+        return False
+
+    # Every user's cached unread count includes broadcasts
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        cache_dependencies.invalidate(cache_dependencies.NOTIFICATIONS)
+
+    def delete_model(self, request, obj):
+        delete_system_notification_batch(obj.batch_id)
+
+    def delete_queryset(self, request, queryset):
+        for batch_id in queryset.values_list('batch_id', flat=True):
+            delete_system_notification_batch(batch_id)
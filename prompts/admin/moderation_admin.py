@@ -21,6 +21,7 @@ from prompts.models import (
     PromptReport,
     NSFWViolation,
 )
+from prompts.services.profanity_filter import invalidate_word_list
 
 from .inlines import ContentFlagInline
 
@@ -259,24 +260,28 @@ class ProfanityWordAdmin(admin.ModelAdmin):
     def activate_words(self, request, queryset):
         """Activate selected words"""
         updated = queryset.update(is_active=True)
+        invalidate_word_list()
         self.message_user(request, f"{updated} words activated.")
     activate_words.short_description = "Activate selected words"
 
     def deactivate_words(self, request, queryset):
         """Deactivate selected words"""
         updated = queryset.update(is_active=False)
+        invalidate_word_list()
         self.message_user(request, f"{updated} words deactivated.")
     deactivate_words.short_description = "Deactivate selected words"
 
     def set_severity_critical(self, request, queryset):
         """Set severity to critical"""
         updated = queryset.update(severity="critical")
+        invalidate_word_list()
         self.message_user(request, f"{updated} words set to critical severity.")
     set_severity_critical.short_description = "Set severity to Critical"
 
     def set_severity_high(self, request, queryset):
         """Set severity to high"""
         updated = queryset.update(severity="high")
+        invalidate_word_list()
         self.message_user(request, f"{updated} words set to high severity.")
     set_severity_high.short_description = "Set severity to High"
 
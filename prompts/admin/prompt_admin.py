@@ -6,6 +6,7 @@ Extracted from prompts/admin.py in Session 168-F.
 Contains:
 - PromptAdmin (the main 950-LOC PromptAdmin with custom URLs and SEO actions)
 - PromptViewAdmin (read-only analytics)
+- PromptViewDailyAdmin (read-only daily view rollups)
 - SlugRedirectAdmin (slug redirect manager)
 """
 import logging
@@ -15,7 +16,7 @@ from django.urls import reverse
 from django.utils.html import format_html
 from django_summernote.admin import SummernoteModelAdmin
 
-from prompts.models import Prompt, PromptView, SlugRedirect
+from prompts.models import Prompt, PromptView, PromptViewDaily, SlugRedirect
 from prompts.utils.related import (
     W_TAG, W_CATEGORY, W_DESCRIPTOR, W_GENERATOR, W_ENGAGEMENT, W_RECENCY,
 )
@@ -639,7 +640,6 @@ class PromptAdmin(SummernoteModelAdmin):
         """Move prompt up in order (decrease order number)"""
         from django.shortcuts import get_object_or_404, redirect
         from django.contrib import messages
-        from django.core.cache import cache
 
         prompt = get_object_or_404(Prompt, pk=pk)
 
@@ -654,9 +654,6 @@ class PromptAdmin(SummernoteModelAdmin):
             prompt.save(update_fields=['order'])
             previous_prompt.save(update_fields=['order'])
 
-            # Clear all relevant caches
-            self.clear_prompt_caches()
-
             messages.success(request, f'Moved "{prompt.title}" up.')
         else:
             messages.warning(request, f'"{prompt.title}" is already at the top.')
@@ -667,7 +664,6 @@ class PromptAdmin(SummernoteModelAdmin):
         """Move prompt down in order (increase order number)"""
         from django.shortcuts import get_object_or_404, redirect
         from django.contrib import messages
-        from django.core.cache import cache
 
         prompt = get_object_or_404(Prompt, pk=pk)
 
@@ -682,9 +678,6 @@ class PromptAdmin(SummernoteModelAdmin):
             prompt.save(update_fields=['order'])
             next_prompt.save(update_fields=['order'])
 
-            # Clear all relevant caches
-            self.clear_prompt_caches()
-
             messages.success(request, f'Moved "{prompt.title}" down.')
         else:
             messages.warning(request, f'"{prompt.title}" is already at the bottom.')
@@ -834,27 +827,8 @@ class PromptAdmin(SummernoteModelAdmin):
 
         return redirect('admin:prompts_prompt_change', pk)
 
-    def clear_prompt_caches(self):
-        """Clear all prompt-related caches"""
-        from django.core.cache import cache
-
-        # Clear list caches for multiple pages and tags
-        for page in range(1, 10):  # Clear more pages
-            cache.delete(f"prompt_list_None_None_{page}")
-            # Clear tag-filtered caches too
-            for tag in ['art', 'portrait', 'landscape', 'photography']:  # Add your common tags
-                cache.delete(f"prompt_list_{tag}_None_{page}")
-
-        # Clear individual prompt detail caches
-        prompts = Prompt.objects.all()[:50]  # Clear recent prompts
-        for prompt in prompts:
-            cache.delete(f"prompt_detail_{prompt.slug}_anonymous")
-            # Clear user-specific caches (this is imperfect, but helps)
-            for user_id in range(1, 20):  # Adjust range based on your user count
-                cache.delete(f"prompt_detail_{prompt.slug}_{user_id}")
-
     def save_model(self, request, obj, form, change):
-        """Create slug redirect on slug change + title warnings + cache clearing.
+        """Create slug redirect on slug change + title warnings.
 
         Slug validation (format, reserved, uniqueness) is handled by
         PromptAdminForm.clean_slug() — errors show inline on the form field.
@@ -910,9 +884,6 @@ class PromptAdmin(SummernoteModelAdmin):
                 level='success'
             )
 
-        if change and 'order' in form.changed_data:
-            self.clear_prompt_caches()
-
         # Queue SEO file rename if B2 image is present.
         # Mirrors the guard in upload_views.py — applies to both new and edited prompts.
         if obj.b2_image_url:
@@ -1005,6 +976,24 @@ class PromptViewAdmin(admin.ModelAdmin):
         return False
 
 
+@admin.register(PromptViewDaily)
+class PromptViewDailyAdmin(admin.ModelAdmin):
+    """Admin interface for daily view rollups (read-only analytics)."""
+    list_display = ('prompt', 'day', 'unique_views', 'authenticated_views')
+    list_filter = ('day',)
+    search_fields = ('prompt__title',)
+    readonly_fields = ('prompt', 'day', 'unique_views', 'authenticated_views')
+    ordering = ('-day',)
+    date_hierarchy = 'day'
+
+    def has_add_permission(self, request):
+        # Rollups are written by the rollup_prompt_views command
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
 @admin.register(SlugRedirect)
 class SlugRedirectAdmin(admin.ModelAdmin):
     list_display = ('old_slug', 'prompt', 'created_at')
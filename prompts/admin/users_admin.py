@@ -7,6 +7,7 @@ Contains:
 - UserProfileAdmin
 - AvatarChangeLogAdmin
 - EmailPreferencesAdmin
+- LeaderboardEntryAdmin (read-only precomputed leaderboards)
 - CustomUserAdmin (extends Django's UserAdmin; requires unregistering default first)
 
 Side effect: ``admin.site.unregister(User)`` runs at module import time
@@ -22,6 +23,7 @@ from prompts.models import (
     UserProfile,
     AvatarChangeLog,
     EmailPreferences,
+    LeaderboardEntry,
 )
 
 
@@ -309,6 +311,26 @@ class EmailPreferencesAdmin(admin.ModelAdmin):
 admin.site.unregister(User)
 
 
+@admin.register(LeaderboardEntry)
+class LeaderboardEntryAdmin(admin.ModelAdmin):
+    """Admin interface for precomputed leaderboards (read-only analytics)."""
+    list_display = ('metric', 'period', 'rank', 'user', 'score', 'computed_at')
+    list_filter = ('metric', 'period')
+    search_fields = ('user__username',)
+    readonly_fields = (
+        'metric', 'period', 'user', 'score', 'rank',
+        'prompt_count', 'follower_count', 'computed_at',
+    )
+    ordering = ('metric', 'period', 'rank')
+
+    def has_add_permission(self, request):
+        # Boards are written by the rebuild_leaderboards command
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
 @admin.register(User)
 class CustomUserAdmin(BaseUserAdmin):
     """Extended UserAdmin with signup and last login columns."""
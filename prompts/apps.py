@@ -21,3 +21,4 @@ class PromptsConfig(AppConfig):
         import prompts.notification_signals  # noqa: F401
         import prompts.social_signals  # noqa: F401 — 163-D
         prompts.notification_signals.connect_m2m_signals()
+        prompts.signals.connect_cache_dependency_signals()
@@ -0,0 +1,292 @@
+"""
+Two-tier cache backend for PromptFinder.
+
+TieredCache puts a bounded, process-local LRU (L1) in front of a shared
+cache (L2 — another CACHES alias, the DatabaseCache in production), so hot
+configuration and lookup reads (SiteSettings, profanity word lists,
+leaderboards, search IDs) stop costing a database round-trip per request.
+
+Consistency:
+- Every L1 entry expires after L1_TIMEOUT seconds (or its own timeout,
+  whichever is sooner), bounding staleness against L2 expiry.
+- Writes (set/delete/add/incr/...) bump a generation stamp in L2 for the
+  key's bucket (crc32(key) % GENERATION_BUCKETS). Each process re-reads
+  all bucket stamps with one get_many at most every
+  VERSION_CHECK_INTERVAL seconds and ignores L1 entries whose bucket has
+  moved on — cross-process invalidation without a per-key L2 read.
+- Keys starting with any L1_BYPASS_PREFIXES (shared counters, rate limits,
+  locks) skip L1 entirely and go straight to L2.
+- L1 stores pickled values, so callers never share mutable objects
+  between requests (same as LocMemCache).
+
+Setting L1_TIMEOUT to 0 turns the backend into a plain pass-through to L2
+(used by the test settings, where transaction rollback resets L2 between
+tests but would not reset a process-local L1).
+
+Configuration (prompts_manager/settings.py):
+    CACHES = {
+        'default': {
+            'BACKEND': 'prompts.cache_backends.TieredCache',
+            'LOCATION': 'shared',  # L2 cache alias
+            'OPTIONS': {'L1_MAX_ENTRIES': 2048, 'L1_TIMEOUT': 30, ...},
+        },
+        'shared': {'BACKEND': '...DatabaseCache', ...},
+    }
+"""
+import logging
+import pickle
+import threading
+import time
+import zlib
+from collections import OrderedDict
+
+from django.core.cache import caches
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+
+
+class TieredCache(BaseCache):
+    """Process-local LRU (L1) over a shared cache alias (L2)."""
+
+    pickle_protocol = pickle.HIGHEST_PROTOCOL
+
+    def __init__(self, location, params):
+        super().__init__(params)
+        options = params.get('OPTIONS', {})
+        self._l2_alias = location or 'shared'
+        self.l1_max_entries = int(options.get('L1_MAX_ENTRIES', 2048))
+        self.l1_timeout = float(options.get('L1_TIMEOUT', 30))
+        self.version_check_interval = float(options.get('VERSION_CHECK_INTERVAL', 1))
+        self.generation_buckets = int(options.get('GENERATION_BUCKETS', 128))
+        self.bypass_prefixes = tuple(options.get('L1_BYPASS_PREFIXES', ()))
+
+        self._l1 = OrderedDict()  # full key → (pickled, expires_at, generation)
+        self._lock = threading.Lock()
+        self._generations = {}
+        self._generations_checked = 0.0
+
+    # ------------------------------------------------------------------
+    # Helpers
+    # ------------------------------------------------------------------
+
+    @property
+    def l2(self):
+        return caches[self._l2_alias]
+
+    @property
+    def l1_enabled(self):
+        return self.l1_timeout > 0 and self.l1_max_entries > 0
+
+    def _uses_l1(self, key):
+        return self.l1_enabled and not key.startswith(self.bypass_prefixes)
+
+    def _bucket(self, full_key):
+        return zlib.crc32(full_key.encode()) % self.generation_buckets
+
+    def _generation_key(self, bucket):
+        return f'tiered_gen:{bucket}'
+
+    def _refresh_generations(self):
+        """Re-read every bucket stamp from L2 (one get_many per interval)."""
+        now = time.monotonic()
+        if now - self._generations_checked < self.version_check_interval:
+            return
+        keys = [self._generation_key(b) for b in range(self.generation_buckets)]
+        try:
+            stamps = self.l2.get_many(keys)
+        except Exception as e:
+            # L2 unreachable: drop L1 rather than serve unverifiable data
+            logger.warning(f"[TieredCache] Generation refresh failed: {e}")
+            self._clear_l1()
+            return
+        self._generations = {
+            b: stamps.get(self._generation_key(b), 0)
+            for b in range(self.generation_buckets)
+        }
+        self._generations_checked = now
+
+    def _bump(self, full_keys):
+        """Retire other processes' L1 copies of these keys."""
+        stamp = time.time_ns()
+        buckets = {self._bucket(k) for k in full_keys}
+        self.l2.set_many(
+            {self._generation_key(b): stamp for b in buckets}, timeout=None,
+        )
+        with self._lock:
+            for b in buckets:
+                self._generations[b] = stamp
+        return stamp
+
+    def _l1_timeout(self, timeout):
+        backend_timeout = self.get_backend_timeout(timeout)
+        if backend_timeout is None:
+            return self.l1_timeout
+        return min(self.l1_timeout, max(0, backend_timeout - time.time()))
+
+    def _l1_get(self, full_key):
+        with self._lock:
+            entry = self._l1.get(full_key)
+            if entry is None:
+                return _MISSING
+            pickled, expires_at, generation = entry
+            if (
+                expires_at <= time.monotonic()
+                or generation != self._generations.get(self._bucket(full_key), 0)
+            ):
+                del self._l1[full_key]
+                return _MISSING
+            self._l1.move_to_end(full_key)
+        return pickle.loads(pickled)
+
+    def _l1_set(self, full_key, value, timeout, generation=None):
+        ttl = self._l1_timeout(timeout)
+        if ttl <= 0:
+            self._l1_delete(full_key)
+            return
+        pickled = pickle.dumps(value, self.pickle_protocol)
+        with self._lock:
+            if generation is None:
+                generation = self._generations.get(self._bucket(full_key), 0)
+            self._l1[full_key] = (pickled, time.monotonic() + ttl, generation)
+            self._l1.move_to_end(full_key)
+            while len(self._l1) > self.l1_max_entries:
+                self._l1.popitem(last=False)
+
+    def _l1_delete(self, full_key):
+        with self._lock:
+            self._l1.pop(full_key, None)
+
+    def _clear_l1(self):
+        with self._lock:
+            self._l1.clear()
+
+    def _resolve_timeout(self, timeout):
+        """Resolve DEFAULT_TIMEOUT against this alias (not L2's default)."""
+        return self.default_timeout if timeout is DEFAULT_TIMEOUT else timeout
+
+    # ------------------------------------------------------------------
+    # Cache API
+    # ------------------------------------------------------------------
+
+    def get(self, key, default=None, version=None):
+        if not self._uses_l1(key):
+            return self.l2.get(key, default, version=version)
+
+        full_key = self.make_and_validate_key(key, version=version)
+        self._refresh_generations()
+        value = self._l1_get(full_key)
+        if value is not _MISSING:
+            return value
+
+        value = self.l2.get(key, _MISSING, version=version)
+        if value is _MISSING:
+            return default
+        self._l1_set(full_key, value, DEFAULT_TIMEOUT)
+        return value
+
+    def get_many(self, keys, version=None):
+        found = {}
+        misses = []
+        refreshed = False
+        for key in keys:
+            if not self._uses_l1(key):
+                misses.append(key)
+                continue
+            if not refreshed:
+                self._refresh_generations()
+                refreshed = True
+            value = self._l1_get(self.make_and_validate_key(key, version=version))
+            if value is _MISSING:
+                misses.append(key)
+            else:
+                found[key] = value
+
+        if misses:
+            from_l2 = self.l2.get_many(misses, version=version)
+            for key, value in from_l2.items():
+                if self._uses_l1(key):
+                    self._l1_set(
+                        self.make_and_validate_key(key, version=version),
+                        value, DEFAULT_TIMEOUT,
+                    )
+            found.update(from_l2)
+        return found
+
+    def has_key(self, key, version=None):
+        return self.get(key, _MISSING, version=version) is not _MISSING
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        timeout = self._resolve_timeout(timeout)
+        self.l2.set(key, value, timeout, version=version)
+        if self._uses_l1(key):
+            full_key = self.make_and_validate_key(key, version=version)
+            generation = self._bump([full_key])
+            self._l1_set(full_key, value, timeout, generation)
+
+    def set_many(self, data, timeout=DEFAULT_TIMEOUT, version=None):
+        timeout = self._resolve_timeout(timeout)
+        failed = self.l2.set_many(data, timeout, version=version)
+        tiered = {
+            self.make_and_validate_key(key, version=version): value
+            for key, value in data.items() if self._uses_l1(key)
+        }
+        if tiered:
+            self._bump(tiered)
+            for full_key, value in tiered.items():
+                self._l1_set(full_key, value, timeout)
+        return failed
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        timeout = self._resolve_timeout(timeout)
+        added = self.l2.add(key, value, timeout, version=version)
+        if added and self._uses_l1(key):
+            full_key = self.make_and_validate_key(key, version=version)
+            generation = self._bump([full_key])
+            self._l1_set(full_key, value, timeout, generation)
+        return added
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        if self._uses_l1(key):
+            self._l1_delete(self.make_and_validate_key(key, version=version))
+        return self.l2.touch(key, self._resolve_timeout(timeout), version=version)
+
+    def delete(self, key, version=None):
+        deleted = self.l2.delete(key, version=version)
+        if self._uses_l1(key):
+            full_key = self.make_and_validate_key(key, version=version)
+            self._l1_delete(full_key)
+            self._bump([full_key])
+        return deleted
+
+    def delete_many(self, keys, version=None):
+        keys = list(keys)
+        self.l2.delete_many(keys, version=version)
+        full_keys = [
+            self.make_and_validate_key(key, version=version)
+            for key in keys if self._uses_l1(key)
+        ]
+        if full_keys:
+            for full_key in full_keys:
+                self._l1_delete(full_key)
+            self._bump(full_keys)
+
+    def incr(self, key, delta=1, version=None):
+        value = self.l2.incr(key, delta, version=version)
+        if self._uses_l1(key):
+            full_key = self.make_and_validate_key(key, version=version)
+            self._l1_delete(full_key)
+            self._bump([full_key])
+        return value
+
+    def decr(self, key, delta=1, version=None):
+        return self.incr(key, -delta, version=version)
+
+    def clear(self):
+        self.l2.clear()
+        self._clear_l1()
+        with self._lock:
+            self._generations = {}
+            self._generations_checked = 0.0
@@ -504,6 +504,11 @@ BOT_USER_AGENT_PATTERNS = [
 # Default rate limit for view tracking (views per minute per IP)
 DEFAULT_VIEW_RATE_LIMIT = 10
 
+# Raw PromptView rows older than this many days are compacted away by
+# rollup_prompt_views once their day has been rolled up into
+# PromptViewDaily. Override with settings.PROMPT_VIEW_RETENTION_DAYS.
+DEFAULT_VIEW_RETENTION_DAYS = 90
+
 
 # =============================================================================
 # OPENAI API CONFIGURATION (L8-TIMEOUT Implementation)
@@ -515,6 +520,160 @@ DEFAULT_VIEW_RATE_LIMIT = 10
 OPENAI_TIMEOUT = 30
 
 
+# =============================================================================
+# BULK MODERATION (ModerationOrchestrator.bulk_moderate_prompts)
+# =============================================================================
+
+# Worker threads for the network stages (OpenAI text + Vision calls)
+BULK_MODERATION_WORKERS = 8
+
+# OpenAI requests per second across all workers (0 = unlimited)
+BULK_MODERATION_REQUESTS_PER_SECOND = 5
+
+# Prompts whose ModerationLog/ContentFlag rows are written per transaction
+BULK_MODERATION_WRITE_BATCH = 50
+
+# OpenAI text moderation batching (openai_moderation.py). One request
+# carries up to MODERATION_BATCH_MAX_INPUTS texts / MAX_CHARS characters.
+MODERATION_BATCH_MAX_INPUTS = 32
+MODERATION_BATCH_MAX_CHARS = 100_000
+
+# Seconds a batch stays open for more texts under batching()
+MODERATION_BATCH_LINGER = 0.05
+
+# Text moderation verdicts are cached by normalised-text hash
+MODERATION_VERDICT_CACHE_TTL = 60 * 60 * 24 * 7  # 7 days
+
+
+# =============================================================================
+# IMAGE VERDICT REUSE (prompts/services/image_verdicts.py)
+# =============================================================================
+
+# Blocking Vision moderation verdicts are reused for images whose pHash
+# and dHash are both within this many bits. The band index finds every
+# match up to 3 bits; 0 = identical perceptual hashes only. Approvals are
+# reused for the exact bytes only.
+IMAGE_VERDICT_MAX_DISTANCE = 3
+
+# Severities of a flagged verdict that near-duplicates inherit
+# (critical = rejected, high = flagged for review)
+IMAGE_VERDICT_NEAR_SEVERITIES = ('high', 'critical')
+
+# AI analysis (title/description/tags) is reused only for the same picture
+# analysed with the same prompt text, generator and tag list
+IMAGE_ANALYSIS_MAX_DISTANCE = 0
+
+# Verdicts older than this are re-checked (policy or model changes)
+IMAGE_VERDICT_MAX_AGE_DAYS = 180
+
+
+# =============================================================================
+# NEAR-DUPLICATE IMAGE INDEX (prompts/services/near_duplicates.py)
+# =============================================================================
+
+# Images whose pHash and dHash are both within this many bits count as
+# near-duplicates (upload warning, report_duplicate_images, related-prompt
+# candidates). Also the largest radius the in-memory index can search: it
+# splits pHash into this many + 1 bands.
+NEAR_DUPLICATE_MAX_DISTANCE = 6
+
+# Published prompts listed in the upload duplicate warning
+NEAR_DUPLICATE_WARNING_LIMIT = 3
+
+# How often a worker's index picks up hashes written by other workers
+NEAR_DUPLICATE_SYNC_SECONDS = 30
+
+# Each catch-up re-reads hashes created this long before the previous one,
+# so rows whose transaction committed late are not skipped
+NEAR_DUPLICATE_SYNC_OVERLAP_SECONDS = 300
+
+# Related prompts: pHash distance at which the visual bonus of a candidate
+# reaches zero (scored pairwise, not searched). Unrelated images sit around
+# 32 bits apart.
+RELATED_VISUAL_MAX_DISTANCE = 12
+
+
+# =============================================================================
+# NEAR-DUPLICATE PROMPT TEXT (prompts/services/text_duplicates.py)
+# =============================================================================
+
+# Estimated Jaccard similarity of word shingles at which two prompt texts
+# count as near-duplicates (upload notice, bulk validation, report)
+TEXT_DUPLICATE_THRESHOLD = 0.7
+
+# Published prompts listed in the upload notice
+TEXT_DUPLICATE_WARNING_LIMIT = 3
+
+
+# =============================================================================
+# TAG VALIDATION (prompts/utils/tag_normalizer.py)
+# =============================================================================
+# Rule tables for _validate_and_fix_tags() in tasks.py, compiled once into
+# frozen lookups by prompts/utils/tag_normalizer.py.
+# Note: The original ACCEPTABLE_COMPOUNDS whitelist (32 entries) was replaced by
+# preserve-by-default logic in Session 80. See SPLIT_THESE_WORDS below.
+
+# Words that are NEVER meaningful as part of a compound tag.
+# If a hyphenated tag contains any of these, split it.
+SPLIT_THESE_WORDS = {
+    'the', 'a', 'an', 'in', 'on', 'at', 'to', 'for', 'of', 'with', 'by',
+    'and', 'or', 'but', 'is', 'are', 'was', 'were', 'be', 'been',
+    'very', 'really', 'just', 'also', 'some', 'any', 'this', 'that',
+    'big', 'small', 'good', 'bad', 'nice', 'great',
+}
+
+# Compounds containing stop words that are still legitimate terms.
+PRESERVE_DESPITE_STOP_WORDS = {
+    'depth-of-field',
+}
+
+# Hyphenated words with single-character parts that are real words/terms.
+# Without this, the single-char check in the compound-split rule would split them.
+PRESERVE_SINGLE_CHAR_COMPOUNDS = {
+    'x-ray', 'x-rays',
+    '3d-render', '3d-photo', '3d-effect', '3d-model', '3d-art',
+    'k-pop',
+    'e-commerce', 'e-sports',
+    'j-pop',
+    't-shirt', 't-shirts',
+}
+
+# Demographic/gender tags that should appear at the END of the tag list for UX.
+# Users see descriptive, content-specific tags first; standard demographic tags last.
+# This is display ordering only — no SEO impact.
+DEMOGRAPHIC_TAGS = {
+    'man', 'male', 'woman', 'female',
+    'boy', 'girl', 'teen-boy', 'teen-girl',
+    'child', 'kid', 'baby', 'infant',
+    'teenager', 'teen', 'person', 'couple',
+}
+
+# Within DEMOGRAPHIC_TAGS, these go last (after man/woman/middle-aged/etc.).
+# "male" and "female" are generic gender identifiers — less visually descriptive,
+# so they display after the more specific demographic terms.
+GENDER_LAST_TAGS = {'male', 'female'}
+
+# Tags that should never appear (AI-related tags waste slots)
+BANNED_AI_TAGS = {
+    'ai-art', 'ai-generated', 'ai-prompt', 'ai-colorize',
+}
+
+# AI-prefixed tags that ARE legitimate search terms (exceptions to startswith('ai-') ban).
+# These represent real product categories and high-traffic search queries.
+ALLOWED_AI_TAGS = {
+    'ai-influencer', 'ai-avatar', 'ai-headshot', 'ai-girlfriend', 'ai-boyfriend',
+}
+
+# Ethnicity terms banned from tags (belong in title/description/descriptors only)
+BANNED_ETHNICITY = {
+    'caucasian', 'african-american', 'asian', 'hispanic', 'latino', 'latina',
+    'black', 'white', 'european', 'african', 'middle-eastern', 'arab',
+    'south-asian', 'east-asian', 'southeast-asian', 'pacific-islander',
+    'indigenous', 'native-american', 'mixed-race', 'biracial', 'multiracial',
+    'ethnicity',
+}
+
+
 # =============================================================================
 # AI CONTENT GENERATION DEFAULTS (L10b Implementation)
 # =============================================================================
@@ -4,6 +4,8 @@ Django management command to permanently delete expired trashed prompts.
 This command:
 - Identifies prompts that have exceeded their retention period
 - Deletes them from both Cloudinary and the database
+- Releases images held by abandoned upload sessions (never submitted or
+  cancelled), deleting files no prompt shares
 - Sends an email summary to admins
 - Supports dry-run mode for testing
 
@@ -24,6 +26,10 @@ from datetime import timedelta
 import logging
 
 from prompts.models import Prompt, DeletedPrompt
+from prompts.services.b2_upload_service import (
+    abandoned_session_references,
+    release_abandoned_session_references,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -136,6 +142,21 @@ class Command(BaseCommand):
                     self.style.WARNING(f'  [DRY RUN] Would delete prompt ID {prompt.id}')
                 )
 
+        # Images of upload sessions that ended without submit or cancel
+        if dry_run:
+            abandoned = abandoned_session_references(now).count()
+            self.stdout.write(self.style.WARNING(
+                f'  [DRY RUN] Would release {abandoned} abandoned upload image reference(s)'
+            ))
+        else:
+            uploads = release_abandoned_session_references(now)
+            self.stdout.write(
+                f"Released {uploads['released']} abandoned upload image reference(s), "
+                f"deleted {uploads['deleted']} image(s)"
+            )
+            for error in uploads['errors']:
+                self.stdout.write(self.style.ERROR(f'✗ Abandoned upload: {error}'))
+
         # Print summary
         self.stdout.write('')
         self.stdout.write(self.style.SUCCESS('=' * 50))
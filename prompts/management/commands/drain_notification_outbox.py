@@ -0,0 +1,38 @@
+"""
+Django management command to drain the notification outbox.
+
+Social actions queue NotificationEvent rows and schedule the
+drain_notification_outbox task. This command processes anything left
+behind (a lost task, a worker outage).
+
+Run every 10 minutes via Heroku Scheduler.
+
+Usage:
+    python manage.py drain_notification_outbox
+    python manage.py drain_notification_outbox --batch-size 200
+"""
+
+from django.core.management.base import BaseCommand
+
+from prompts.services.notification_outbox import DRAIN_BATCH_SIZE, drain
+
+
+class Command(BaseCommand):
+    help = 'Write notifications for queued notification events'
+
+    def add_arguments(self, parser):
+        """Add command line arguments"""
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=DRAIN_BATCH_SIZE,
+            help=f'Events per transaction (default: {DRAIN_BATCH_SIZE})',
+        )
+
+    def handle(self, *args, **options):
+        """Main command logic"""
+        if options['batch_size'] < 1:
+            self.stderr.write(self.style.ERROR('--batch-size must be at least 1'))
+            return
+        processed = drain(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Drained {processed} notification events'))
@@ -181,6 +181,7 @@ class Command(BaseCommand):
             result = upload_image(
                 image_file,
                 original_filename=image_file.name,
+                prompt_id=prompt.pk,
             )
         except Exception as exc:
             return f"upload-exception: {exc}"
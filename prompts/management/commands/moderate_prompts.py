@@ -1,18 +1,49 @@
 """
 Django management command for bulk moderation of prompts.
 
+Prompts are moderated through ModerationOrchestrator.bulk_moderate_prompts:
+the OpenAI text and Vision calls run on a worker pool under a shared rate
+limit, and results are written in batches.
+
+A forced (--all) run records its start time on the SiteSettings row
+(not the cache, which may evict it); if it is interrupted, --all --resume
+skips the prompts that run already finished.
+
 Usage:
     python manage.py moderate_prompts                    # Moderate all pending prompts
     python manage.py moderate_prompts --all              # Re-moderate all prompts
+    python manage.py moderate_prompts --all --resume     # Continue an interrupted --all run
+    python manage.py moderate_prompts --all --refresh-verdicts  # Ignore stored image verdicts
     python manage.py moderate_prompts --status pending   # Moderate specific status
     python manage.py moderate_prompts --limit 10         # Limit number of prompts
+    python manage.py moderate_prompts --workers 4 --rate 2   # Gentler on the API
 """
 
 from django.core.management.base import BaseCommand, CommandError
-from prompts.models import Prompt
+from django.utils import timezone
+
+from prompts.constants import (
+    BULK_MODERATION_REQUESTS_PER_SECOND,
+    BULK_MODERATION_WORKERS,
+)
+from prompts.models import Prompt, SiteSettings
 from prompts.services import ModerationOrchestrator
 
 
+def get_run_checkpoint():
+    """Start time of the unfinished --all run, or None."""
+    return SiteSettings.objects.filter(pk=1).values_list(
+        'moderation_run_started_at', flat=True,
+    ).first()
+
+
+def set_run_checkpoint(started_at):
+    """Record (or clear, with None) the --all run checkpoint."""
+    # update() rather than save(): no signal, cached settings stay valid
+    if not SiteSettings.objects.filter(pk=1).update(moderation_run_started_at=started_at):
+        SiteSettings.objects.create(moderation_run_started_at=started_at)
+
+
 class Command(BaseCommand):
     help = 'Run moderation checks on prompts'
 
@@ -38,6 +69,31 @@ class Command(BaseCommand):
             action='store_true',
             help='Show what would be moderated without actually doing it',
         )
+        parser.add_argument(
+            '--resume',
+            action='store_true',
+            help='With --all: skip prompts the interrupted previous run finished',
+        )
+        parser.add_argument(
+            '--refresh-verdicts',
+            action='store_true',
+            help='Judge every image again instead of reusing stored verdicts',
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=BULK_MODERATION_WORKERS,
+            help=f'Concurrent API calls (default: {BULK_MODERATION_WORKERS})',
+        )
+        parser.add_argument(
+            '--rate',
+            type=float,
+            default=BULK_MODERATION_REQUESTS_PER_SECOND,
+            help=(
+                'API requests per second, 0 for unlimited '
+                f'(default: {BULK_MODERATION_REQUESTS_PER_SECOND})'
+            ),
+        )
 
     def handle(self, *args, **options):
         self.stdout.write(self.style.SUCCESS('Starting prompt moderation...'))
@@ -57,6 +113,26 @@ class Command(BaseCommand):
                 f'Moderating {prompts.count()} prompts with status: {status}'
             )
 
+        if options['workers'] < 1:
+            raise CommandError('--workers must be at least 1')
+
+        completed_since = None
+        if options['all']:
+            completed_since = get_run_checkpoint() if options['resume'] else None
+            if options['resume'] and not completed_since:
+                self.stdout.write(self.style.WARNING(
+                    'No unfinished --all run recorded; re-moderating every prompt.'
+                ))
+            if completed_since:
+                prompts = prompts.exclude(moderation_completed_at__gte=completed_since)
+                self.stdout.write(
+                    f'Resuming run started {completed_since:%Y-%m-%d %H:%M} UTC: '
+                    f'{prompts.count()} prompts left'
+                )
+
+        # Oldest first, so an interrupted run has finished a prefix
+        prompts = prompts.order_by('pk')
+
         # Apply limit if specified
         if options['limit']:
             prompts = prompts[:options['limit']]
@@ -85,58 +161,24 @@ class Command(BaseCommand):
         except Exception as e:
             raise CommandError(f'Failed to initialize moderation services: {e}')
 
+        if options['all'] and not completed_since:
+            set_run_checkpoint(timezone.now())
+
         # Run bulk moderation
         self.stdout.write('\nProcessing prompts...\n')
 
-        stats = {
-            'total': 0,
-            'approved': 0,
-            'rejected': 0,
-            'flagged': 0,
-            'errors': 0,
-        }
-
-        for prompt in prompts:
-            self.stdout.write(
-                f'Moderating: {prompt.id} - {prompt.title[:50]}...',
-                ending=' '
-            )
-
-            try:
-                result = orchestrator.moderate_prompt(
-                    prompt,
-                    force=options['all']
-                )
+        stats = orchestrator.bulk_moderate_prompts(
+            list(prompts),
+            force=options['all'],
+            refresh_verdicts=options['refresh_verdicts'],
+            workers=options['workers'],
+            requests_per_second=options['rate'],
+            on_result=self._report,
+        )
+        stats['total'] = stats['total_processed']
 
-                stats['total'] += 1
-                status = result['overall_status']
-
-                if status == 'approved':
-                    stats['approved'] += 1
-                    self.stdout.write(self.style.SUCCESS('✓ APPROVED'))
-                elif status == 'rejected':
-                    stats['rejected'] += 1
-                    self.stdout.write(self.style.ERROR('✗ REJECTED'))
-                elif status == 'flagged':
-                    stats['flagged'] += 1
-                    self.stdout.write(self.style.WARNING('⚠ FLAGGED'))
-                else:
-                    self.stdout.write(self.style.WARNING(f'? {status.upper()}'))
-
-                # Show details if flagged or rejected
-                if result.get('requires_review'):
-                    summary = result.get('summary', {})
-                    for service, service_result in summary.items():
-                        if service_result and service_result.get('status') != 'approved':
-                            flags = service_result.get('flagged_categories', [])
-                            if flags:
-                                self.stdout.write(
-                                    f'    └─ {service}: {", ".join(flags[:3])}'
-                                )
-
-            except Exception as e:
-                stats['errors'] += 1
-                self.stdout.write(self.style.ERROR(f'ERROR: {str(e)}'))
+        if options['all'] and not stats['errors']:
+            set_run_checkpoint(None)
 
         # Print summary
         self.stdout.write('\n' + '=' * 60)
@@ -152,10 +194,17 @@ class Command(BaseCommand):
             self.style.WARNING(f'  ⚠ Flagged for review: {stats["flagged"]}')
         )
 
+        if stats['skipped'] > 0:
+            self.stdout.write(f'  Skipped (already moderated): {stats["skipped"]}')
+
         if stats['errors'] > 0:
             self.stdout.write(
                 self.style.ERROR(f'  ⚠ Errors: {stats["errors"]}')
             )
+            if options['all']:
+                self.stdout.write(
+                    'Re-run with --all --resume to retry only the unfinished prompts.'
+                )
 
         self.stdout.write('=' * 60 + '\n')
 
@@ -166,3 +215,31 @@ class Command(BaseCommand):
                     '\nAction required: Review flagged/rejected prompts in Django admin.'
                 )
             )
+
+    def _report(self, prompt, result):
+        """Print one prompt's outcome as bulk moderation saves it."""
+        self.stdout.write(
+            f'Moderating: {prompt.id} - {prompt.title[:50]}...',
+            ending=' '
+        )
+        status = result['overall_status']
+
+        if status == 'approved':
+            self.stdout.write(self.style.SUCCESS('✓ APPROVED'))
+        elif status == 'rejected':
+            self.stdout.write(self.style.ERROR('✗ REJECTED'))
+        elif status == 'flagged':
+            self.stdout.write(self.style.WARNING('⚠ FLAGGED'))
+        else:
+            self.stdout.write(self.style.WARNING(f'? {status.upper()}'))
+
+        # Show details if flagged or rejected
+        if result.get('requires_review'):
+            summary = result.get('summary', {})
+            for service, service_result in summary.items():
+                if service_result and service_result.get('status') != 'approved':
+                    flags = service_result.get('flagged_categories', [])
+                    if flags:
+                        self.stdout.write(
+                            f'    └─ {service}: {", ".join(flags[:3])}'
+                        )
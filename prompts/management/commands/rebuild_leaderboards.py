@@ -0,0 +1,59 @@
+"""
+Django management command to rebuild the precomputed leaderboards.
+
+This command:
+- Recomputes every (or the selected) metric × period board into
+  LeaderboardEntry rows (score + dense rank per user)
+- Swaps each board in atomically and retires cached leaderboard reads
+- Refreshes the profile stats snapshots (views, ranks, counters)
+
+Run hourly via Heroku Scheduler (and after rollup_prompt_views).
+
+Usage:
+    python manage.py rebuild_leaderboards                    # All boards
+    python manage.py rebuild_leaderboards --metric views     # Most Viewed only
+    python manage.py rebuild_leaderboards --period week      # This week only
+"""
+
+from django.core.management.base import BaseCommand
+import logging
+
+from prompts.services import profile_stats
+from prompts.services.leaderboard import LeaderboardService
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the precomputed leaderboard tables (score + rank per user)'
+
+    def add_arguments(self, parser):
+        """Add command line arguments"""
+        parser.add_argument(
+            '--metric',
+            choices=LeaderboardService.VALID_METRICS,
+            default=None,
+            help='Only rebuild this metric (default: all)',
+        )
+        parser.add_argument(
+            '--period',
+            choices=LeaderboardService.VALID_PERIODS,
+            default=None,
+            help='Only rebuild this period (default: all)',
+        )
+
+    def handle(self, *args, **options):
+        """Main command logic"""
+        metrics = [options['metric']] if options['metric'] else None
+        periods = [options['period']] if options['period'] else None
+
+        results = LeaderboardService.rebuild_boards(metrics=metrics, periods=periods)
+        for (metric, period), count in results.items():
+            self.stdout.write(self.style.SUCCESS(
+                f'Leaderboard {metric}/{period}: {count} ranked users'
+            ))
+
+        refreshed = profile_stats.refresh_snapshots()
+        self.stdout.write(self.style.SUCCESS(
+            f'Profile stats: {refreshed} snapshots refreshed'
+        ))
@@ -1,6 +1,6 @@
 """
 Management command to reorder tags on all published prompts.
-Runs existing tags through _validate_and_fix_tags() and re-applies
+Runs existing tags through _validate_and_fix_tags_batch() and re-applies
 them with clear() + ordered add() to fix database insertion order.
 
 No GPT calls, no API cost. Safe to run multiple times.
@@ -11,11 +11,15 @@ Usage:
     python manage.py reorder_tags --dry-run          # Preview without changes
     python manage.py reorder_tags --limit 10         # First 10 only
 """
+from django.contrib.contenttypes.models import ContentType
 from django.core.management.base import BaseCommand
 from django.db import transaction
-from taggit.models import Tag
+from taggit.models import Tag, TaggedItem
 from prompts.models import Prompt
-from prompts.tasks import _validate_and_fix_tags
+from prompts.tasks import _validate_and_fix_tags_batch
+
+# Prompts whose tags are read and validated together
+BATCH_SIZE = 500
 
 
 class Command(BaseCommand):
@@ -36,54 +40,71 @@ class Command(BaseCommand):
         if options['limit']:
             queryset = queryset[:options['limit']]
 
-        total = queryset.count()
+        prompt_ids = list(queryset.values_list('pk', flat=True))
+        total = len(prompt_ids)
         reordered = 0
         unchanged = 0
 
-        for i, prompt in enumerate(queryset.iterator(), 1):
-            # Get current tags in current DB order
-            current_tags = list(
-                prompt.tags.all()
-                .order_by('taggit_taggeditem_items__id')
-                .values_list('name', flat=True)
-            )
-
-            if not current_tags:
-                self.stdout.write(f'[{i}/{total}] Prompt {prompt.pk}: no tags, skipping')
-                unchanged += 1
-                continue
+        content_type = ContentType.objects.get_for_model(Prompt)
+        i = 0
+
+        for start in range(0, len(prompt_ids), BATCH_SIZE):
+            batch = prompt_ids[start:start + BATCH_SIZE]
+            # Current tags of the whole batch, in DB insertion order
+            tags_by_prompt = {pk: [] for pk in batch}
+            for object_id, name in (
+                TaggedItem.objects
+                .filter(content_type=content_type, object_id__in=batch)
+                .order_by('id')
+                .values_list('object_id', 'tag__name')
+            ):
+                tags_by_prompt[object_id].append(name)
 
             # Run through validator (handles demographic ordering, dedup, etc.)
-            validated_tags = _validate_and_fix_tags(current_tags)
-
-            # Check if order actually changed
-            if current_tags == validated_tags:
-                self.stdout.write(f'[{i}/{total}] Prompt {prompt.pk}: order correct, skipping')
-                unchanged += 1
-                continue
+            tagged = [pk for pk in batch if tags_by_prompt[pk]]
+            validated_by_prompt = dict(zip(tagged, _validate_and_fix_tags_batch(
+                [tags_by_prompt[pk] for pk in tagged],
+            )))
+
+            for prompt_pk in batch:
+                i += 1
+                current_tags = tags_by_prompt[prompt_pk]
+                if not current_tags:
+                    self.stdout.write(f'[{i}/{total}] Prompt {prompt_pk}: no tags, skipping')
+                    unchanged += 1
+                    continue
+
+                validated_tags = validated_by_prompt[prompt_pk]
+
+                # Check if order actually changed
+                if current_tags == validated_tags:
+                    self.stdout.write(f'[{i}/{total}] Prompt {prompt_pk}: order correct, skipping')
+                    unchanged += 1
+                    continue
+
+                if options['dry_run']:
+                    self.stdout.write(
+                        f'[{i}/{total}] Prompt {prompt_pk}: WOULD reorder\n'
+                        f'  Before: {current_tags}\n'
+                        f'  After:  {validated_tags}'
+                    )
+                    reordered += 1
+                    continue
+
+                # Apply: clear + ordered add
+                prompt = Prompt.objects.get(pk=prompt_pk)
+                with transaction.atomic():
+                    prompt.tags.clear()
+                    for tag_name in validated_tags:
+                        tag_obj, _ = Tag.objects.get_or_create(name=tag_name)
+                        prompt.tags.add(tag_obj)
 
-            if options['dry_run']:
                 self.stdout.write(
-                    f'[{i}/{total}] Prompt {prompt.pk}: WOULD reorder\n'
+                    f'[{i}/{total}] Prompt {prompt_pk}: reordered\n'
                     f'  Before: {current_tags}\n'
                     f'  After:  {validated_tags}'
                 )
                 reordered += 1
-                continue
-
-            # Apply: clear + ordered add
-            with transaction.atomic():
-                prompt.tags.clear()
-                for tag_name in validated_tags:
-                    tag_obj, _ = Tag.objects.get_or_create(name=tag_name)
-                    prompt.tags.add(tag_obj)
-
-            self.stdout.write(
-                f'[{i}/{total}] Prompt {prompt.pk}: reordered\n'
-                f'  Before: {current_tags}\n'
-                f'  After:  {validated_tags}'
-            )
-            reordered += 1
 
         prefix = 'DRY RUN — ' if options['dry_run'] else ''
         self.stdout.write(
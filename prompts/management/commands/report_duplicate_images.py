@@ -0,0 +1,96 @@
+"""
+Report groups of near-duplicate images across the catalogue.
+
+Reads the near-duplicate index (prompts/services/near_duplicates.py):
+images whose perceptual hashes are within --distance bits are linked, and
+each connected group is listed. Read-only unless --backfill is given,
+which hashes images uploaded before the index existed.
+
+Usage:
+    python manage.py report_duplicate_images                 # Prompts, default distance
+    python manage.py report_duplicate_images --distance 4    # Stricter matching (max 6)
+    python manage.py report_duplicate_images --include-generated
+    python manage.py report_duplicate_images --backfill --limit 500
+"""
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from prompts.constants import NEAR_DUPLICATE_MAX_DISTANCE
+from prompts.models import GeneratedImage, Prompt
+from prompts.services import near_duplicates
+
+
+class Command(BaseCommand):
+    help = 'List groups of near-duplicate Prompt (and generated) images'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--distance', type=int, default=NEAR_DUPLICATE_MAX_DISTANCE,
+                            help=f'Max differing hash bits (default {NEAR_DUPLICATE_MAX_DISTANCE})')
+        parser.add_argument('--include-generated', action='store_true',
+                            help='Also group bulk-generated images')
+        parser.add_argument('--backfill', action='store_true',
+                            help='First download and hash images that have no hashes yet')
+        parser.add_argument('--limit', type=int, default=None,
+                            help='Max images to backfill')
+
+    def handle(self, *args, **options):
+        if not getattr(settings, 'NEAR_DUPLICATE_INDEX', False):
+            raise CommandError('NEAR_DUPLICATE_INDEX is disabled in settings')
+        if options['distance'] > NEAR_DUPLICATE_MAX_DISTANCE:
+            raise CommandError(f'--distance can be at most {NEAR_DUPLICATE_MAX_DISTANCE}')
+
+        if options['backfill']:
+            self._backfill(options['limit'], options['include_generated'])
+
+        kind = None if options['include_generated'] else near_duplicates.PROMPT
+        groups = near_duplicates.duplicate_groups(options['distance'], kind=kind)
+        if not groups:
+            self.stdout.write(self.style.SUCCESS('No near-duplicate images found'))
+            return
+
+        prompts = Prompt.all_objects.in_bulk([
+            object_id for group in groups
+            for kind_name, object_id in group if kind_name == near_duplicates.PROMPT
+        ])
+        for number, group in enumerate(groups, 1):
+            self.stdout.write(self.style.WARNING(f'Group {number} ({len(group)} images)'))
+            for kind_name, object_id in sorted(group, key=str):
+                if kind_name == near_duplicates.PROMPT:
+                    prompt = prompts.get(object_id)
+                    if prompt is None:
+                        continue
+                    state = 'trashed' if prompt.deleted_at else ('published' if prompt.status == 1 else 'draft')
+                    self.stdout.write(f'  prompt #{prompt.pk} [{state}] {prompt.title} (/prompt/{prompt.slug}/)')
+                else:
+                    self.stdout.write(f'  generated image {object_id}')
+        self.stdout.write(f'{len(groups)} group(s) at distance <= {options["distance"]}')
+
+    def _backfill(self, limit, include_generated):
+        from prompts.tasks import _download_image
+
+        hashed = done = 0
+        prompts = Prompt.objects.filter(
+            image_hash__isnull=True, deleted_at__isnull=True,
+        ).exclude(b2_image_url__isnull=True).exclude(b2_image_url='').only('id', 'b2_image_url')
+        targets = [(near_duplicates.PROMPT, p.pk, p.b2_image_url) for p in prompts.iterator()]
+        if include_generated:
+            images = GeneratedImage.objects.filter(
+                image_hash__isnull=True, status='completed',
+            ).exclude(image_url='').only('id', 'image_url')
+            targets += [(near_duplicates.GENERATED, i.pk, i.image_url) for i in images.iterator()]
+        if limit is not None:
+            targets = targets[:limit]
+
+        for kind, object_id, url in targets:
+            done += 1
+            downloaded = _download_image(url)
+            hashes = near_duplicates.fingerprint(downloaded[0]) if downloaded else None
+            if hashes is None:
+                self.stderr.write(f'  could not hash {kind} {object_id}: {url}')
+                continue
+            if kind == near_duplicates.PROMPT:
+                near_duplicates.record_prompt(object_id, hashes.phash, hashes.dhash)
+            else:
+                near_duplicates.record_generated_image(object_id, downloaded[0])
+            hashed += 1
+        self.stdout.write(f'Backfilled {hashed}/{done} image(s)')
@@ -0,0 +1,89 @@
+"""
+Report groups of near-duplicate prompt texts across the catalogue.
+
+Reads the MinHash/LSH text index (prompts/services/text_duplicates.py):
+texts whose estimated similarity reaches --threshold are linked, and each
+connected group is listed. Read-only unless --backfill is given, which
+indexes texts saved before the index existed.
+
+Usage:
+    python manage.py report_duplicate_prompt_texts                   # Prompts, default threshold
+    python manage.py report_duplicate_prompt_texts --threshold 0.9   # Near-verbatim copies only
+    python manage.py report_duplicate_prompt_texts --include-generated
+    python manage.py report_duplicate_prompt_texts --backfill --limit 5000
+"""
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from prompts.constants import TEXT_DUPLICATE_THRESHOLD
+from prompts.models import GeneratedImage, Prompt
+from prompts.services import text_duplicates
+
+BACKFILL_BATCH = 500
+
+
+class Command(BaseCommand):
+    help = 'List groups of near-duplicate Prompt (and generated) prompt texts'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threshold', type=float, default=TEXT_DUPLICATE_THRESHOLD,
+                            help=f'Min estimated similarity, 0-1 (default {TEXT_DUPLICATE_THRESHOLD})')
+        parser.add_argument('--include-generated', action='store_true',
+                            help='Also group bulk-generation prompt texts')
+        parser.add_argument('--backfill', action='store_true',
+                            help='First index texts that have no signature yet')
+        parser.add_argument('--limit', type=int, default=None,
+                            help='Max texts of each kind to backfill')
+
+    def handle(self, *args, **options):
+        if not getattr(settings, 'PROMPT_TEXT_INDEX', False):
+            raise CommandError('PROMPT_TEXT_INDEX is disabled in settings')
+
+        if options['backfill']:
+            self._backfill(options['limit'], options['include_generated'])
+
+        kind = None if options['include_generated'] else text_duplicates.PROMPT
+        groups = text_duplicates.duplicate_text_groups(options['threshold'], kind=kind)
+        if not groups:
+            self.stdout.write(self.style.SUCCESS('No near-duplicate prompt texts found'))
+            return
+
+        prompts = Prompt.all_objects.in_bulk([
+            object_id for group in groups
+            for kind_name, object_id in group if kind_name == text_duplicates.PROMPT
+        ])
+        for number, group in enumerate(groups, 1):
+            self.stdout.write(self.style.WARNING(f'Group {number} ({len(group)} texts)'))
+            for kind_name, object_id in sorted(group, key=str):
+                if kind_name == text_duplicates.PROMPT:
+                    prompt = prompts.get(object_id)
+                    if prompt is None:
+                        continue
+                    state = 'trashed' if prompt.deleted_at else ('published' if prompt.status == 1 else 'draft')
+                    self.stdout.write(f'  prompt #{prompt.pk} [{state}] {prompt.title} (/prompt/{prompt.slug}/)')
+                else:
+                    self.stdout.write(f'  generated image {object_id}')
+        self.stdout.write(f'{len(groups)} group(s) at similarity >= {options["threshold"]}')
+
+    def _backfill(self, limit, include_generated):
+        prompts = Prompt.all_objects.filter(
+            text_signature__isnull=True,
+        ).order_by('pk').values_list('pk', 'content')
+        if limit is not None:
+            prompts = prompts[:limit]
+        count = 0
+        for prompt_id, content in prompts.iterator():
+            text_duplicates.record_prompt_text(prompt_id, content)
+            count += 1
+        self.stdout.write(f'Indexed {count} prompt text(s)')
+
+        if include_generated:
+            images = GeneratedImage.objects.filter(
+                text_signature__isnull=True, variation_number=1,
+            ).order_by('created_at').only('id', 'prompt_text')
+            if limit is not None:
+                images = images[:limit]
+            images = list(images)
+            for start in range(0, len(images), BACKFILL_BATCH):
+                text_duplicates.record_generated_texts(images[start:start + BACKFILL_BATCH])
+            self.stdout.write(f'Indexed {len(images)} generated prompt text(s)')
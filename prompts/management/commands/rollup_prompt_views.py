@@ -0,0 +1,90 @@
+"""
+Django management command to roll up PromptView rows into daily totals.
+
+This command:
+- Aggregates every complete UTC day since the last run into PromptViewDaily
+  (one row per prompt per day: unique views + authenticated views)
+- Compacts raw PromptView rows older than the retention window once their
+  day has been rolled up
+
+Run daily via Heroku Scheduler (after midnight UTC).
+
+Usage:
+    python manage.py rollup_prompt_views                       # Roll up + compact
+    python manage.py rollup_prompt_views --retention-days 60   # Custom window
+    python manage.py rollup_prompt_views --no-compact          # Roll up only
+    python manage.py rollup_prompt_views --dry-run             # Roll up, report compaction
+"""
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+import logging
+
+from prompts.constants import DEFAULT_VIEW_RETENTION_DAYS
+from prompts.services.view_rollups import compact_views, rollup_views
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = 'Roll up prompt views into daily totals and compact old raw view rows'
+
+    def add_arguments(self, parser):
+        """Add command line arguments"""
+        parser.add_argument(
+            '--retention-days',
+            type=int,
+            default=None,
+            help=(
+                'Days of raw view rows to keep '
+                '(default: settings.PROMPT_VIEW_RETENTION_DAYS)'
+            ),
+        )
+        parser.add_argument(
+            '--no-compact',
+            action='store_true',
+            help='Skip deleting old raw view rows',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Report how many raw rows would be compacted without deleting',
+        )
+
+    def handle(self, *args, **options):
+        """Main command logic"""
+        retention_days = options['retention_days']
+        if retention_days is None:
+            retention_days = getattr(
+                settings, 'PROMPT_VIEW_RETENTION_DAYS', DEFAULT_VIEW_RETENTION_DAYS
+            )
+        if retention_days < 1:
+            self.stderr.write(self.style.ERROR('--retention-days must be at least 1'))
+            return
+
+        result = rollup_views()
+        if result['first_day'] is None:
+            self.stdout.write('Rollup: nothing new to roll up')
+        else:
+            self.stdout.write(self.style.SUCCESS(
+                f"Rollup: {result['first_day']} → {result['last_day']} "
+                f"({result['rows']} prompt-day rows)"
+            ))
+
+        if options['no_compact']:
+            return
+
+        compacted = compact_views(
+            retention_days=retention_days,
+            dry_run=options['dry_run'],
+        )
+        if options['dry_run']:
+            self.stdout.write(self.style.WARNING(
+                f'Compaction (dry run): {compacted} raw rows older than '
+                f'{retention_days} days would be deleted'
+            ))
+        else:
+            self.stdout.write(self.style.SUCCESS(
+                f'Compaction: deleted {compacted} raw rows older than '
+                f'{retention_days} days'
+            ))
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.11 on 2026-10-19 10:43
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('prompts', '0092_profanityword_provider_aware'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PromptViewDaily',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField(help_text='UTC day the views were recorded on')),
+                ('unique_views', models.PositiveIntegerField(default=0, help_text='Unique viewers first recorded on this day')),
+                ('authenticated_views', models.PositiveIntegerField(default=0, help_text='Subset of unique_views from logged-in users')),
+                ('prompt', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_views', to='prompts.prompt')),
+            ],
+            options={
+                'verbose_name': 'Prompt View (Daily)',
+                'verbose_name_plural': 'Prompt Views (Daily)',
+                'indexes': [models.Index(fields=['day', 'prompt'], name='promptviewdaily_day_idx')],
+                'constraints': [models.UniqueConstraint(fields=('prompt', 'day'), name='promptviewdaily_prompt_day_uniq')],
+            },
+        ),
+    ]
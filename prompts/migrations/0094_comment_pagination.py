@@ -0,0 +1,40 @@
+# Generated by Django 5.2.11 on 2026-10-19 11:13
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def backfill_approved_comment_count(apps, schema_editor):
+    Prompt = apps.get_model('prompts', 'Prompt')
+    Comment = apps.get_model('prompts', 'Comment')
+    approved = Comment.objects.filter(
+        prompt=OuterRef('pk'), approved=True,
+    ).order_by().values('prompt').annotate(c=Count('id')).values('c')
+    Prompt.objects.update(
+        approved_comment_count=Coalesce(Subquery(approved), Value(0))
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('prompts', '0093_add_prompt_view_daily'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='prompt',
+            name='approved_comment_count',
+            field=models.PositiveIntegerField(default=0, help_text='Number of approved comments (maintained automatically)'),
+        ),
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['prompt', 'approved', 'created_on', 'id'], name='comment_prompt_page_idx'),
+        ),
+        migrations.RunPython(
+            backfill_approved_comment_count, migrations.RunPython.noop,
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.2.11 on 2026-10-19 12:19
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('prompts', '0094_comment_pagination'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LeaderboardEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('metric', models.CharField(choices=[('views', 'Most Viewed'), ('active', 'Most Active')], max_length=10)),
+                ('period', models.CharField(choices=[('week', 'This Week'), ('month', 'This Month'), ('all', 'All Time')], max_length=10)),
+                ('score', models.PositiveBigIntegerField(help_text='Total views (views) or activity score (active)')),
+                ('rank', models.PositiveIntegerField(help_text='Dense rank (1 = top; equal scores share a rank)')),
+                ('prompt_count', models.PositiveIntegerField(default=0)),
+                ('follower_count', models.PositiveIntegerField(default=0)),
+                ('computed_at', models.DateTimeField()),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='leaderboard_entries', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Leaderboard Entry',
+                'verbose_name_plural': 'Leaderboard Entries',
+                'indexes': [models.Index(fields=['metric', 'period', 'rank'], name='leaderboardentry_rank_idx')],
+                'constraints': [models.UniqueConstraint(fields=('metric', 'period', 'user'), name='leaderboardentry_board_user_uniq')],
+            },
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.11 on 2026-10-19 12:41
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('prompts', '0095_leaderboard_entry'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserProfileStats',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='profile_stats', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('prompt_count', models.PositiveIntegerField(default=0, help_text='Published, non-deleted prompts')),
+                ('likes_received', models.PositiveIntegerField(default=0, help_text='Likes on published, non-deleted prompts')),
+                ('total_views', models.PositiveBigIntegerField(default=0, help_text="Unique views across all of the user's prompts")),
+                ('all_time_rank', models.PositiveIntegerField(blank=True, help_text='Most Viewed, all time', null=True)),
+                ('thirty_day_rank', models.PositiveIntegerField(blank=True, help_text='Most Active, this month', null=True)),
+                ('follower_count', models.PositiveIntegerField(default=0)),
+                ('following_count', models.PositiveIntegerField(default=0)),
+                ('version', models.PositiveBigIntegerField(default=1, help_text='Incremented on every change to this snapshot')),
+                ('computed_at', models.DateTimeField()),
+            ],
+            options={
+                'verbose_name': 'User Profile Stats',
+                'verbose_name_plural': 'User Profile Stats',
+            },
+        ),
+    ]
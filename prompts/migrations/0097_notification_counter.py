@@ -0,0 +1,31 @@
+# Generated by Django 5.2.11 on 2026-10-19 12:57
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('prompts', '0096_user_profile_stats'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NotificationCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('category', models.CharField(choices=[('comments', 'Comments'), ('likes', 'Likes'), ('follows', 'Follows'), ('collections', 'Collections'), ('system', 'System')], max_length=20)),
+                ('unread_count', models.PositiveIntegerField(default=0)),
+                ('latest_at', models.DateTimeField(blank=True, help_text='Most recent notification in this category (read or not)', null=True)),
+                ('next_expiry', models.DateTimeField(blank=True, help_text='Earliest expires_at among counted unread notifications', null=True)),
+                ('reconciled_at', models.DateTimeField()),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='notification_counters', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('user', 'category'), name='notifcounter_user_category_uniq')],
+            },
+        ),
+    ]
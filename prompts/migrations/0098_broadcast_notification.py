@@ -0,0 +1,47 @@
+# Generated by Django 5.2.11 on 2026-10-19 13:16
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('prompts', '0097_notification_counter'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BroadcastNotification',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('title', models.CharField(max_length=200)),
+                ('link', models.CharField(blank=True, max_length=500)),
+                ('expires_at', models.DateTimeField(blank=True, help_text='Auto-expire this notification after this time', null=True)),
+                ('is_expired', models.BooleanField(db_index=True, default=False, help_text='Manually expired by admin')),
+                ('click_count', models.PositiveIntegerField(default=0)),
+                ('batch_id', models.CharField(help_text='Identifies the blast in the Sent Notifications table', max_length=8, unique=True)),
+                ('recipient_count', models.PositiveIntegerField(default=0, help_text='Active users when the broadcast was sent')),
+                ('created_by', models.CharField(blank=True, max_length=150)),
+                ('created_at', models.DateTimeField(auto_now_add=True, db_index=True)),
+            ],
+            options={
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='BroadcastReceipt',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('read_at', models.DateTimeField(blank=True, null=True)),
+                ('dismissed_at', models.DateTimeField(blank=True, null=True)),
+                ('broadcast', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='receipts', to='prompts.broadcastnotification')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='broadcast_receipts', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('broadcast', 'user'), name='broadcastreceipt_uniq')],
+            },
+        ),
+    ]
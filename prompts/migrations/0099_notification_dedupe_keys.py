@@ -0,0 +1,38 @@
+# Generated by Django 5.2.11 on 2026-10-19 13:35
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('prompts', '0098_broadcast_notification'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='notification',
+            name='actor_count',
+            field=models.PositiveIntegerField(default=1, help_text='Users folded into this notification'),
+        ),
+        migrations.AddField(
+            model_name='notification',
+            name='aggregate_key',
+            field=models.CharField(blank=True, help_text='Hash of recipient, type and target for rolled-up events', max_length=64, null=True),
+        ),
+        migrations.AddField(
+            model_name='notification',
+            name='dedupe_key',
+            field=models.CharField(blank=True, help_text='Hash of the event within its dedupe window', max_length=64, null=True),
+        ),
+        migrations.AddConstraint(
+            model_name='notification',
+            constraint=models.UniqueConstraint(fields=('dedupe_key',), name='notif_dedupe_key_uniq'),
+        ),
+        migrations.AddConstraint(
+            model_name='notification',
+            constraint=models.UniqueConstraint(condition=models.Q(('is_read', False)), fields=('aggregate_key',), name='notif_open_aggregate_uniq'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.11 on 2026-10-19 13:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('prompts', '0099_notification_dedupe_keys'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NotificationEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('comment', 'Comment'), ('like', 'Like'), ('follow', 'Follow'), ('collection_save', 'Collection save')], max_length=20)),
+                ('actor_id', models.PositiveBigIntegerField(help_text='User who acted')),
+                ('object_id', models.PositiveBigIntegerField(help_text='Comment, liked Prompt, Follow or CollectionItem id')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.11 on 2026-10-19 14:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('prompts', '0100_notification_event_outbox'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImageVerdict',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('sha256', models.CharField(max_length=64, unique=True)),
+                ('phash', models.BigIntegerField(help_text='64-bit DCT hash (signed storage)')),
+                ('dhash', models.BigIntegerField(help_text='64-bit difference hash (signed storage)')),
+                ('phash_band0', models.PositiveIntegerField(db_index=True)),
+                ('phash_band1', models.PositiveIntegerField(db_index=True)),
+                ('phash_band2', models.PositiveIntegerField(db_index=True)),
+                ('phash_band3', models.PositiveIntegerField(db_index=True)),
+                ('moderation', models.JSONField(blank=True, help_text='Parsed Vision moderation verdict (flagged/categories/severity/explanation)', null=True)),
+                ('moderated_at', models.DateTimeField(blank=True, null=True)),
+                ('analysis', models.JSONField(blank=True, help_text='Validated AI analysis result (title/description/tags/...)', null=True)),
+                ('analysis_context', models.CharField(blank=True, help_text='Hash of the prompt text, generator and tag list the analysis used', max_length=64)),
+                ('analyzed_at', models.DateTimeField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.11 on 2026-10-19 15:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('prompts', '0101_image_verdict'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MediaBlob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('sha256', models.CharField(max_length=64, unique=True)),
+                ('filename', models.CharField(help_text="B2 filename shared by every variant (e.g. 'a1b2c3d4e5f6.jpg')", max_length=64, unique=True)),
+                ('year', models.CharField(help_text='Upload path folder', max_length=4)),
+                ('month', models.CharField(help_text='Upload path folder', max_length=2)),
+                ('urls', models.JSONField(default=dict, help_text='Uploaded versions: original, thumb, medium, large, webp')),
+                ('info', models.JSONField(default=dict, help_text='process_upload() image info')),
+                ('ref_count', models.PositiveIntegerField(default=1)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.11 on 2026-10-19 15:46
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('prompts', '0103_image_hash'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PromptTextSignature',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('minhash', models.JSONField(default=list)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('generated_image', models.OneToOneField(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='text_signature', to='prompts.generatedimage')),
+                ('prompt', models.OneToOneField(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='text_signature', to='prompts.prompt')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='PromptTextBand',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('bucket', models.BigIntegerField(db_index=True)),
+                ('signature', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='bands', to='prompts.prompttextsignature')),
+            ],
+        ),
+    ]
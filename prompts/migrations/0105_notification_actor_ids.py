@@ -0,0 +1,43 @@
+# Generated by Django 5.2.11 on 2026-10-19 17:05
+
+from django.db import migrations, models
+
+AGGREGATED_TYPES = ['prompt_liked', 'prompt_saved', 'new_follower']
+
+
+def record_senders(apps, schema_editor):
+    """Existing social notifications: their latest actor is the only one known."""
+    Notification = apps.get_model('prompts', 'Notification')
+    rows = Notification.objects.filter(
+        notification_type__in=AGGREGATED_TYPES, sender__isnull=False,
+    ).only('pk', 'sender_id')
+    batch = []
+    for notification in rows.iterator(chunk_size=2000):
+        notification.actor_ids = [notification.sender_id]
+        batch.append(notification)
+        if len(batch) >= 2000:
+            Notification.objects.bulk_update(batch, ['actor_ids'])
+            batch = []
+    if batch:
+        Notification.objects.bulk_update(batch, ['actor_ids'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('prompts', '0104_prompt_text_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='notification',
+            name='actor_ids',
+            field=models.JSONField(blank=True, default=list, help_text='Distinct users folded into this notification, latest last'),
+        ),
+        migrations.AlterField(
+            model_name='notification',
+            name='dedupe_key',
+            field=models.CharField(blank=True, help_text='Hash of the event; held by its latest notification', max_length=64, null=True),
+        ),
+        migrations.RunPython(record_senders, migrations.RunPython.noop),
+    ]
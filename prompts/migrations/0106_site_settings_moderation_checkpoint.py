@@ -0,0 +1,18 @@
+# Generated by Django 5.2.11 on 2026-10-19 16:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('prompts', '0105_notification_actor_ids'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='sitesettings',
+            name='moderation_run_started_at',
+            field=models.DateTimeField(blank=True, help_text='Start of the unfinished moderate_prompts --all run, if any', null=True),
+        ),
+    ]
@@ -0,0 +1,51 @@
+# Generated by Django 5.2.11 on 2026-10-19 16:58
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def attach_prompts(apps, schema_editor):
+    """
+    Existing blobs: prompts showing the image become its owners. References
+    taken by upload sessions were never recorded, so their files are kept.
+    """
+    MediaBlob = apps.get_model('prompts', 'MediaBlob')
+    MediaBlobReference = apps.get_model('prompts', 'MediaBlobReference')
+    Prompt = apps.get_model('prompts', 'Prompt')
+    for blob in MediaBlob.objects.only('pk', 'urls').iterator(chunk_size=500):
+        original = blob.urls.get('original')
+        if not original:
+            continue
+        prompt_ids = Prompt.objects.filter(b2_image_url=original).values_list('pk', flat=True)
+        MediaBlobReference.objects.bulk_create([
+            MediaBlobReference(blob_id=blob.pk, prompt_id=prompt_id)
+            for prompt_id in prompt_ids
+        ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('prompts', '0106_site_settings_moderation_checkpoint'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MediaBlobReference',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('session_key', models.CharField(blank=True, default='', help_text='Upload session holding the image before it is attached to a prompt', max_length=40)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('blob', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='references', to='prompts.mediablob')),
+                ('prompt', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='media_blob_references', to='prompts.prompt')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(condition=models.Q(('prompt__isnull', False)), fields=('blob', 'prompt'), name='mediablobref_prompt_uniq'), models.UniqueConstraint(condition=models.Q(('prompt__isnull', True)), fields=('blob', 'session_key'), name='mediablobref_session_uniq')],
+            },
+        ),
+        migrations.RunPython(attach_prompts, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name='mediablob',
+            name='ref_count',
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.11 on 2026-10-19 17:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('prompts', '0107_media_blob_references'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='imagehash',
+            name='created_at',
+            field=models.DateTimeField(auto_now_add=True, db_index=True),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.11 on 2026-10-19 18:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('prompts', '0108_image_hash_created_at_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='imageverdict',
+            name='moderation_policy',
+            field=models.CharField(blank=True, help_text='Hash of the moderation prompt and model the verdict used', max_length=64),
+        ),
+    ]
@@ -12,23 +12,30 @@ ContentFlag`) when a circular-import would otherwise occur.
 """
 
 # Re-export all public classes
-from .users import UserProfile, AvatarChangeLog, EmailPreferences, Follow
+from .users import (
+    UserProfile, AvatarChangeLog, EmailPreferences, Follow, LeaderboardEntry,
+    UserProfileStats,
+)
 from .taxonomy import TagCategory, SubjectCategory, SubjectDescriptor
 from .prompt import (
     PromptManager, Prompt, SlugRedirect, DeletedPrompt, PromptView,
+    PromptViewDaily,
 )
 from .interactions import (
-    Comment, Collection, CollectionItem, Notification,
+    Comment, Collection, CollectionItem, Notification, NotificationCounter,
+    NotificationEvent, BroadcastNotification, BroadcastReceipt,
 )
 from .moderation import (
     PromptReport, ModerationLog, ProfanityWord, ContentFlag,
-    NSFWViolation,
+    NSFWViolation, ImageVerdict,
 )
 from .bulk_gen import (
     BulkGenerationJob, GeneratedImage, GeneratorModel,
 )
 from .credits import UserCredit, CreditTransaction
 from .site import SiteSettings, CollaborateRequest
+from .media import MediaBlob, MediaBlobReference, ImageHash
+from .text_index import PromptTextSignature, PromptTextBand
 
 # Re-export module-level constants that external code imports
 # (test_bulk_page_creation.py:775 imports AI_GENERATOR_CHOICES)
@@ -44,15 +51,21 @@ from .constants import (
 __all__ = [
     # Models
     'UserProfile', 'AvatarChangeLog', 'EmailPreferences', 'Follow',
+    'LeaderboardEntry',
+    'UserProfileStats',
     'TagCategory', 'SubjectCategory', 'SubjectDescriptor',
     'PromptManager', 'Prompt', 'SlugRedirect', 'DeletedPrompt',
-    'PromptView',
+    'PromptView', 'PromptViewDaily',
     'Comment', 'Collection', 'CollectionItem', 'Notification',
+    'NotificationCounter', 'NotificationEvent', 'BroadcastNotification',
+    'BroadcastReceipt',
     'PromptReport', 'ModerationLog', 'ProfanityWord', 'ContentFlag',
-    'NSFWViolation',
+    'NSFWViolation', 'ImageVerdict',
     'BulkGenerationJob', 'GeneratedImage', 'GeneratorModel',
     'UserCredit', 'CreditTransaction',
     'SiteSettings', 'CollaborateRequest',
+    'MediaBlob', 'MediaBlobReference', 'ImageHash',
+    'PromptTextSignature', 'PromptTextBand',
     # Constants
     'STATUS', 'MODERATION_STATUS', 'MODERATION_SERVICE',
     'AI_GENERATOR_CHOICES', 'DELETION_REASONS',
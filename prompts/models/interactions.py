@@ -1,6 +1,6 @@
 """
 Interaction models for the prompts app — Comment, Collection,
-CollectionItem, Notification.
+CollectionItem, Notification, NotificationCounter.
 
 Part of the prompts.models package (Session 168-D split).
 Public classes are re-exported by __init__.py — import from
@@ -60,6 +60,13 @@ class Comment(models.Model):
 
     class Meta:
         ordering = ['created_on']
+        indexes = [
+            # Keyset pagination of a prompt's approved comments
+            models.Index(
+                fields=['prompt', 'approved', 'created_on', 'id'],
+                name='comment_prompt_page_idx',
+            ),
+        ]
 
     def __str__(self):
         return f"Comment by {self.author} on {self.prompt}"
@@ -265,6 +272,24 @@ class Notification(models.Model):
         help_text="Groups notifications from the same blast"
     )
 
+    # Write-time deduplication and coalescing (see create_notification)
+    dedupe_key = models.CharField(
+        max_length=64, null=True, blank=True,
+        help_text="Hash of the event; held by its latest notification"
+    )
+    aggregate_key = models.CharField(
+        max_length=64, null=True, blank=True,
+        help_text="Hash of recipient, type and target for rolled-up events"
+    )
+    actor_count = models.PositiveIntegerField(
+        default=1,
+        help_text="Users folded into this notification"
+    )
+    actor_ids = models.JSONField(
+        default=list, blank=True,
+        help_text="Distinct users folded into this notification, latest last"
+    )
+
     # Timestamps
     created_at = models.DateTimeField(auto_now_add=True)
 
@@ -284,6 +309,18 @@ class Notification(models.Model):
                 name='notif_cleanup'
             ),
         ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['dedupe_key'],
+                name='notif_dedupe_key_uniq'
+            ),
+            # One open (unread) rolled-up notification per target
+            models.UniqueConstraint(
+                fields=['aggregate_key'],
+                condition=models.Q(is_read=False),
+                name='notif_open_aggregate_uniq'
+            ),
+        ]
 
     def __str__(self):
         return f"{self.get_notification_type_display()} → {self.recipient.username}"
@@ -292,3 +329,159 @@ class Notification(models.Model):
         if not self.is_read:
             self.is_read = True
             self.save(update_fields=['is_read'])
+
+    @property
+    def feed_id(self):
+        """Identifier used by the notification feed's read/click/delete URLs."""
+        return self.pk
+
+
+class NotificationCounter(models.Model):
+    """
+    Per-user, per-category unread notification counter.
+
+    Kept current by the notification service and signals (create, read,
+    delete, expire) with atomic F() updates, cached per user, and
+    reconciled from the Notification table when rows are missing, a
+    tracked expiry passes, or the last reconciliation is too old.
+    See the counters section of prompts/services/notifications.py.
+    """
+    user = models.ForeignKey(
+        User, on_delete=models.CASCADE,
+        related_name='notification_counters'
+    )
+    category = models.CharField(
+        max_length=20,
+        choices=Notification.Category.choices
+    )
+    unread_count = models.PositiveIntegerField(default=0)
+    latest_at = models.DateTimeField(
+        null=True, blank=True,
+        help_text="Most recent notification in this category (read or not)"
+    )
+    next_expiry = models.DateTimeField(
+        null=True, blank=True,
+        help_text="Earliest expires_at among counted unread notifications"
+    )
+    reconciled_at = models.DateTimeField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'category'],
+                name='notifcounter_user_category_uniq'
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id}/{self.category}: {self.unread_count}"
+
+
+class NotificationEvent(models.Model):
+    """
+    Outbox row for a social action that should notify someone.
+
+    The notification signals append one of these (a single small insert
+    on the request path) instead of creating the notification inline;
+    prompts.tasks.drain_notification_outbox resolves them in batches and
+    writes the notifications in bulk. Holds ids only: the objects are
+    re-read when drained, so actions undone in the meantime are skipped.
+    """
+
+    class Kind(models.TextChoices):
+        COMMENT = 'comment', 'Comment'
+        LIKE = 'like', 'Like'
+        FOLLOW = 'follow', 'Follow'
+        COLLECTION_SAVE = 'collection_save', 'Collection save'
+
+    kind = models.CharField(max_length=20, choices=Kind.choices)
+    actor_id = models.PositiveBigIntegerField(
+        help_text="User who acted"
+    )
+    object_id = models.PositiveBigIntegerField(
+        help_text="Comment, liked Prompt, Follow or CollectionItem id"
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.kind} {self.object_id} by {self.actor_id}"
+
+
+class BroadcastNotification(models.Model):
+    """
+    A system notification sent to every user, stored once.
+
+    Instead of one Notification row per user, a blast to everyone is a
+    single row; per-user state lives in BroadcastReceipt rows created
+    lazily when a user reads or dismisses it. Broadcasts are merged into
+    each user's system feed and unread counts at read time (see the
+    broadcasts section of prompts/services/notifications.py).
+
+    Exposes the attributes the notification templates read, so a
+    broadcast renders like a system Notification.
+    """
+    title = models.CharField(max_length=200)
+    link = models.CharField(max_length=500, blank=True)
+    expires_at = models.DateTimeField(
+        null=True, blank=True,
+        help_text="Auto-expire this notification after this time"
+    )
+    is_expired = models.BooleanField(
+        default=False, db_index=True,
+        help_text="Manually expired by admin"
+    )
+    click_count = models.PositiveIntegerField(default=0)
+    batch_id = models.CharField(
+        max_length=8, unique=True,
+        help_text="Identifies the blast in the Sent Notifications table"
+    )
+    recipient_count = models.PositiveIntegerField(
+        default=0,
+        help_text="Active users when the broadcast was sent"
+    )
+    created_by = models.CharField(max_length=150, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    # Rendered like a system Notification
+    category = 'system'
+    notification_type = 'system'
+    sender = None
+    sender_id = None
+    message = ''
+    is_admin_notification = True
+
+    class Meta:
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"Broadcast {self.batch_id}"
+
+    @property
+    def feed_id(self):
+        """Identifier used by the notification feed's read/click/delete URLs."""
+        return f'broadcast-{self.pk}'
+
+
+class BroadcastReceipt(models.Model):
+    """A user's read/dismissed state for one BroadcastNotification."""
+    broadcast = models.ForeignKey(
+        BroadcastNotification, on_delete=models.CASCADE,
+        related_name='receipts'
+    )
+    user = models.ForeignKey(
+        User, on_delete=models.CASCADE,
+        related_name='broadcast_receipts'
+    )
+    read_at = models.DateTimeField(null=True, blank=True)
+    dismissed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['broadcast', 'user'],
+                name='broadcastreceipt_uniq'
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id} / {self.broadcast_id}"
@@ -0,0 +1,109 @@
+"""
+Media storage models for the prompts app — MediaBlob, MediaBlobReference,
+ImageHash.
+
+Part of the prompts.models package (Session 168-D split).
+Public classes are re-exported by __init__.py — import from
+`prompts.models` not from `prompts.models.media` in external code.
+"""
+
+from django.db import models
+
+
+class MediaBlob(models.Model):
+    """
+    One image stored in B2, keyed by the hash of the uploaded bytes.
+
+    upload_image() looks the hash up before processing: identical bytes
+    reuse the stored original and variant URLs instead of being processed
+    and uploaded again. Each owner of the image holds one
+    MediaBlobReference; delete_image() and Prompt.hard_delete() release
+    the caller's own reference and only remove the files from B2 once
+    none remain. See prompts/services/b2_upload_service.py.
+    """
+    sha256 = models.CharField(max_length=64, unique=True)
+    filename = models.CharField(
+        max_length=64, unique=True,
+        help_text="B2 filename shared by every variant (e.g. 'a1b2c3d4e5f6.jpg')",
+    )
+    year = models.CharField(max_length=4, help_text='Upload path folder')
+    month = models.CharField(max_length=2, help_text='Upload path folder')
+    urls = models.JSONField(
+        default=dict,
+        help_text='Uploaded versions: original, thumb, medium, large, webp',
+    )
+    info = models.JSONField(default=dict, help_text='process_upload() image info')
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f'MediaBlob({self.filename})'
+
+
+class MediaBlobReference(models.Model):
+    """
+    One owner's hold on a MediaBlob: a Prompt, or an upload session whose
+    image has not been attached to a prompt (exactly one of the two is set).
+
+    An owner holds at most one reference per blob, so uploading the same
+    bytes twice or releasing twice does not change what other owners hold.
+    """
+    blob = models.ForeignKey(
+        MediaBlob, on_delete=models.CASCADE, related_name='references',
+    )
+    prompt = models.ForeignKey(
+        'Prompt', on_delete=models.CASCADE, null=True, blank=True,
+        related_name='media_blob_references',
+    )
+    session_key = models.CharField(
+        max_length=40, blank=True, default='',
+        help_text='Upload session holding the image before it is attached to a prompt',
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['blob', 'prompt'],
+                condition=models.Q(prompt__isnull=False),
+                name='mediablobref_prompt_uniq'
+            ),
+            models.UniqueConstraint(
+                fields=['blob', 'session_key'],
+                condition=models.Q(prompt__isnull=True),
+                name='mediablobref_session_uniq'
+            ),
+        ]
+
+    def __str__(self):
+        owner = f'prompt {self.prompt_id}' if self.prompt_id else f'session {self.session_key}'
+        return f'MediaBlobReference({self.blob_id}, {owner})'
+
+
+class ImageHash(models.Model):
+    """
+    Perceptual hashes of one Prompt image or GeneratedImage (exactly one
+    of the two is set).
+
+    Loaded into the in-memory near-duplicate index (a band index per
+    worker, see prompts/services/near_duplicates.py). Rows are only ever
+    inserted: a changed image gets a fresh row, so other workers catch up
+    by reading rows created since their last sync (with an overlap for
+    transactions that commit late).
+    """
+    prompt = models.OneToOneField(
+        'Prompt', on_delete=models.CASCADE, null=True, blank=True,
+        related_name='image_hash',
+    )
+    generated_image = models.OneToOneField(
+        'GeneratedImage', on_delete=models.CASCADE, null=True, blank=True,
+        related_name='image_hash',
+    )
+    # Unsigned 64-bit hashes stored signed (image_hashing.to_signed)
+    phash = models.BigIntegerField()
+    dhash = models.BigIntegerField()
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    def __str__(self):
+        owner = f'prompt {self.prompt_id}' if self.prompt_id else f'image {self.generated_image_id}'
+        return f'ImageHash({owner})'
@@ -1,6 +1,6 @@
 """
 Moderation models for the prompts app — PromptReport, ModerationLog,
-ProfanityWord, ContentFlag, NSFWViolation.
+ProfanityWord, ContentFlag, NSFWViolation, ImageVerdict.
 
 Part of the prompts.models package (Session 168-D split).
 Public classes are re-exported by __init__.py — import from
@@ -493,3 +493,43 @@ class NSFWViolation(models.Model):
 
     def __str__(self):
         return f'NSFWViolation({self.user.username}, {self.severity}, {self.created_at:%Y-%m-%d})'
+
+
+class ImageVerdict(models.Model):
+    """
+    Paid Vision API results keyed by image fingerprint.
+
+    One row per distinct image (sha256). The perceptual hashes let
+    re-encoded or resized copies inherit a blocking verdict: phash is split
+    into four indexed 16-bit bands, and any hash within 3 bits of a stored
+    one shares at least one band with it. See prompts/services/image_verdicts.py.
+    """
+    sha256 = models.CharField(max_length=64, unique=True)
+    phash = models.BigIntegerField(help_text='64-bit DCT hash (signed storage)')
+    dhash = models.BigIntegerField(help_text='64-bit difference hash (signed storage)')
+    phash_band0 = models.PositiveIntegerField(db_index=True)
+    phash_band1 = models.PositiveIntegerField(db_index=True)
+    phash_band2 = models.PositiveIntegerField(db_index=True)
+    phash_band3 = models.PositiveIntegerField(db_index=True)
+    moderation = models.JSONField(
+        null=True, blank=True,
+        help_text='Parsed Vision moderation verdict (flagged/categories/severity/explanation)',
+    )
+    moderation_policy = models.CharField(
+        max_length=64, blank=True,
+        help_text='Hash of the moderation prompt and model the verdict used',
+    )
+    moderated_at = models.DateTimeField(null=True, blank=True)
+    analysis = models.JSONField(
+        null=True, blank=True,
+        help_text='Validated AI analysis result (title/description/tags/...)',
+    )
+    analysis_context = models.CharField(
+        max_length=64, blank=True,
+        help_text='Hash of the prompt text, generator and tag list the analysis used',
+    )
+    analyzed_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f'ImageVerdict({self.sha256[:12]})'
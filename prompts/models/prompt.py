@@ -1,6 +1,6 @@
 """
 Prompt models for the prompts app — Prompt, PromptManager, SlugRedirect,
-DeletedPrompt, PromptView.
+DeletedPrompt, PromptView, PromptViewDaily.
 
 Part of the prompts.models package (Session 168-D split).
 Public classes are re-exported by __init__.py — import from
@@ -16,7 +16,6 @@ from cloudinary.models import CloudinaryField
 from taggit.managers import TaggableManager
 import cloudinary.uploader
 import logging
-import hashlib
 import uuid
 
 from .constants import (
@@ -25,9 +24,9 @@ from .constants import (
     AI_GENERATOR_CHOICES,
     DELETION_REASONS,
 )
-# BOT_USER_AGENT_PATTERNS and DEFAULT_VIEW_RATE_LIMIT come from the
-# app-level prompts.constants (not the models-package constants).
-from prompts.constants import BOT_USER_AGENT_PATTERNS, DEFAULT_VIEW_RATE_LIMIT
+# DEFAULT_VIEW_RATE_LIMIT comes from the app-level prompts.constants
+# (not the models-package constants).
+from prompts.constants import DEFAULT_VIEW_RATE_LIMIT
 
 logger = logging.getLogger(__name__)
 
@@ -331,6 +330,13 @@ class Prompt(models.Model):
         help_text="When the background SEO Pass 2 review last ran"
     )
 
+    # Maintained approved-comment count (updated by Comment signals in
+    # prompts/signals.py) so the detail page never counts comment rows
+    approved_comment_count = models.PositiveIntegerField(
+        default=0,
+        help_text="Number of approved comments (maintained automatically)"
+    )
+
     # Custom managers
     objects = PromptManager()  # Default: excludes soft-deleted prompts
     all_objects = models.Manager()  # Include deleted prompts
@@ -466,6 +472,17 @@ class Prompt(models.Model):
                     exc_info=True
                 )
 
+        # Release the uploaded B2 image (deleted once no other owner shares it)
+        if self.b2_image_url:
+            try:
+                from prompts.services.b2_upload_service import release_image_url
+                release_image_url(self.b2_image_url, self.pk)
+            except Exception as e:
+                logger.error(
+                    f"Failed to release B2 image for Prompt '{self.title}': {e}",
+                    exc_info=True
+                )
+
         # Then delete from database
         super().delete()
 
@@ -505,9 +522,15 @@ class Prompt(models.Model):
         """
         Return the total number of likes for this prompt.
 
+        Uses the total attached by attach_viewer_state() on card grids,
+        so a page of cards does not issue one COUNT per card.
+
         Returns:
             int: Count of users who have liked this prompt
         """
+        like_count = getattr(self, '_like_count', None)
+        if like_count is not None:
+            return like_count
         return self.likes.count()
 
     def get_ai_generator_display_name(self):
@@ -915,10 +938,14 @@ class Prompt(models.Model):
         """
         Get total unique view count for this prompt.
 
+        Reads rolled-up days from PromptViewDaily and only the days after
+        the rollup watermark from raw PromptView rows.
+
         Returns:
             int: Total number of unique views (deduplicated by user/session)
         """
-        return self.views.count()
+        from prompts.services.view_rollups import count_views
+        return count_views(prompt=self)
 
     def get_recent_engagement(self, hours=None):
         """
@@ -955,8 +982,9 @@ class Prompt(models.Model):
             created_on__gte=cutoff
         ).count()
 
-        # Count recent views
-        views_count = self.views.filter(viewed_at__gte=cutoff).count()
+        # Count recent views (daily rollups + raw rows after the watermark)
+        from prompts.services.view_rollups import count_views
+        views_count = count_views(since=cutoff, prompt=self)
 
         return {
             'likes': likes_count,
@@ -983,8 +1011,8 @@ class Prompt(models.Model):
         """
         from .site import SiteSettings
         try:
-            settings = SiteSettings.objects.first()
-            visibility = settings.view_count_visibility if settings else 'admin'
+            # Cached singleton (1 hour, cleared on save) — no query per call
+            visibility = SiteSettings.get_settings().view_count_visibility
         except Exception:
             visibility = 'admin'
 
@@ -1249,11 +1277,15 @@ class PromptView(models.Model):
         # Record a view
         PromptView.record_view(prompt, request)
 
-        # Get view count
-        prompt.views.count()
+        # Get view count (rollups + raw rows, see services/view_rollups.py)
+        prompt.get_view_count()
 
         # Get recent views (for trending)
-        prompt.get_recent_views_count(hours=48)
+        prompt.get_recent_engagement(hours=48)
+
+    Retention:
+        Raw rows are rolled up into PromptViewDaily and compacted after
+        settings.PROMPT_VIEW_RETENTION_DAYS by `manage.py rollup_prompt_views`.
     """
     prompt = models.ForeignKey(
         'Prompt',
@@ -1290,8 +1322,8 @@ class PromptView(models.Model):
             models.Index(fields=['prompt', 'session_key']),
         ]
 
-    # Bot patterns imported from constants for maintainability
-    # See prompts/constants.py for the full list (BOT_USER_AGENT_PATTERNS)
+    # Bot detection and IP hashing live in prompts/utils/request_classification.py
+    # (patterns: BOT_USER_AGENT_PATTERNS in prompts/constants.py)
 
     def __str__(self):
         viewer = self.user.username if self.user else f"anon:{self.session_key[:8]}"
@@ -1302,15 +1334,10 @@ class PromptView(models.Model):
         """
         Hash IP address with server-side pepper for enhanced privacy.
 
-        The pepper prevents rainbow table attacks on hashed IPs.
-        Falls back to SECRET_KEY prefix if IP_HASH_PEPPER not set.
+        Delegates to the shared request classifier (memoised per IP).
         """
-        import os
-        from django.conf import settings
-
-        pepper = os.environ.get('IP_HASH_PEPPER', settings.SECRET_KEY[:16])
-        salted = f"{pepper}:{ip_address}"
-        return hashlib.sha256(salted.encode()).hexdigest()
+        from prompts.utils.request_classification import hash_ip
+        return hash_ip(ip_address)
 
     @classmethod
     def _is_rate_limited(cls, ip_hash):
@@ -1343,14 +1370,12 @@ class PromptView(models.Model):
         """
         Detect if request is from a known bot.
 
-        Checks user-agent against common bot patterns from constants.
+        Delegates to the shared request classifier (single compiled
+        regex over BOT_USER_AGENT_PATTERNS, LRU-memoised per UA string).
         Returns True for bots, False for regular users.
         """
-        if not user_agent:
-            return True  # No user-agent is suspicious
-
-        ua_lower = user_agent.lower()
-        return any(pattern in ua_lower for pattern in BOT_USER_AGENT_PATTERNS)
+        from prompts.utils.request_classification import is_bot_user_agent
+        return is_bot_user_agent(user_agent)
 
     @classmethod
     def record_view(cls, prompt, request):
@@ -1366,18 +1391,16 @@ class PromptView(models.Model):
             tuple: (view_object, created) - created is True if new view recorded
                    Returns (None, False) if filtered by bot detection or rate limiting
         """
-        from prompts.views import get_client_ip  # Reuse existing IP detection
+        from prompts.utils.request_classification import classify_request
 
-        # Get user-agent for bot detection
-        user_agent = request.META.get('HTTP_USER_AGENT', '')
+        # Bot verdict + peppered IP hash, computed once per request
+        classification = classify_request(request)
 
         # Filter bot traffic
-        if cls._is_bot(user_agent):
+        if classification.is_bot:
             return None, False
 
-        # Get IP and create peppered hash
-        ip = get_client_ip(request)
-        ip_hash = cls._hash_ip(ip)
+        ip_hash = classification.ip_hash
 
         # Check rate limit
         if cls._is_rate_limited(ip_hash):
@@ -1404,3 +1427,49 @@ class PromptView(models.Model):
             )
 
         return view, created
+
+
+class PromptViewDaily(models.Model):
+    """
+    Daily rollup of PromptView rows (one row per prompt per day).
+
+    Maintained by the ``rollup_prompt_views`` management command
+    (Heroku Scheduler, daily). Each PromptView row is counted once, on
+    the day it was first recorded, so summing ``unique_views`` across
+    days reproduces the raw row count even after old raw rows have been
+    compacted away.
+
+    Time-windowed view queries read these rows for rolled-up days and
+    only fall back to raw PromptView rows for the days after the rollup
+    watermark. See prompts/services/view_rollups.py.
+    """
+    prompt = models.ForeignKey(
+        'Prompt',
+        on_delete=models.CASCADE,
+        related_name='daily_views'
+    )
+    day = models.DateField(help_text="UTC day the views were recorded on")
+    unique_views = models.PositiveIntegerField(
+        default=0,
+        help_text="Unique viewers first recorded on this day"
+    )
+    authenticated_views = models.PositiveIntegerField(
+        default=0,
+        help_text="Subset of unique_views from logged-in users"
+    )
+
+    class Meta:
+        verbose_name = "Prompt View (Daily)"
+        verbose_name_plural = "Prompt Views (Daily)"
+        constraints = [
+            models.UniqueConstraint(
+                fields=['prompt', 'day'],
+                name='promptviewdaily_prompt_day_uniq'
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['day', 'prompt'], name='promptviewdaily_day_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.prompt_id} @ {self.day}: {self.unique_views} views"
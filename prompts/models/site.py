@@ -7,7 +7,8 @@ Public classes are re-exported by __init__.py — import from
 """
 
 from django.db import models
-from django.core.cache import cache
+
+from prompts.utils import cache_dependencies
 
 
 class CollaborateRequest(models.Model):
@@ -78,6 +79,9 @@ class SiteSettings(models.Model):
     View Visibility:
         view_count_visibility: Controls who can see view counts
 
+    Maintenance State:
+        moderation_run_started_at: Resume point for moderate_prompts --all
+
     Usage:
         settings = SiteSettings.get_settings()
         if settings.auto_approve_comments:
@@ -139,6 +143,12 @@ class SiteSettings(models.Model):
         help_text="Maximum views per minute per IP address (default: 10)"
     )
 
+    # === MAINTENANCE STATE (not shown in admin) ===
+    moderation_run_started_at = models.DateTimeField(
+        null=True, blank=True,
+        help_text="Start of the unfinished moderate_prompts --all run, if any"
+    )
+
     class Meta:
         verbose_name = "Site Settings"
         verbose_name_plural = "Site Settings"
@@ -150,14 +160,15 @@ class SiteSettings(models.Model):
         # Ensure only one instance exists (singleton pattern)
         self.pk = 1
         super().save(*args, **kwargs)
-        # Clear cached settings
-        cache.delete('site_settings')
+        # Cached settings are retired by the post_save signal
+        # (site_settings surrogate key, prompts/signals.py)
 
     @classmethod
     def get_settings(cls):
         """Get or create the singleton settings instance."""
-        settings = cache.get('site_settings')
-        if settings is None:
-            settings, _ = cls.objects.get_or_create(pk=1)
-            cache.set('site_settings', settings, 3600)  # Cache for 1 hour
-        return settings
+        return cache_dependencies.get_or_set(
+            'site_settings',
+            lambda: cls.objects.get_or_create(pk=1)[0],
+            86400,  # 1 day; saves invalidate it immediately
+            depends_on=[cache_dependencies.SITE_SETTINGS],
+        )
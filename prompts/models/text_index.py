@@ -0,0 +1,50 @@
+"""
+Prompt-text similarity models for the prompts app — PromptTextSignature,
+PromptTextBand.
+
+Part of the prompts.models package (Session 168-D split).
+Public classes are re-exported by __init__.py — import from
+`prompts.models` not from `prompts.models.text_index` in external code.
+"""
+
+from django.db import models
+
+
+class PromptTextSignature(models.Model):
+    """
+    MinHash signature of one Prompt's content or one GeneratedImage's
+    prompt text (exactly one of the two is set).
+
+    Written by prompts/services/text_duplicates.py; the signature estimates
+    text similarity, its PromptTextBand rows make candidates findable.
+    """
+    prompt = models.OneToOneField(
+        'Prompt', on_delete=models.CASCADE, null=True, blank=True,
+        related_name='text_signature',
+    )
+    generated_image = models.OneToOneField(
+        'GeneratedImage', on_delete=models.CASCADE, null=True, blank=True,
+        related_name='text_signature',
+    )
+    minhash = models.JSONField(default=list)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        owner = f'prompt {self.prompt_id}' if self.prompt_id else f'image {self.generated_image_id}'
+        return f'PromptTextSignature({owner})'
+
+
+class PromptTextBand(models.Model):
+    """
+    One LSH bucket of a signature (see prompts/utils/minhash.py).
+
+    Texts sharing any bucket are near-duplicate candidates, so a lookup is
+    an indexed `bucket IN (...)` query instead of a scan of every text.
+    """
+    signature = models.ForeignKey(
+        PromptTextSignature, on_delete=models.CASCADE, related_name='bands',
+    )
+    bucket = models.BigIntegerField(db_index=True)
+
+    def __str__(self):
+        return f'PromptTextBand({self.signature_id}, {self.bucket})'
@@ -9,7 +9,7 @@ Public classes are re-exported by __init__.py — import from
 from django.db import models
 from django.contrib.auth.models import User
 from django.core.exceptions import ValidationError
-from django.core.cache import cache
+from prompts.utils import cache_dependencies
 import hashlib
 import secrets
 import logging
@@ -181,19 +181,21 @@ class UserProfile(models.Model):
     @property
     def follower_count(self):
         """Get count of users following this user"""
-        return cache.get_or_set(
+        return cache_dependencies.get_or_set(
             f'followers_count_{self.user.id}',
             lambda: self.user.follower_set.count(),
-            timeout=300  # 5 minute cache
+            timeout=3600,  # 1 hour; Follow signals retire it (user:<id>)
+            depends_on=[cache_dependencies.user_key(self.user.id)],
         )
 
     @property
     def following_count(self):
         """Get count of users this user follows"""
-        return cache.get_or_set(
+        return cache_dependencies.get_or_set(
             f'following_count_{self.user.id}',
             lambda: self.user.following_set.count(),
-            timeout=300  # 5 minute cache
+            timeout=3600,  # 1 hour; Follow signals retire it (user:<id>)
+            depends_on=[cache_dependencies.user_key(self.user.id)],
         )
 
     def is_following(self, user):
@@ -468,17 +470,119 @@ class Follow(models.Model):
 
     def save(self, *args, **kwargs):
         self.clean()
-        is_new = self.pk is None
+        # Cached follower/following counts are retired by the Follow
+        # post_save/post_delete signals (user:<id> surrogate keys)
         super().save(*args, **kwargs)
 
-        if is_new:
-            # Increment follower counts (consider caching in production)
-            # Clear any cached counts - use same format as views
-            cache.delete(f'following_count_{self.follower.id}')
-            cache.delete(f'followers_count_{self.following.id}')
-
-    def delete(self, *args, **kwargs):
-        # Clear cached counts before deletion - use same format as views
-        cache.delete(f'following_count_{self.follower.id}')
-        cache.delete(f'followers_count_{self.following.id}')
-        super().delete(*args, **kwargs)
+
+class LeaderboardEntry(models.Model):
+    """
+    One user's precomputed position on one leaderboard (metric × period).
+
+    Rebuilt by the ``rebuild_leaderboards`` management command (Heroku
+    Scheduler) from the daily view rollups and the activity aggregates,
+    so the leaderboard page and profile ranks are indexed reads instead
+    of per-request aggregates over every user. Only users with a
+    positive score get a row. See prompts/services/leaderboard.py.
+    """
+    METRIC_CHOICES = [
+        ('views', 'Most Viewed'),
+        ('active', 'Most Active'),
+    ]
+    PERIOD_CHOICES = [
+        ('week', 'This Week'),
+        ('month', 'This Month'),
+        ('all', 'All Time'),
+    ]
+
+    metric = models.CharField(max_length=10, choices=METRIC_CHOICES)
+    period = models.CharField(max_length=10, choices=PERIOD_CHOICES)
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='leaderboard_entries'
+    )
+    score = models.PositiveBigIntegerField(
+        help_text="Total views (views) or activity score (active)"
+    )
+    rank = models.PositiveIntegerField(
+        help_text="Dense rank (1 = top; equal scores share a rank)"
+    )
+    prompt_count = models.PositiveIntegerField(default=0)
+    follower_count = models.PositiveIntegerField(default=0)
+    computed_at = models.DateTimeField()
+
+    class Meta:
+        verbose_name = "Leaderboard Entry"
+        verbose_name_plural = "Leaderboard Entries"
+        constraints = [
+            models.UniqueConstraint(
+                fields=['metric', 'period', 'user'],
+                name='leaderboardentry_board_user_uniq'
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=['metric', 'period', 'rank'],
+                name='leaderboardentry_rank_idx'
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.metric}/{self.period} #{self.rank}: {self.user_id} ({self.score})"
+
+
+class UserProfileStats(models.Model):
+    """
+    Precomputed profile header statistics for one user.
+
+    Served to the profile and profile collections pages in one read
+    (joined onto the User lookup) instead of a handful of aggregates per
+    request. Counters (prompts, likes received, followers, following)
+    are kept current by signals; views and ranks are refreshed with the
+    leaderboards by ``rebuild_leaderboards``. ``version`` increases on
+    every change, so anything derived from a snapshot can be keyed on it.
+    See prompts/services/profile_stats.py.
+    """
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='profile_stats'
+    )
+    prompt_count = models.PositiveIntegerField(
+        default=0,
+        help_text="Published, non-deleted prompts"
+    )
+    likes_received = models.PositiveIntegerField(
+        default=0,
+        help_text="Likes on published, non-deleted prompts"
+    )
+    total_views = models.PositiveBigIntegerField(
+        default=0,
+        help_text="Unique views across all of the user's prompts"
+    )
+    all_time_rank = models.PositiveIntegerField(
+        null=True,
+        blank=True,
+        help_text="Most Viewed, all time"
+    )
+    thirty_day_rank = models.PositiveIntegerField(
+        null=True,
+        blank=True,
+        help_text="Most Active, this month"
+    )
+    follower_count = models.PositiveIntegerField(default=0)
+    following_count = models.PositiveIntegerField(default=0)
+    version = models.PositiveBigIntegerField(
+        default=1,
+        help_text="Incremented on every change to this snapshot"
+    )
+    computed_at = models.DateTimeField()
+
+    class Meta:
+        verbose_name = "User Profile Stats"
+        verbose_name_plural = "User Profile Stats"
+
+    def __str__(self):
+        return f"Stats for {self.user_id} (v{self.version})"
@@ -3,7 +3,23 @@ Signal handlers that auto-create notifications on social actions.
 
 Handles: comment, like (M2M), follow, collection save.
 Reverse handlers: unlike (M2M post_remove), unfollow, comment delete.
-All creation handlers call create_notification() from the service module.
+Creation handlers do not write notifications. They append NotificationEvent
+rows through notification_outbox.enqueue(), and the drain task resolves the
+events and writes the notifications with create_notifications(). An action
+undone before the drain has no object left to resolve, so its event is
+dropped.
+
+The drain bulk_creates plain notifications, which sends no post_save, so
+it counts the rows it inserted on the recipients' unread counters itself
+(record_notifications_created). The post_save receiver at the bottom
+counts notifications saved one at a time: new rolled-up notifications
+from the drain, and create_notification() (bulk generation results and
+admin alerts).
+
+Reverse handlers run in the request. They delete through
+delete_notifications() so the counters stay in step, and undoing a like or
+follow also takes the user out of rolled-up notifications ("bob and 3
+others liked your prompt"), see retract_actors().
 """
 import logging
 
@@ -19,64 +35,54 @@ def on_comment_created(sender, instance, created, **kwargs):
     if not created:
         return
 
-    from prompts.services.notifications import create_notification
+    from prompts.models import NotificationEvent
+    from prompts.services.notification_outbox import enqueue
 
     try:
-        prompt = instance.prompt
-        author = prompt.author
-        commenter = instance.author
-
-        create_notification(
-            recipient=author,
-            sender=commenter,
-            notification_type='comment_on_prompt',
-            title=f'{commenter.username} commented on your prompt',
-            message=instance.body[:200] if instance.body else '',
-            link=f'/prompt/{prompt.slug}/#comments',
-        )
+        enqueue(NotificationEvent.Kind.COMMENT, [(instance.author_id, instance.pk)])
     except Exception:
         logger.exception("Error creating comment notification")
 
 
-def _on_prompt_liked(sender, instance, action, pk_set, **kwargs):
+def _on_prompt_liked(sender, instance, action, pk_set, reverse=False, **kwargs):
     """Notify prompt author when someone likes their prompt; delete on unlike."""
     if not pk_set:
         return
 
-    # Unlike: delete the like notification for each removed user
+    # Unlike: take each removed user out of the like notifications
     if action == 'post_remove':
-        from prompts.models import Notification
-        for user_id in pk_set:
-            Notification.objects.filter(
-                recipient=instance.author,
-                sender_id=user_id,
-                notification_type='prompt_liked',
-                link=f'/prompt/{instance.slug}/',
-            ).delete()
+        from prompts.models import Prompt
+        from prompts.services.notifications import retract_actors
+        try:
+            # user.prompt_likes.remove(prompt) sends the user as instance
+            if reverse:
+                unliked = [
+                    (prompt, [instance.pk])
+                    for prompt in Prompt.all_objects.filter(pk__in=pk_set).select_related('author')
+                ]
+            else:
+                unliked = [(instance, pk_set)]
+            for prompt, user_ids in unliked:
+                retract_actors(
+                    prompt.author, 'prompt_liked', f'/prompt/{prompt.slug}/', user_ids,
+                )
+        except Exception:
+            logger.exception("Error retracting like notification")
         return
 
     if action != 'post_add':
         return
 
-    from django.contrib.auth.models import User
-    from prompts.services.notifications import create_notification
+    from prompts.models import NotificationEvent
+    from prompts.services.notification_outbox import enqueue
 
     try:
-        prompt = instance
-        author = prompt.author
-
-        for user_id in pk_set:
-            try:
-                liker = User.objects.get(pk=user_id)
-                create_notification(
-                    recipient=author,
-                    sender=liker,
-                    notification_type='prompt_liked',
-                    title=f'{liker.username} liked your prompt',
-                    link=f'/prompt/{prompt.slug}/',
-                )
-            except User.DoesNotExist:
-                continue
+        # user.prompt_likes.add(prompt) sends the user as instance
+        if reverse:
+            pairs = [(instance.pk, prompt_id) for prompt_id in pk_set]
+        else:
+            pairs = [(user_id, instance.pk) for user_id in pk_set]
+        enqueue(NotificationEvent.Kind.LIKE, pairs)
     except Exception:
         logger.exception("Error creating like notification")
 
@@ -87,19 +93,11 @@ def on_user_followed(sender, instance, created, **kwargs):
     if not created:
         return
 
-    from prompts.services.notifications import create_notification
+    from prompts.models import NotificationEvent
+    from prompts.services.notification_outbox import enqueue
 
     try:
-        follower = instance.follower
-        followed = instance.following
-
-        create_notification(
-            recipient=followed,
-            sender=follower,
-            notification_type='new_follower',
-            title=f'{follower.username} started following you',
-            link=f'/users/{follower.username}/',
-        )
+        enqueue(NotificationEvent.Kind.FOLLOW, [(instance.follower_id, instance.pk)])
     except Exception:
         logger.exception("Error creating follow notification")
 
@@ -110,40 +108,30 @@ def on_prompt_saved_to_collection(sender, instance, created, **kwargs):
     if not created:
         return
 
-    from prompts.services.notifications import create_notification
+    from prompts.models import NotificationEvent
+    from prompts.services.notification_outbox import enqueue
 
     try:
         collection = instance.collection
-        prompt = instance.prompt
-        saver = collection.user
-        author = prompt.author
 
         # Skip if collection is private (respect privacy)
         if collection.is_private:
             return
 
-        create_notification(
-            recipient=author,
-            sender=saver,
-            notification_type='prompt_saved',
-            title=f'{saver.username} saved your prompt to a collection',
-            link=f'/prompt/{prompt.slug}/',
-        )
+        enqueue(NotificationEvent.Kind.COLLECTION_SAVE, [(collection.user_id, instance.pk)])
     except Exception:
         logger.exception("Error creating collection save notification")
 
 
 @receiver(post_delete, sender='prompts.Follow')
 def on_user_unfollowed(sender, instance, **kwargs):
-    """Delete follow notification when a user unfollows someone."""
-    from prompts.models import Notification
+    """Take the unfollower out of the follow notifications."""
+    from prompts.services.notifications import retract_actors
 
     try:
-        Notification.objects.filter(
-            recipient=instance.following,
-            sender=instance.follower,
-            notification_type='new_follower',
-        ).delete()
+        retract_actors(
+            instance.following, 'new_follower', '', [instance.follower_id],
+        )
     except Exception:
         logger.exception("Error deleting unfollow notification")
 
@@ -152,6 +140,7 @@ def on_user_unfollowed(sender, instance, **kwargs):
 def on_comment_deleted(sender, instance, **kwargs):
     """Delete comment notification when a comment is deleted."""
     from prompts.models import Notification
+    from prompts.services.notifications import delete_notifications
 
     try:
         # Build filter — need prompt slug for link matching
@@ -173,7 +162,7 @@ def on_comment_deleted(sender, instance, **kwargs):
         if instance.body:
             filters['message__contains'] = instance.body[:50]
 
-        Notification.objects.filter(**filters).delete()
+        delete_notifications(Notification.objects.filter(**filters))
     except Exception:
         logger.exception("Error deleting comment notification")
 
@@ -185,3 +174,17 @@ def connect_m2m_signals():
     """
     from prompts.models import Prompt
     m2m_changed.connect(_on_prompt_liked, sender=Prompt.likes.through)
+
+
+@receiver(post_save, sender='prompts.Notification')
+def on_notification_created(sender, instance, created, **kwargs):
+    """Count new notifications on the recipient's unread counters."""
+    if not created:
+        return
+
+    from prompts.services.notifications import record_notification_created
+
+    try:
+        record_notification_created(instance)
+    except Exception:
+        logger.exception("Error updating notification counters")
@@ -7,17 +7,34 @@ Handles the complete upload pipeline:
 3. Upload all versions to B2
 4. Return URLs for all versions
 
+Images are deduplicated by content: the sha256 of the uploaded bytes is
+looked up in the MediaBlob index, and identical bytes reuse the stored
+original and variant URLs without any Pillow work or B2 writes. Each
+owner (a Prompt or an upload session) holds one reference, and
+claim_image_url() hands a session's reference to the Prompt it submits.
+delete_image() and release_image_url() drop only the caller's own
+reference and remove files from B2 once no reference remains; sessions
+that end without submitting or cancelling are released by
+release_abandoned_session_references() (cleanup_deleted_prompts).
+
 Created: December 30, 2025 (Micro-Spec L4)
 Updated: December 30, 2025 (Phase L6-VIDEO: Added video upload support)
 """
 
+import hashlib
 import logging
 import os
 import tempfile
 import uuid
-from datetime import datetime
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from urllib.parse import urlparse
 
+from django.conf import settings
 from django.core.files.base import ContentFile
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from django.utils import timezone
 
 from prompts.storage_backends import B2MediaStorage
 from prompts.services.image_processor import (
@@ -27,6 +44,16 @@ from prompts.services.image_processor import (
 
 logger = logging.getLogger(__name__)
 
+IMAGE_VERSIONS = ('original', *THUMBNAIL_SIZES, 'webp')
+QUICK_MODE_VERSIONS = ('original', 'thumb')
+VARIANT_VERSIONS = (*THUMBNAIL_SIZES, 'webp')
+
+# Session engines whose sessions live in django_session (expiry is queryable)
+SESSION_TABLE_ENGINES = (
+    'django.contrib.sessions.backends.db',
+    'django.contrib.sessions.backends.cached_db',
+)
+
 
 def generate_unique_filename(original_filename):
     """
@@ -55,13 +82,15 @@ def generate_unique_filename(original_filename):
     return f"{unique_id}.{extension}"
 
 
-def get_upload_path(filename, version='original'):
+def get_upload_path(filename, version='original', year=None, month=None):
     """
     Generate the B2 storage path for an image.
 
     Args:
         filename: The filename (e.g., 'abc123.jpg')
         version: One of 'original', 'thumb', 'medium', 'large', 'webp'
+        year: Year folder (optional, defaults to current year)
+        month: Month folder (optional, defaults to current month)
 
     Returns:
         str: Full path like 'media/images/2025/12/thumb/abc123.jpg'
@@ -77,8 +106,8 @@ def get_upload_path(filename, version='original'):
         raise ValueError(f"Invalid version: {version}. Must be one of {valid_versions}")
 
     now = datetime.now()
-    year = now.strftime('%Y')
-    month = now.strftime('%m')
+    year = year or now.strftime('%Y')
+    month = month or now.strftime('%m')
 
     # For WebP, change extension
     if version == 'webp':
@@ -118,7 +147,163 @@ def upload_to_b2(content_file, path):
         raise ValueError(f"Failed to upload to B2: {str(e)}")
 
 
-def upload_image(image_file, original_filename=None, quick_mode=False):
+def _content_sha256(image_file):
+    """sha256 of an uploaded file's bytes, leaving the file rewound."""
+    digest = hashlib.sha256()
+    if hasattr(image_file, 'chunks'):
+        for chunk in image_file.chunks():
+            digest.update(chunk)
+    else:
+        image_file.seek(0)
+        digest.update(image_file.read())
+    image_file.seek(0)
+    return digest.hexdigest()
+
+
+def _upload_versions(processed, filename, versions, year, month):
+    """Upload the given processed versions; returns {version: url}."""
+    urls = {}
+    for version in versions:
+        if version in processed:
+            path = get_upload_path(filename, version, year, month)
+            urls[version] = upload_to_b2(processed[version], path)
+    return urls
+
+
+def _owner_lookup(prompt_id=None, session_key=None):
+    """MediaBlobReference fields identifying one owner."""
+    if prompt_id is not None:
+        return {'prompt_id': prompt_id}
+    if session_key:
+        return {'prompt_id': None, 'session_key': session_key}
+    raise ValueError('An image reference needs a prompt or an upload session')
+
+
+def _acquire_blob(sha256, owner):
+    """
+    Give owner a reference to the stored blob for these bytes.
+
+    Returns:
+        tuple: (blob, created) — blob is None if the bytes are unseen,
+        created is False if owner already held a reference
+    """
+    from prompts.models import MediaBlob
+
+    with transaction.atomic():
+        blob = MediaBlob.objects.select_for_update().filter(sha256=sha256).first()
+        if blob is None:
+            return None, False
+        _, created = blob.references.get_or_create(**owner)
+    return blob, created
+
+
+def _add_blob_urls(blob_id, urls):
+    """Record newly uploaded versions of a blob; returns all of its URLs."""
+    from prompts.models import MediaBlob
+
+    with transaction.atomic():
+        blob = MediaBlob.objects.select_for_update().get(pk=blob_id)
+        blob.urls = {**urls, **blob.urls}
+        blob.save(update_fields=['urls', 'updated_at'])
+    return blob.urls
+
+
+def _release_blob(owner, **lookup):
+    """
+    Drop owner's reference to the blob matching lookup (filename= or
+    urls__original=). Releasing a reference that is not held does nothing.
+
+    Returns:
+        tuple or None: (blob, released, remaining) — the blob row is deleted
+        once remaining is 0 — or None for files uploaded before
+        deduplication.
+    """
+    from prompts.models import MediaBlob
+
+    with transaction.atomic():
+        blob = MediaBlob.objects.select_for_update().filter(**lookup).first()
+        if blob is None:
+            return None
+        released, _ = blob.references.filter(**owner).delete()
+        remaining = blob.references.count()
+        if released and not remaining:
+            blob.delete()
+    return blob, bool(released), remaining
+
+
+def _url_to_path(url):
+    """Storage path of a B2 URL (CDN or direct bucket URL)."""
+    path = urlparse(url).path.lstrip('/')
+    bucket_prefix = f"{settings.B2_BUCKET_NAME}/"
+    return path[len(bucket_prefix):] if path.startswith(bucket_prefix) else path
+
+
+def _release_and_delete(owner, **lookup):
+    """
+    Release owner's reference to a blob; delete its files once none remain.
+
+    Returns:
+        dict or None: delete_image()-style result, None if untracked
+    """
+    released = _release_blob(owner, **lookup)
+    if released is None:
+        return None
+    blob, held, remaining = released
+    if not held:
+        logger.info(f"[B2Upload] Keeping {blob.filename}: no reference held by {owner}")
+        return {'success': True, 'deleted': [], 'errors': [], 'retained': True}
+    if remaining:
+        logger.info(
+            f"[B2Upload] Keeping {blob.filename}: {remaining} reference(s) left"
+        )
+        return {'success': True, 'deleted': [], 'errors': [], 'retained': True}
+
+    # Delete by recorded URL: SEO renames move the files (see lock_image_blob)
+    storage = B2MediaStorage()
+    deleted = []
+    errors = []
+    for version, url in blob.urls.items():
+        try:
+            path = _url_to_path(url)
+            if storage.exists(path):
+                storage.delete(path)
+                deleted.append(version)
+        except Exception as e:
+            errors.append(f"{version}: {str(e)}")
+
+    return {
+        'success': len(errors) == 0,
+        'deleted': deleted,
+        'errors': errors,
+        'retained': False,
+    }
+
+
+def _record_blob(sha256, filename, year, month, urls, info, owner):
+    """Index a newly uploaded image so identical bytes can reuse it."""
+    from prompts.models import MediaBlob
+
+    try:
+        with transaction.atomic():
+            blob = MediaBlob.objects.create(
+                sha256=sha256, filename=filename, year=year, month=month,
+                urls=urls, info=info,
+            )
+            blob.references.create(**owner)
+    except IntegrityError:
+        # Identical bytes uploaded concurrently: this copy stays untracked
+        logger.info(f"[B2Upload] {filename} duplicates a concurrent upload")
+
+
+def _undo_acquire(blob, owner):
+    """Give back the reference taken by a failed upload."""
+    if blob is None:
+        return
+    _release_and_delete(owner, pk=blob.pk)
+
+
+def upload_image(image_file, original_filename=None, quick_mode=False,
+                 prompt_id=None, session_key=None):
     """
     Process and upload an image with all variants to B2.
 
@@ -130,6 +315,8 @@ def upload_image(image_file, original_filename=None, quick_mode=False):
         quick_mode: If True, only upload original + thumbnail for faster redirect.
                    Medium, large, and webp variants can be generated later via
                    generate_image_variants().
+        prompt_id / session_key: Owner of the upload — the Prompt the image
+                   is for, or the upload session until one exists. Required.
 
     Returns:
         dict: {
@@ -148,9 +335,15 @@ def upload_image(image_file, original_filename=None, quick_mode=False):
                 'height': 1080,
                 'mode': 'RGB'
             },
-            'error': None  # or error message if failed
+            'error': None,  # or error message if failed
+            'deduplicated': True if the bytes were already stored
         }
+
+    Identical bytes share one filename and set of URLs (see MediaBlob);
+    the owner gets its own reference to them.
     """
+    owner = _owner_lookup(prompt_id, session_key)
+
     # Get original filename for extension
     if original_filename is None:
         if hasattr(image_file, 'name'):
@@ -158,10 +351,35 @@ def upload_image(image_file, original_filename=None, quick_mode=False):
         else:
             original_filename = 'upload.jpg'
 
-    # Generate unique filename
-    filename = generate_unique_filename(original_filename)
+    versions = QUICK_MODE_VERSIONS if quick_mode else IMAGE_VERSIONS
+    blob = acquired = None
 
     try:
+        sha256 = _content_sha256(image_file)
+        blob, created = _acquire_blob(sha256, owner)
+        acquired = blob if created else None
+
+        if blob is not None:
+            missing = [v for v in versions if v not in blob.urls]
+            if not missing:
+                logger.info(f"[B2Upload] Reusing stored image {blob.filename}")
+                return {
+                    'success': True,
+                    'filename': blob.filename,
+                    'urls': blob.urls,
+                    'info': blob.info,
+                    'error': None,
+                    'quick_mode': quick_mode,
+                    'deduplicated': True,
+                }
+            # Stored by a quick-mode upload: add only the missing variants
+            filename, year, month = blob.filename, blob.year, blob.month
+        else:
+            filename = generate_unique_filename(original_filename)
+            now = datetime.now()
+            year, month = now.strftime('%Y'), now.strftime('%m')
+            missing = versions
+
         # Process the image (validate, compress, thumbnails, webp)
         # In quick_mode, only generate thumbnail (skip medium, large, webp)
         processed = process_upload(
@@ -171,29 +389,12 @@ def upload_image(image_file, original_filename=None, quick_mode=False):
             thumbnail_sizes=['thumb'] if quick_mode else None  # Quick mode: thumb only
         )
 
-        urls = {}
-
-        # Upload original (compressed)
-        original_path = get_upload_path(filename, 'original')
-        urls['original'] = upload_to_b2(processed['original'], original_path)
+        urls = _upload_versions(processed, filename, missing, year, month)
 
-        # In quick_mode, only upload thumbnail
-        if quick_mode:
-            # Upload only the thumbnail
-            if 'thumb' in processed:
-                thumb_path = get_upload_path(filename, 'thumb')
-                urls['thumb'] = upload_to_b2(processed['thumb'], thumb_path)
+        if blob is not None:
+            urls = _add_blob_urls(blob.pk, urls)
         else:
-            # Upload all thumbnails (thumb, medium, large)
-            for size_name in THUMBNAIL_SIZES:
-                if size_name in processed:
-                    path = get_upload_path(filename, size_name)
-                    urls[size_name] = upload_to_b2(processed[size_name], path)
-
-            # Upload WebP version
-            if 'webp' in processed:
-                webp_path = get_upload_path(filename, 'webp')
-                urls['webp'] = upload_to_b2(processed['webp'], webp_path)
+            _record_blob(sha256, filename, year, month, urls, processed['info'], owner)
 
         return {
             'success': True,
@@ -202,9 +403,11 @@ def upload_image(image_file, original_filename=None, quick_mode=False):
             'info': processed['info'],
             'error': None,
             'quick_mode': quick_mode,
+            'deduplicated': blob is not None,
         }
 
     except ValueError as e:
+        _undo_acquire(acquired, owner)
         return {
             'success': False,
             'filename': None,
@@ -213,6 +416,7 @@ def upload_image(image_file, original_filename=None, quick_mode=False):
             'error': str(e),
         }
     except Exception as e:
+        _undo_acquire(acquired, owner)
         return {
             'success': False,
             'filename': None,
@@ -222,25 +426,51 @@ def upload_image(image_file, original_filename=None, quick_mode=False):
         }
 
 
-def delete_image(filename, year=None, month=None):
+def delete_image(filename, year=None, month=None, prompt_id=None, session_key=None):
     """
     Delete all versions of an image from B2.
 
+    Deduplicated images only lose the given owner's reference, and only
+    if it holds one; the files are deleted once no other owner shares
+    them. Without an owner a deduplicated image is left untouched.
+
     Args:
         filename: The base filename (e.g., 'abc123.jpg')
         year: Year folder (optional, defaults to current year)
         month: Month folder (optional, defaults to current month)
+        prompt_id / session_key: Owner releasing its reference
 
     Returns:
-        dict: {'success': True/False, 'deleted': [...], 'errors': [...]}
+        dict: {'success': True/False, 'deleted': [...], 'errors': [...],
+               'retained': True if other uploads still use the files}
     """
     if not filename:
         return {
             'success': False,
             'deleted': [],
             'errors': ['Filename cannot be empty'],
+            'retained': False,
         }
 
+    try:
+        if prompt_id is None and not session_key:
+            result = _refuse_ownerless_delete(filename)
+        else:
+            result = _release_and_delete(
+                _owner_lookup(prompt_id, session_key), filename=filename,
+            )
+    except Exception as e:
+        # Without the reference count we cannot tell whether it is shared
+        logger.error(f"[B2Upload] Could not release {filename}: {e}")
+        return {
+            'success': False,
+            'deleted': [],
+            'errors': [str(e)],
+            'retained': False,
+        }
+    if result is not None:
+        return result
+
     storage = B2MediaStorage()
 
     # Use provided year/month or current
@@ -251,18 +481,9 @@ def delete_image(filename, year=None, month=None):
     deleted = []
     errors = []
 
-    versions = ['original', 'thumb', 'medium', 'large', 'webp']
-
-    for version in versions:
+    for version in IMAGE_VERSIONS:
         try:
-            # Build the path manually to use provided year/month
-            if version == 'webp':
-                base_name = filename.rsplit('.', 1)[0] if '.' in filename else filename
-                versioned_filename = f"{base_name}.webp"
-            else:
-                versioned_filename = filename
-
-            path = f"media/images/{year}/{month}/{version}/{versioned_filename}"
+            path = get_upload_path(filename, version, year, month)
 
             # Check if file exists before deleting
             if storage.exists(path):
@@ -275,9 +496,185 @@ def delete_image(filename, year=None, month=None):
         'success': len(errors) == 0,
         'deleted': deleted,
         'errors': errors,
+        'retained': False,
+    }
+
+
+def _refuse_ownerless_delete(filename):
+    """delete_image() result for a call that names no owner; None if untracked."""
+    from prompts.models import MediaBlob
+
+    if not MediaBlob.objects.filter(filename=filename).exists():
+        return None
+    logger.warning(f"[B2Upload] Not deleting shared image {filename}: no owner given")
+    return {
+        'success': False,
+        'deleted': [],
+        'errors': ['Deduplicated images are released by their owner'],
+        'retained': True,
     }
 
 
+def holds_image(filename, session_key):
+    """
+    Whether an upload session may release this image.
+
+    Returns:
+        bool or None: None for images uploaded before deduplication,
+        otherwise whether session_key holds a reference to it
+    """
+    from prompts.models import MediaBlob
+
+    blob = MediaBlob.objects.filter(filename=filename).first()
+    if blob is None:
+        return None
+    return bool(session_key) and blob.references.filter(
+        prompt__isnull=True, session_key=session_key,
+    ).exists()
+
+
+def claim_image_url(image_url, prompt_id, session_key):
+    """
+    Hand an upload session's reference to its image over to a new Prompt.
+
+    Called when the upload is submitted: from then on the prompt owns the
+    image, so Prompt.hard_delete() releases it and the session can no
+    longer delete it through b2_delete_upload.
+
+    Args:
+        image_url: The Prompt's b2_image_url
+        prompt_id: The Prompt taking over the reference
+        session_key: The upload session that holds it
+
+    Returns:
+        bool or None: None if the image is untracked, otherwise whether
+        the session held a reference to hand over
+    """
+    from prompts.models import MediaBlob
+
+    if not image_url:
+        return None
+    with transaction.atomic():
+        blob = MediaBlob.objects.select_for_update().filter(
+            urls__original=image_url,
+        ).first()
+        if blob is None:
+            return None
+        reference = blob.references.filter(
+            **_owner_lookup(session_key=session_key),
+        ).first() if session_key else None
+        if reference is None:
+            logger.warning(
+                f"[B2Upload] Prompt {prompt_id}: session holds no reference to {blob.filename}"
+            )
+            return False
+        if blob.references.filter(prompt_id=prompt_id).exists():
+            reference.delete()
+        else:
+            reference.prompt_id = prompt_id
+            reference.session_key = ''
+            reference.save(update_fields=['prompt', 'session_key'])
+    return True
+
+
+def release_image_url(image_url, prompt_id):
+    """
+    Release a Prompt's reference to its deduplicated B2 image.
+
+    Images uploaded before deduplication have no MediaBlob and are left
+    in place, as before.
+
+    Args:
+        image_url: The Prompt's b2_image_url
+        prompt_id: The Prompt releasing its reference
+
+    Returns:
+        dict or None: delete_image() result, None if the image is untracked
+    """
+    if not image_url:
+        return None
+    return _release_and_delete(_owner_lookup(prompt_id), urls__original=image_url)
+
+
+def abandoned_session_references(now=None):
+    """
+    Image references held by upload sessions that are over: the session
+    has expired (database-backed sessions) or the reference is older than
+    SESSION_COOKIE_AGE.
+    """
+    from prompts.models import MediaBlobReference
+
+    now = now or timezone.now()
+    abandoned = Q(created_at__lt=now - timedelta(seconds=settings.SESSION_COOKIE_AGE))
+    if settings.SESSION_ENGINE in SESSION_TABLE_ENGINES:
+        from django.contrib.sessions.models import Session
+
+        abandoned |= ~Q(session_key__in=Session.objects.filter(
+            expire_date__gt=now,
+        ).values('session_key'))
+    return MediaBlobReference.objects.filter(abandoned, prompt__isnull=True)
+
+
+def release_abandoned_session_references(now=None):
+    """
+    Release the references of abandoned upload sessions, deleting files no
+    other owner shares.
+
+    Returns:
+        dict: {'released': references dropped, 'deleted': blobs whose
+        files were removed, 'errors': [...]}
+    """
+    stats = {'released': 0, 'deleted': 0, 'errors': []}
+    references = abandoned_session_references(now).values_list('blob_id', 'session_key')
+    for blob_id, session_key in list(references):
+        try:
+            result = _release_and_delete(_owner_lookup(session_key=session_key), pk=blob_id)
+        except Exception as e:
+            logger.error(f"[B2Upload] Could not release blob {blob_id} of session: {e}")
+            stats['errors'].append(f"blob {blob_id}: {e}")
+            continue
+        if result is None:
+            continue
+        stats['released'] += 1
+        if not result['retained']:
+            stats['deleted'] += 1
+        stats['errors'].extend(result['errors'])
+    return stats
+
+
+@contextmanager
+def lock_image_blob(image_url):
+    """
+    Hold the MediaBlob row whose original is image_url while its files move.
+
+    Used by the SEO rename task: files another owner also references
+    must stay where they are, and a sole owner's moved
+    files are recorded with record_blob_urls() so later identical uploads
+    reuse the new URLs. Uploads of the same bytes wait on the row lock
+    instead of picking up URLs that are being moved.
+
+    Yields:
+        MediaBlob or None: None for images uploaded before deduplication
+    """
+    from prompts.models import MediaBlob
+
+    if not image_url:
+        yield None
+        return
+    with transaction.atomic():
+        yield MediaBlob.objects.select_for_update().filter(
+            urls__original=image_url,
+        ).first()
+
+
+def record_blob_urls(blob, urls):
+    """Replace the recorded URLs of versions that were moved."""
+    blob.urls = {
+        version: urls.get(version) or url for version, url in blob.urls.items()
+    }
+    blob.save(update_fields=['urls', 'updated_at'])
+
+
 def generate_video_filename(original_filename):
     """
     Generate a unique filename for video uploads.
@@ -371,7 +768,8 @@ def upload_video(video_file, original_filename=None):
     # Import here to avoid circular imports
     from prompts.services.video_processor import (
         validate_video,
-        extract_thumbnail,
+        analyze_video,
+        make_thumbnail,
         check_ffmpeg_available,
     )
 
@@ -417,14 +815,11 @@ def upload_video(video_file, original_filename=None):
                     video_file.seek(0)
                     temp_file.write(video_file.read())
 
-            # Extract thumbnail
-            temp_thumb_path = os.path.join(temp_dir, 'thumb.jpg')
-            extract_thumbnail(
-                temp_video_path,
-                temp_thumb_path,
-                timestamp='00:00:01',
-                size='600x600'
+            # Extract thumbnail (validation already probed the file)
+            analysis = analyze_video(
+                temp_video_path, num_frames=0, thumbnail_at=1.0, metadata=metadata,
             )
+            thumb_bytes = make_thumbnail(analysis['thumbnail_frame'], size='600x600')
 
             # Upload original video
             with open(temp_video_path, 'rb') as f:
@@ -433,10 +828,8 @@ def upload_video(video_file, original_filename=None):
             urls['original'] = upload_to_b2(video_content, original_path)
 
             # Upload thumbnail
-            with open(temp_thumb_path, 'rb') as f:
-                thumb_content = ContentFile(f.read())
             thumb_path = get_video_upload_path(filename, 'thumb')
-            urls['thumb'] = upload_to_b2(thumb_content, thumb_path)
+            urls['thumb'] = upload_to_b2(ContentFile(thumb_bytes), thumb_path)
 
         logger.info(f"Video uploaded successfully: {filename}")
 
@@ -481,10 +874,25 @@ def generate_image_variants(image_bytes, filename):
             },
             'error': None  # or error message if failed
         }
+
+    Variants already stored for a deduplicated image are returned as-is.
     """
     from io import BytesIO
 
+    from prompts.models import MediaBlob
+
     try:
+        blob = MediaBlob.objects.filter(filename=filename).first()
+        stored = blob.urls if blob is not None else {}
+        missing = [v for v in VARIANT_VERSIONS if v not in stored]
+        if not missing:
+            logger.info(f"Variants for {filename} already stored")
+            return {
+                'success': True,
+                'urls': {v: stored[v] for v in VARIANT_VERSIONS},
+                'error': None,
+            }
+
         # Create a file-like object from bytes
         image_file = BytesIO(image_bytes)
 
@@ -495,27 +903,14 @@ def generate_image_variants(image_bytes, filename):
             convert_webp=True
         )
 
-        urls = {}
-
-        # Upload thumb variant (300x300) - required for card displays
-        if 'thumb' in processed:
-            thumb_path = get_upload_path(filename, 'thumb')
-            urls['thumb'] = upload_to_b2(processed['thumb'], thumb_path)
-
-        # Upload medium variant (600x600)
-        if 'medium' in processed:
-            medium_path = get_upload_path(filename, 'medium')
-            urls['medium'] = upload_to_b2(processed['medium'], medium_path)
-
-        # Upload large variant (1200x1200)
-        if 'large' in processed:
-            large_path = get_upload_path(filename, 'large')
-            urls['large'] = upload_to_b2(processed['large'], large_path)
-
-        # Upload WebP version
-        if 'webp' in processed:
-            webp_path = get_upload_path(filename, 'webp')
-            urls['webp'] = upload_to_b2(processed['webp'], webp_path)
+        # Upload thumb (300x300), medium (600x600), large (1200x1200), WebP.
+        # Deduplicated images keep the folders of their first upload.
+        if blob is not None:
+            urls = _upload_versions(processed, filename, missing, blob.year, blob.month)
+            stored = _add_blob_urls(blob.pk, urls)
+            urls = {v: stored[v] for v in VARIANT_VERSIONS if v in stored}
+        else:
+            urls = _upload_versions(processed, filename, missing, None, None)
 
         logger.info(f"Generated variants for {filename}: {list(urls.keys())}")
 
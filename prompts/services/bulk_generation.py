@@ -15,6 +15,7 @@ from django.urls import reverse
 from django.utils import timezone
 from django_q.tasks import async_task
 
+from prompts.constants import TEXT_DUPLICATE_THRESHOLD
 from prompts.models import BulkGenerationJob, GeneratedImage
 from prompts.services.image_providers import get_provider
 
@@ -95,6 +96,9 @@ class BulkGenerationService:
         - Profanity filter (Tier 1 universal + Tier 2 provider advisory
           when provider_id is given — Session 173-B)
         - Duplicate detection
+        - Near-duplicates of other prompts in the batch, of published
+          prompts and of earlier jobs' prompts (warnings only, see
+          prompts/services/text_duplicates.py)
 
         Args:
             prompts: List of prompt text strings.
@@ -116,12 +120,24 @@ class BulkGenerationService:
                     reason (str, '' / 'universal_block' /
                         'provider_advisory' — added Session 173-B),
                     scope_provider (str, '' / provider_id — added 173-B).
+                'warnings': list of dicts (do not affect 'valid') - each
+                    contains index, prompt_num, message and similarity.
         """
         from prompts.services.profanity_filter import ProfanityFilterService
 
         errors = []
         profanity_service = ProfanityFilterService()
 
+        # Session 173-B Tier 2 advisory results for the whole batch, from
+        # the cached matcher registry (no per-prompt queries).
+        advisories = {}
+        if provider_id:
+            indexes = [i for i, prompt in enumerate(prompts) if prompt.strip()]
+            results = profanity_service.check_texts_with_provider(
+                [prompts[i].strip() for i in indexes], provider_id=provider_id,
+            )
+            advisories = dict(zip(indexes, results))
+
         seen = {}
         for i, prompt in enumerate(prompts):
             # Empty check
@@ -190,9 +206,7 @@ class BulkGenerationService:
             # this branch is skipped entirely and behavior is identical
             # to pre-173-B.
             if provider_id:
-                advisory = profanity_service.check_text_with_provider(
-                    text, provider_id=provider_id,
-                )
+                advisory = advisories[i]
                 if (not advisory['allowed']
                         and advisory['reason'] == 'provider_advisory'):
                     from django.utils.html import escape
@@ -232,8 +246,61 @@ class BulkGenerationService:
         return {
             'valid': len(errors) == 0,
             'errors': errors,
+            'warnings': self._near_duplicate_warnings(prompts, errors),
         }
 
+    def _near_duplicate_warnings(self, prompts: list[str], errors: list) -> list:
+        """
+        Non-blocking notices for prompts that closely resemble another
+        prompt in the batch or an indexed prompt (two queries per batch).
+        """
+        from prompts.services import text_duplicates
+        from prompts.utils.minhash import minhash, similarity
+
+        rejected = {error['index'] for error in errors}
+        indexes = [
+            i for i, prompt in enumerate(prompts)
+            if i not in rejected and prompt.strip()
+        ]
+        texts = [prompts[i].strip() for i in indexes]
+        catalogue = text_duplicates.find_similar_prompt_texts_many(texts)
+
+        warnings = []
+        signatures = {}
+        for i, text, matches in zip(indexes, texts, catalogue):
+            signature = minhash(text)
+            earlier = [
+                (score, j) for j, score in (
+                    (j, similarity(signature, other))
+                    for j, other in signatures.items()
+                )
+                if score >= TEXT_DUPLICATE_THRESHOLD
+            ]
+            signatures[i] = signature
+            if earlier:
+                score, j = max(earlier)
+                message = f'Very similar to prompt {j + 1}'
+            elif matches:
+                # Published prompts first, then earlier generations
+                best = min(matches, key=lambda m: (
+                    m.kind != text_duplicates.PROMPT, -m.similarity,
+                ))
+                score = best.similarity
+                message = (
+                    'Very similar to an existing prompt'
+                    if best.kind == text_duplicates.PROMPT
+                    else 'Very similar to a prompt from an earlier job'
+                )
+            else:
+                continue
+            warnings.append({
+                'index': i,
+                'prompt_num': i + 1,
+                'message': message,
+                'similarity': round(score, 2),
+            })
+        return warnings
+
     def create_job(
         self,
         user,
@@ -372,6 +439,12 @@ class BulkGenerationService:
 
         GeneratedImage.objects.bulk_create(images_to_create)
 
+        # Near-duplicate text index: variations share their prompt's text
+        from prompts.services.text_duplicates import record_generated_texts
+        record_generated_texts(
+            image for image in images_to_create if image.variation_number == 1
+        )
+
         logger.info(
             "Created bulk job %s: %d prompts, %d images",
             job.id, len(prompts), len(images_to_create),
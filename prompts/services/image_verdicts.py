@@ -0,0 +1,248 @@
+"""
+Reuse of paid Vision API results for images we have already judged.
+
+Every image sent to the Vision API is fingerprinted (sha256 plus perceptual
+pHash/dHash, see prompts/utils/image_hashing.py) and the result stored in
+an ImageVerdict row. Before the next paid call, the same fingerprint is
+looked up:
+
+- Moderation verdicts, judged with the same moderation prompt and model
+  (moderation_policy): any verdict for the exact bytes, and a blocking
+  one (flagged at IMAGE_VERDICT_NEAR_SEVERITIES) for any stored image
+  whose pHash and dHash are both within IMAGE_VERDICT_MAX_DISTANCE bits.
+  An approval is never reused for a near-duplicate: a small local edit
+  keeps the hashes within a few bits, so it must reach the API. Forced
+  re-moderation skips the lookup and refreshes the stored verdict.
+- AI analysis: the same picture (IMAGE_ANALYSIS_MAX_DISTANCE) analysed
+  with the same prompt text, generator and tag list, since those shape
+  the title, description and tags.
+
+Verdicts older than IMAGE_VERDICT_MAX_AGE_DAYS are ignored. Only results
+the API actually returned are stored — timeouts and errors are not.
+
+Near-duplicate lookup: pHash is stored as four 16-bit bands, each indexed.
+Two hashes within 3 bits differ in at most 3 bands, so they share at
+least one — one OR-of-equalities query finds every candidate, and the
+exact distance is checked in Python.
+
+All entry points are no-ops when settings.IMAGE_VERDICT_REUSE is False,
+and store failures only log: a missed reuse costs one API call.
+"""
+import base64
+import hashlib
+import json
+import logging
+from datetime import timedelta
+from typing import Dict, Optional
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+
+from ..constants import (
+    IMAGE_ANALYSIS_MAX_DISTANCE,
+    IMAGE_VERDICT_MAX_AGE_DAYS,
+    IMAGE_VERDICT_MAX_DISTANCE,
+    IMAGE_VERDICT_NEAR_SEVERITIES,
+)
+from ..utils.image_hashing import (
+    ImageFingerprint,
+    fingerprint_bytes,
+    hamming,
+    to_signed,
+    to_unsigned,
+)
+
+logger = logging.getLogger(__name__)
+
+BAND_BITS = 16
+BAND_COUNT = 4
+# Largest distance the band index is guaranteed to find
+MAX_INDEXED_DISTANCE = BAND_COUNT - 1
+
+
+def _enabled() -> bool:
+    return getattr(settings, 'IMAGE_VERDICT_REUSE', False)
+
+
+def _bands(phash: int):
+    mask = (1 << BAND_BITS) - 1
+    return [(phash >> (BAND_BITS * i)) & mask for i in range(BAND_COUNT)]
+
+
+def fingerprint_image(data: bytes) -> Optional[ImageFingerprint]:
+    """Fingerprint image bytes; None if disabled or not a readable image."""
+    if not _enabled() or not data:
+        return None
+    try:
+        return fingerprint_bytes(data)
+    except Exception as e:
+        logger.warning(f"[ImageVerdicts] Could not fingerprint image: {e}")
+        return None
+
+
+def fingerprint_base64(data: str) -> Optional[ImageFingerprint]:
+    """fingerprint_image() for base64-encoded image data."""
+    if not _enabled() or not data:
+        return None
+    try:
+        return fingerprint_image(base64.b64decode(data))
+    except ValueError:
+        return None
+
+
+def fingerprint_url(url: str) -> Optional[ImageFingerprint]:
+    """Download (allowlisted domains only) and fingerprint an image URL."""
+    if not _enabled() or not url:
+        return None
+    from prompts.tasks import _download_image
+
+    downloaded = _download_image(url)
+    return fingerprint_image(downloaded[0]) if downloaded else None
+
+
+def analysis_context(prompt_text: str, ai_generator: str, available_tags) -> str:
+    """Hash of the non-image inputs an AI analysis depends on."""
+    payload = json.dumps(
+        [prompt_text or '', ai_generator or '', sorted(available_tags or [])],
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def moderation_policy(moderation_prompt: str, model: str) -> str:
+    """Hash of the moderation prompt and model a verdict was judged with."""
+    payload = json.dumps([moderation_prompt or '', model or ''])
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def _find(fingerprint, max_distance, field, extra=None, near=None):
+    """
+    Stored row with a fresh `field` closest to the fingerprint, or None.
+
+    extra filters every match; near additionally filters matches that are
+    not the exact bytes.
+    """
+    from prompts.models import ImageVerdict
+
+    cutoff = timezone.now() - timedelta(days=IMAGE_VERDICT_MAX_AGE_DAYS)
+    stamp = {'moderation': 'moderated_at', 'analysis': 'analyzed_at'}[field]
+    fresh = ImageVerdict.objects.filter(**{f'{field}__isnull': False, f'{stamp}__gte': cutoff})
+    if extra:
+        fresh = fresh.filter(**extra)
+
+    exact = fresh.filter(sha256=fingerprint.sha256).first()
+    if exact is not None:
+        return exact
+
+    if near:
+        fresh = fresh.filter(**near)
+    max_distance = min(max_distance, MAX_INDEXED_DISTANCE)
+    if max_distance:
+        any_band = Q()
+        for i, band in enumerate(_bands(fingerprint.phash)):
+            any_band |= Q(**{f'phash_band{i}': band})
+        candidates = fresh.filter(any_band)
+    else:
+        candidates = fresh.filter(
+            phash=to_signed(fingerprint.phash), dhash=to_signed(fingerprint.dhash),
+        )
+
+    best, best_distance = None, None
+    for row in candidates:
+        distance = max(
+            hamming(to_unsigned(row.phash), fingerprint.phash),
+            hamming(to_unsigned(row.dhash), fingerprint.dhash),
+        )
+        if distance <= max_distance and (best is None or distance < best_distance):
+            best, best_distance = row, distance
+    return best
+
+
+def _store(fingerprint, **fields):
+    from prompts.models import ImageVerdict
+
+    band0, band1, band2, band3 = _bands(fingerprint.phash)
+    ImageVerdict.objects.update_or_create(
+        sha256=fingerprint.sha256,
+        defaults={
+            'phash': to_signed(fingerprint.phash),
+            'dhash': to_signed(fingerprint.dhash),
+            'phash_band0': band0,
+            'phash_band1': band1,
+            'phash_band2': band2,
+            'phash_band3': band3,
+            **fields,
+        },
+    )
+
+
+def find_moderation(fingerprint: Optional[ImageFingerprint], policy: str) -> Optional[Dict]:
+    """
+    Prior Vision moderation verdict for this image under the same policy,
+    or a blocking verdict for a near-identical image.
+
+    Returns:
+        The parsed verdict dict (flagged/categories/severity/explanation)
+        or None when the image must be sent to the API.
+    """
+    if fingerprint is None:
+        return None
+    try:
+        row = _find(
+            fingerprint, IMAGE_VERDICT_MAX_DISTANCE, 'moderation',
+            extra={'moderation_policy': policy},
+            near={
+                'moderation__flagged': True,
+                'moderation__severity__in': IMAGE_VERDICT_NEAR_SEVERITIES,
+            },
+        )
+    except Exception as e:
+        logger.warning(f"[ImageVerdicts] Moderation lookup failed: {e}")
+        return None
+    if row is None:
+        return None
+    logger.info(f"[ImageVerdicts] Reusing moderation verdict of {row.sha256[:12]}")
+    return row.moderation
+
+
+def store_moderation(fingerprint: Optional[ImageFingerprint], policy: str, verdict: Dict) -> None:
+    """Remember a parsed Vision moderation verdict for this image."""
+    if fingerprint is None:
+        return
+    try:
+        _store(
+            fingerprint, moderation=verdict, moderation_policy=policy,
+            moderated_at=timezone.now(),
+        )
+    except Exception as e:
+        logger.warning(f"[ImageVerdicts] Could not store moderation verdict: {e}")
+
+
+def find_analysis(fingerprint: Optional[ImageFingerprint], context: str) -> Optional[Dict]:
+    """Prior AI analysis of this image with the same context, or None."""
+    if fingerprint is None:
+        return None
+    try:
+        row = _find(
+            fingerprint, IMAGE_ANALYSIS_MAX_DISTANCE, 'analysis',
+            extra={'analysis_context': context},
+        )
+    except Exception as e:
+        logger.warning(f"[ImageVerdicts] Analysis lookup failed: {e}")
+        return None
+    if row is None:
+        return None
+    logger.info(f"[ImageVerdicts] Reusing AI analysis of {row.sha256[:12]}")
+    return row.analysis
+
+
+def store_analysis(fingerprint: Optional[ImageFingerprint], context: str, result: Dict) -> None:
+    """Remember a validated AI analysis result for this image."""
+    if fingerprint is None or not result or result.get('error'):
+        return
+    try:
+        _store(
+            fingerprint, analysis=result, analysis_context=context, analyzed_at=timezone.now(),
+        )
+    except Exception as e:
+        logger.warning(f"[ImageVerdicts] Could not store AI analysis: {e}")
@@ -5,16 +5,31 @@ Provides algorithms and caching for community leaderboards:
 - Most Viewed: Users ranked by total views on their content
 - Most Active: Users ranked by activity score (uploads, comments, likes)
 
-Uses 5-minute caching to optimize performance.
+Boards are precomputed into LeaderboardEntry rows (score + dense rank per
+metric × period) by rebuild_boards(), run on a schedule by the
+``rebuild_leaderboards`` management command. Board reads and rank lookups
+are then indexed reads; until a board has been built they fall back to
+the live aggregate.
+
+Uses 5-minute caching to optimize performance. Leaderboards go through
+cached_computation (single-flight recompute, stale-while-revalidate), so
+expiry no longer sends every concurrent request into the aggregate.
+Cached boards depend on the 'leaderboard' surrogate key, which model
+signals (and every rebuild) bump.
 """
 
 from django.contrib.auth.models import User
+from django.db import transaction
 from django.db.models import Count, Q, F
-from django.core.cache import cache
 from django.utils import timezone
 from datetime import timedelta
 import logging
 
+from prompts.services.view_rollups import author_views_expression
+from prompts.utils import cache_dependencies
+from prompts.utils.cached_computation import cached_computation
+from prompts.utils.top_n import top_n_per_group
+
 logger = logging.getLogger(__name__)
 
 
@@ -75,35 +90,28 @@ class LeaderboardService:
             List of User objects with total_views annotation
         """
         limit = cls._validate_limit(limit)
-
-        cache_key = f'leaderboard_viewed_{period}_{limit}'
-        cached = cache.get(cache_key)
-        if cached is not None:
-            logger.debug(f"Leaderboard cache hit: {cache_key}")
-            return cached
-
-        logger.info(f"Leaderboard cache miss: {cache_key}, calculating...")
-
-        date_filter = cls.get_date_filter(period)
-
-        # Build view count filter
-        view_filter = Q(
-            prompts__status=1,
-            prompts__deleted_at__isnull=True
+        return cached_computation(
+            f'leaderboard_viewed_{period}_{limit}',
+            lambda: (
+                cls._read_board('views', period, limit)
+                or cls._compute_most_viewed(period, limit)
+            ),
+            ttl=cls.CACHE_TTL,
+            name='leaderboard_viewed',
+            depends_on=[cache_dependencies.LEADERBOARD],
         )
 
-        if date_filter:
-            view_filter &= Q(prompts__views__viewed_at__gte=date_filter)
+    @classmethod
+    def _most_viewed_queryset(cls, period):
+        """Unsliced Most Viewed ranking (users with total_views > 0)."""
+        date_filter = cls.get_date_filter(period)
 
         # Build query for users with view counts
-        queryset = User.objects.filter(
+        # Views come from daily rollups (+ raw rows after the watermark)
+        return User.objects.filter(
             is_active=True,
         ).annotate(
-            total_views=Count(
-                'prompts__views',
-                filter=view_filter,
-                distinct=True
-            ),
+            total_views=author_views_expression(since=date_filter),
             prompt_count=Count(
                 'prompts',
                 filter=Q(
@@ -115,12 +123,15 @@ class LeaderboardService:
             follower_count=Count('follower_set', distinct=True)
         ).filter(
             total_views__gt=0
-        ).order_by('-total_views').select_related('userprofile')[:limit]
+        ).order_by('-total_views')
 
-        result = list(queryset)
-        cache.set(cache_key, result, cls.CACHE_TTL)
-        logger.info(f"Leaderboard cached: {cache_key}, {len(result)} users")
-        return result
+    @classmethod
+    def _compute_most_viewed(cls, period, limit):
+        """Live Most Viewed query (see get_most_viewed)."""
+        logger.info(f"Leaderboard recompute: viewed {period} {limit}")
+        return list(
+            cls._most_viewed_queryset(period).select_related('userprofile')[:limit]
+        )
 
     @classmethod
     def get_most_active(cls, period='week', limit=None):
@@ -138,15 +149,20 @@ class LeaderboardService:
             List of User objects with activity_score annotation
         """
         limit = cls._validate_limit(limit)
+        return cached_computation(
+            f'leaderboard_active_{period}_{limit}',
+            lambda: (
+                cls._read_board('active', period, limit)
+                or cls._compute_most_active(period, limit)
+            ),
+            ttl=cls.CACHE_TTL,
+            name='leaderboard_active',
+            depends_on=[cache_dependencies.LEADERBOARD],
+        )
 
-        cache_key = f'leaderboard_active_{period}_{limit}'
-        cached = cache.get(cache_key)
-        if cached is not None:
-            logger.debug(f"Leaderboard cache hit: {cache_key}")
-            return cached
-
-        logger.info(f"Leaderboard cache miss: {cache_key}, calculating...")
-
+    @classmethod
+    def _most_active_queryset(cls, period):
+        """Unsliced Most Active ranking (users with activity_score > 0)."""
         date_filter = cls.get_date_filter(period)
 
         # Build activity filters
@@ -164,7 +180,7 @@ class LeaderboardService:
         # queries we count all likes (no date filter applied to likes)
 
         # Build query for users with activity scores
-        queryset = User.objects.filter(
+        return User.objects.filter(
             is_active=True,
         ).annotate(
             uploads_count=Count(
@@ -195,12 +211,15 @@ class LeaderboardService:
         ).filter(
             activity_score__gt=0,
             prompt_count__gt=0,
-        ).order_by('-activity_score').select_related('userprofile')[:limit]
+        ).order_by('-activity_score')
 
-        result = list(queryset)
-        cache.set(cache_key, result, cls.CACHE_TTL)
-        logger.info(f"Leaderboard cached: {cache_key}, {len(result)} users")
-        return result
+    @classmethod
+    def _compute_most_active(cls, period, limit):
+        """Live Most Active query (see get_most_active)."""
+        logger.info(f"Leaderboard recompute: active {period} {limit}")
+        return list(
+            cls._most_active_queryset(period).select_related('userprofile')[:limit]
+        )
 
     @classmethod
     def get_user_thumbnails(cls, user, limit=None):
@@ -227,6 +246,9 @@ class LeaderboardService:
         """
         Attach thumbnails to all creators in a single query (prevents N+1).
 
+        Only the top `limit` prompts of each creator are fetched
+        (ROW_NUMBER() per author), however prolific they are.
+
         Args:
             creators: List of User objects with prompt_count annotation
             limit: Max thumbnails per user (default: THUMBNAIL_LIMIT)
@@ -242,21 +264,23 @@ class LeaderboardService:
 
         creator_ids = [c.id for c in creators]
 
-        # Get top prompts per user sorted by likes
-        prompts = Prompt.objects.filter(
-            author_id__in=creator_ids,
-            status=1,
-            deleted_at__isnull=True
-        ).annotate(
-            likes_count=Count('likes')
-        ).order_by('author_id', '-likes_count', '-created_on').select_related('author')
+        # Top N prompts per user sorted by likes, trimmed in the database
+        prompts = top_n_per_group(
+            Prompt.objects.filter(
+                author_id__in=creator_ids,
+                status=1,
+                deleted_at__isnull=True
+            ).annotate(
+                likes_count=Count('likes')
+            ).select_related('author'),
+            partition_by='author_id',
+            order_by=['-likes_count', '-created_on', '-id'],
+            n=limit,
+        )
 
-        # Group prompts by user, taking only top N
         thumbnails_by_user = {}
         for prompt in prompts:
-            user_prompts = thumbnails_by_user.setdefault(prompt.author_id, [])
-            if len(user_prompts) < limit:
-                user_prompts.append(prompt)
+            thumbnails_by_user.setdefault(prompt.author_id, []).append(prompt)
 
         # Attach to creators
         for creator in creators:
@@ -293,7 +317,9 @@ class LeaderboardService:
         """
         Get a specific user's rank on the leaderboard.
 
-        Used by user profile page to display ranking stats.
+        Used by user profile page to display ranking stats. Reads the
+        precomputed dense rank when the board has been built (any rank,
+        not just the top of the board).
 
         Args:
             user: User object to find rank for
@@ -320,34 +346,135 @@ class LeaderboardService:
                 f"Invalid period '{period}'. Must be one of: {cls.VALID_PERIODS}"
             )
 
+        from prompts.models import LeaderboardEntry
+
+        # Built boards: the user's own row via the (metric, period, user)
+        # unique index
+        board = LeaderboardEntry.objects.filter(metric=metric, period=period)
+        rank = board.filter(user_id=user.id).values_list('rank', flat=True).first()
+        if rank is not None:
+            return rank
+        if board.exists():
+            # Board built; a user without a row has no score on it
+            return None
+
+        # Board not built yet: scan the live ranking
         # Use higher limit for rank lookup to find users not in top 25
         limit = 1000
 
         if metric == 'views':
-            leaderboard = cls.get_most_viewed(period=period, limit=limit)
+            queryset = cls._most_viewed_queryset(period)
         else:
-            leaderboard = cls.get_most_active(period=period, limit=limit)
+            queryset = cls._most_active_queryset(period)
 
-        for index, entry in enumerate(leaderboard, start=1):
-            if entry.id == user.id:
+        for index, user_id in enumerate(queryset.values_list('id', flat=True)[:limit], start=1):
+            if user_id == user.id:
                 return index
 
         return None  # User not ranked (no activity or beyond limit)
 
     @classmethod
-    def invalidate_cache(cls, period=None):
+    def _read_board(cls, metric, period, limit):
+        """
+        Top of a precomputed board as User objects carrying the same
+        annotations as the live queries (total_views / activity_score,
+        prompt_count, follower_count) plus leaderboard_rank.
+
+        Returns:
+            list: Empty if the board has not been built (or has no
+            scored users), in which case callers use the live query
         """
-        Invalidate leaderboard cache.
+        from prompts.models import LeaderboardEntry
+
+        entries = LeaderboardEntry.objects.filter(
+            metric=metric,
+            period=period,
+            user__is_active=True,
+        ).select_related('user', 'user__userprofile').order_by('rank', 'user_id')[:limit]
+
+        score_attr = 'total_views' if metric == 'views' else 'activity_score'
+        users = []
+        for entry in entries:
+            user = entry.user
+            setattr(user, score_attr, entry.score)
+            user.prompt_count = entry.prompt_count
+            user.follower_count = entry.follower_count
+            user.leaderboard_rank = entry.rank
+            users.append(user)
+        return users
+
+    @classmethod
+    def rebuild_boards(cls, metrics=None, periods=None):
+        """
+        Recompute LeaderboardEntry rows for each metric × period.
+
+        Each board is one set-based aggregate (views come from the daily
+        PromptViewDaily rollups plus the raw tail after the watermark),
+        dense-ranked and swapped in atomically, so readers never see a
+        half-built board. Bumps the 'leaderboard' surrogate key afterwards.
 
         Args:
-            period: Specific period to invalidate, or None for all
+            metrics: Subset of VALID_METRICS (default: all)
+            periods: Subset of VALID_PERIODS (default: all)
+
+        Returns:
+            dict: {(metric, period): number of ranked users}
         """
-        periods = [period] if period else ['week', 'month', 'all']
-        limits = [cls.DEFAULT_LIMIT]  # Could add more if needed
+        from prompts.models import LeaderboardEntry
+
+        computed_at = timezone.now()
+        results = {}
+        for metric in metrics or cls.VALID_METRICS:
+            for period in periods or cls.VALID_PERIODS:
+                if metric == 'views':
+                    rows = cls._most_viewed_queryset(period).values_list(
+                        'id', 'total_views', 'prompt_count', 'follower_count',
+                    )
+                else:
+                    rows = cls._most_active_queryset(period).values_list(
+                        'id', 'activity_score', 'prompt_count', 'follower_count',
+                    )
+
+                entries = []
+                rank = 0
+                previous_score = None
+                for user_id, score, prompt_count, follower_count in rows.iterator(chunk_size=2000):
+                    if score != previous_score:
+                        rank += 1  # Dense: equal scores share a rank
+                        previous_score = score
+                    entries.append(LeaderboardEntry(
+                        metric=metric,
+                        period=period,
+                        user_id=user_id,
+                        score=score,
+                        rank=rank,
+                        prompt_count=prompt_count,
+                        follower_count=follower_count,
+                        computed_at=computed_at,
+                    ))
+
+                with transaction.atomic():
+                    LeaderboardEntry.objects.filter(
+                        metric=metric, period=period,
+                    ).delete()
+                    LeaderboardEntry.objects.bulk_create(entries, batch_size=1000)
+
+                results[(metric, period)] = len(entries)
+                logger.info(
+                    f"[Leaderboard] Rebuilt {metric}/{period}: {len(entries)} users"
+                )
+
+        cache_dependencies.invalidate(cache_dependencies.LEADERBOARD)
+        return results
 
-        for p in periods:
-            for limit_val in limits:
-                cache.delete(f'leaderboard_viewed_{p}_{limit_val}')
-                cache.delete(f'leaderboard_active_{p}_{limit_val}')
+    @classmethod
+    def invalidate_cache(cls, period=None):
+        """
+        Invalidate leaderboard cache (every limit, including rank lookups).
 
-        logger.info(f"Leaderboard cache invalidated for periods: {periods}")
+        Args:
+            period: Kept for compatibility; all periods share the
+                'leaderboard' surrogate key and are retired together
+        """
+        cache_dependencies.invalidate(cache_dependencies.LEADERBOARD)
+        logger.info(f"Leaderboard cache invalidated (requested period: {period or 'all'})")
@@ -0,0 +1,362 @@
+"""
+Near-duplicate image index over perceptual hashes.
+
+Every Prompt image and GeneratedImage gets an ImageHash row (64-bit pHash
+and dHash, see prompts/utils/image_hashing.py) when it is uploaded or
+generated. Each worker process keeps those hashes in a band index
+(prompts/utils/hash_bands.py) that finds every pHash within
+NEAR_DUPLICATE_MAX_DISTANCE bits with a few dict lookups:
+
+- built from the ImageHash table when the web worker starts (warm(),
+  called from wsgi.py), or on first use in other processes,
+- extended immediately with the hashes this process records,
+- caught up with rows written by other workers at most every
+  NEAR_DUPLICATE_SYNC_SECONDS. Catch-up reads rows created since the
+  previous one, less NEAR_DUPLICATE_SYNC_OVERLAP_SECONDS: ids and
+  timestamps are assigned before commit, so a row can become visible
+  after later ones.
+
+Lookups are in-memory and take no lock: the index only grows, and
+writers (under the index lock) only append. Radii beyond
+NEAR_DUPLICATE_MAX_DISTANCE are capped to it. Matches are keys only —
+callers resolve them through the database, so deleted, trashed or
+unpublished items drop out there.
+
+Used by:
+- the upload duplicate warning (views/upload_api_views.py)
+- the report_duplicate_images management command
+- the visual-similarity signal in related prompts (utils/related.py)
+
+All entry points are no-ops when settings.NEAR_DUPLICATE_INDEX is False.
+"""
+import base64
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import Dict, List, Optional
+
+from django.conf import settings
+from django.db import close_old_connections
+from django.urls import reverse
+from django.utils import timezone
+
+from ..constants import (
+    NEAR_DUPLICATE_MAX_DISTANCE,
+    NEAR_DUPLICATE_SYNC_OVERLAP_SECONDS,
+    NEAR_DUPLICATE_SYNC_SECONDS,
+    NEAR_DUPLICATE_WARNING_LIMIT,
+)
+from ..utils.clusters import Clusters
+from ..utils.hash_bands import HashBandIndex
+from ..utils.image_hashing import (
+    ImageFingerprint,
+    fingerprint_bytes,
+    hamming,
+    to_signed,
+    to_unsigned,
+)
+
+logger = logging.getLogger(__name__)
+
+PROMPT = 'prompt'
+GENERATED = 'generated'
+
+
+@dataclass(frozen=True)
+class Match:
+    kind: str  # PROMPT or GENERATED
+    object_id: object  # Prompt pk (int) or GeneratedImage pk (UUID)
+    distance: int
+
+
+def _enabled() -> bool:
+    return getattr(settings, 'NEAR_DUPLICATE_INDEX', False)
+
+
+class NearDuplicateIndex:
+    """Per-process band index of ImageHash rows (see module docstring)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()  # serialises writers; readers take none
+        self._bands = None
+        self._hashes = {}  # (kind, object_id) -> (phash, dhash)
+        self._synced_through = None  # wall-clock start of the last sync
+        self._synced_at = 0.0
+
+    def _put(self, key, phash, dhash):
+        """Index key under these hashes; False if it already was."""
+        if self._hashes.get(key) == (phash, dhash):
+            return False
+        self._hashes[key] = (phash, dhash)
+        self._bands.add(phash, key)
+        return True
+
+    def _sync(self):
+        """Build on first use, then pick up rows written by other workers."""
+        from prompts.models import ImageHash
+
+        now = time.monotonic()
+        if self._bands is not None and now - self._synced_at < NEAR_DUPLICATE_SYNC_SECONDS:
+            return
+        with self._lock:
+            if self._bands is not None and now - self._synced_at < NEAR_DUPLICATE_SYNC_SECONDS:
+                return  # Another thread synced while we waited
+            if self._bands is None:
+                self._bands = HashBandIndex(NEAR_DUPLICATE_MAX_DISTANCE)
+            started = timezone.now()
+            rows = ImageHash.objects.all()
+            if self._synced_through is not None:
+                rows = rows.filter(created_at__gte=self._synced_through - timedelta(
+                    seconds=NEAR_DUPLICATE_SYNC_OVERLAP_SECONDS,
+                ))
+            rows = rows.order_by('created_at', 'id').values_list(
+                'prompt_id', 'generated_image_id', 'phash', 'dhash',
+            )
+            count = 0
+            for prompt_id, generated_id, phash, dhash in rows.iterator():
+                key = (PROMPT, prompt_id) if prompt_id else (GENERATED, generated_id)
+                count += self._put(key, to_unsigned(phash), to_unsigned(dhash))
+            self._synced_through = started
+            self._synced_at = now
+        if count:
+            logger.info(f"[NearDuplicates] Indexed {count} image hash(es), {len(self._hashes)} total")
+
+    def add(self, key, phash: int, dhash: int) -> None:
+        """Index a hash this process just recorded."""
+        self._sync()
+        with self._lock:
+            self._put(key, phash, dhash)
+
+    def get(self, key):
+        """(phash, dhash) of an indexed item, or None."""
+        self._sync()
+        return self._hashes.get(key)
+
+    def items(self):
+        """Snapshot of ((kind, object_id), (phash, dhash)) pairs."""
+        self._sync()
+        with self._lock:
+            return list(self._hashes.items())
+
+    def search(self, phash: int, dhash: int, max_distance: int) -> List[Match]:
+        """
+        Indexed items whose pHash and dHash are both within max_distance
+        (capped to NEAR_DUPLICATE_MAX_DISTANCE).
+
+        Returns:
+            Matches nearest first; distance is the larger of the two.
+        """
+        self._sync()
+        max_distance = min(max_distance, NEAR_DUPLICATE_MAX_DISTANCE)
+        bands, hashes = self._bands, self._hashes
+        if bands is None:
+            return []  # Reset between the sync and here
+        matches = {}
+        for _, key in bands.search(phash, max_distance):
+            # Items re-hashed since insertion also sit under their old hash
+            current = hashes.get(key)
+            if current is None:
+                continue
+            distance = max(hamming(phash, current[0]), hamming(dhash, current[1]))
+            if distance <= max_distance:
+                matches[key] = distance
+        return sorted(
+            (Match(kind, object_id, distance) for (kind, object_id), distance in matches.items()),
+            key=lambda match: match.distance,
+        )
+
+    def warm(self) -> None:
+        """Build the index now instead of on the first lookup."""
+        self._sync()
+
+    def reset(self) -> None:
+        """Forget everything; the next lookup rebuilds from the database."""
+        with self._lock:
+            self._bands = None
+            self._hashes = {}
+            self._synced_through = None
+            self._synced_at = 0.0
+
+
+index = NearDuplicateIndex()
+
+
+def warm_in_background() -> None:
+    """Start building this process's index without delaying startup."""
+    if not _enabled():
+        return
+
+    def build():
+        try:
+            index.warm()
+        except Exception as e:
+            logger.warning(f"[NearDuplicates] Could not build index: {e}")
+        finally:
+            close_old_connections()
+
+    threading.Thread(target=build, name='near-duplicate-index', daemon=True).start()
+
+
+def fingerprint(data: bytes) -> Optional[ImageFingerprint]:
+    """Hash image bytes; None if disabled or not a readable image."""
+    if not _enabled() or not data:
+        return None
+    try:
+        return fingerprint_bytes(data)
+    except Exception as e:
+        logger.warning(f"[NearDuplicates] Could not hash image: {e}")
+        return None
+
+
+def _record(key, phash: int, dhash: int) -> None:
+    from prompts.models import ImageHash
+
+    owner = {'prompt_id': key[1]} if key[0] == PROMPT else {'generated_image_id': key[1]}
+    if index.get(key) == (phash, dhash):
+        return
+    # Insert-only: a fresh id lets other workers' sync pick the change up
+    ImageHash.objects.filter(**owner).delete()
+    ImageHash.objects.create(phash=to_signed(phash), dhash=to_signed(dhash), **owner)
+    index.add(key, phash, dhash)
+
+
+def record_prompt(prompt_id: int, phash: int, dhash: int) -> None:
+    """Store and index the hashes of a Prompt's image."""
+    if not _enabled():
+        return
+    try:
+        _record((PROMPT, prompt_id), phash, dhash)
+    except Exception as e:
+        logger.warning(f"[NearDuplicates] Could not record prompt {prompt_id}: {e}")
+
+
+def record_generated_image(image_id, image_data) -> None:
+    """Hash, store and index a freshly generated image (bytes or base64)."""
+    if not _enabled():
+        return
+    try:
+        data = base64.b64decode(image_data) if isinstance(image_data, str) else image_data
+    except ValueError:
+        return
+    hashes = fingerprint(data)
+    if hashes is None:
+        return
+    try:
+        _record((GENERATED, image_id), hashes.phash, hashes.dhash)
+    except Exception as e:
+        logger.warning(f"[NearDuplicates] Could not record generated image {image_id}: {e}")
+
+
+def record_prompt_from_generated(prompt_id: int, image_id) -> None:
+    """Give a Prompt published from a GeneratedImage the same hashes."""
+    from prompts.models import ImageHash
+
+    if not _enabled():
+        return
+    row = ImageHash.objects.filter(generated_image_id=image_id).values_list('phash', 'dhash').first()
+    if row is not None:
+        record_prompt(prompt_id, to_unsigned(row[0]), to_unsigned(row[1]))
+
+
+def find_similar(phash: int, dhash: int, max_distance: int = NEAR_DUPLICATE_MAX_DISTANCE,
+                 kind: Optional[str] = None) -> List[Match]:
+    """
+    Indexed images within max_distance (at most NEAR_DUPLICATE_MAX_DISTANCE),
+    nearest first (optionally one kind).
+    """
+    if not _enabled():
+        return []
+    try:
+        matches = index.search(phash, dhash, max_distance)
+    except Exception as e:
+        logger.warning(f"[NearDuplicates] Lookup failed: {e}")
+        return []
+    return [m for m in matches if kind is None or m.kind == kind]
+
+
+def similar_prompt_ids(prompt_id: int, max_distance: int) -> Dict[int, int]:
+    """{prompt id: distance} of prompts whose image is close to this one's."""
+    if not _enabled():
+        return {}
+    hashes = index.get((PROMPT, prompt_id))
+    if hashes is None:
+        return {}
+    return {
+        match.object_id: match.distance
+        for match in find_similar(*hashes, max_distance=max_distance, kind=PROMPT)
+        if match.object_id != prompt_id
+    }
+
+
+def visual_similarity(prompt_id: int, candidate_ids, max_distance: int) -> Dict[int, float]:
+    """
+    {candidate id: score} for candidates whose image is indexed: 1.0 for the
+    same picture, falling linearly to 0.0 at max_distance bits of pHash.
+    """
+    if not _enabled():
+        return {}
+    source = index.get((PROMPT, prompt_id))
+    if source is None:
+        return {}
+    scores = {}
+    for candidate_id in candidate_ids:
+        hashes = index.get((PROMPT, candidate_id))
+        if hashes is not None:
+            scores[candidate_id] = max(0.0, 1.0 - hamming(source[0], hashes[0]) / max_distance)
+    return scores
+
+
+def upload_duplicates(hashes: Optional[ImageFingerprint], limit: int = NEAR_DUPLICATE_WARNING_LIMIT):
+    """
+    Published prompts whose image looks like a new upload, for the warning.
+
+    Returns:
+        [{'title': ..., 'url': ..., 'distance': ...}], nearest first
+    """
+    from prompts.models import Prompt
+
+    if hashes is None:
+        return []
+    distances = {
+        match.object_id: match.distance
+        for match in find_similar(hashes.phash, hashes.dhash, kind=PROMPT)
+    }
+    if not distances:
+        return []
+    prompts = Prompt.objects.filter(
+        pk__in=distances, status=1, deleted_at__isnull=True,
+    ).only('id', 'title', 'slug')
+    ranked = sorted(prompts, key=lambda prompt: distances[prompt.pk])[:limit]
+    return [
+        {
+            'title': prompt.title,
+            'url': reverse('prompts:prompt_detail', args=[prompt.slug]),
+            'distance': distances[prompt.pk],
+        }
+        for prompt in ranked
+    ]
+
+
+def duplicate_groups(max_distance: int = NEAR_DUPLICATE_MAX_DISTANCE, kind: Optional[str] = PROMPT):
+    """
+    Clusters of indexed images that are near-duplicates of each other.
+
+    Items are linked when within max_distance; clusters are the connected
+    components (so a chain of small edits forms one group).
+
+    Returns:
+        List of sets of (kind, object_id) keys, largest first; singletons
+        are omitted.
+    """
+    if not _enabled():
+        return []
+    clusters = Clusters()
+    for key, (phash, dhash) in index.items():
+        if kind is not None and key[0] != kind:
+            continue
+        for match in index.search(phash, dhash, max_distance):
+            if kind is None or match.kind == kind:
+                clusters.link((match.kind, match.object_id), key)
+    return clusters.groups()
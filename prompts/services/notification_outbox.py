@@ -0,0 +1,193 @@
+"""
+Notification Outbox Service for PromptFinder.
+
+Social actions (comments, likes, follows, collection saves) notify the
+affected user, but the request that performed the action should not pay
+for it. The notification signals call enqueue(), which appends compact
+NotificationEvent rows (a single insert) and schedules the
+drain_notification_outbox task once the transaction commits. The task
+drains the outbox in batches:
+
+- Events are resolved per kind with one query each (the comment, like,
+  follow or collection item, with recipient and actor joined). Events
+  whose object is gone — undone before the drain — are dropped.
+- Notifications are written by create_notifications(): repeat events on
+  the same target are folded, the rest go out in one bulk_create.
+
+With settings.NOTIFICATION_OUTBOX_ASYNC = False (tests) enqueue() drains
+inline, so notifications exist as soon as the action returns.
+
+Safety net: python manage.py drain_notification_outbox (Heroku Scheduler)
+picks up events whose task was never scheduled.
+"""
+
+import logging
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+logger = logging.getLogger(__name__)
+
+DRAIN_BATCH_SIZE = 500
+
+# One drain task is scheduled per window, however many events arrive
+DRAIN_SCHEDULED_KEY = 'notification_outbox_drain_scheduled'
+DRAIN_SCHEDULE_WINDOW = 30  # seconds
+
+
+def _async_enabled():
+    return getattr(settings, 'NOTIFICATION_OUTBOX_ASYNC', True)
+
+
+def enqueue(kind, pairs):
+    """
+    Record events of one kind in a single insert.
+
+    Args:
+        kind: NotificationEvent.Kind value
+        pairs: Iterable of (actor_id, object_id)
+
+    Example:
+        enqueue(NotificationEvent.Kind.LIKE, [(user.pk, prompt.pk)])
+    """
+    from prompts.models import NotificationEvent
+
+    events = [
+        NotificationEvent(kind=kind, actor_id=actor_id, object_id=object_id)
+        for actor_id, object_id in pairs
+    ]
+    if not events:
+        return
+    NotificationEvent.objects.bulk_create(events)
+    if _async_enabled():
+        transaction.on_commit(schedule_drain)
+    else:
+        drain()
+
+
+def schedule_drain():
+    """Queue the drain task unless one is already queued for this window."""
+    if not cache.add(DRAIN_SCHEDULED_KEY, True, DRAIN_SCHEDULE_WINDOW):
+        return
+    try:
+        from django_q.tasks import async_task
+        async_task('prompts.tasks.drain_notification_outbox')
+    except Exception:
+        cache.delete(DRAIN_SCHEDULED_KEY)
+        logger.exception("[NotificationOutbox] Failed to queue drain task")
+
+
+def drain(batch_size=DRAIN_BATCH_SIZE):
+    """
+    Turn queued events into notifications, oldest first, until the
+    outbox is empty.
+
+    Concurrent drains take disjoint batches (SELECT ... SKIP LOCKED).
+
+    Returns:
+        int: Events processed
+    """
+    from prompts.models import NotificationEvent
+    from prompts.services.notifications import create_notifications
+
+    # Events arriving from now on need a new task
+    cache.delete(DRAIN_SCHEDULED_KEY)
+    processed = 0
+    while True:
+        with transaction.atomic():
+            events = list(
+                NotificationEvent.objects
+                .select_for_update(skip_locked=True)
+                .order_by('id')[:batch_size]
+            )
+            if not events:
+                break
+            create_notifications(_resolve(events))
+            NotificationEvent.objects.filter(pk__in=[e.pk for e in events]).delete()
+        processed += len(events)
+    if processed:
+        logger.info(f"[NotificationOutbox] Drained {processed} events")
+    return processed
+
+
+def _resolve(events):
+    """
+    Events to create_notifications() entries, in event order. One query
+    per kind present in the batch.
+    """
+    from prompts.models import CollectionItem, Comment, Follow, NotificationEvent, Prompt
+
+    Kind = NotificationEvent.Kind
+    ids = defaultdict(set)
+    for event in events:
+        ids[event.kind].add(event.object_id)
+
+    comments = {
+        c.pk: c for c in Comment.objects.filter(pk__in=ids[Kind.COMMENT])
+        .select_related('author', 'prompt__author')
+    } if ids[Kind.COMMENT] else {}
+    # Likes have no row of their own; the (prompt, user) pair still being
+    # in the M2M table confirms the like was not undone
+    likes = {}
+    if ids[Kind.LIKE]:
+        actor_ids = {e.actor_id for e in events if e.kind == Kind.LIKE}
+        likes = {
+            (like.prompt_id, like.user_id): like
+            for like in Prompt.likes.through.objects.filter(
+                prompt_id__in=ids[Kind.LIKE], user_id__in=actor_ids,
+            ).select_related('prompt__author', 'user')
+        }
+    follows = {
+        f.pk: f for f in Follow.objects.filter(pk__in=ids[Kind.FOLLOW])
+        .select_related('follower', 'following')
+    } if ids[Kind.FOLLOW] else {}
+    items = {
+        i.pk: i for i in CollectionItem.objects.filter(pk__in=ids[Kind.COLLECTION_SAVE])
+        .select_related('collection__user', 'prompt__author')
+    } if ids[Kind.COLLECTION_SAVE] else {}
+
+    entries = []
+    for event in events:
+        if event.kind == Kind.COMMENT and event.object_id in comments:
+            comment = comments[event.object_id]
+            entries.append({
+                'recipient': comment.prompt.author,
+                'sender': comment.author,
+                'notification_type': 'comment_on_prompt',
+                'title': f'{comment.author.username} commented on your prompt',
+                'message': comment.body[:200] if comment.body else '',
+                'link': f'/prompt/{comment.prompt.slug}/#comments',
+            })
+        elif event.kind == Kind.LIKE and (event.object_id, event.actor_id) in likes:
+            like = likes[(event.object_id, event.actor_id)]
+            entries.append({
+                'recipient': like.prompt.author,
+                'sender': like.user,
+                'notification_type': 'prompt_liked',
+                'title': f'{like.user.username} liked your prompt',
+                'link': f'/prompt/{like.prompt.slug}/',
+            })
+        elif event.kind == Kind.FOLLOW and event.object_id in follows:
+            follow = follows[event.object_id]
+            entries.append({
+                'recipient': follow.following,
+                'sender': follow.follower,
+                'notification_type': 'new_follower',
+                'title': f'{follow.follower.username} started following you',
+                'link': f'/users/{follow.follower.username}/',
+            })
+        elif event.kind == Kind.COLLECTION_SAVE and event.object_id in items:
+            item = items[event.object_id]
+            # Skip if collection is private (respect privacy)
+            if item.collection.is_private:
+                continue
+            entries.append({
+                'recipient': item.prompt.author,
+                'sender': item.collection.user,
+                'notification_type': 'prompt_saved',
+                'title': f'{item.collection.user.username} saved your prompt to a collection',
+                'link': f'/prompt/{item.prompt.slug}/',
+            })
+    return entries
@@ -5,22 +5,218 @@ All notification creation goes through create_notification().
 Signal handlers and views should use this module instead of creating
 Notification objects directly.
 """
+import hashlib
+import heapq
 import logging
 import uuid
 from datetime import timedelta
+from itertools import islice
+from operator import attrgetter, itemgetter
 
 import bleach
-from django.db.models import Count, Max, Min, Q
+from django.db import IntegrityError, transaction
+from django.db.models import Count, Exists, F, Max, Min, OuterRef, Q, Value
+from django.db.models.functions import Coalesce, Greatest, Least
 from django.utils import timezone
 from django.utils.html import strip_tags
 
-from prompts.models import Notification, NOTIFICATION_TYPE_CATEGORY_MAP
+from prompts.models import (
+    BroadcastNotification, BroadcastReceipt, Notification, NotificationCounter,
+    NOTIFICATION_TYPE_CATEGORY_MAP,
+)
+from prompts.utils import cache_dependencies
 
 logger = logging.getLogger(__name__)
 
 # Window for duplicate detection (seconds)
 DUPLICATE_WINDOW_SECONDS = 60
 
+# Types whose repeated events on the same target fold into one rolling
+# notification ("bob and 24 others liked your prompt"), with the verb
+# used in the rolled-up title. The target is the prompt in the link;
+# follows all target the recipient.
+AGGREGATED_TYPES = {
+    'prompt_liked': 'liked your prompt',
+    'prompt_saved': 'saved your prompt to a collection',
+    'new_follower': 'started following you',
+}
+
+
+def _hash_key(*parts):
+    return hashlib.sha256(
+        '\x1f'.join(str(part) for part in parts).encode()
+    ).hexdigest()
+
+
+def _dedupe_key(recipient, sender, notification_type, link, message):
+    """
+    Same recipient, sender, type, link and message. The latest notification
+    for an event holds its key, so a repeat collides on the constraint
+    until _release_dedupe_keys() frees it.
+    """
+    return _hash_key(
+        'dedupe', recipient.pk, sender.pk if sender else '',
+        notification_type, link, message,
+    )
+
+
+def _release_dedupe_keys(keys, now):
+    """
+    Free dedupe keys held by notifications older than
+    DUPLICATE_WINDOW_SECONDS: the window slides from the latest kept
+    notification of each event. Returns the number released.
+    """
+    return Notification.objects.filter(
+        dedupe_key__in=keys,
+        created_at__lte=now - timedelta(seconds=DUPLICATE_WINDOW_SECONDS),
+    ).update(dedupe_key=None)
+
+
+def _insert_or_ignore(notification):
+    """
+    Insert the notification unless its dedupe_key (or open aggregate_key)
+    is already taken, in which case return None. The unique constraints
+    make this safe under concurrent signal fires.
+    """
+    try:
+        with transaction.atomic():
+            notification.save(force_insert=True)
+    except IntegrityError:
+        return None
+    return notification
+
+
+def _insert_unless_duplicate(notification):
+    """
+    Insert a non-aggregated notification unless the same event was
+    notified within the last DUPLICATE_WINDOW_SECONDS. Costs one insert
+    normally; a collision adds one UPDATE, and a second insert when the
+    colliding notification turns out to be older than the window.
+    """
+    inserted = _insert_or_ignore(notification)
+    if inserted is None and _release_dedupe_keys([notification.dedupe_key], timezone.now()):
+        inserted = _insert_or_ignore(notification)
+    return inserted
+
+
+def _aggregate_key(recipient, notification_type, link):
+    target = '' if notification_type == 'new_follower' else link
+    return _hash_key('aggregate', recipient.pk, notification_type, target)
+
+
+def _rolled_up_title(username, others, notification_type):
+    """Title of a notification folding ``others`` actors besides username."""
+    verb = AGGREGATED_TYPES[notification_type]
+    if others < 1:
+        title = f"{username} {verb}"
+    else:
+        title = f"{username} and {others} other{'' if others == 1 else 's'} {verb}"
+    return title[:Notification._meta.get_field('title').max_length]
+
+
+def _roll_up(recipient, senders, notification_type, category, link, aggregate_key):
+    """
+    Fold events from ``senders`` (oldest first) into the recipient's open
+    (unread) notification for the same target. Users already folded into
+    it are not counted again; if any sender is new, the latest new one
+    becomes the notification's sender and it moves to the top.
+
+    Returns:
+        tuple: (notification, folded) — notification is None if there is
+        no open one; folded is False when every sender was already in it
+        (a double-fire)
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        notification = Notification.objects.select_for_update().filter(
+            aggregate_key=aggregate_key, is_read=False,
+        ).first()
+        if notification is None:
+            return None, False
+        known = set(notification.actor_ids)
+        new = [s for s in dict((s.pk, s) for s in senders).values() if s.pk not in known]
+        if not new:
+            return notification, False
+        latest = new[-1]
+        notification.actor_ids = notification.actor_ids + [s.pk for s in new]
+        notification.actor_count += len(new)
+        notification.sender = latest
+        notification.title = _rolled_up_title(
+            latest.username, notification.actor_count - 1, notification_type,
+        )
+        notification.link = link
+        notification.created_at = now
+        notification.save(update_fields=[
+            'actor_ids', 'actor_count', 'sender', 'title', 'link', 'created_at',
+        ])
+    record_notification_bumped(recipient.pk, category, now)
+    return notification, True
+
+
+def retract_actors(recipient, notification_type, link, sender_ids):
+    """
+    Take users whose like, follow or collection save was undone back out
+    of the recipient's notifications for that target. A notification left
+    without actors is deleted; a rolled-up one keeps the remaining actors
+    (count and title updated, latest remaining actor as sender).
+
+    Args:
+        recipient: The notified user
+        notification_type: One of AGGREGATED_TYPES
+        link: The target's link (ignored for new_follower)
+        sender_ids: Users whose action was undone
+
+    Returns:
+        int: Notifications updated or deleted
+    """
+    from django.contrib.auth.models import User
+
+    sender_ids = set(sender_ids)
+    if not sender_ids:
+        return 0
+    key = _aggregate_key(recipient, notification_type, link)
+    with transaction.atomic():
+        # Expired notifications have released their key; match them by sender
+        candidates = Notification.objects.select_for_update().filter(
+            Q(aggregate_key=key) | Q(aggregate_key__isnull=True, sender_id__in=sender_ids),
+            recipient=recipient, notification_type=notification_type,
+        )
+        if notification_type != 'new_follower':
+            candidates = candidates.filter(link=link)
+
+        emptied, shrunk = [], []
+        for notification in candidates:
+            remaining = [i for i in notification.actor_ids if i not in sender_ids]
+            if len(remaining) == len(notification.actor_ids):
+                continue
+            if not remaining:
+                emptied.append(notification.pk)
+                continue
+            removed = len(notification.actor_ids) - len(remaining)
+            notification.actor_ids = remaining
+            notification.actor_count = max(notification.actor_count - removed, len(remaining))
+            if notification.sender_id not in remaining:
+                notification.sender_id = remaining[-1]
+            shrunk.append(notification)
+
+        usernames = dict(User.objects.filter(
+            pk__in={n.sender_id for n in shrunk},
+        ).values_list('pk', 'username')) if shrunk else {}
+        for notification in shrunk:
+            username = usernames.get(notification.sender_id, '')
+            notification.title = _rolled_up_title(
+                username, notification.actor_count - 1, notification_type,
+            )
+            if notification_type == 'new_follower':
+                notification.link = f'/users/{username}/'
+            notification.save(update_fields=[
+                'actor_ids', 'actor_count', 'sender', 'title', 'link',
+            ])
+        deleted = delete_notifications(
+            Notification.objects.filter(pk__in=emptied),
+        ) if emptied else 0
+    return len(shrunk) + deleted
+
 
 def create_notification(
     recipient,
@@ -34,10 +230,14 @@ def create_notification(
     """
     Create a notification for a user.
 
+    Likes, follows and collection saves (AGGREGATED_TYPES) on the same
+    target fold into the recipient's unread notification for it, if there
+    is one, instead of adding a row.
+
     Returns the Notification instance, or None if:
     - recipient == sender (no self-notifications)
     - recipient is inactive
-    - duplicate notification exists within 60 seconds
+    - the same notification was created within the last 60 seconds
     """
     # No self-notifications
     if sender and sender == recipient:
@@ -53,27 +253,8 @@ def create_notification(
         logger.warning(f"Unknown notification type: {notification_type}")
         return None
 
-    # Check for duplicate (same recipient, sender, type, link, message within window)
-    # Including link and message ensures unique comments/actions are not suppressed.
-    # The dedup only catches true signal double-fires (identical in every field).
-    cutoff = timezone.now() - timedelta(seconds=DUPLICATE_WINDOW_SECONDS)
-    duplicate_filter = Q(
-        recipient=recipient,
-        notification_type=notification_type,
-        created_at__gte=cutoff,
-    )
-    if sender:
-        duplicate_filter &= Q(sender=sender)
-    if link:
-        duplicate_filter &= Q(link=link)
-    if message:
-        duplicate_filter &= Q(message=message)
-
-    if Notification.objects.filter(duplicate_filter).exists():
-        return None
-
     try:
-        notification = Notification.objects.create(
+        notification = Notification(
             recipient=recipient,
             sender=sender,
             notification_type=notification_type,
@@ -83,25 +264,310 @@ def create_notification(
             link=link,
             is_admin_notification=is_admin_notification,
         )
-        return notification
+        if notification_type not in AGGREGATED_TYPES or sender is None:
+            # Duplicates (same recipient, sender, type, link and message
+            # within the window) collide on dedupe_key. Including link and
+            # message ensures unique comments/actions are not suppressed.
+            notification.dedupe_key = _dedupe_key(
+                recipient, sender, notification_type, link, message,
+            )
+            return _insert_unless_duplicate(notification)
+
+        aggregate_key = _aggregate_key(recipient, notification_type, link)
+        rolled, folded = _roll_up(
+            recipient, [sender], notification_type, category, link, aggregate_key,
+        )
+        if rolled is None:
+            notification.aggregate_key = aggregate_key
+            notification.actor_ids = [sender.pk]
+            if _insert_or_ignore(notification):
+                return notification
+            # A concurrent first event opened the notification since: fold into it
+            rolled, folded = _roll_up(
+                recipient, [sender], notification_type, category, link, aggregate_key,
+            )
+        return rolled if folded else None
     except Exception:
         logger.exception("Failed to create notification")
         return None
 
 
+def create_notifications(entries):
+    """
+    Bulk counterpart of create_notification() for the notification outbox.
+
+    Applies the same rules (no self-notifications, active recipients,
+    dedupe, roll-ups) to a batch: events on the same aggregated target
+    are folded together first, then into the recipient's open
+    notification when there is one, or inserted as a new one (folded
+    into the winner if a concurrent writer opened it first). Everything
+    else is written with one bulk_create, duplicates skipped by the
+    dedupe_key constraint, and counted on the recipients' counters.
+
+    Args:
+        entries: Dicts of create_notification() keyword arguments, oldest
+            first
+
+    Returns:
+        int: Notifications written or rolled up
+    """
+    now = timezone.now()
+    rows = {}  # dedupe_key -> Notification
+    groups = {}
+    for entry in entries:
+        recipient = entry['recipient']
+        sender = entry.get('sender')
+        notification_type = entry['notification_type']
+        link = entry.get('link', '')
+        message = entry.get('message', '')
+        category = NOTIFICATION_TYPE_CATEGORY_MAP.get(notification_type)
+        if (sender and sender.pk == recipient.pk) or not recipient.is_active:
+            continue
+        if not category:
+            logger.warning(f"Unknown notification type: {notification_type}")
+            continue
+
+        if notification_type in AGGREGATED_TYPES and sender is not None:
+            key = _aggregate_key(recipient, notification_type, link)
+            group = groups.setdefault(key, {'category': category, 'actors': {}})
+            # Latest event per actor, most recent actor last
+            group['actors'].pop(sender.pk, None)
+            group['actors'][sender.pk] = entry
+            continue
+
+        dedupe_key = _dedupe_key(recipient, sender, notification_type, link, message)
+        # A repeat within the batch would collide with the first anyway
+        rows.setdefault(dedupe_key, Notification(
+            recipient=recipient,
+            sender=sender,
+            notification_type=notification_type,
+            category=category,
+            title=entry['title'],
+            message=message,
+            link=link,
+            is_admin_notification=entry.get('is_admin_notification', False),
+            dedupe_key=dedupe_key,
+        ))
+
+    written = 0
+    for key, group in groups.items():
+        actors = list(group['actors'].values())
+        entry = actors[-1]
+        recipient, sender = entry['recipient'], entry['sender']
+        notification_type, link = entry['notification_type'], entry.get('link', '')
+        senders = [actor['sender'] for actor in actors]
+        notification, folded = _roll_up(
+            recipient, senders, notification_type, group['category'], link, key,
+        )
+        if notification is None:
+            notification = Notification(
+                recipient=recipient,
+                sender=sender,
+                notification_type=notification_type,
+                category=group['category'],
+                title=(
+                    entry['title'] if len(actors) == 1
+                    else _rolled_up_title(sender.username, len(actors) - 1, notification_type)
+                ),
+                link=link,
+                aggregate_key=key,
+                actor_count=len(actors),
+                actor_ids=[user.pk for user in senders],
+            )
+            # One at a time: the counters are updated by the post_save receiver
+            if _insert_or_ignore(notification):
+                written += 1
+                continue
+            # A concurrent first event opened the notification since: fold into it
+            notification, folded = _roll_up(
+                recipient, senders, notification_type, group['category'], link, key,
+            )
+        written += folded
+
+    if rows:
+        # Repeats of events notified more than the window ago may insert
+        _release_dedupe_keys(list(rows), now)
+        Notification.objects.bulk_create(rows.values(), batch_size=500, ignore_conflicts=True)
+        # Rows skipped as duplicates kept the existing holder's timestamp
+        stored = dict(Notification.objects.filter(
+            dedupe_key__in=list(rows),
+        ).values_list('dedupe_key', 'created_at'))
+        inserted = [n for key, n in rows.items() if stored.get(key) == n.created_at]
+        record_notifications_created(inserted)
+        written += len(inserted)
+    return written
+
+
+# =============================================================================
+# UNREAD COUNTERS
+# =============================================================================
+#
+# Unread counts and per-category recency come from NotificationCounter rows
+# (one per user and category), cached per user. Creates, reads, deletes and
+# expiries update the rows atomically with F() expressions; paths whose
+# effect is not known row-by-row (bulk updates, system blasts) drop the
+# affected rows instead, and the next read reconciles them from the
+# Notification table. Reads also reconcile when a tracked expires_at has
+# passed or the rows are older than COUNTER_RECONCILE_INTERVAL, which bounds
+# drift from races between a reconciliation and a concurrent write.
+# Unread broadcasts (see BROADCASTS below) are added to the system count
+# when the counts are loaded, not stored in the counter rows.
+
+COUNTS_CACHE_TIMEOUT = 3600  # 1 hour (writes invalidate earlier)
+COUNTER_RECONCILE_INTERVAL = timedelta(hours=24)
+
+
+def _counts_cache_key(user_id):
+    return f'notification_counts_v1_{user_id}'
+
+
+def _counts_dependencies(user_id):
+    return [
+        cache_dependencies.notifications_key(user_id),
+        cache_dependencies.NOTIFICATIONS,
+    ]
+
+
+def _empty_counts():
+    return {
+        'total': 0,
+        'by_category': {c: 0 for c in Notification.Category.values},
+        'latest': {},
+        'next_expiry': None,
+    }
+
+
+def _unread_q(now):
+    """Unread, not expired (manually or by expires_at)."""
+    return Q(is_read=False, is_expired=False) & (
+        Q(expires_at__isnull=True) | Q(expires_at__gt=now)
+    )
+
+
+def _is_counted(notification, now=None):
+    """Whether the notification currently contributes to an unread count."""
+    now = now or timezone.now()
+    return (
+        not notification.is_read
+        and not notification.is_expired
+        and (notification.expires_at is None or notification.expires_at > now)
+    )
+
+
+def reconcile_notification_counts(user_id):
+    """
+    Recompute a user's counter rows from the Notification table.
+
+    Returns:
+        list: The user's NotificationCounter rows (one per category)
+    """
+    now = timezone.now()
+    unread = _unread_q(now)
+    aggregates = {
+        row['category']: row
+        for row in Notification.objects.filter(recipient_id=user_id)
+        .values('category')
+        .annotate(
+            unread=Count('id', filter=unread),
+            latest=Max('created_at'),
+            next_expiry=Min('expires_at', filter=unread & Q(expires_at__isnull=False)),
+        )
+        .order_by()
+    }
+    rows = [
+        NotificationCounter(
+            user_id=user_id,
+            category=category,
+            unread_count=aggregates.get(category, {}).get('unread', 0),
+            latest_at=aggregates.get(category, {}).get('latest'),
+            next_expiry=aggregates.get(category, {}).get('next_expiry'),
+            reconciled_at=now,
+        )
+        for category in Notification.Category.values
+    ]
+    NotificationCounter.objects.bulk_create(
+        rows,
+        update_conflicts=True,
+        unique_fields=['user', 'category'],
+        update_fields=['unread_count', 'latest_at', 'next_expiry', 'reconciled_at'],
+    )
+    return rows
+
+
+def _load_counts(user):
+    """Counter rows plus unread broadcasts as a counts dict."""
+    now = timezone.now()
+    rows = list(NotificationCounter.objects.filter(user_id=user.pk))
+    needs_reconcile = (
+        len(rows) < len(Notification.Category.values)
+        or any(r.next_expiry and r.next_expiry <= now for r in rows)
+        or any(r.reconciled_at < now - COUNTER_RECONCILE_INTERVAL for r in rows)
+    )
+    if needs_reconcile:
+        rows = reconcile_notification_counts(user.pk)
+
+    broadcasts = _broadcast_counts(user, now)
+    rows = [
+        (row.category, row.unread_count, row.latest_at, row.next_expiry)
+        for row in rows
+    ]
+    rows.append((
+        'system', broadcasts['unread'], broadcasts['latest'], broadcasts['next_expiry'],
+    ))
+
+    counts = _empty_counts()
+    for category, unread, latest_at, next_expiry in rows:
+        counts['by_category'][category] += unread
+        if latest_at:
+            counts['latest'][category] = max(
+                latest_at, counts['latest'].get(category, latest_at),
+            )
+        if next_expiry and (
+            counts['next_expiry'] is None or next_expiry < counts['next_expiry']
+        ):
+            counts['next_expiry'] = next_expiry
+    counts['total'] = sum(counts['by_category'].values())
+    return counts
+
+
+def get_notification_counts(user):
+    """
+    Unread notification counts for a user — the single source for the
+    navbar badge, the category dropdown and the unread-count API.
+
+    Usually one cache read; the Notification table is only touched when
+    the counters need reconciling.
+
+    Returns:
+        dict: {'total': int, 'by_category': {category: int},
+        'latest': {category: datetime of most recent notification},
+        'next_expiry': datetime or None}
+    """
+    if not user or not user.is_authenticated:
+        return _empty_counts()
+
+    key = _counts_cache_key(user.pk)
+    depends_on = _counts_dependencies(user.pk)
+    counts = cache_dependencies.get_value(key, depends_on)
+    if counts is not None and (
+        counts['next_expiry'] is None or counts['next_expiry'] > timezone.now()
+    ):
+        return counts
+
+    generations = cache_dependencies.current_generations(depends_on)
+    counts = _load_counts(user)
+    cache_dependencies.set_value(
+        key, counts, COUNTS_CACHE_TIMEOUT, depends_on, generations,
+    )
+    return counts
+
+
 def get_unread_count(user):
     """
     Get unread notification count for a user.
-    Single efficient query — called on every page load via template tag.
+    Called on every page load via template tag (see get_notification_counts).
     """
-    if not user or not user.is_authenticated:
-        return 0
-    now = timezone.now()
-    return Notification.objects.filter(
-        recipient=user, is_read=False
-    ).exclude(is_expired=True).exclude(
-        expires_at__lte=now
-    ).count()
+    return get_notification_counts(user)['total']
 
 
 def get_unread_count_by_category(user):
@@ -109,22 +575,135 @@ def get_unread_count_by_category(user):
     Get unread counts per category for dropdown badge display.
     Returns dict: {'comments': 0, 'likes': 0, 'follows': 0, ...}
     """
-    if not user or not user.is_authenticated:
-        return {c: 0 for c in Notification.Category.values}
+    return dict(get_notification_counts(user)['by_category'])
+
+
+def _latest_at(at):
+    return Greatest(Coalesce(F('latest_at'), Value(at)), Value(at))
+
 
+def record_notification_created(notification):
+    """Count a new notification (post_save receiver)."""
+    record_notifications_created([notification])
+
+
+def record_notifications_created(notifications):
+    """
+    Count new notifications inserted without signals (bulk_create): one
+    F() update per (recipient, category) pair.
+    """
     now = timezone.now()
-    counts = (
-        Notification.objects
-        .filter(recipient=user, is_read=False)
-        .exclude(is_expired=True)
-        .exclude(expires_at__lte=now)
-        .values('category')
-        .annotate(count=Count('id'))
+    pairs = {}
+    for notification in notifications:
+        pair = pairs.setdefault(
+            (notification.recipient_id, notification.category),
+            {'latest': notification.created_at, 'unread': 0, 'expiry': None},
+        )
+        pair['latest'] = max(pair['latest'], notification.created_at)
+        if _is_counted(notification, now):
+            pair['unread'] += 1
+            if notification.expires_at and (
+                pair['expiry'] is None or notification.expires_at < pair['expiry']
+            ):
+                pair['expiry'] = notification.expires_at
+    for (user_id, category), pair in pairs.items():
+        updates = {
+            'latest_at': _latest_at(pair['latest']),
+        }
+        if pair['unread']:
+            updates['unread_count'] = F('unread_count') + pair['unread']
+        if pair['expiry']:
+            updates['next_expiry'] = Least(
+                Coalesce(F('next_expiry'), Value(pair['expiry'])),
+                Value(pair['expiry']),
+            )
+        NotificationCounter.objects.filter(
+            user_id=user_id, category=category,
+        ).update(**updates)
+    if pairs:
+        cache_dependencies.invalidate(*{
+            cache_dependencies.notifications_key(user_id) for user_id, _ in pairs
+        })
+
+
+def record_notification_bumped(user_id, category, at):
+    """An unread notification was rolled up (still one unread, now newer)."""
+    NotificationCounter.objects.filter(
+        user_id=user_id, category=category,
+    ).update(latest_at=_latest_at(at))
+    cache_dependencies.invalidate(cache_dependencies.notifications_key(user_id))
+
+
+def record_notification_uncounted(notification):
+    """
+    A notification that was counted stopped counting (e.g. it was read).
+    Call only if it was counted (see _is_counted) before the change.
+    """
+    _decrement_unread(notification.recipient_id, notification.category, 1)
+
+
+def _decrement_unread(user_id, category, amount):
+    NotificationCounter.objects.filter(
+        user_id=user_id, category=category,
+    ).update(unread_count=Greatest(F('unread_count') - amount, Value(0)))
+    cache_dependencies.invalidate(cache_dependencies.notifications_key(user_id))
+
+
+def _reset_unread(user_id, category=None):
+    """Every (or one category's) notification of a user is now read."""
+    counters = NotificationCounter.objects.filter(user_id=user_id)
+    if category:
+        counters = counters.filter(category=category)
+    counters.update(unread_count=0, next_expiry=None)
+    cache_dependencies.invalidate(cache_dependencies.notifications_key(user_id))
+
+
+def delete_notifications(queryset):
+    """
+    Delete notifications and take the unread ones off their counters.
+
+    Use this instead of queryset.delete() for notification deletes, so
+    the counters stay in step (there is deliberately no post_delete
+    receiver: it would turn every bulk delete into per-row signals).
+
+    Returns:
+        int: Number of notifications deleted
+    """
+    counted = list(
+        queryset.filter(_unread_q(timezone.now()))
+        .values('recipient_id', 'category')
+        .annotate(n=Count('id'))
+        .order_by()
     )
-    result = {c: 0 for c in Notification.Category.values}
-    for row in counts:
-        result[row['category']] = row['count']
-    return result
+    count, _ = queryset.delete()
+    for row in counted:
+        _decrement_unread(row['recipient_id'], row['category'], row['n'])
+    return count
+
+
+def mark_counts_stale(user_ids=None, category=None):
+    """
+    Drop counter rows so the next read reconciles them (bulk paths).
+
+    Args:
+        user_ids: Affected users, or None for everyone
+        category: Only this category's rows (default: all)
+    """
+    counters = NotificationCounter.objects.all()
+    if user_ids is not None:
+        user_ids = list(user_ids)
+        if not user_ids:
+            return
+        counters = counters.filter(user_id__in=user_ids)
+    if category:
+        counters = counters.filter(category=category)
+    counters.delete()
+    if user_ids is not None:
+        cache_dependencies.invalidate(
+            *(cache_dependencies.notifications_key(pk) for pk in user_ids)
+        )
+    else:
+        cache_dependencies.invalidate(cache_dependencies.NOTIFICATIONS)
 
 
 def mark_as_read(notification_id, user):
@@ -133,10 +712,13 @@ def mark_as_read(notification_id, user):
         notification = Notification.objects.get(
             id=notification_id, recipient=user
         )
-        notification.mark_as_read()
-        return True
     except Notification.DoesNotExist:
         return False
+    was_counted = _is_counted(notification)
+    notification.mark_as_read()
+    if was_counted:
+        record_notification_uncounted(notification)
+    return True
 
 
 def mark_all_as_read(user, category=None):
@@ -145,6 +727,43 @@ def mark_all_as_read(user, category=None):
     if category:
         qs = qs.filter(category=category)
     count = qs.update(is_read=True)
+    if count:
+        _reset_unread(user.pk, category)
+    if category in (None, 'system'):
+        count += mark_broadcasts_read(user)
+    return count
+
+
+def mark_admin_notifications_read(user):
+    """Mark a user's system/admin notifications as seen (notifications page)."""
+    count = Notification.objects.filter(
+        recipient=user,
+        is_admin_notification=True,
+        is_read=False,
+    ).update(is_read=True)
+    if count:
+        # Admin notifications can sit in any category; recount this user
+        mark_counts_stale([user.pk])
+    return count + mark_broadcasts_read(user)
+
+
+def expire_notifications(queryset):
+    """
+    Manually expire notifications (hidden from feeds and unread counts).
+
+    Returns:
+        int: Number of notifications expired
+    """
+    queryset = queryset.filter(is_expired=False)
+    affected = set(queryset.values_list('recipient_id', 'category'))
+    # Release rolled-up targets so new events open a visible notification
+    count = queryset.update(is_expired=True, aggregate_key=None)
+    if count:
+        categories = {category for _, category in affected}
+        mark_counts_stale(
+            {user_id for user_id, _ in affected},
+            category=categories.pop() if len(categories) == 1 else None,
+        )
     return count
 
 
@@ -154,12 +773,10 @@ def delete_notification(user, notification_id):
     Returns True if deleted, False if not found or not owned by user.
     Caller is responsible for focus management after deletion.
     """
-    try:
-        notification = Notification.objects.get(id=notification_id, recipient=user)
-        notification.delete()
-        return True
-    except Notification.DoesNotExist:
-        return False
+    deleted = delete_notifications(
+        Notification.objects.filter(id=notification_id, recipient=user)
+    )
+    return deleted > 0
 
 
 def delete_all_notifications(user, category=None):
@@ -172,9 +789,153 @@ def delete_all_notifications(user, category=None):
     if category:
         queryset = queryset.filter(category=category)
     count, _ = queryset.delete()
+    if count:
+        # Nothing left to count (latest_at too); recount on next read
+        mark_counts_stale([user.pk], category=category)
+    if category in (None, 'system'):
+        count += dismiss_broadcasts(user)
     return count
 
 
+# =============================================================================
+# BROADCASTS
+# =============================================================================
+#
+# A system notification to every user is one BroadcastNotification row
+# rather than a Notification row per user, so sending, expiring or deleting
+# it is a constant number of writes. A user's read/dismissed state is a
+# BroadcastReceipt, written only when they read or delete it. Broadcasts are
+# merged into the system feed and the unread counts at read time; changes
+# to a broadcast invalidate every user's cached counts at once through the
+# NOTIFICATIONS cache dependency.
+
+
+def _receipts(user, **filters):
+    return BroadcastReceipt.objects.filter(
+        broadcast=OuterRef('pk'), user=user, **filters,
+    )
+
+
+def visible_broadcasts(user, now=None):
+    """
+    Broadcasts in a user's feed: not expired, sent since the user joined
+    and not deleted by them. Annotated with the user's ``is_read``.
+    """
+    now = now or timezone.now()
+    return (
+        BroadcastNotification.objects
+        .filter(is_expired=False, created_at__gte=user.date_joined)
+        .filter(Q(expires_at__isnull=True) | Q(expires_at__gt=now))
+        .exclude(Exists(_receipts(user, dismissed_at__isnull=False)))
+        .annotate(is_read=Exists(_receipts(user, read_at__isnull=False)))
+    )
+
+
+def _broadcast_counts(user, now):
+    unread = Q(is_read=False)
+    return visible_broadcasts(user, now).aggregate(
+        unread=Count('pk', filter=unread),
+        latest=Max('created_at'),
+        next_expiry=Min('expires_at', filter=unread),
+    )
+
+
+def _write_receipts(user, broadcast_ids, field):
+    """Upsert the user's receipts for broadcast_ids, stamping field."""
+    now = timezone.now()
+    BroadcastReceipt.objects.bulk_create(
+        [
+            BroadcastReceipt(broadcast_id=pk, user=user, **{field: now})
+            for pk in broadcast_ids
+        ],
+        update_conflicts=True,
+        unique_fields=['broadcast', 'user'],
+        update_fields=[field],
+    )
+    cache_dependencies.invalidate(cache_dependencies.notifications_key(user.pk))
+
+
+def mark_broadcasts_read(user, broadcast_ids=None):
+    """
+    Mark a user's unread broadcasts (all, or those in broadcast_ids) read.
+
+    Returns:
+        int: Number of broadcasts newly marked read
+    """
+    broadcasts = visible_broadcasts(user).filter(is_read=False)
+    if broadcast_ids is not None:
+        broadcasts = broadcasts.filter(pk__in=broadcast_ids)
+    ids = list(broadcasts.values_list('pk', flat=True))
+    if ids:
+        _write_receipts(user, ids, 'read_at')
+    return len(ids)
+
+
+def mark_broadcast_read(broadcast_id, user):
+    """Mark a single broadcast as read. False if the user can't see it."""
+    if not visible_broadcasts(user).filter(pk=broadcast_id).exists():
+        return False
+    mark_broadcasts_read(user, [broadcast_id])
+    return True
+
+
+def dismiss_broadcasts(user, broadcast_ids=None):
+    """
+    Remove broadcasts (all, or those in broadcast_ids) from a user's feed.
+
+    Returns:
+        int: Number of broadcasts dismissed
+    """
+    broadcasts = visible_broadcasts(user)
+    if broadcast_ids is not None:
+        broadcasts = broadcasts.filter(pk__in=broadcast_ids)
+    ids = list(broadcasts.values_list('pk', flat=True))
+    if ids:
+        _write_receipts(user, ids, 'dismissed_at')
+    return len(ids)
+
+
+def record_broadcast_click(broadcast_id, user):
+    """Count a click on a broadcast the user can see."""
+    visible_broadcasts(user).filter(pk=broadcast_id).update(
+        click_count=F('click_count') + 1,
+    )
+
+
+def get_notification_feed(user, category, offset=0, limit=15):
+    """
+    One page of a user's live notifications in a category, newest first.
+    The system category merges in the user's broadcasts.
+
+    Returns:
+        tuple: (list of Notification / BroadcastNotification, has_more)
+    """
+    now = timezone.now()
+    end = offset + limit + 1  # one extra to determine if more exist
+    notifications = Notification.objects.filter(
+        recipient=user,
+        category=category,
+    ).exclude(
+        is_expired=True
+    ).exclude(
+        expires_at__lte=now
+    ).select_related('sender', 'sender__userprofile').order_by('-created_at')
+
+    if category == 'system':
+        # Both sources are sorted, so the merge's first `end` items come
+        # from the first `end` of each
+        merged = heapq.merge(
+            notifications[:end],
+            visible_broadcasts(user, now).order_by('-created_at')[:end],
+            key=attrgetter('created_at'),
+            reverse=True,
+        )
+        items = list(islice(merged, offset, end))
+    else:
+        items = list(notifications[offset:end])
+    return items[:limit], len(items) > limit
+
+
 # =============================================================================
 # SYSTEM NOTIFICATION FUNCTIONS (Phase P2-A)
 # =============================================================================
@@ -200,8 +961,11 @@ def create_system_notification(message, link='', audience='all',
         expires_at: Optional datetime for auto-expiry
         created_by: Username of staff member (audit trail only)
 
+    'all' stores a single BroadcastNotification (see BROADCASTS above);
+    the bounded audiences get a Notification row per recipient.
+
     Returns:
-        dict with 'count' (notifications created), or 'error' on failure
+        dict with 'count' (users notified), or 'error' on failure
     """
     from django.contrib.auth.models import User
 
@@ -220,17 +984,34 @@ def create_system_notification(message, link='', audience='all',
     plain_text = strip_tags(sanitized_html).strip()
     title = sanitized_html if plain_text else 'System Notification'
 
+    batch_id = str(uuid.uuid4())[:8]
+
     if audience == 'all':
-        recipients = User.objects.filter(is_active=True)
-    elif audience == 'staff':
+        broadcast = BroadcastNotification.objects.create(
+            title=title,
+            link=link,
+            expires_at=expires_at,
+            batch_id=batch_id,
+            recipient_count=User.objects.filter(is_active=True).count(),
+            created_by=created_by or '',
+        )
+        cache_dependencies.invalidate(cache_dependencies.NOTIFICATIONS)
+        logger.info(
+            "System notification broadcast: title=%r, audience=all, count=%d, "
+            "created_by=%s",
+            title, broadcast.recipient_count, created_by,
+        )
+        return {
+            'count': broadcast.recipient_count,
+        }
+
+    if audience == 'staff':
         recipients = User.objects.filter(is_active=True, is_staff=True)
     elif isinstance(audience, (list, set)):
         recipients = User.objects.filter(id__in=audience, is_active=True)
     else:
         return {'count': 0, 'error': 'Invalid audience'}
 
-    batch_id = str(uuid.uuid4())[:8]
-
     notifications = []
     for user in recipients.iterator():
         notifications.append(Notification(
@@ -247,6 +1028,8 @@ def create_system_notification(message, link='', audience='all',
         ))
 
     created = Notification.objects.bulk_create(notifications, batch_size=500)
+    # bulk_create sends no signals; recount recipients' system category
+    mark_counts_stale([n.recipient_id for n in created], category='system')
 
     logger.info(
         "System notification sent: title=%r, audience=%s, count=%d, "
@@ -262,7 +1045,8 @@ def create_system_notification(message, link='', audience='all',
 def get_system_notification_batches():
     """
     Get all system notification batches for the management table.
-    Groups by batch_id for unique blast identification.
+    Groups by batch_id for unique blast identification; broadcasts are
+    one batch each, read by the users holding a read receipt.
     Returns list of dicts with batch_id, title, recipient_count,
     read_count, read_percentage, first_sent.
     """
@@ -280,25 +1064,71 @@ def get_system_notification_batches():
         )
         .order_by('-first_sent')
     )
+    broadcasts = (
+        BroadcastNotification.objects
+        .filter(is_expired=False)
+        .annotate(read_count=Count(
+            'receipts', filter=Q(receipts__read_at__isnull=False),
+        ))
+        .values(
+            'batch_id', 'title', 'recipient_count', 'read_count',
+            first_sent=F('created_at'),
+        )
+    )
 
-    result = list(batches)
+    result = sorted(
+        [*batches, *broadcasts], key=itemgetter('first_sent'), reverse=True,
+    )
     for batch in result:
         batch['read_percentage'] = (
-            round(batch['read_count'] / batch['recipient_count'] * 100)
+            min(100, round(batch['read_count'] / batch['recipient_count'] * 100))
             if batch['recipient_count'] > 0 else 0
         )
     return result
 
 
+def expire_system_notification_batch(batch_id):
+    """
+    Expire a system notification batch (hidden from feeds and counts,
+    kept for the record).
+    Returns count of users it was sent to.
+    """
+    if not batch_id:
+        return 0
+    count = 0
+    broadcast = BroadcastNotification.objects.filter(
+        batch_id=batch_id, is_expired=False,
+    ).first()
+    if broadcast:
+        broadcast.is_expired = True
+        broadcast.save(update_fields=['is_expired'])
+        cache_dependencies.invalidate(cache_dependencies.NOTIFICATIONS)
+        count += broadcast.recipient_count
+    count += expire_notifications(Notification.objects.filter(
+        is_admin_notification=True,
+        batch_id=batch_id,
+    ))
+    return count
+
+
 def delete_system_notification_batch(batch_id):
     """
     Hard-delete all system notifications matching a batch_id.
-    Returns count of deleted notifications.
+    Returns count of users it was removed from.
     """
     if not batch_id:
         return 0
-    count, _ = Notification.objects.filter(
+    count = 0
+    broadcast = BroadcastNotification.objects.filter(batch_id=batch_id).first()
+    if broadcast:
+        # Receipts go with it (cascade)
+        broadcast.delete()
+        cache_dependencies.invalidate(cache_dependencies.NOTIFICATIONS)
+        count += broadcast.recipient_count
+    deleted, _ = Notification.objects.filter(
         is_admin_notification=True,
         batch_id=batch_id,
     ).delete()
-    return count
+    if deleted:
+        mark_counts_stale(category='system')
+    return count + deleted
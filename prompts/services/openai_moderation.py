@@ -10,16 +10,110 @@ Categories checked:
 - harassment, harassment/threatening
 - self-harm, self-harm/intent, self-harm/instructions
 - violence, violence/graphic
+
+Texts are sent in batches (one request carries many inputs), and verdicts
+are cached by normalised text so repeated prompts cost nothing. Inside
+batching(), concurrent moderate_text() calls from different threads are
+collected for a short linger window and share a request; a rate limiter
+passed to batching() is charged once per request, not once per text.
 """
 
+import hashlib
 import os
 import logging
+import threading
+from concurrent.futures import Future
+from contextlib import contextmanager
 from typing import Dict, List, Tuple
 from django.conf import settings
+from django.core.cache import cache
+from django.db import close_old_connections
 from openai import OpenAI
 
+from ..constants import (
+    MODERATION_BATCH_LINGER,
+    MODERATION_BATCH_MAX_CHARS,
+    MODERATION_BATCH_MAX_INPUTS,
+    MODERATION_VERDICT_CACHE_TTL,
+)
+
 logger = logging.getLogger(__name__)
 
+VERDICT_CACHE_PREFIX = 'openai_moderation_verdict:'
+
+
+def _verdict_key(text: str) -> str:
+    """Cache key for a text: case- and whitespace-insensitive."""
+    normalised = ' '.join(text.split()).casefold()
+    return VERDICT_CACHE_PREFIX + hashlib.sha256(normalised.encode()).hexdigest()
+
+
+class _ModerationBatcher:
+    """
+    Collects moderate_text() calls from many threads into shared requests.
+
+    The first pending text starts a linger timer; when it fires, everything
+    pending is sent together. A batch that reaches
+    MODERATION_BATCH_MAX_INPUTS is sent at once by the thread that filled it.
+    """
+
+    def __init__(self, service, linger, limiter=None):
+        self.service = service
+        self.linger = linger
+        self.limiter = limiter
+        self._lock = threading.Lock()
+        self._pending = []
+        self._timer = None
+
+    def submit(self, text: str) -> Future:
+        future = Future()
+        with self._lock:
+            self._pending.append((text, future))
+            if len(self._pending) >= MODERATION_BATCH_MAX_INPUTS:
+                batch = self._take()
+            else:
+                batch = None
+                if self._timer is None:
+                    self._timer = threading.Timer(self.linger, self._flush_on_timer)
+                    self._timer.daemon = True
+                    self._timer.start()
+        if batch:
+            self._send(batch)
+        return future
+
+    def close(self):
+        """Send whatever is still pending."""
+        with self._lock:
+            batch = self._take()
+        if batch:
+            self._send(batch)
+
+    def _take(self):
+        # Caller holds the lock
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        return batch
+
+    def _flush_on_timer(self):
+        try:
+            self.close()
+        finally:
+            close_old_connections()
+
+    def _send(self, batch):
+        try:
+            results = self.service.moderate_texts(
+                [text for text, _ in batch], limiter=self.limiter,
+            )
+        except Exception as e:
+            for _, future in batch:
+                future.set_exception(e)
+            return
+        for (_, future), result in zip(batch, results):
+            future.set_result(result)
+
 
 class OpenAIModerationService:
     """
@@ -61,8 +155,30 @@ class OpenAIModerationService:
             raise ValueError("OPENAI_API_KEY is required for moderation")
 
         self.client = OpenAI(api_key=api_key)
+        self._batcher = None
         logger.info("OpenAI Moderation Service initialized")
 
+    @contextmanager
+    def batching(self, linger: float = MODERATION_BATCH_LINGER, limiter=None):
+        """
+        Share requests between threads calling moderate_text().
+
+        Usage:
+            with service.batching(limiter=RateLimiter(5)):
+                pool.map(service.moderate_prompt, prompts)
+
+        Args:
+            linger: Seconds to wait for more texts before sending a batch
+            limiter: RateLimiter to take one token from per API request
+        """
+        batcher = _ModerationBatcher(self, linger, limiter)
+        self._batcher = batcher
+        try:
+            yield self
+        finally:
+            self._batcher = None
+            batcher.close()
+
     def moderate_text(self, text: str) -> Tuple[bool, List[Dict], float]:
         """
         Moderate text content using OpenAI's Moderation API.
@@ -76,56 +192,122 @@ class OpenAIModerationService:
             - flagged_categories (list): List of flagged category dicts
             - max_confidence (float): Highest confidence score
 
+        Inside batching(), the text joins the current shared batch.
+
         Example:
             is_safe, categories, confidence = service.moderate_text("Hello world")
             # is_safe = True, categories = [], confidence = 0.0
         """
-        if not text or not text.strip():
-            logger.warning("Empty text provided for moderation")
-            return True, [], 0.0
+        batcher = self._batcher
+        if batcher is not None and text and text.strip():
+            return batcher.submit(text).result()
+        return self.moderate_texts([text])[0]
 
-        try:
-            # Call OpenAI Moderation API
-            response = self.client.moderations.create(input=text)
-            result = response.results[0]
-
-            # Check if content is flagged
-            is_safe = not result.flagged
-
-            # Extract flagged categories with scores
-            flagged_categories = []
-            max_confidence = 0.0
-
-            for category, flagged in result.categories.model_dump().items():
-                if flagged:
-                    score = result.category_scores.model_dump()[category]
-                    max_confidence = max(max_confidence, score)
-
-                    flagged_categories.append({
-                        'category': category,
-                        'confidence': score,
-                        'severity': self._get_severity(category),
-                    })
-
-            # Sort by confidence (highest first)
-            flagged_categories.sort(key=lambda x: x['confidence'], reverse=True)
-
-            logger.info(
-                f"OpenAI moderation complete - Safe: {is_safe}, "
-                f"Flags: {len(flagged_categories)}, Max confidence: {max_confidence:.3f}"
-            )
+    def moderate_texts(self, texts: List[str], limiter=None) -> List[Tuple[bool, List[Dict], float]]:
+        """
+        Moderate many texts with as few API requests as possible.
 
-            return is_safe, flagged_categories, max_confidence
+        Cached verdicts are reused and texts that normalise to the same
+        string (case and whitespace) are sent once. The rest go out in
+        requests of at most MODERATION_BATCH_MAX_INPUTS texts /
+        MODERATION_BATCH_MAX_CHARS characters.
 
-        except Exception as e:
-            logger.error(f"OpenAI moderation API error: {str(e)}", exc_info=True)
-            # On error, flag for manual review
-            return False, [{
-                'category': 'api_error',
-                'confidence': 0.0,
-                'severity': 'medium',
-                'error': str(e)
-            }], 0.0
+        Args:
+            texts: The text contents to moderate
+            limiter: RateLimiter to take one token from per API request
+
+        Returns:
+            List of moderate_text()-style tuples, in input order. If a
+            request fails, each of its texts gets an 'api_error' category
+            and nothing is cached.
+        """
+        results = [None] * len(texts)
+        keys = {}
+        for i, text in enumerate(texts):
+            if not text or not text.strip():
+                logger.warning("Empty text provided for moderation")
+                results[i] = (True, [], 0.0)
+            else:
+                keys.setdefault(_verdict_key(text), []).append(i)
+
+        cached = cache.get_many(list(keys)) if keys else {}
+        misses = []
+        for key, indexes in keys.items():
+            if key in cached:
+                for i in indexes:
+                    results[i] = tuple(cached[key])
+            else:
+                misses.append(key)
+
+        for chunk in self._chunks(misses, texts, keys):
+            inputs = [texts[keys[key][0]] for key in chunk]
+            if limiter is not None:
+                limiter.acquire()
+            try:
+                response = self.client.moderations.create(input=inputs)
+                verdicts = [self._parse_result(result) for result in response.results]
+            except Exception as e:
+                logger.error(f"OpenAI moderation API error: {str(e)}", exc_info=True)
+                # On error, flag for manual review
+                verdicts = None
+                error = (False, [{
+                    'category': 'api_error',
+                    'confidence': 0.0,
+                    'severity': 'medium',
+                    'error': str(e)
+                }], 0.0)
+            for n, key in enumerate(chunk):
+                for i in keys[key]:
+                    results[i] = verdicts[n] if verdicts else error
+            if verdicts:
+                cache.set_many(dict(zip(chunk, verdicts)), MODERATION_VERDICT_CACHE_TTL)
+
+        return results
+
+    @staticmethod
+    def _chunks(misses, texts, keys):
+        """Split uncached keys into requests within the size limits."""
+        chunk, chars = [], 0
+        for key in misses:
+            size = len(texts[keys[key][0]])
+            if chunk and (len(chunk) >= MODERATION_BATCH_MAX_INPUTS
+                          or chars + size > MODERATION_BATCH_MAX_CHARS):
+                yield chunk
+                chunk, chars = [], 0
+            chunk.append(key)
+            chars += size
+        if chunk:
+            yield chunk
+
+    def _parse_result(self, result) -> Tuple[bool, List[Dict], float]:
+        """Turn one Moderation API result into a moderate_text() tuple."""
+        # Check if content is flagged
+        is_safe = not result.flagged
+
+        # Extract flagged categories with scores
+        flagged_categories = []
+        max_confidence = 0.0
+
+        for category, flagged in result.categories.model_dump().items():
+            if flagged:
+                score = result.category_scores.model_dump()[category]
+                max_confidence = max(max_confidence, score)
+
+                flagged_categories.append({
+                    'category': category,
+                    'confidence': score,
+                    'severity': self._get_severity(category),
+                })
+
+        # Sort by confidence (highest first)
+        flagged_categories.sort(key=lambda x: x['confidence'], reverse=True)
+
+        logger.info(
+            f"OpenAI moderation complete - Safe: {is_safe}, "
+            f"Flags: {len(flagged_categories)}, Max confidence: {max_confidence:.3f}"
+        )
+
+        return is_safe, flagged_categories, max_confidence
 
     def moderate_prompt(self, prompt_obj) -> Dict:
         """
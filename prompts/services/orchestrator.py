@@ -7,14 +7,28 @@ This module runs all three layers of moderation:
 3. OpenAI Moderation API (text content)
 
 And creates ModerationLog and ContentFlag records for tracking.
+
+bulk_moderate_prompts() pipelines the same checks over many prompts:
+the network layers (OpenAI text, Vision) run on a bounded worker pool,
+concurrently with each other and with other prompts, under a shared
+rate limit; results are written from the calling thread in batches.
 """
 
 import logging
-from typing import Dict, List, Optional
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait
+from contextlib import nullcontext
+from typing import Callable, Dict, List, Optional
 from django.utils import timezone
-from django.db import transaction
+from django.db import close_old_connections, transaction
 
+from ..constants import (
+    BULK_MODERATION_REQUESTS_PER_SECOND,
+    BULK_MODERATION_WORKERS,
+    BULK_MODERATION_WRITE_BATCH,
+)
 from ..models import Prompt, ModerationLog, ContentFlag
+from ..utils.rate_limiter import RateLimiter
 from .openai_moderation import OpenAIModerationService
 from .vision_moderation import VisionModerationService
 from .profanity_filter import ProfanityFilterService
@@ -50,7 +64,9 @@ class ModerationOrchestrator:
         self.profanity_service = ProfanityFilterService()
         logger.info("Moderation Orchestrator initialized")
 
-    def moderate_prompt(self, prompt: Prompt, force: bool = False) -> Dict:
+    def moderate_prompt(
+        self, prompt: Prompt, force: bool = False, refresh_verdicts: bool = False,
+    ) -> Dict:
         """
         Run all moderation checks on a prompt.
 
@@ -64,6 +80,8 @@ class ModerationOrchestrator:
         Args:
             prompt: Prompt instance to moderate
             force: If True, re-run moderation even if already completed
+            refresh_verdicts: Judge the image again instead of reusing a
+                stored verdict for it
 
         Returns:
             Dict with:
@@ -108,15 +126,10 @@ class ModerationOrchestrator:
                 results['openai'] = {'status': 'flagged', 'error': str(e)}
 
         # Layer 3: OpenAI Vision moderation (synchronous, runs immediately)
-        # Check for both Cloudinary fields AND B2 URL fields
-        has_visual_content = (
-            prompt.featured_image or
-            prompt.featured_video or
-            getattr(prompt, 'b2_image_url', None)  # Support B2 uploads
-        )
+        has_visual_content = self._has_visual_content(prompt)
         if self.vision_enabled and has_visual_content:
             try:
-                results['openai_vision'] = self._run_vision_moderation(prompt)
+                results['openai_vision'] = self._run_vision_moderation(prompt, refresh_verdicts)
             except Exception as e:
                 logger.error(f"Vision moderation failed: {str(e)}", exc_info=True)
                 results['openai_vision'] = {'status': 'flagged', 'error': str(e)}
@@ -136,37 +149,25 @@ class ModerationOrchestrator:
         with transaction.atomic():
             # Save moderation logs
             self._save_moderation_logs(prompt, results)
-
-            # Update prompt moderation status
-            prompt.moderation_status = overall_result['status']
-            prompt.requires_manual_review = overall_result['requires_review']
-            prompt.moderation_completed_at = timezone.now()
-
-            # Set prompt publication status based on moderation result
-            # Publish immediately if approved, keep as draft otherwise
-            old_status = prompt.status
-            if overall_result['status'] == 'approved':
-                prompt.status = 1  # Published
-                logger.info(f"Setting prompt {prompt.id} status to PUBLISHED (1) - was {old_status}")
-            else:
-                # Flagged or rejected content should remain as draft
-                prompt.status = 0  # Draft
-                logger.info(f"Keeping prompt {prompt.id} as DRAFT (0) - moderation status: {overall_result['status']}")
-
-            prompt.save(update_fields=[
-                'moderation_status',
-                'requires_manual_review',
-                'moderation_completed_at',
-                'status'
-            ])
-
-            logger.info(f"Prompt {prompt.id} saved - status in DB: {prompt.status}, moderation_status: {prompt.moderation_status}")
+            self._apply_overall_status(prompt, overall_result)
 
         logger.info(
             f"Moderation complete for Prompt {prompt.id}: "
             f"{overall_result['status']} (review: {overall_result['requires_review']})"
         )
 
+        return self._summarize(overall_result, results)
+
+    def _has_visual_content(self, prompt: Prompt) -> bool:
+        """Check for both Cloudinary fields AND B2 URL fields."""
+        return bool(
+            prompt.featured_image or
+            prompt.featured_video or
+            getattr(prompt, 'b2_image_url', None)  # Support B2 uploads
+        )
+
+    def _summarize(self, overall_result: Dict, results: Dict) -> Dict:
+        """moderate_prompt()'s return value."""
         return {
             'overall_status': overall_result['status'],
             'requires_review': overall_result['requires_review'],
@@ -178,6 +179,39 @@ class ModerationOrchestrator:
             'summary': results,
         }
 
+    def _apply_overall_status(self, prompt: Prompt, overall_result: Dict) -> None:
+        """
+        Save the overall result on the prompt. Call inside a transaction.
+
+        Args:
+            prompt: Prompt instance
+            overall_result: Result of _determine_overall_status()
+        """
+        # Update prompt moderation status
+        prompt.moderation_status = overall_result['status']
+        prompt.requires_manual_review = overall_result['requires_review']
+        prompt.moderation_completed_at = timezone.now()
+
+        # Set prompt publication status based on moderation result
+        # Publish immediately if approved, keep as draft otherwise
+        old_status = prompt.status
+        if overall_result['status'] == 'approved':
+            prompt.status = 1  # Published
+            logger.info(f"Setting prompt {prompt.id} status to PUBLISHED (1) - was {old_status}")
+        else:
+            # Flagged or rejected content should remain as draft
+            prompt.status = 0  # Draft
+            logger.info(f"Keeping prompt {prompt.id} as DRAFT (0) - moderation status: {overall_result['status']}")
+
+        prompt.save(update_fields=[
+            'moderation_status',
+            'requires_manual_review',
+            'moderation_completed_at',
+            'status'
+        ])
+
+        logger.info(f"Prompt {prompt.id} saved - status in DB: {prompt.status}, moderation_status: {prompt.moderation_status}")
+
     def _run_profanity_check(self, prompt: Prompt) -> Dict:
         """
         Run custom profanity filter and return results.
@@ -206,18 +240,22 @@ class ModerationOrchestrator:
         result = self.openai_service.moderate_prompt(prompt)
         return result
 
-    def _run_vision_moderation(self, prompt: Prompt) -> Dict:
+    def _run_vision_moderation(self, prompt: Prompt, refresh_verdicts: bool = False) -> Dict:
         """
         Run OpenAI Vision moderation and return results.
 
         Args:
             prompt: Prompt instance
+            refresh_verdicts: Judge the image again instead of reusing a
+                stored verdict
 
         Returns:
             Dict with Vision moderation results
         """
         logger.info(f"Running Vision moderation for Prompt {prompt.id}")
-        result = self.vision_service.moderate_visual_content(prompt)
+        result = self.vision_service.moderate_visual_content(
+            prompt, refresh_verdicts=refresh_verdicts,
+        )
         return result
 
     def _determine_overall_status(self, results: Dict) -> Dict:
@@ -297,6 +335,16 @@ class ModerationOrchestrator:
             prompt: Prompt instance
             results: Dict of service results
         """
+        self._write_moderation_logs([(prompt, results)])
+
+    def _write_moderation_logs(self, entries: List) -> None:
+        """
+        Save ModerationLog and ContentFlag entries for many prompts with
+        one bulk insert per table.
+
+        Args:
+            entries: (prompt, results) pairs
+        """
         # Map service names to model choices
         service_map = {
             'profanity': 'profanity',
@@ -304,35 +352,42 @@ class ModerationOrchestrator:
             'openai_vision': 'openai_vision',
         }
 
-        for service_key, result in results.items():
-            if result is None:
-                continue
-
-            service_name = service_map.get(service_key)
-            if not service_name:
-                continue
-
-            # Create ModerationLog with new fields
-            log = ModerationLog.objects.create(
-                prompt=prompt,
-                service=service_name,
-                status=result.get('status', 'pending'),
-                confidence_score=result.get('confidence_score', 0.0),
-                flagged_categories=result.get('flagged_categories', []),
-                severity=result.get('severity', 'medium'),
-                explanation=result.get('explanation', ''),
-                raw_response=result.get('raw_response', {}),
-                notes=result.get('error', '') if 'error' in result else ''
-            )
-
-            # Create ContentFlag entries for violations
-            self._save_content_flags(log, result)
-
-            logger.info(f"Saved {service_name} moderation log for Prompt {prompt.id}")
-
-    def _save_content_flags(self, log: ModerationLog, result: Dict) -> None:
+        logs = []
+        for prompt, results in entries:
+            for service_key, result in results.items():
+                if result is None:
+                    continue
+
+                service_name = service_map.get(service_key)
+                if not service_name:
+                    continue
+
+                logs.append((ModerationLog(
+                    prompt=prompt,
+                    service=service_name,
+                    status=result.get('status', 'pending'),
+                    confidence_score=result.get('confidence_score', 0.0),
+                    flagged_categories=result.get('flagged_categories', []),
+                    severity=result.get('severity', 'medium'),
+                    explanation=result.get('explanation', ''),
+                    raw_response=result.get('raw_response', {}),
+                    notes=result.get('error', '') if 'error' in result else ''
+                ), result))
+
+        ModerationLog.objects.bulk_create([log for log, _ in logs])
+
+        # Create ContentFlag entries for violations
+        ContentFlag.objects.bulk_create([
+            flag for log, result in logs
+            for flag in self._build_content_flags(log, result)
+        ])
+
+        for log, _ in logs:
+            logger.info(f"Saved {log.service} moderation log for Prompt {log.prompt_id}")
+
+    def _build_content_flags(self, log: ModerationLog, result: Dict) -> List[ContentFlag]:
         """
-        Create ContentFlag entries for flagged categories.
+        Unsaved ContentFlag entries for flagged categories.
 
         Args:
             log: ModerationLog instance
@@ -344,20 +399,22 @@ class ModerationOrchestrator:
 
         # Handle OpenAI text moderation format
         if 'flagged_details' in raw_response:
-            for detail in raw_response['flagged_details']:
-                ContentFlag.objects.create(
+            return [
+                ContentFlag(
                     moderation_log=log,
                     category=detail['category'],
                     confidence=detail['confidence'],
                     severity=detail['severity'],
                     details={'source': 'openai'}
                 )
+                for detail in raw_response['flagged_details']
+            ]
 
         # Handle OpenAI Vision format
-        elif 'result' in raw_response and raw_response.get('result', {}).get('flagged'):
+        if 'result' in raw_response and raw_response.get('result', {}).get('flagged'):
             categories = result.get('flagged_categories', [])
-            for category in categories:
-                ContentFlag.objects.create(
+            return [
+                ContentFlag(
                     moderation_log=log,
                     category=category,
                     confidence=confidence,
@@ -368,18 +425,54 @@ class ModerationOrchestrator:
                         'media_type': raw_response.get('media_type', 'unknown')
                     }
                 )
+                for category in categories
+            ]
+        return []
 
     def bulk_moderate_prompts(
         self,
-        prompts: Optional[List[Prompt]] = None,
-        status_filter: str = 'pending'
+        prompts=None,
+        status_filter: str = 'pending',
+        force: bool = False,
+        refresh_verdicts: bool = False,
+        completed_since=None,
+        limit: Optional[int] = None,
+        workers: int = BULK_MODERATION_WORKERS,
+        requests_per_second: float = BULK_MODERATION_REQUESTS_PER_SECOND,
+        on_result: Optional[Callable[[Prompt, Dict], None]] = None,
     ) -> Dict:
         """
-        Run moderation on multiple prompts.
+        Run moderation on multiple prompts, pipelined.
+
+        Each prompt gets the same checks and outcome as moderate_prompt(),
+        but the OpenAI text and Vision calls are submitted to a pool of
+        ``workers`` threads — a prompt's two calls run side by side, and
+        the pool works ahead on later prompts — under a shared rate
+        limit: one token per Vision call and per batched text request
+        (see OpenAIModerationService.batching). Prompts are finalized in
+        order on the calling thread, and their logs, flags and status
+        written every BULK_MODERATION_WRITE_BATCH prompts in one
+        transaction.
+
+        Checkpointing: each written prompt gets moderation_completed_at,
+        so a re-run passing the first run's start time as completed_since
+        skips the prompts it already finished.
 
         Args:
-            prompts: List of Prompt instances (if None, queries based on status)
+            prompts: Queryset or list of Prompt instances (if None, queries
+                based on status)
             status_filter: Only moderate prompts with this status
+            force: Re-moderate prompts that are no longer pending
+            refresh_verdicts: Judge images again instead of reusing stored
+                verdicts
+            completed_since: Skip prompts moderated at or after this time
+            limit: Moderate at most this many prompts (after skipping
+                checkpointed ones)
+            workers: Threads for the network stages
+            requests_per_second: OpenAI requests per second across
+                workers (0 = unlimited)
+            on_result: Called with (prompt, moderate_prompt()-style
+                result) once the prompt's result is saved
 
         Returns:
             Dict with:
@@ -387,41 +480,151 @@ class ModerationOrchestrator:
             - approved: int
             - rejected: int
             - flagged: int
+            - skipped: int (not pending and not forced, or checkpointed)
             - errors: int
         """
         if prompts is None:
             prompts = Prompt.objects.filter(moderation_status=status_filter)
+        if isinstance(prompts, list):
+            if completed_since is not None:
+                prompts = [
+                    p for p in prompts
+                    if not (p.moderation_completed_at
+                            and p.moderation_completed_at >= completed_since)
+                ]
+            prompts = prompts[:limit] if limit else prompts
+            count = len(prompts)
+        else:
+            if completed_since is not None:
+                prompts = prompts.exclude(moderation_completed_at__gte=completed_since)
+            prompts = prompts.order_by('pk')
+            if limit:
+                prompts = prompts[:limit]
+            count = prompts.count()
 
-        logger.info(f"Starting bulk moderation of {prompts.count()} prompts")
+        logger.info(
+            f"Starting bulk moderation of {count} prompts "
+            f"({workers} workers, {requests_per_second or 'unlimited'} req/s)"
+        )
 
         stats = {
             'total_processed': 0,
             'approved': 0,
             'rejected': 0,
             'flagged': 0,
+            'skipped': 0,
             'errors': 0,
         }
+        limiter = RateLimiter(requests_per_second)
+        in_flight = deque()
+        finished = []
 
-        for prompt in prompts:
+        def run_in_worker(check, prompt, *args):
             try:
-                result = self.moderate_prompt(prompt)
-                stats['total_processed'] += 1
-
-                status = result['overall_status']
-                if status == 'approved':
-                    stats['approved'] += 1
-                elif status == 'rejected':
-                    stats['rejected'] += 1
-                elif status == 'flagged':
-                    stats['flagged'] += 1
-
+                return check(prompt, *args)
+            finally:
+                # Verdict caches read the DB from worker threads
+                close_old_connections()
+
+        def run_limited(check, prompt, *args):
+            limiter.acquire()
+            return run_in_worker(check, prompt, *args)
+
+        def finalize(prompt, results, futures):
+            for key, future in futures.items():
+                try:
+                    results[key] = future.result()
+                except Exception as e:
+                    logger.error(f"{key} moderation failed for Prompt {prompt.id}: {str(e)}")
+                    results[key] = {'status': 'flagged', 'error': str(e)}
+            try:
+                finished.append((prompt, results, self._determine_overall_status(results)))
             except Exception as e:
                 logger.error(f"Error moderating prompt {prompt.id}: {str(e)}")
                 stats['errors'] += 1
+            if len(finished) >= BULK_MODERATION_WRITE_BATCH:
+                self._write_bulk_batch(finished, stats, on_result)
+
+        # Workers' text checks share OpenAI requests while the pool runs;
+        # the batcher takes a token per request, not per text
+        batching = (
+            self.openai_service.batching(limiter=limiter)
+            if self.openai_enabled else nullcontext()
+        )
+        pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='moderation')
+        with batching, pool:
+            for prompt in prompts:
+                if prompt.moderation_status != 'pending' and not force:
+                    stats['skipped'] += 1
+                    continue
+
+                # Layer 1 (profanity) is local and cheap: run it here
+                results = {'profanity': None, 'openai': None, 'openai_vision': None}
+                try:
+                    results['profanity'] = self._run_profanity_check(prompt)
+                except Exception as e:
+                    logger.error(f"Profanity filter failed: {str(e)}", exc_info=True)
+                    results['profanity'] = {'status': 'flagged', 'error': str(e)}
+
+                futures = {}
+                if self.openai_enabled:
+                    futures['openai'] = pool.submit(
+                        run_in_worker, self._run_openai_moderation, prompt,
+                    )
+                if not self._has_visual_content(prompt):
+                    results['openai_vision'] = {
+                        'status': 'approved',
+                        'message': 'No visual content to moderate',
+                        'is_safe': True
+                    }
+                elif self.vision_enabled:
+                    futures['openai_vision'] = pool.submit(
+                        run_limited, self._run_vision_moderation, prompt, refresh_verdicts,
+                    )
+                in_flight.append((prompt, results, futures))
+
+                # Work ahead at most two prompts per worker, then drain
+                # from the front so prompts finish in order
+                while len(in_flight) > workers * 2:
+                    head = in_flight.popleft()
+                    wait(head[2].values())
+                    finalize(*head)
+
+            while in_flight:
+                head = in_flight.popleft()
+                wait(head[2].values())
+                finalize(*head)
+
+        if finished:
+            self._write_bulk_batch(finished, stats, on_result)
 
         logger.info(f"Bulk moderation complete: {stats}")
         return stats
 
+    def _write_bulk_batch(self, finished: List, stats: Dict, on_result) -> None:
+        """Write one batch of bulk_moderate_prompts() results, then clear it."""
+        try:
+            with transaction.atomic():
+                self._write_moderation_logs(
+                    [(prompt, results) for prompt, results, _ in finished]
+                )
+                for prompt, _, overall_result in finished:
+                    self._apply_overall_status(prompt, overall_result)
+        except Exception as e:
+            logger.error(f"Error saving moderation batch of {len(finished)} prompts: {str(e)}")
+            stats['errors'] += len(finished)
+            finished.clear()
+            return
+
+        for prompt, results, overall_result in finished:
+            stats['total_processed'] += 1
+            status = overall_result['status']
+            if status in ('approved', 'rejected', 'flagged'):
+                stats[status] += 1
+            if on_result is not None:
+                on_result(prompt, self._summarize(overall_result, results))
+        finished.clear()
+
     def moderate_with_ai_generation(self, prompt: Prompt) -> Dict:
         """
         Moderate prompt with AI-powered content generation.
@@ -3,15 +3,236 @@ Profanity filtering service for text content moderation.
 
 This service checks text content against a custom admin-managed
 list of banned words/phrases.
+
+The word list is compiled into a WordMatcher — one regex whose
+alternation is laid out as a trie of the words — so a check is a single
+pass over the text however long the list grows. Matchers are cached per
+process and rebuilt only when the list itself changes.
+
+The provider-aware pre-flight check reads a MatcherRegistry: the
+universal matcher plus one advisory matcher per provider, loaded with a
+single query and kept until a ProfanityWord changes (the save/delete
+signals bump the PROFANITY_WORDS cache dependency key).
 """
 
 import re
 import logging
-from typing import Dict, List, Tuple
+import time
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
 from django.core.cache import cache
 
+from ..utils import cache_dependencies
+
 logger = logging.getLogger(__name__)
 
+# Distinct word lists kept compiled per process (universal + providers)
+MATCHER_CACHE_SIZE = 16
+
+# Upper bound on registry age, for list changes no signal sees
+# (QuerySet.update() from a shell); same as the word-list cache
+MATCHER_REGISTRY_TTL = 300  # seconds
+
+
+class WordMatcher:
+    """
+    Finds every word of a list in a text in one regex pass.
+
+    Matches are the same as searching for each word separately with
+    ``\\b<word>\\b``: phrases may overlap one another ("bad word" and
+    "word" both match "a bad word"), and occurrences of a single word are
+    non-overlapping, as with re.finditer.
+
+    Usage:
+        matcher = get_word_matcher((('damn', 'low'), ('hell', 'low')))
+        matcher.find('what the hell')
+        # [{'word': 'hell', 'severity': 'low', 'count': 1, 'positions': [9]}]
+    """
+
+    def __init__(self, entries: Tuple[Tuple[str, str], ...]):
+        """
+        Args:
+            entries: (word, severity) pairs, in the order results are
+                reported
+        """
+        self.severities = {}
+        for word, severity in entries:
+            if word:
+                self.severities.setdefault(word, severity)
+        self._order = {word: i for i, word in enumerate(self.severities)}
+        self._pattern = None
+        if self.severities:
+            # Zero-width lookahead so every start position is tried and
+            # overlapping phrases are all found
+            self._pattern = re.compile(
+                r'(?=\b(' + _trie_pattern(self.severities) + r')\b)'
+            )
+        # The regex reports the longest word matching at a position. The
+        # shorter words that also match there are its prefixes ending on a
+        # word boundary — known from the longest word alone
+        self._also_matched = {
+            word: [
+                word[:end] for end in range(1, len(word))
+                if word[:end] in self.severities
+                and re.match(re.escape(word[:end]) + r'\b', word)
+            ] + [word]
+            for word in self.severities
+        }
+
+    def __len__(self):
+        return len(self.severities)
+
+    def find(self, text: str) -> List[Dict]:
+        """
+        Find words in text (already lowercased).
+
+        Returns:
+            List of {'word', 'severity', 'count', 'positions'} dicts in
+            word-list order
+        """
+        if self._pattern is None:
+            return []
+        positions = {}
+        ends = {}
+        for match in self._pattern.finditer(text):
+            start = match.start()
+            for word in self._also_matched[match.group(1)]:
+                if start < ends.get(word, 0):
+                    continue
+                positions.setdefault(word, []).append(start)
+                ends[word] = start + len(word)
+        return [
+            {
+                'word': word,
+                'severity': self.severities[word],
+                'count': len(positions[word]),
+                'positions': positions[word],
+            }
+            for word in sorted(positions, key=self._order.__getitem__)
+        ]
+
+    def search(self, text: str) -> List[str]:
+        """Words found in text (already lowercased), in word-list order."""
+        return [found['word'] for found in self.find(text)]
+
+
+def _trie_pattern(words) -> str:
+    """Regex alternation of words, factored by common prefix."""
+    trie = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[''] = {}
+    return _node_pattern(trie)
+
+
+def _node_pattern(node: Dict) -> str:
+    branches = [
+        re.escape(char) + _node_pattern(child)
+        for char, child in sorted(node.items()) if char
+    ]
+    if not branches:
+        return ''
+    body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+    if '' in node:
+        # A word ends here: greedily try the longer words first, falling
+        # back to this one if they do not end on a word boundary
+        return '(?:' + body + ')?'
+    return body
+
+
+@lru_cache(maxsize=MATCHER_CACHE_SIZE)
+def get_word_matcher(entries: Tuple[Tuple[str, str], ...]) -> WordMatcher:
+    """
+    Compiled matcher for a word list, built once per distinct list.
+
+    Args:
+        entries: (word, severity) pairs — a tuple so it can key the cache
+    """
+    matcher = WordMatcher(entries)
+    logger.info(f"[ProfanityFilter] Compiled matcher for {len(matcher)} words")
+    return matcher
+
+
+class MatcherRegistry:
+    """
+    Compiled matchers for every scope of the active word list.
+
+    Attributes:
+        universal: WordMatcher for block_scope='universal' words
+        advisory: {provider_id: WordMatcher} for provider-advisory words
+        generations: cache_dependencies generations it was built from
+        loaded_at: time.monotonic() when it was built
+    """
+
+    def __init__(self, rows: List[Dict], generations: Dict):
+        universal = []
+        advisory = {}
+        for row in rows:
+            entry = (row['word'], row['severity'])
+            if row['block_scope'] == 'universal':
+                universal.append(entry)
+            elif row['block_scope'] == 'provider_advisory':
+                # Empty affected_providers list = no enforcement
+                providers = row['affected_providers']
+                for provider_id in providers if isinstance(providers, list) else ():
+                    advisory.setdefault(provider_id, []).append(entry)
+        self.universal = get_word_matcher(tuple(universal))
+        self.advisory = {
+            provider_id: WordMatcher(tuple(entries))
+            for provider_id, entries in advisory.items()
+        }
+        self.generations = generations
+        self.loaded_at = time.monotonic()
+
+    def is_current(self) -> bool:
+        return (
+            time.monotonic() - self.loaded_at < MATCHER_REGISTRY_TTL
+            and cache_dependencies.is_current(self.generations)
+        )
+
+
+_registry: Optional[MatcherRegistry] = None
+
+
+def get_matcher_registry() -> MatcherRegistry:
+    """
+    The process's MatcherRegistry, rebuilt when the word list changed.
+
+    A current registry costs one cache read; a rebuild, one query.
+    """
+    global _registry
+    registry = _registry
+    if registry is not None and registry.is_current():
+        return registry
+
+    from ..models import ProfanityWord
+
+    generations = cache_dependencies.current_generations(
+        [cache_dependencies.PROFANITY_WORDS]
+    )
+    rows = list(
+        ProfanityWord.objects.filter(is_active=True)
+        .values('word', 'severity', 'block_scope', 'affected_providers')
+    )
+    registry = _registry = MatcherRegistry(rows, generations)
+    logger.info(
+        f"[ProfanityFilter] Loaded matcher registry: {len(registry.universal)} "
+        f"universal words, {len(registry.advisory)} advisory providers"
+    )
+    return registry
+
+
+def invalidate_word_list():
+    """
+    Retire every cached copy of the word list (all processes).
+
+    Called by the ProfanityWord signals and by admin bulk updates.
+    """
+    cache.delete('profanity_word_list')
+    cache_dependencies.invalidate(cache_dependencies.PROFANITY_WORDS)
+
 
 class ProfanityFilterService:
     """
@@ -26,8 +247,13 @@ class ProfanityFilterService:
     def __init__(self):
         """Initialize profanity filter service"""
         self.word_list = self._load_word_list()
+        self.matcher = self._build_matcher(self.word_list)
         logger.info(f"Profanity filter initialized with {len(self.word_list)} active words")
 
+    @staticmethod
+    def _build_matcher(word_list: List[Dict]) -> WordMatcher:
+        return get_word_matcher(tuple((w['word'], w['severity']) for w in word_list))
+
     def _load_word_list(self) -> List[Dict]:
         """
         Load active universal-scope profanity words from database with caching.
@@ -90,27 +316,10 @@ class ProfanityFilterService:
 
         # Normalize text for matching
         text_lower = text.lower()
-        found_words = []
 
         try:
-            # Check each banned word
-            for word_data in self.word_list:
-                word = word_data['word']
-                severity = word_data['severity']
-
-                # Use word boundary regex for exact word matching
-                # This prevents "hello" from matching in "hello"
-                pattern = r'\b' + re.escape(word) + r'\b'
-
-                matches = re.findall(pattern, text_lower)
-
-                if matches:
-                    found_words.append({
-                        'word': word,
-                        'severity': severity,
-                        'count': len(matches),
-                        'positions': self._find_positions(text_lower, word)
-                    })
+            # Whole-word matches of every banned word in one pass
+            found_words = self.matcher.find(text_lower)
 
             # Determine results
             is_clean = len(found_words) == 0
@@ -143,25 +352,6 @@ class ProfanityFilterService:
                 'error': str(e)
             }], 'medium'
 
-    def _find_positions(self, text: str, word: str) -> List[int]:
-        """
-        Find all positions of a word in text.
-
-        Args:
-            text: Text to search in (should be lowercase)
-            word: Word to find (should be lowercase)
-
-        Returns:
-            List of character positions where word was found
-        """
-        positions = []
-        pattern = r'\b' + re.escape(word) + r'\b'
-
-        for match in re.finditer(pattern, text):
-            positions.append(match.start())
-
-        return positions
-
     def check_prompt(self, prompt_obj) -> Dict:
         """
         Check all text content from a Prompt object for profanity.
@@ -237,8 +427,9 @@ class ProfanityFilterService:
 
         Call this after updating profanity words in admin.
         """
-        cache.delete('profanity_word_list')
+        invalidate_word_list()
         self.word_list = self._load_word_list()
+        self.matcher = self._build_matcher(self.word_list)
         logger.info("Profanity word list refreshed from database")
 
     # ───────────────────────────────────────────────────────────────────
@@ -277,56 +468,54 @@ class ProfanityFilterService:
         list query fails. Failures degrade to "allowed" so the existing
         check_text fallback path can still surface the issue.
         """
-        if not text or not text.strip():
-            logger.warning(
-                "check_text_with_provider received empty text "
-                "(provider_id=%r) — returning 'allowed' as a safe default. "
-                "Caller should validate non-empty before this point.",
-                provider_id,
-            )
-            return {
-                'allowed': True,
-                'reason': 'clean',
-                'matched_words': [],
-                'severity': 'none',
-                'message': '',
-                'scope_provider': '',
-            }
-
-        # Import here to avoid circular import (existing pattern at line 44)
-        from ..models import ProfanityWord
+        return self.check_texts_with_provider([text], provider_id)[0]
 
-        text_lower = text.lower()
+    def check_texts_with_provider(
+        self, texts: List[str], provider_id: str = ''
+    ) -> List[Dict]:
+        """
+        Batch form of check_text_with_provider: one result dict per text.
 
-        # Tier 1: universal blocks (matches legacy check_text behavior)
+        The matchers come from the process's MatcherRegistry, so a batch
+        costs at most one query however many texts it holds.
+        """
         try:
-            universal_qs = ProfanityWord.objects.filter(
-                is_active=True,
-                block_scope='universal',
-            ).values('word', 'severity')
-            universal_words = list(universal_qs)
+            registry = get_matcher_registry()
         except Exception as e:
             logger.warning(
-                "Tier 1 universal-words query failed (provider_id=%r): %s. "
+                "Profanity matcher registry load failed (provider_id=%r): %s. "
                 "Memory Rule #13 — logging silent-fallback. Returning "
                 "'allowed' so legacy check_text path can re-attempt.",
                 provider_id, e,
             )
-            return {
-                'allowed': True,
-                'reason': 'clean',
-                'matched_words': [],
-                'severity': 'none',
-                'message': '',
-                'scope_provider': '',
-            }
+            return [self._allowed_result() for _ in texts]
 
-        matched_universal = []
-        for w in universal_words:
-            pattern = r'\b' + re.escape(w['word']) + r'\b'
-            if re.search(pattern, text_lower):
-                matched_universal.append(w)
+        advisory = registry.advisory.get(provider_id) if provider_id else None
+        return [
+            self._check_with_registry(text, provider_id, registry.universal, advisory)
+            for text in texts
+        ]
 
+    def _check_with_registry(
+        self,
+        text: str,
+        provider_id: str,
+        universal: WordMatcher,
+        advisory: Optional[WordMatcher],
+    ) -> Dict:
+        if not text or not text.strip():
+            logger.warning(
+                "check_text_with_provider received empty text "
+                "(provider_id=%r) — returning 'allowed' as a safe default. "
+                "Caller should validate non-empty before this point.",
+                provider_id,
+            )
+            return self._allowed_result()
+
+        text_lower = text.lower()
+
+        # Tier 1: universal blocks (matches legacy check_text behavior)
+        matched_universal = universal.find(text_lower)
         if matched_universal:
             severity_rank = {
                 'critical': 4, 'high': 3, 'medium': 2, 'low': 1
@@ -346,45 +535,11 @@ class ProfanityFilterService:
                 'scope_provider': '',
             }
 
-        # Tier 2: provider advisory — only if provider_id given.
-        # Fetches all active advisory rows then filters by provider_id in
-        # Python. Avoids JSONField __contains lookup which behaves
-        # inconsistently between PostgreSQL prod and SQLite test DB for
-        # "list contains string element" semantics — fetch + filter is
-        # the same pattern as the existing check_text iteration.
-        if provider_id:
-            try:
-                advisory_qs = ProfanityWord.objects.filter(
-                    is_active=True,
-                    block_scope='provider_advisory',
-                ).values('word', 'severity', 'affected_providers')
-                all_advisory = list(advisory_qs)
-            except Exception as e:
-                logger.warning(
-                    "Tier 2 advisory-words query failed (provider_id=%r): %s. "
-                    "Memory Rule #13 — logging silent-fallback. Falling "
-                    "through to 'allowed' since universal already cleared.",
-                    provider_id, e,
-                )
-                all_advisory = []
-
-            # Python-side filter: only words whose affected_providers list
-            # actually contains this provider_id. Empty affected_providers
-            # list = no enforcement (warn-only-future-feature edge case).
-            advisory_words = [
-                w for w in all_advisory
-                if isinstance(w.get('affected_providers'), list)
-                and provider_id in w['affected_providers']
-            ]
-
-            matched_advisory = []
-            for w in advisory_words:
-                pattern = r'\b' + re.escape(w['word']) + r'\b'
-                if re.search(pattern, text_lower):
-                    matched_advisory.append(w)
-
-            if matched_advisory:
-                matched_words = [w['word'] for w in matched_advisory]
+        # Tier 2: provider advisory — only if provider_id given and some
+        # advisory word lists this provider in affected_providers.
+        if advisory is not None:
+            matched_words = advisory.search(text_lower)
+            if matched_words:
                 return {
                     'allowed': False,
                     'reason': 'provider_advisory',
@@ -405,6 +560,10 @@ class ProfanityFilterService:
                     'block_source': 'preflight',
                 }
 
+        return self._allowed_result()
+
+    @staticmethod
+    def _allowed_result() -> Dict:
         return {
             'allowed': True,
             'reason': 'clean',
@@ -0,0 +1,189 @@
+"""
+Profile Stats Service for PromptFinder.
+
+Keeps one UserProfileStats snapshot per user so the profile header
+(prompts, likes received, views, ranks, followers/following) is a single
+read rather than a set of aggregates on every profile page view:
+
+- Counters are maintained by signals (prompts/signals.py): likes and
+  follows adjust them in place; prompt publish/unpublish/delete recounts
+  the author's prompts and likes.
+- Views and ranks are refreshed for every snapshot, set-based, after the
+  leaderboards are rebuilt (rebuild_leaderboards, hourly). The same pass
+  re-syncs the counters, so any drift is bounded by the schedule.
+- Snapshots are created lazily the first time a profile is viewed.
+
+Every change increments the snapshot's ``version``.
+"""
+
+import logging
+
+from django.db.models import Count, F, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce, Greatest
+from django.utils import timezone
+
+from prompts.services.view_rollups import author_views_expression
+
+logger = logging.getLogger(__name__)
+
+COUNTER_FIELDS = frozenset({
+    'prompt_count', 'likes_received', 'follower_count', 'following_count',
+})
+
+
+def _published_prompts(author_id):
+    from prompts.models import Prompt
+    return Prompt.objects.filter(
+        author_id=author_id, status=1, deleted_at__isnull=True,
+    )
+
+
+def _count_subquery(queryset, group_field):
+    """Coalesced COUNT(*) of queryset rows grouped on group_field."""
+    return Coalesce(
+        Subquery(
+            queryset.order_by().values(group_field).annotate(c=Count('pk')).values('c')
+        ),
+        Value(0),
+    )
+
+
+def _counter_expressions(outer_ref):
+    """prompt/like/follow counts for a queryset whose outer_ref is a user id."""
+    from prompts.models import Follow, Prompt
+
+    likes = Prompt.likes.through.objects.filter(
+        prompt__author_id=OuterRef(outer_ref),
+        prompt__status=1,
+        prompt__deleted_at__isnull=True,
+    )
+    return {
+        'prompt_count': _count_subquery(
+            Prompt.objects.filter(
+                author_id=OuterRef(outer_ref), status=1, deleted_at__isnull=True,
+            ),
+            'author_id',
+        ),
+        'likes_received': _count_subquery(likes, 'prompt__author_id'),
+        'follower_count': _count_subquery(
+            Follow.objects.filter(following_id=OuterRef(outer_ref)), 'following_id',
+        ),
+        'following_count': _count_subquery(
+            Follow.objects.filter(follower_id=OuterRef(outer_ref)), 'follower_id',
+        ),
+    }
+
+
+def _rank_subquery(metric, period):
+    from prompts.models import LeaderboardEntry
+    return Subquery(
+        LeaderboardEntry.objects.filter(
+            metric=metric, period=period, user_id=OuterRef('user_id'),
+        ).values('rank')[:1]
+    )
+
+
+def build_snapshot(user):
+    """
+    Compute and store a user's snapshot from scratch.
+
+    Returns:
+        UserProfileStats
+    """
+    from prompts.models import Follow, UserProfileStats
+    from prompts.services.leaderboard import LeaderboardService
+    from prompts.services.view_rollups import count_views
+
+    values = {
+        'prompt_count': _published_prompts(user.pk).count(),
+        'likes_received': _published_prompts(user.pk).aggregate(
+            n=Count('likes')
+        )['n'] or 0,
+        'total_views': count_views(prompt__author=user),
+        'all_time_rank': LeaderboardService.get_user_rank(user, metric='views', period='all'),
+        'thirty_day_rank': LeaderboardService.get_user_rank(user, metric='active', period='month'),
+        'follower_count': Follow.objects.filter(following=user).count(),
+        'following_count': Follow.objects.filter(follower=user).count(),
+        'computed_at': timezone.now(),
+    }
+    snapshot, created = UserProfileStats.objects.get_or_create(user=user, defaults=values)
+    if not created:
+        # Someone else built it first; theirs is as fresh as ours
+        logger.debug(f"[ProfileStats] Snapshot for {user.pk} built concurrently")
+    return snapshot
+
+
+def get_snapshot(user):
+    """
+    The user's stats snapshot, building it on first use.
+
+    Uses ``user.profile_stats`` when the caller already joined it
+    (``select_related('profile_stats')``), so the common case costs no
+    extra query.
+    """
+    from prompts.models import UserProfileStats
+
+    try:
+        return user.profile_stats
+    except UserProfileStats.DoesNotExist:
+        snapshot = build_snapshot(user)
+        user.profile_stats = snapshot
+        return snapshot
+
+
+def adjust(user_id, **deltas):
+    """
+    Add deltas to a snapshot's counters in place (no-op if the user has
+    no snapshot yet; it will be built from scratch when first viewed).
+
+    Example:
+        adjust(prompt.author_id, likes_received=1)
+    """
+    from prompts.models import UserProfileStats
+
+    unknown = set(deltas) - COUNTER_FIELDS
+    if unknown:
+        raise ValueError(f"Not a profile stats counter: {sorted(unknown)}")
+    updates = {
+        field: Greatest(F(field) + delta, Value(0))
+        for field, delta in deltas.items() if delta
+    }
+    if not updates:
+        return
+    UserProfileStats.objects.filter(user_id=user_id).update(
+        **updates, version=F('version') + 1,
+    )
+
+
+def recount(user_ids):
+    """Recompute the counters (not views or ranks) of the given snapshots."""
+    from prompts.models import UserProfileStats
+
+    user_ids = [pk for pk in set(user_ids) if pk]
+    if not user_ids:
+        return 0
+    return UserProfileStats.objects.filter(user_id__in=user_ids).update(
+        **_counter_expressions('user_id'), version=F('version') + 1,
+    )
+
+
+def refresh_snapshots():
+    """
+    Refresh every existing snapshot (counters, views and ranks) in one
+    UPDATE. Run after the leaderboards are rebuilt so ranks match them.
+
+    Returns:
+        int: Number of snapshots refreshed
+    """
+    from prompts.models import UserProfileStats
+
+    updated = UserProfileStats.objects.update(
+        **_counter_expressions('user_id'),
+        total_views=author_views_expression(outer_ref='user_id', published_only=False),
+        all_time_rank=_rank_subquery('views', 'all'),
+        thirty_day_rank=_rank_subquery('active', 'month'),
+        version=F('version') + 1,
+        computed_at=timezone.now(),
+    )
+    logger.info(f"[ProfileStats] Refreshed {updated} snapshots")
+    return updated
@@ -0,0 +1,389 @@
+"""
+Prompt Detail Loader for PromptFinder.
+
+Batches every lookup the prompt detail page needs and returns a typed
+view-model. Data is split into two cache layers:
+
+- Shared layer (PromptDetailShared): everything that is the same for
+  every viewer — ordered tags, the first page of approved comments, like
+  count, "more from this author", related prompts and the view count.
+  Cached per prompt id for SHARED_TTL, depending on the prompt:<id> and
+  user:<author id> surrogate keys.
+- Viewer overlay (ViewerOverlay): the few facts that depend on who is
+  looking — liked, following the author, own comments awaiting approval.
+  Two queries for logged-in viewers, cached per (prompt, user) for
+  OVERLAY_TTL, depending on prompt:<id> and user:<viewer id>;
+  anonymous viewers need none.
+
+Both layers are retired by model signals bumping those surrogate keys
+(prompts/utils/cache_dependencies.py, prompts/signals.py).
+
+The prompt row itself (with author + profile) is always fetched fresh in a
+single query when resolving the slug, so edits to the prompt appear
+immediately and deleted/draft handling stays in the view. View counts in
+the shared layer may lag by up to SHARED_TTL.
+
+Uncached, a logged-in detail view costs: 1 (slug) + 5 (shared, excluding the
+related-prompts scorer) + 2 (overlay) queries. Cached: 1 + 0 + 0. Only the
+first COMMENTS_PAGE_SIZE approved comments are loaded; the rest come from
+the cursor-paginated comments_ajax endpoint, and the total is read from
+the maintained Prompt.approved_comment_count.
+"""
+
+import base64
+import binascii
+import logging
+from dataclasses import dataclass, field
+from datetime import datetime
+
+from django.db.models import Count, Exists, OuterRef, Q, Subquery, Value
+from django.db.models.functions import Coalesce
+
+from prompts.services.view_rollups import count_views
+from prompts.utils import cache_dependencies
+from prompts.utils.related import get_related_prompts
+from prompts.utils.top_n import top_n_per_group
+
+logger = logging.getLogger(__name__)
+
+SHARED_TTL = 300  # 5 minutes (matches the template fragment caches)
+OVERLAY_TTL = 3600  # 1 hour (every overlay input is signal-invalidated)
+
+MORE_FROM_AUTHOR_LIMIT = 4
+RELATED_LIMIT = 60
+COMMENTS_PAGE_SIZE = 20
+
+
+def _shared_cache_key(prompt_id):
+    return f'prompt_detail_shared_v2_{prompt_id}'
+
+
+def _overlay_cache_key(prompt_id, user_id):
+    return f'prompt_detail_viewer_v2_{prompt_id}_{user_id}'
+
+
+def _shared_dependencies(prompt):
+    return [
+        cache_dependencies.prompt_key(prompt.id),
+        cache_dependencies.user_key(prompt.author_id),
+    ]
+
+
+def _overlay_dependencies(prompt, user):
+    return [
+        cache_dependencies.prompt_key(prompt.id),
+        cache_dependencies.user_key(user.pk),
+    ]
+
+
+@dataclass
+class SlugResolution:
+    """Outcome of resolving a detail-page slug."""
+    prompt: object = None  # Prompt (may be deleted or a draft)
+    redirect_slug: str = ''  # Admin slug change → 301
+    deleted_record: object = None  # DeletedPrompt → 301 / 410
+
+
+@dataclass
+class PromptDetailShared:
+    """Viewer-independent detail data (cached per prompt)."""
+    ordered_tags: list = field(default_factory=list)
+    approved_comments: list = field(default_factory=list)  # First page only
+    next_comments_cursor: str = ''
+    number_of_likes: int = 0
+    more_from_author: list = field(default_factory=list)
+    author_total_prompts: int = 0
+    related_prompts: list = field(default_factory=list)
+    view_count: int = 0
+
+
+@dataclass
+class ViewerOverlay:
+    """Viewer-specific detail data (cached per prompt + user)."""
+    liked: bool = False
+    is_following_author: bool = False
+    pending_comments: list = field(default_factory=list)
+
+
+@dataclass
+class PromptDetailViewModel:
+    """Everything prompt_detail.html needs, in one object."""
+    prompt: object
+    shared: PromptDetailShared
+    overlay: ViewerOverlay
+    can_see_views: bool = False
+    view_created: bool = False
+
+    @property
+    def comments(self):
+        """First page of approved comments plus the viewer's pending ones."""
+        if not self.overlay.pending_comments:
+            return self.shared.approved_comments
+        return sorted(
+            self.shared.approved_comments + self.overlay.pending_comments,
+            key=lambda c: c.created_on,
+        )
+
+    @property
+    def view_count(self):
+        # The shared layer may predate this viewer's first view
+        return self.shared.view_count + (1 if self.view_created else 0)
+
+    def as_context(self, related_page_size=18):
+        """Template context for prompts/prompt_detail.html."""
+        shared = self.shared
+        more_from_author = shared.more_from_author
+        return {
+            "prompt": self.prompt,
+            "ordered_tags": shared.ordered_tags,
+            "comments": self.comments,
+            "comment_count": self.prompt.approved_comment_count,
+            "next_comments_cursor": shared.next_comments_cursor,
+            "number_of_likes": shared.number_of_likes,
+            "prompt_is_liked": self.overlay.liked,
+            "view_count": self.view_count,
+            "can_see_views": self.can_see_views,
+            "is_following_author": self.overlay.is_following_author,
+            "more_from_author": more_from_author,
+            "more_from_author_count": len(more_from_author),
+            "author_remaining_count": max(
+                0, shared.author_total_prompts - MORE_FROM_AUTHOR_LIMIT
+            ),
+            "related_prompts": shared.related_prompts[:related_page_size],
+            "has_more_related": len(shared.related_prompts) > related_page_size,
+            "related_prompt_slug": self.prompt.slug,
+        }
+
+
+def resolve_slug(slug):
+    """
+    Resolve a detail-page slug in as few queries as possible.
+
+    The prompt itself is looked up first (1 query, the common case);
+    SlugRedirect and DeletedPrompt are only consulted when no prompt
+    currently owns the slug.
+
+    Returns:
+        SlugResolution
+    """
+    from prompts.models import DeletedPrompt, Prompt, SlugRedirect
+
+    prompt = Prompt.all_objects.select_related(
+        'author', 'author__userprofile',
+    ).filter(slug=slug).first()
+    if prompt is not None:
+        return SlugResolution(prompt=prompt)
+
+    slug_redirect = SlugRedirect.objects.select_related('prompt').filter(
+        old_slug=slug
+    ).first()
+    if slug_redirect:
+        return SlugResolution(redirect_slug=slug_redirect.prompt.slug)
+
+    deleted_record = DeletedPrompt.objects.filter(slug=slug).first()
+    if deleted_record and not deleted_record.is_expired:
+        return SlugResolution(deleted_record=deleted_record)
+
+    return SlugResolution()
+
+
+def _more_from_author(prompt):
+    """
+    Top published prompts by the same author plus the author's total,
+    in a single query (the total rides along on each row as a window
+    count over the author's prompts).
+
+    Returns:
+        tuple: (list of Prompt, int total other prompts)
+    """
+    from prompts.models import Prompt
+
+    rows = top_n_per_group(
+        Prompt.objects.filter(
+            author_id=prompt.author_id,
+            status=1,
+            deleted_at__isnull=True,
+        ).exclude(id=prompt.id).annotate(
+            likes_count=Count('likes'),
+        ),
+        partition_by='author_id',
+        order_by=['-likes_count', '-created_on', '-id'],
+        n=MORE_FROM_AUTHOR_LIMIT,
+        count_as='author_total',
+    )
+    total = rows[0].author_total if rows else 0
+    return rows, total
+
+
+def encode_comment_cursor(comment):
+    """Opaque keyset cursor pointing just after ``comment``."""
+    raw = f'{comment.created_on.isoformat()}|{comment.pk}'
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_comment_cursor(cursor):
+    """
+    Decode a cursor from encode_comment_cursor().
+
+    Returns:
+        tuple: (datetime created_on, int comment id)
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        raw = base64.urlsafe_b64decode(padded.encode()).decode()
+        created_on, pk = raw.rsplit('|', 1)
+        return datetime.fromisoformat(created_on), int(pk)
+    except (binascii.Error, UnicodeDecodeError, ValueError) as e:
+        raise ValueError(f'Invalid comment cursor: {cursor!r}') from e
+
+
+def get_comment_page(prompt, cursor=None, limit=COMMENTS_PAGE_SIZE):
+    """
+    One page of a prompt's approved comments, oldest first.
+
+    Keyset pagination on (created_on, id) — every page is a single
+    indexed range scan regardless of how deep the reader has scrolled.
+
+    Args:
+        prompt: Prompt (or prompt id)
+        cursor: Cursor returned with the previous page, or None
+        limit: Page size
+
+    Returns:
+        tuple: (list of Comment, str next cursor or '' on the last page)
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    from prompts.models import Comment
+
+    qs = Comment.objects.filter(prompt=prompt, approved=True)
+    if cursor:
+        created_on, pk = decode_comment_cursor(cursor)
+        qs = qs.filter(
+            Q(created_on__gt=created_on) | Q(created_on=created_on, pk__gt=pk)
+        )
+    rows = list(
+        qs.select_related('author', 'author__userprofile')
+        .order_by('created_on', 'pk')[:limit + 1]
+    )
+    if len(rows) > limit:
+        return rows[:limit], encode_comment_cursor(rows[limit - 1])
+    return rows, ''
+
+
+def refresh_approved_comment_counts(prompt_ids):
+    """
+    Recompute Prompt.approved_comment_count for the given prompts.
+
+    A single UPDATE with a correlated COUNT — used by the Comment signals
+    and by bulk operations that bypass them (e.g. queryset.update()).
+    """
+    from prompts.models import Comment, Prompt
+
+    approved = Comment.objects.filter(
+        prompt=OuterRef('pk'), approved=True,
+    ).order_by().values('prompt').annotate(c=Count('id')).values('c')
+    Prompt.all_objects.filter(pk__in=list(prompt_ids)).update(
+        approved_comment_count=Coalesce(Subquery(approved), Value(0))
+    )
+
+
+def build_shared(prompt):
+    """Compute the viewer-independent layer (uncached)."""
+    approved_comments, next_cursor = get_comment_page(prompt)
+    more_from_author, author_total = _more_from_author(prompt)
+
+    return PromptDetailShared(
+        ordered_tags=list(prompt.ordered_tags()),
+        approved_comments=approved_comments,
+        next_comments_cursor=next_cursor,
+        number_of_likes=prompt.likes.count(),
+        more_from_author=more_from_author,
+        author_total_prompts=author_total,
+        related_prompts=get_related_prompts(prompt, limit=RELATED_LIMIT),
+        view_count=count_views(prompt=prompt),
+    )
+
+
+def get_shared(prompt):
+    """Viewer-independent layer, cached for published prompts only."""
+    if not (prompt.status == 1 and prompt.deleted_at is None):
+        return build_shared(prompt)
+    return cache_dependencies.get_or_set(
+        _shared_cache_key(prompt.id),
+        lambda: build_shared(prompt),
+        SHARED_TTL,
+        depends_on=_shared_dependencies(prompt),
+    )
+
+
+def build_overlay(prompt, user):
+    """Compute the viewer layer (uncached). No queries for anonymous users."""
+    if not user or not user.is_authenticated:
+        return ViewerOverlay()
+
+    from django.contrib.auth.models import User
+    from prompts.models import Comment, Follow, Prompt
+
+    flags = User.objects.filter(pk=user.pk).annotate(
+        liked=Exists(Prompt.likes.through.objects.filter(
+            prompt_id=prompt.pk, user_id=OuterRef('pk'),
+        )),
+        following=Exists(Follow.objects.filter(
+            follower_id=OuterRef('pk'), following_id=prompt.author_id,
+        )),
+    ).values('liked', 'following').first() or {}
+
+    pending_comments = list(
+        Comment.objects.filter(
+            prompt=prompt, author=user, approved=False,
+        ).select_related('author', 'author__userprofile').order_by('created_on')
+    )
+
+    return ViewerOverlay(
+        liked=bool(flags.get('liked')),
+        is_following_author=(
+            user.pk != prompt.author_id and bool(flags.get('following'))
+        ),
+        pending_comments=pending_comments,
+    )
+
+
+def get_overlay(prompt, user):
+    """Viewer layer, cached per (prompt, user)."""
+    if not user or not user.is_authenticated:
+        return ViewerOverlay()
+
+    # A like, follow or comment by the viewer bumps user:<id>, so one
+    # round trip (entry + generations) validates the cached copy.
+    return cache_dependencies.get_or_set(
+        _overlay_cache_key(prompt.id, user.pk),
+        lambda: build_overlay(prompt, user),
+        OVERLAY_TTL,
+        depends_on=_overlay_dependencies(prompt, user),
+    )
+
+
+def load_prompt_detail(prompt, user, view_created=False):
+    """
+    Assemble the detail view-model for a resolved, viewable prompt.
+
+    Args:
+        prompt: Prompt from resolve_slug() (published, or the author's draft)
+        user: request.user
+        view_created: True if this request just recorded a new PromptView
+
+    Returns:
+        PromptDetailViewModel
+    """
+    return PromptDetailViewModel(
+        prompt=prompt,
+        shared=get_shared(prompt),
+        overlay=get_overlay(prompt, user),
+        can_see_views=prompt.can_see_view_count(user),
+        view_created=view_created,
+    )
@@ -0,0 +1,235 @@
+"""
+Near-duplicate detection for prompt texts.
+
+Prompt.content and GeneratedImage.prompt_text are summarised by MinHash
+signatures (prompts/utils/minhash.py) stored in PromptTextSignature, with
+one PromptTextBand row per LSH bucket. A lookup hashes the query text into
+its buckets, fetches the signatures sharing any of them through the
+bucket index, and keeps those whose estimated similarity reaches the
+threshold — no scan of the catalogue text.
+
+Written by:
+- the Prompt post_save signal (prompts/signals.py) when content changes
+- BulkGenerationService.create_job for the prompts of a new job
+
+Used by:
+- the upload submit notice (views/upload_views.py)
+- BulkGenerationService.validate_prompts warnings
+- the report_duplicate_prompt_texts management command
+
+All entry points are no-ops when settings.PROMPT_TEXT_INDEX is False.
+"""
+import logging
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+from django.conf import settings
+from django.db import transaction
+from django.urls import reverse
+
+from ..constants import TEXT_DUPLICATE_THRESHOLD, TEXT_DUPLICATE_WARNING_LIMIT
+from ..utils.clusters import Clusters
+from ..utils.minhash import band_keys, minhash, similarity
+
+logger = logging.getLogger(__name__)
+
+PROMPT = 'prompt'
+GENERATED = 'generated'
+
+
+@dataclass(frozen=True)
+class TextMatch:
+    kind: str  # PROMPT or GENERATED
+    object_id: object  # Prompt pk (int) or GeneratedImage pk (UUID)
+    similarity: float
+
+
+def _enabled() -> bool:
+    return getattr(settings, 'PROMPT_TEXT_INDEX', False)
+
+
+def _key(prompt_id, generated_image_id):
+    return (PROMPT, prompt_id) if prompt_id else (GENERATED, generated_image_id)
+
+
+def _bands(signature_row, signature):
+    from prompts.models import PromptTextBand
+
+    return [PromptTextBand(signature=signature_row, bucket=key) for key in band_keys(signature)]
+
+
+def record_prompt_text(prompt_id: int, text: str) -> None:
+    """Store (or refresh) the signature of a Prompt's content."""
+    from prompts.models import PromptTextBand, PromptTextSignature
+
+    if not _enabled():
+        return
+    signature = minhash(text or '')
+    try:
+        existing = PromptTextSignature.objects.filter(prompt_id=prompt_id).first()
+        if existing is not None and existing.minhash == signature:
+            return
+        with transaction.atomic():
+            if existing is not None:
+                existing.delete()
+            if signature:
+                row = PromptTextSignature.objects.create(prompt_id=prompt_id, minhash=signature)
+                PromptTextBand.objects.bulk_create(_bands(row, signature))
+    except Exception as e:
+        logger.warning(f"[TextDuplicates] Could not index prompt {prompt_id}: {e}")
+
+
+def record_generated_texts(images) -> None:
+    """
+    Store signatures for new GeneratedImages (one per prompt is enough:
+    variations share their text). Uses two bulk inserts for the batch.
+    """
+    from prompts.models import PromptTextBand, PromptTextSignature
+
+    if not _enabled():
+        return
+    pending = []
+    for image in images:
+        signature = minhash(image.prompt_text)
+        if signature:
+            pending.append(PromptTextSignature(generated_image_id=image.pk, minhash=signature))
+    try:
+        with transaction.atomic():
+            rows = PromptTextSignature.objects.bulk_create(pending)
+            PromptTextBand.objects.bulk_create(
+                [band for row in rows for band in _bands(row, row.minhash)]
+            )
+    except Exception as e:
+        logger.warning(f"[TextDuplicates] Could not index {len(pending)} generated prompt(s): {e}")
+
+
+def find_similar_prompt_texts_many(texts: List[str], threshold: float = TEXT_DUPLICATE_THRESHOLD,
+                                   kind: Optional[str] = None) -> List[List[TextMatch]]:
+    """
+    Indexed texts similar to each of several texts, in two queries total.
+
+    Returns:
+        One list per input text, most similar first.
+    """
+    from prompts.models import PromptTextBand, PromptTextSignature
+
+    results = [[] for _ in texts]
+    if not _enabled() or not texts:
+        return results
+    signatures = [minhash(text or '') for text in texts]
+    buckets = defaultdict(set)  # bucket -> indexes of the query texts in it
+    for position, signature in enumerate(signatures):
+        for key in band_keys(signature):
+            buckets[key].add(position)
+    if not buckets:
+        return results
+
+    candidates = defaultdict(set)  # signature id -> query indexes sharing a bucket
+    for signature_id, bucket in PromptTextBand.objects.filter(
+        bucket__in=list(buckets),
+    ).values_list('signature_id', 'bucket'):
+        candidates[signature_id] |= buckets[bucket]
+    if not candidates:
+        return results
+
+    rows = PromptTextSignature.objects.filter(id__in=list(candidates))
+    if kind == PROMPT:
+        rows = rows.filter(prompt__isnull=False)
+    elif kind == GENERATED:
+        rows = rows.filter(generated_image__isnull=False)
+    for row_id, prompt_id, generated_id, stored in rows.values_list(
+        'id', 'prompt_id', 'generated_image_id', 'minhash',
+    ):
+        for position in candidates[row_id]:
+            score = similarity(signatures[position], stored)
+            if score >= threshold:
+                results[position].append(TextMatch(*_key(prompt_id, generated_id), score))
+    for matches in results:
+        matches.sort(key=lambda match: match.similarity, reverse=True)
+    return results
+
+
+def find_similar_prompt_texts(text: str, threshold: float = TEXT_DUPLICATE_THRESHOLD,
+                              kind: Optional[str] = None) -> List[TextMatch]:
+    """Indexed Prompt/GeneratedImage texts similar to text, most similar first."""
+    return find_similar_prompt_texts_many([text], threshold, kind=kind)[0]
+
+
+def similar_published_prompts(text: str, exclude_id: Optional[int] = None,
+                              limit: int = TEXT_DUPLICATE_WARNING_LIMIT):
+    """
+    Published prompts whose text is a near-duplicate of text, for notices.
+
+    Returns:
+        [{'title': ..., 'url': ..., 'similarity': ...}], most similar first
+    """
+    from prompts.models import Prompt
+
+    scores = {
+        match.object_id: match.similarity
+        for match in find_similar_prompt_texts(text, kind=PROMPT)
+        if match.object_id != exclude_id
+    }
+    if not scores:
+        return []
+    prompts = Prompt.objects.filter(
+        pk__in=scores, status=1, deleted_at__isnull=True,
+    ).only('id', 'title', 'slug')
+    ranked = sorted(prompts, key=lambda prompt: scores[prompt.pk], reverse=True)[:limit]
+    return [
+        {
+            'title': prompt.title,
+            'url': reverse('prompts:prompt_detail', args=[prompt.slug]),
+            'similarity': round(scores[prompt.pk], 2),
+        }
+        for prompt in ranked
+    ]
+
+
+def duplicate_text_groups(threshold: float = TEXT_DUPLICATE_THRESHOLD,
+                          kind: Optional[str] = PROMPT) -> List[set]:
+    """
+    Clusters of indexed texts that are near-duplicates of each other.
+
+    Only pairs sharing an LSH bucket are compared; clusters are connected
+    components of the pairs that reach the threshold.
+
+    Returns:
+        List of sets of (kind, object_id) keys, largest first; singletons
+        are omitted.
+    """
+    from prompts.models import PromptTextBand, PromptTextSignature
+
+    if not _enabled():
+        return []
+    rows = PromptTextSignature.objects.all()
+    if kind == PROMPT:
+        rows = rows.filter(prompt__isnull=False)
+    elif kind == GENERATED:
+        rows = rows.filter(generated_image__isnull=False)
+    signatures: Dict[int, tuple] = {
+        row_id: (_key(prompt_id, generated_id), stored)
+        for row_id, prompt_id, generated_id, stored in rows.values_list(
+            'id', 'prompt_id', 'generated_image_id', 'minhash',
+        ).iterator()
+    }
+
+    buckets = defaultdict(list)
+    for signature_id, bucket in PromptTextBand.objects.values_list('signature_id', 'bucket').iterator():
+        if signature_id in signatures:
+            buckets[bucket].append(signature_id)
+
+    clusters = Clusters()
+    compared = set()
+    for members in buckets.values():
+        for i, first in enumerate(members):
+            for second in members[i + 1:]:
+                pair = (first, second) if first < second else (second, first)
+                if pair in compared:
+                    continue
+                compared.add(pair)
+                if similarity(signatures[first][1], signatures[second][1]) >= threshold:
+                    clusters.link(first, second)
+
+    return clusters.groups(label=lambda signature_id: signatures[signature_id][0])
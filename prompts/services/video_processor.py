@@ -8,20 +8,29 @@ Functions:
 - check_ffmpeg_available() -> bool
 - validate_video(file) -> dict with metadata or raises ValidationError
 - get_video_metadata(video_path) -> dict with duration, width, height, format
+- analyze_video(video_path, num_frames=3, thumbnail_at=None, metadata=None) -> dict
+  with metadata and in-memory JPEG frames, from one probe + one FFmpeg run
+- make_thumbnail(frame, size='600x600') -> JPEG bytes cropped from a frame
 - extract_thumbnail(video_path, output_path, timestamp='00:00:01', size='600x600') -> bool
 
 Phase L6-VIDEO: FFmpeg Video Processing for B2
 Created: December 30, 2025
 """
 
+import hashlib
 import json
 import logging
 import os
+import re
 import subprocess  # nosec B404 - Required for FFmpeg video processing
 import tempfile
+import threading
+from collections import OrderedDict
+from io import BytesIO
 from pathlib import Path
 
 from django.core.exceptions import ValidationError
+from PIL import Image
 
 logger = logging.getLogger(__name__)
 
@@ -31,6 +40,16 @@ ALLOWED_VIDEO_EXTENSIONS = ['.mp4', '.webm', '.mov']
 MAX_VIDEO_SIZE = 100 * 1024 * 1024  # 100MB
 MAX_VIDEO_DURATION = 300  # 5 minutes in seconds
 
+# Moderation frames are taken at these fractions of the duration
+FRAME_POSITIONS = (0.25, 0.50, 0.75)
+# Longest side of extracted frames (Vision uses 'low' detail, thumbs are 600px)
+FRAME_MAX_SIZE = 1024
+# analyze_video() results kept in-process, keyed by file hash
+VIDEO_ANALYSIS_CACHE_SIZE = 8
+
+_analysis_cache = OrderedDict()
+_analysis_cache_lock = threading.Lock()
+
 
 def check_ffmpeg_available():
     """
@@ -273,100 +292,216 @@ def validate_video(uploaded_file):
         }
 
 
-def extract_moderation_frames(video_path, num_frames=3):
+def _file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _split_jpegs(data):
+    """
+    Split concatenated JPEGs (FFmpeg image2pipe output) into images.
+
+    Walks the marker segments of each image and scans its entropy-coded
+    data for the EOI marker, so 0xFFD9 bytes inside headers are skipped.
     """
-    Extract frames from a video at evenly spaced intervals for moderation.
+    images = []
+    pos = 0
+    while True:
+        start = data.find(b'\xff\xd8', pos)
+        if start < 0:
+            return images
+        i = start + 2
+        while i + 2 <= len(data):
+            if data[i] != 0xFF:
+                return images  # Truncated or corrupt stream
+            marker = data[i + 1]
+            if marker == 0xD9:  # EOI
+                break
+            length = int.from_bytes(data[i + 2:i + 4], 'big')
+            i += 2 + length
+            if marker == 0xDA:  # SOS: entropy-coded data up to the next marker
+                while i + 1 < len(data) and not (
+                    data[i] == 0xFF and data[i + 1] not in (0x00, *range(0xD0, 0xD8))
+                ):
+                    i += 1
+        else:
+            return images
+        images.append(data[start:i + 2])
+        pos = i + 2
+
+
+def _seek_filtergraph(count):
+    """
+    Filter graph for one frame per seeked input: input k keeps its first
+    frame, scaled to at most FRAME_MAX_SIZE, and the frames are joined
+    into one stream for image2pipe.
+    """
+    scale = (
+        f"scale=w='if(gte(iw,ih),min({FRAME_MAX_SIZE},iw),-2)'"
+        f":h='if(gte(iw,ih),-2,min({FRAME_MAX_SIZE},ih))'"
+    )
+    chains = [
+        f'[{k}:v:0]trim=end_frame=1,{scale},setsar=1,setpts=PTS-STARTPTS[f{k}]'
+        for k in range(count)
+    ]
+    joined = ''.join(f'[f{k}]' for k in range(count))
+    return ';'.join(chains + [f'{joined}concat=n={count}:v=1:a=0[frames]'])
+
+
+def analyze_video(video_path, num_frames=3, thumbnail_at=None, metadata=None):
+    """
+    Probe a video and extract its moderation frames in one FFmpeg run.
 
-    Extracts frames at 25%, 50%, and 75% of the video duration for NSFW
-    moderation analysis. Uses FFmpeg for frame extraction.
+    Frames at FRAME_POSITIONS of the duration (and optionally one at
+    thumbnail_at seconds) are read in a single FFmpeg invocation with one
+    input-seeked (-ss before -i) input per timestamp, so each frame only
+    decodes from the nearest keyframe instead of from the start of the
+    video. They are scaled to at most FRAME_MAX_SIZE and returned as
+    in-memory JPEGs. Results are cached per file content, so analysing
+    the same bytes again costs no subprocess.
 
     Args:
         video_path: Path to the video file (string or Path object)
-        num_frames: Number of frames to extract (default: 3)
+        num_frames: Number of moderation frames (default: 3)
+        thumbnail_at: Also extract the frame at this many seconds
+            (clamped to the video's midpoint for short videos)
+        metadata: get_video_metadata() result if already known; skips
+            the probe
 
     Returns:
-        list: List of paths to extracted frame images (JPEG format)
-              Returns empty list if extraction fails.
+        dict: {
+            'metadata': get_video_metadata() dict,
+            'frames': list of JPEG bytes (may be shorter than num_frames
+                      if FFmpeg could not decode some positions),
+            'frame_times': list of float seconds for each frame,
+            'thumbnail_frame': JPEG bytes or None,
+        }
 
-    Note:
-        Caller is responsible for cleaning up the temporary frame files.
-        Use a try/finally block to ensure cleanup.
+    Raises:
+        ValidationError: If the video cannot be probed or no frames could
+            be extracted
     """
     video_path = str(video_path)
-    frame_paths = []
 
     if not os.path.exists(video_path):
-        logger.error(f"Video file not found for frame extraction: {video_path}")
-        return []
+        raise ValidationError(f"Video file not found: {video_path}")
 
-    try:
-        # Get video duration
-        metadata = get_video_metadata(video_path)
-        duration = metadata.get('duration', 0)
-
-        if duration <= 0:
-            logger.error(f"Invalid video duration: {duration}")
-            return []
-
-        # Calculate timestamps at 25%, 50%, 75% of video duration
-        # This gives good coverage of the video content
-        percentages = [0.25, 0.50, 0.75]
-        timestamps = [duration * p for p in percentages[:num_frames]]
-
-        for i, ts in enumerate(timestamps):
-            # Create temp file for frame
-            fd, output_path = tempfile.mkstemp(suffix=f'_frame_{i}.jpg')
-            os.close(fd)
-
-            # Convert timestamp to FFmpeg format (seconds)
-            ts_str = f"{ts:.3f}"
-
-            cmd = [
-                'ffmpeg',
-                '-y',  # Overwrite output
-                '-ss', ts_str,  # Seek to timestamp
-                '-i', video_path,  # Input file
-                '-vframes', '1',  # Extract single frame
-                '-q:v', '2',  # High quality JPEG
-                output_path
-            ]
-
-            subprocess.run(  # nosec B603 B607
-                cmd,
-                capture_output=True,
-                text=True,
-                timeout=30
-            )
+    cache_key = (_file_sha256(video_path), num_frames, thumbnail_at)
+    with _analysis_cache_lock:
+        if cache_key in _analysis_cache:
+            _analysis_cache.move_to_end(cache_key)
+            logger.info("Reusing video analysis for identical file")
+            return _analysis_cache[cache_key]
 
-            # Check if frame was created successfully
-            if os.path.exists(output_path) and os.path.getsize(output_path) > 0:
-                frame_paths.append(output_path)
-                logger.debug(f"Extracted frame {i + 1} at {ts:.2f}s: {output_path}")
-            else:
-                logger.warning(f"Failed to extract frame {i + 1} at {ts:.2f}s")
-                # Clean up any partial file
-                if os.path.exists(output_path):
-                    os.remove(output_path)
-
-        logger.info(f"Extracted {len(frame_paths)}/{num_frames} frames from video")
-        return frame_paths
+    if metadata is None:
+        metadata = get_video_metadata(video_path)
+    duration = metadata.get('duration', 0)
+    if duration <= 0:
+        raise ValidationError(f"Invalid video duration: {duration}")
+
+    frame_times = [duration * p for p in FRAME_POSITIONS[:num_frames]]
+    requested = list(frame_times)
+    if thumbnail_at is not None:
+        thumbnail_at = min(thumbnail_at, duration / 2)
+        requested.append(thumbnail_at)
+    times = sorted(set(round(ts, 3) for ts in requested))
+
+    cmd = ['ffmpeg', '-hide_banner']
+    for ts in times:
+        cmd += ['-ss', f'{ts:.3f}', '-i', video_path]  # Seek before decoding
+    cmd += [
+        '-filter_complex', _seek_filtergraph(len(times)),
+        '-map', '[frames]',
+        '-vsync', 'vfr',  # One output image per input frame
+        '-frames:v', str(len(times)),
+        '-f', 'image2pipe',
+        '-c:v', 'mjpeg',
+        '-q:v', '2',  # High quality JPEG
+        'pipe:1',
+    ]
 
+    try:
+        result = subprocess.run(  # nosec B603 B607
+            cmd,
+            capture_output=True,
+            timeout=60
+        )
     except subprocess.TimeoutExpired:
         logger.error("FFmpeg frame extraction timed out")
-        # Clean up any extracted frames on timeout
-        for path in frame_paths:
-            if os.path.exists(path):
-                os.remove(path)
-        return []
-    except ValidationError:
-        raise
+        raise ValidationError("Video processing timed out")
+
+    images = _split_jpegs(result.stdout)
+    if not images:
+        logger.error(f"FFmpeg extracted no frames (exit {result.returncode})")
+        raise ValidationError("Could not extract frames from video")
+    # Images come out in input (time) order; a seek past the last
+    # decodable frame yields nothing, which can only drop the latest times
+    by_time = dict(zip(times, images))
+
+    frames, actual_times = [], []
+    for ts in frame_times:
+        image = by_time.get(round(ts, 3))
+        if image is not None:
+            frames.append(image)
+            actual_times.append(round(ts, 3))
+    thumbnail_frame = by_time.get(round(thumbnail_at, 3)) if thumbnail_at is not None else None
+
+    logger.info(f"Extracted {len(frames)}/{num_frames} frames from video in one pass")
+    analysis = {
+        'metadata': metadata,
+        'frames': frames,
+        'frame_times': actual_times,
+        'thumbnail_frame': thumbnail_frame,
+    }
+    with _analysis_cache_lock:
+        _analysis_cache[cache_key] = analysis
+        while len(_analysis_cache) > VIDEO_ANALYSIS_CACHE_SIZE:
+            _analysis_cache.popitem(last=False)
+    return analysis
+
+
+def make_thumbnail(frame, size='600x600'):
+    """
+    Crop-to-fill thumbnail from an extracted JPEG frame.
+
+    Same framing as extract_thumbnail()'s scale+crop filter, without
+    another FFmpeg run.
+
+    Args:
+        frame: JPEG bytes (from analyze_video)
+        size: Output size as 'WIDTHxHEIGHT'
+
+    Returns:
+        bytes: JPEG thumbnail
+
+    Raises:
+        ValidationError: If size is malformed or the frame is unreadable
+    """
+    try:
+        width, height = (int(v) for v in size.split('x'))
+    except (ValueError, AttributeError):
+        raise ValidationError(f"Invalid size format: {size}. Use 'WIDTHxHEIGHT'")
+
+    try:
+        with Image.open(BytesIO(frame)) as image:
+            scale = max(width / image.width, height / image.height)
+            resized = image.convert('RGB').resize(
+                (max(width, round(image.width * scale)), max(height, round(image.height * scale))),
+                Image.Resampling.LANCZOS,
+            )
+        left = (resized.width - width) // 2
+        top = (resized.height - height) // 2
+        output = BytesIO()
+        resized.crop((left, top, left + width, top + height)).save(
+            output, 'JPEG', quality=90,
+        )
+        return output.getvalue()
     except Exception as e:
-        logger.error(f"Error extracting moderation frames: {e}")
-        # Clean up any extracted frames on error
-        for path in frame_paths:
-            if os.path.exists(path):
-                os.remove(path)
-        return []
+        logger.error(f"Error making thumbnail: {e}")
+        raise ValidationError(f"Error extracting thumbnail: {str(e)}")
 
 
 def extract_thumbnail(video_path, output_path, timestamp='00:00:01', size='600x600'):
@@ -0,0 +1,317 @@
+"""
+Prompt View Rollup Service for PromptFinder.
+
+PromptView stores one row per viewer per prompt. Left alone that table
+grows without bound, and every leaderboard / trending / profile query
+re-aggregates it. This module keeps a daily PromptViewDaily rollup and
+answers all view-count questions from it:
+
+- Days up to the rollup *watermark* (the last rolled-up UTC day) are
+  read from PromptViewDaily (small indexed range scans).
+- Days after the watermark (normally just today) are read from the raw
+  PromptView rows, which have not been rolled up yet.
+- A window starting mid-day reads rollups from the first full day after
+  its start, and the partial first day from raw rows. Once that day's raw
+  rows are past the retention window they may have been compacted, so
+  such long windows count the whole first day from its rollup instead
+  (over by at most the part of that day before the window starts).
+
+Raw rows older than the retention window (settings.PROMPT_VIEW_RETENTION_DAYS)
+are compacted away once their day is rolled up. Because PromptView dedupes
+with get_or_create, a viewer whose raw row was compacted is counted again
+if they return — the dedupe window becomes the retention window.
+
+Scheduled via: python manage.py rollup_prompt_views (Heroku Scheduler, daily)
+"""
+
+import logging
+from time import monotonic
+from datetime import datetime, time, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, IntegerField, Max, OuterRef, Q, Subquery, Sum, Value
+from django.db.models.functions import Coalesce, TruncDate
+from django.utils import timezone
+
+from prompts.constants import DEFAULT_VIEW_RETENTION_DAYS
+
+logger = logging.getLogger(__name__)
+
+# Per-process memo of the watermark: (watermark, expires_at monotonic).
+# A stale value is safe because rollup reads are capped at the watermark;
+# days after it are simply counted from raw rows.
+WATERMARK_TTL = 300  # 5 minutes
+_watermark_memo = None
+
+COMPACT_BATCH_SIZE = 5000
+
+
+def _day_start(day):
+    """Return the aware UTC datetime at midnight of ``day``."""
+    return datetime.combine(day, time.min, tzinfo=dt_timezone.utc)
+
+
+def get_rollup_watermark():
+    """
+    Get the last UTC day that has been rolled up into PromptViewDaily.
+
+    One indexed MAX() query per process every WATERMARK_TTL seconds.
+
+    Returns:
+        date or None if nothing has been rolled up yet
+    """
+    global _watermark_memo
+    if _watermark_memo is not None and _watermark_memo[1] > monotonic():
+        return _watermark_memo[0]
+
+    from prompts.models import PromptViewDaily
+    watermark = PromptViewDaily.objects.aggregate(last=Max('day'))['last']
+    _watermark_memo = (watermark, monotonic() + WATERMARK_TTL)
+    return watermark
+
+
+def reset_rollup_watermark():
+    """Forget the memoised watermark (after a rollup, and in tests)."""
+    global _watermark_memo
+    _watermark_memo = None
+
+
+def _retention_days():
+    return getattr(settings, 'PROMPT_VIEW_RETENTION_DAYS', DEFAULT_VIEW_RETENTION_DAYS)
+
+
+def _window(since=None):
+    """
+    Split a view window into its rollup part and its raw part.
+
+    Args:
+        since: Aware datetime lower bound, or None for all time
+
+    Returns:
+        tuple: (watermark, rollup_from_day, raw_q)
+            watermark: last rolled-up day, or None if nothing is rolled up
+            rollup_from_day: date lower bound for PromptViewDaily, or None
+            raw_q: Q selecting the raw PromptView rows to count
+    """
+    watermark = get_rollup_watermark()
+    if watermark is None:
+        return None, None, Q(viewed_at__gte=since) if since else Q()
+
+    tail_start = _day_start(watermark + timedelta(days=1))
+    if since is None:
+        return watermark, None, Q(viewed_at__gte=tail_start)
+    first_day = since.astimezone(dt_timezone.utc).date()
+    if since >= tail_start:
+        return watermark, first_day, Q(viewed_at__gte=since)  # After every rollup row
+    next_day_start = _day_start(first_day + timedelta(days=1))
+    raw_q = Q(viewed_at__gte=tail_start)
+    if since == _day_start(first_day):
+        return watermark, first_day, raw_q
+    if since < timezone.now() - timedelta(days=_retention_days()):
+        # The partial day's raw rows may be compacted: count all of it
+        return watermark, first_day, raw_q
+    raw_q |= Q(viewed_at__gte=since, viewed_at__lt=next_day_start)
+    return watermark, first_day + timedelta(days=1), raw_q
+
+
+def _rollup_filters(watermark, rollup_from_day):
+    filters = {'day__lte': watermark}
+    if rollup_from_day:
+        filters['day__gte'] = rollup_from_day
+    return filters
+
+
+def count_views(since=None, **prompt_filters):
+    """
+    Count unique views over a set of prompts, optionally within a window.
+
+    ``prompt_filters`` are lookups shared by PromptView and PromptViewDaily,
+    e.g. ``prompt=obj``, ``prompt__author=user`` or
+    ``prompt__ai_generator__iexact='midjourney'``.
+
+    Returns:
+        int: Number of unique views
+    """
+    from prompts.models import PromptView, PromptViewDaily
+
+    watermark, rollup_from_day, raw_q = _window(since)
+
+    total = PromptView.objects.filter(raw_q, **prompt_filters).count()
+
+    if watermark is not None:
+        total += PromptViewDaily.objects.filter(
+            **prompt_filters, **_rollup_filters(watermark, rollup_from_day)
+        ).aggregate(total=Sum('unique_views'))['total'] or 0
+
+    return total
+
+
+def _count_expression(group_field, outer_ref, since, extra_filters):
+    """Build the Subquery sum used by the annotate helpers below."""
+    from prompts.models import PromptView, PromptViewDaily
+
+    watermark, rollup_from_day, raw_q = _window(since)
+    lookup = {group_field: OuterRef(outer_ref), **extra_filters}
+
+    raw_qs = PromptView.objects.filter(
+        raw_q, **lookup
+    ).order_by().values(group_field).annotate(c=Count('id')).values('c')
+    expression = Coalesce(
+        Subquery(raw_qs, output_field=IntegerField()), Value(0)
+    )
+
+    if watermark is not None:
+        rollup_qs = PromptViewDaily.objects.filter(
+            **lookup, **_rollup_filters(watermark, rollup_from_day)
+        ).order_by().values(group_field).annotate(
+            s=Sum('unique_views')
+        ).values('s')
+        expression = expression + Coalesce(
+            Subquery(rollup_qs, output_field=IntegerField()), Value(0)
+        )
+
+    return expression
+
+
+def prompt_views_expression(since=None, outer_ref='pk'):
+    """
+    Annotation expression: unique views per prompt (Prompt querysets).
+
+    Usage:
+        Prompt.objects.annotate(views_count=prompt_views_expression())
+    """
+    return _count_expression('prompt', outer_ref, since, {})
+
+
+def author_views_expression(since=None, outer_ref='pk', published_only=True):
+    """
+    Annotation expression: unique views across an author's prompts
+    (User querysets).
+
+    Args:
+        since: Aware datetime lower bound, or None for all time
+        outer_ref: Field on the outer queryset holding the user id
+        published_only: Only count views on published, non-deleted prompts
+    """
+    extra = {}
+    if published_only:
+        extra = {'prompt__status': 1, 'prompt__deleted_at__isnull': True}
+    return _count_expression('prompt__author', outer_ref, since, extra)
+
+
+def rollup_views(through=None):
+    """
+    Roll up every complete UTC day after the watermark into PromptViewDaily.
+
+    Idempotent: rollup rows for the processed days are replaced, never
+    incremented, so re-running after a failure is safe.
+
+    Args:
+        through: Last day to roll up (default: yesterday, UTC)
+
+    Returns:
+        dict: {'first_day', 'last_day', 'rows'} — days are None if
+        there was nothing to roll up
+    """
+    from prompts.models import PromptView, PromptViewDaily
+
+    today = timezone.now().astimezone(dt_timezone.utc).date()
+    through = min(through or today - timedelta(days=1), today - timedelta(days=1))
+
+    # Always read the stored rows here, never the memoised watermark
+    watermark = PromptViewDaily.objects.aggregate(last=Max('day'))['last']
+    if watermark is not None:
+        first_day = watermark + timedelta(days=1)
+    else:
+        earliest = PromptView.objects.order_by('viewed_at').values_list(
+            'viewed_at', flat=True
+        ).first()
+        if earliest is None:
+            return {'first_day': None, 'last_day': None, 'rows': 0}
+        first_day = earliest.astimezone(dt_timezone.utc).date()
+
+    if first_day > through:
+        return {'first_day': None, 'last_day': None, 'rows': 0}
+
+    aggregates = PromptView.objects.filter(
+        viewed_at__gte=_day_start(first_day),
+        viewed_at__lt=_day_start(through + timedelta(days=1)),
+    ).annotate(
+        day=TruncDate('viewed_at', tzinfo=dt_timezone.utc)
+    ).order_by().values('prompt_id', 'day').annotate(
+        unique=Count('id'),
+        authenticated=Count('user'),
+    )
+
+    rows = [
+        PromptViewDaily(
+            prompt_id=row['prompt_id'],
+            day=row['day'],
+            unique_views=row['unique'],
+            authenticated_views=row['authenticated'],
+        )
+        for row in aggregates
+    ]
+
+    with transaction.atomic():
+        PromptViewDaily.objects.filter(
+            day__gte=first_day, day__lte=through
+        ).delete()
+        PromptViewDaily.objects.bulk_create(rows, batch_size=1000)
+
+    # Quiet days leave no rollup rows, so the next run re-scans them.
+    # That is harmless (the raw rows for those days are empty) and keeps
+    # the watermark derivable from the table alone.
+    reset_rollup_watermark()
+    logger.info(
+        f"[ViewRollup] Rolled up {first_day}..{through}: {len(rows)} rows"
+    )
+    return {'first_day': first_day, 'last_day': through, 'rows': len(rows)}
+
+
+def compact_views(retention_days=None, dry_run=False):
+    """
+    Delete raw PromptView rows older than the retention window.
+
+    Only rows on already rolled-up days are eligible, so counts never
+    change as a result of compaction.
+
+    Args:
+        retention_days: Days of raw rows to keep
+            (default: settings.PROMPT_VIEW_RETENTION_DAYS)
+        dry_run: Count eligible rows without deleting them
+
+    Returns:
+        int: Number of raw rows deleted (or eligible, in dry-run mode)
+    """
+    from prompts.models import PromptView, PromptViewDaily
+
+    if retention_days is None:
+        retention_days = _retention_days()
+
+    watermark = PromptViewDaily.objects.aggregate(last=Max('day'))['last']
+    if watermark is None:
+        return 0
+
+    cutoff = min(
+        timezone.now() - timedelta(days=retention_days),
+        _day_start(watermark + timedelta(days=1)),
+    )
+    eligible = PromptView.objects.filter(viewed_at__lt=cutoff)
+
+    if dry_run:
+        return eligible.count()
+
+    deleted = 0
+    while True:
+        ids = list(eligible.values_list('id', flat=True)[:COMPACT_BATCH_SIZE])
+        if not ids:
+            break
+        count, _ = PromptView.objects.filter(id__in=ids).delete()
+        deleted += count
+
+    logger.info(
+        f"[ViewRollup] Compacted {deleted} raw views older than {cutoff:%Y-%m-%d}"
+    )
+    return deleted
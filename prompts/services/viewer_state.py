@@ -0,0 +1,116 @@
+"""
+Viewer State Service for PromptFinder.
+
+Answers "has the current viewer liked / saved these cards?" for a page of
+prompts, so card grids no longer prefetch the
+full likes M2M (every liker's User row for every card) just to test
+`user in prompt.likes.all`.
+
+For a page of prompts this costs at most two indexed id__in queries:
+1. Like totals + viewer's likes (one GROUP BY on the likes through table)
+2. Prompts the viewer saved to any (non-deleted) collection
+
+Anonymous viewers only pay for query 1 (like totals).
+
+Usage:
+    prompts = attach_viewer_state(list(page_obj.object_list), request.user)
+
+    {% if prompt.viewer_liked %} ... {{ prompt.number_of_likes }}
+    {% if prompt.viewer_saved %} is-saved{% endif %}
+"""
+
+import logging
+from dataclasses import dataclass, field
+
+from django.db.models import Count, Q
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ViewerState:
+    """Viewer-relative state for a set of prompts."""
+    like_counts: dict = field(default_factory=dict)  # prompt id → total likes
+    liked_ids: frozenset = frozenset()
+    saved_ids: frozenset = frozenset()
+
+    def is_liked(self, prompt_id):
+        return prompt_id in self.liked_ids
+
+    def is_saved(self, prompt_id):
+        return prompt_id in self.saved_ids
+
+
+def get_viewer_state(user, prompts):
+    """
+    Look up viewer state for a page of prompts.
+
+    Args:
+        user: request.user (may be anonymous)
+        prompts: Iterable of Prompt instances
+
+    Returns:
+        ViewerState
+    """
+    from prompts.models import CollectionItem, Prompt
+
+    prompts = [p for p in prompts if p is not None]
+    prompt_ids = {p.pk for p in prompts}
+    if not prompt_ids:
+        return ViewerState()
+
+    authenticated = bool(user and user.is_authenticated)
+    counts = {'total': Count('id')}
+    if authenticated:
+        counts['mine'] = Count('id', filter=Q(user_id=user.pk))
+
+    rows = Prompt.likes.through.objects.filter(
+        prompt_id__in=prompt_ids,
+    ).values('prompt_id').annotate(**counts).order_by()
+
+    like_counts = dict.fromkeys(prompt_ids, 0)
+    liked_ids = set()
+    for row in rows:
+        like_counts[row['prompt_id']] = row['total']
+        if row.get('mine'):
+            liked_ids.add(row['prompt_id'])
+
+    if not authenticated:
+        return ViewerState(like_counts=like_counts)
+
+    saved_ids = CollectionItem.objects.filter(
+        collection__user_id=user.pk,
+        collection__is_deleted=False,
+        prompt_id__in=prompt_ids,
+    ).values_list('prompt_id', flat=True)
+
+    return ViewerState(
+        like_counts=like_counts,
+        liked_ids=frozenset(liked_ids),
+        saved_ids=frozenset(saved_ids),
+    )
+
+
+def attach_viewer_state(prompts, user):
+    """
+    Annotate a page of prompts in place for the card templates.
+
+    Sets on each prompt:
+        viewer_liked, viewer_saved (bool)
+        and the like total used by Prompt.number_of_likes()
+
+    Args:
+        prompts: List of Prompt instances (materialised page)
+        user: request.user
+
+    Returns:
+        The same list, for chaining
+    """
+    state = get_viewer_state(user, prompts)
+    for prompt in prompts:
+        if prompt is None:
+            continue
+        prompt.viewer_liked = state.is_liked(prompt.pk)
+        prompt.viewer_saved = state.is_saved(prompt.pk)
+        prompt._like_count = state.like_counts.get(prompt.pk, 0)
+    return prompts
@@ -26,6 +26,7 @@ import base64
 
 # Import timeout constant from central constants file (L8-TIMEOUT)
 from prompts.constants import OPENAI_TIMEOUT
+from prompts.services import image_verdicts
 from PIL import Image
 from io import BytesIO
 logger = logging.getLogger(__name__)
@@ -92,6 +93,9 @@ class VisionModerationService:
     # - critical → BLOCKED at Step 1 (rejected) - explicit nudity/pornography only
     # - high → WARNING banner shown (actual nudity but non-sexual/artistic)
     # - medium/low → APPROVED without warning (suggestive but clothed content)
+    # Model that judges MODERATION_PROMPT; stored verdicts are keyed to both
+    MODERATION_MODEL = "gpt-4o-mini"
+
     MODERATION_PROMPT = """Analyze this image for policy violations. Check for:
 - Sexual content or nudity
 - Violence or gore
@@ -214,63 +218,11 @@ Respond with JSON:
         try:
             logger.info(f"Moderating image URL: {image_url}")
 
-            # Call OpenAI Vision API
-            response = self.client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[
-                    {
-                        "role": "user",
-                        "content": [
-                            {
-                                "type": "text",
-                                "text": self.MODERATION_PROMPT
-                            },
-                            {
-                                "type": "image_url",
-                                "image_url": {
-                                    "url": image_url,
-                                    "detail": "low"
-                                }
-                            }
-                        ]
-                    }
-                ],
-                max_tokens=300,
-                temperature=0.0,
-            )
-
-            # Parse response
-            content = response.choices[0].message.content
-            logger.info(f"Vision API response: {content}")
-
-            # Parse JSON response
-            import json
-            try:
-                result = json.loads(content)
-                logger.info(f"[NSFW DEBUG] Raw parsed JSON: {result}")
-            except json.JSONDecodeError:
-                logger.warning(f"Failed to parse Vision API response as JSON: {content}")
-
-                # SECURITY: Check if this is an AI refusal to analyze explicit content
-                # AI refusals indicate content too explicit for the model to engage with
-                # Treat as REJECTED (fail-closed security pattern)
-                if _is_ai_refusal(content):
-                    logger.warning("[NSFW DEBUG] AI refused to analyze - treating as critical NSFW")
-                    result = {
-                        'flagged': True,
-                        'categories': ['ai_refusal', 'explicit_content'],
-                        'severity': 'critical',
-                        'explanation': 'Content too explicit for AI analysis - automatically rejected.',
-                    }
-                else:
-                    # Non-refusal parse error - flag for manual review (fail-closed)
-                    logger.error("[NSFW DEBUG] JSON parse error (not refusal) - flagging for review")
-                    result = {
-                        'flagged': True,
-                        'categories': ['parse_error'],
-                        'severity': 'high',
-                        'explanation': f'Unable to parse moderation response: {content[:200]}',
-                    }
+            # Already judged this (or a near-identical) image?
+            fingerprint = image_verdicts.fingerprint_url(image_url)
+            result = image_verdicts.find_moderation(fingerprint, self._verdict_policy())
+            if result is None:
+                result = self._request_image_url_verdict(image_url, fingerprint)
 
             # Map to our response format
             flagged = result.get('flagged', False)
@@ -355,12 +307,87 @@ Respond with JSON:
                 # NO explanation field - this prevents user-facing banner
             }
 
-    def moderate_visual_content(self, prompt_obj) -> Dict:
+    def _request_image_url_verdict(self, image_url: str, fingerprint) -> Dict:
+        """
+        Ask the Vision API to judge an image URL.
+
+        Returns the parsed verdict (flagged/categories/severity/explanation).
+        Parsed verdicts are stored against the image fingerprint; refusals
+        and unparseable responses are not.
+        """
+        # Call OpenAI Vision API
+        response = self.client.chat.completions.create(
+            model=self.MODERATION_MODEL,
+            messages=[
+                {
+                    "role": "user",
+                    "content": [
+                        {
+                            "type": "text",
+                            "text": self.MODERATION_PROMPT
+                        },
+                        {
+                            "type": "image_url",
+                            "image_url": {
+                                "url": image_url,
+                                "detail": "low"
+                            }
+                        }
+                    ]
+                }
+            ],
+            max_tokens=300,
+            temperature=0.0,
+        )
+
+        # Parse response
+        content = response.choices[0].message.content
+        logger.info(f"Vision API response: {content}")
+
+        # Parse JSON response
+        import json
+        try:
+            result = json.loads(content)
+            logger.info(f"[NSFW DEBUG] Raw parsed JSON: {result}")
+            image_verdicts.store_moderation(fingerprint, self._verdict_policy(), result)
+        except json.JSONDecodeError:
+            logger.warning(f"Failed to parse Vision API response as JSON: {content}")
+
+            # SECURITY: Check if this is an AI refusal to analyze explicit content
+            # AI refusals indicate content too explicit for the model to engage with
+            # Treat as REJECTED (fail-closed security pattern)
+            if _is_ai_refusal(content):
+                logger.warning("[NSFW DEBUG] AI refused to analyze - treating as critical NSFW")
+                result = {
+                    'flagged': True,
+                    'categories': ['ai_refusal', 'explicit_content'],
+                    'severity': 'critical',
+                    'explanation': 'Content too explicit for AI analysis - automatically rejected.',
+                }
+            else:
+                # Non-refusal parse error - flag for manual review (fail-closed)
+                logger.error("[NSFW DEBUG] JSON parse error (not refusal) - flagging for review")
+                result = {
+                    'flagged': True,
+                    'categories': ['parse_error'],
+                    'severity': 'high',
+                    'explanation': f'Unable to parse moderation response: {content[:200]}',
+                }
+
+        return result
+
+    def _verdict_policy(self) -> str:
+        """Key of stored verdicts judged with this prompt and model."""
+        return image_verdicts.moderation_policy(self.MODERATION_PROMPT, self.MODERATION_MODEL)
+
+    def moderate_visual_content(self, prompt_obj, refresh_verdicts: bool = False) -> Dict:
         """
         Moderate image or video content synchronously using OpenAI Vision.
 
         Args:
             prompt_obj: Prompt model instance with featured_image or featured_video
+            refresh_verdicts: Ask the API even if a stored verdict exists,
+                and store the fresh one (re-moderation normally reuses it)
 
         Returns:
             Dict with:
@@ -411,47 +438,67 @@ Respond with JSON:
 
             logger.info(f"Moderating {media_type} for Prompt {prompt_obj.id}: {image_url}")
 
-            # Call OpenAI Vision API
-            response = self.client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[
-                    {
-                        "role": "user",
-                        "content": [
-                            {
-                                "type": "text",
-                                "text": self.MODERATION_PROMPT
-                            },
-                            {
-                                "type": "image_url",
-                                "image_url": {
-                                    "url": image_url,
-                                    "detail": "low"  # Lower cost, faster response
+            # Already judged this (or a near-identical) image? Video frame
+            # URLs are extracted per run, so only images are fingerprinted.
+            fingerprint = None
+            if media_type == 'image':
+                fingerprint = image_verdicts.fingerprint_url(image_url)
+            result = None
+            if not refresh_verdicts:
+                result = image_verdicts.find_moderation(fingerprint, self._verdict_policy())
+            if result is not None:
+                api_details = {'reused_verdict': True}
+            else:
+                # Call OpenAI Vision API
+                response = self.client.chat.completions.create(
+                    model=self.MODERATION_MODEL,
+                    messages=[
+                        {
+                            "role": "user",
+                            "content": [
+                                {
+                                    "type": "text",
+                                    "text": self.MODERATION_PROMPT
+                                },
+                                {
+                                    "type": "image_url",
+                                    "image_url": {
+                                        "url": image_url,
+                                        "detail": "low"  # Lower cost, faster response
+                                    }
                                 }
-                            }
-                        ]
-                    }
-                ],
-                max_tokens=300,
-                temperature=0.0,  # Deterministic responses
-            )
+                            ]
+                        }
+                    ],
+                    max_tokens=300,
+                    temperature=0.0,  # Deterministic responses
+                )
 
-            # Parse response
-            content = response.choices[0].message.content
-            logger.info(f"Vision API response for Prompt {prompt_obj.id}: {content}")
+                # Parse response
+                content = response.choices[0].message.content
+                logger.info(f"Vision API response for Prompt {prompt_obj.id}: {content}")
 
-            # Parse JSON response
-            import json
-            try:
-                result = json.loads(content)
-            except json.JSONDecodeError:
-                # Fallback if model doesn't return valid JSON
-                logger.error(f"Failed to parse Vision API response as JSON: {content}")
-                result = {
-                    'flagged': False,
-                    'categories': [],
-                    'severity': 'low',
-                    'explanation': content
+                # Parse JSON response
+                import json
+                try:
+                    result = json.loads(content)
+                    image_verdicts.store_moderation(fingerprint, self._verdict_policy(), result)
+                except json.JSONDecodeError:
+                    # Fallback if model doesn't return valid JSON
+                    logger.error(f"Failed to parse Vision API response as JSON: {content}")
+                    result = {
+                        'flagged': False,
+                        'categories': [],
+                        'severity': 'low',
+                        'explanation': content
+                    }
+                api_details = {
+                    'model': response.model,
+                    'usage': {
+                        'prompt_tokens': response.usage.prompt_tokens,
+                        'completion_tokens': response.usage.completion_tokens,
+                        'total_tokens': response.usage.total_tokens,
+                    },
                 }
 
             # Map to our response format
@@ -496,12 +543,7 @@ Respond with JSON:
                 'severity': severity,
                 'confidence_score': confidence,
                 'raw_response': {
-                    'model': response.model,
-                    'usage': {
-                        'prompt_tokens': response.usage.prompt_tokens,
-                        'completion_tokens': response.usage.completion_tokens,
-                        'total_tokens': response.usage.total_tokens,
-                    },
+                    **api_details,
                     'result': result,
                     'media_type': media_type,
                 },
@@ -721,7 +763,7 @@ Respond with JSON:
         logger.info(f"Extracted video frame URL from ID: {frame_url}")
         return frame_url
 
-    def moderate_video_frames(self, frame_paths: List[str], user_prompt: str = "") -> Dict:
+    def moderate_video_frames(self, frames: List, user_prompt: str = "") -> Dict:
         """
         Moderate video using multiple extracted frames.
 
@@ -729,7 +771,8 @@ Respond with JSON:
         severity, the entire video is rejected.
 
         Args:
-            frame_paths: List of paths to extracted frame images (from extract_moderation_frames)
+            frames: JPEG frames as bytes (from video_processor.analyze_video)
+                or paths to frame image files
             user_prompt: Optional user-provided prompt text for context
 
         Returns:
@@ -744,8 +787,8 @@ Respond with JSON:
                 - tags: list (if safe)
                 - best_thumbnail_frame: int (1, 2, or 3)
         """
-        if not frame_paths:
-            logger.warning("No frame paths provided for video moderation")
+        if not frames:
+            logger.warning("No frames provided for video moderation")
             return {
                 'is_safe': False,
                 'status': 'rejected',
@@ -765,10 +808,14 @@ Respond with JSON:
             ]
 
             # Add each frame as base64-encoded image
-            for i, frame_path in enumerate(frame_paths):
+            for i, frame in enumerate(frames):
                 try:
-                    with open(frame_path, 'rb') as f:
-                        frame_data = base64.b64encode(f.read()).decode('utf-8')
+                    if isinstance(frame, (bytes, bytearray)):
+                        frame_bytes = frame
+                    else:
+                        with open(frame, 'rb') as f:
+                            frame_bytes = f.read()
+                    frame_data = base64.b64encode(frame_bytes).decode('utf-8')
 
                     content.append({
                         "type": "image_url",
@@ -1,13 +1,25 @@
 """
 Signal handlers for the prompts app.
 
-Handles automatic creation of UserProfile and EmailPreferences instances
-for new and existing users.
+Handlers, grouped by section below:
+- User: auto-create UserProfile and EmailPreferences
+- Prompt hard delete: remove Cloudinary and B2 assets
+- Cache dependencies: bump the surrogate keys of cached entries
+  (prompts/utils/cache_dependencies.py) when prompts, comments, follows,
+  likes, tags or SiteSettings change
+- Profanity: drop the cached word list and compiled matchers when a
+  ProfanityWord changes
+- Profile stats: keep the snapshot counters (prompts/services/profile_stats.py)
+  in step with prompts, follows and likes
+- Text index: re-sign a prompt's content for the near-duplicate text
+  index (prompts/services/text_duplicates.py)
+
+Like (M2M through) and taggit handlers need concrete senders and are
+connected by connect_cache_dependency_signals(), called from apps.py.
 
 IMPLEMENTATION NOTE:
-- Uses signal handlers to auto-create related models
-- Only creates for newly created users (created=True)
-- Uses get_or_create() for backward compatibility
+- Profiles are created only for new users (created=True), with
+  get_or_create() for backward compatibility
 - Avoids infinite loops by never calling save() in post_save signals
 
 163-B: Cloudinary avatar cleanup handlers removed (Option A). B2
@@ -233,3 +245,205 @@ def delete_cloudinary_assets(sender, instance, **kwargs):
                 f"(signal): {e}",
                 exc_info=True
             )
+
+
+# ==============================================================
+# Cache dependency invalidation (prompts/utils/cache_dependencies.py).
+# Cached entries declare surrogate keys (prompt:<id>, user:<id>,
+# tag:<name>, leaderboard, site_settings); these receivers bump them.
+# ==============================================================
+
+# Prompt fields that move a prompt on or off the leaderboards
+LEADERBOARD_PROMPT_FIELDS = frozenset({'status', 'deleted_at', 'author'})
+
+
+@receiver(post_save, sender='prompts.Prompt')
+@receiver(post_delete, sender='prompts.Prompt')
+def invalidate_caches_on_prompt_change(sender, instance, **kwargs):
+    """A prompt's detail data and its author's listings/stats are stale."""
+    from prompts.utils import cache_dependencies
+    keys = [
+        cache_dependencies.prompt_key(instance.pk),
+        cache_dependencies.user_key(instance.author_id),
+    ]
+    update_fields = kwargs.get('update_fields')
+    if update_fields is None or LEADERBOARD_PROMPT_FIELDS & set(update_fields):
+        keys.append(cache_dependencies.LEADERBOARD)
+    cache_dependencies.invalidate(*keys)
+
+
+@receiver(post_save, sender='prompts.Comment')
+@receiver(post_delete, sender='prompts.Comment')
+def invalidate_caches_on_comment_change(sender, instance, **kwargs):
+    """
+    Comments change the prompt's approved count, the shared comment page
+    and the commenter's overlay.
+    """
+    from prompts.services.prompt_detail import refresh_approved_comment_counts
+    from prompts.utils import cache_dependencies
+    refresh_approved_comment_counts([instance.prompt_id])
+    cache_dependencies.invalidate(
+        cache_dependencies.prompt_key(instance.prompt_id),
+        cache_dependencies.user_key(instance.author_id),
+    )
+
+
+@receiver(post_save, sender='prompts.Follow')
+@receiver(post_delete, sender='prompts.Follow')
+def invalidate_caches_on_follow_change(sender, instance, **kwargs):
+    """Follower/following counts, the follower's overlay and leaderboards."""
+    from prompts.utils import cache_dependencies
+    cache_dependencies.invalidate(
+        cache_dependencies.user_key(instance.follower_id),
+        cache_dependencies.user_key(instance.following_id),
+        cache_dependencies.LEADERBOARD,
+    )
+
+
+@receiver(post_save, sender='prompts.SiteSettings')
+def invalidate_caches_on_site_settings_change(sender, instance, **kwargs):
+    """SiteSettings.get_settings() is cached for a day."""
+    from prompts.utils import cache_dependencies
+    cache_dependencies.invalidate(cache_dependencies.SITE_SETTINGS)
+
+
+@receiver(post_save, sender='prompts.ProfanityWord')
+@receiver(post_delete, sender='prompts.ProfanityWord')
+def invalidate_caches_on_profanity_word_change(sender, instance, **kwargs):
+    """The cached word list and every process's compiled matchers."""
+    from prompts.services.profanity_filter import invalidate_word_list
+    invalidate_word_list()
+
+
+# Set by pre_clear on the instance whose likes are cleared: the other
+# side's pks, which post_clear does not receive (pk_set is None)
+CLEARED_LIKES_ATTR = '_cleared_like_pks'
+
+
+def _invalidate_caches_on_like(sender, instance, action, reverse, pk_set, **kwargs):
+    """Likes change the shared like count and the liker's overlay."""
+    if action == 'pre_clear':
+        if reverse:
+            cleared = sender.objects.filter(user_id=instance.pk).values_list('prompt_id', flat=True)
+        else:
+            cleared = sender.objects.filter(prompt_id=instance.pk).values_list('user_id', flat=True)
+        setattr(instance, CLEARED_LIKES_ATTR, list(cleared))
+        return
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    from prompts.utils import cache_dependencies
+    if action == 'post_clear':
+        pk_set = instance.__dict__.pop(CLEARED_LIKES_ATTR, ())
+    pks = list(pk_set or ())
+    if reverse:
+        # user.prompt_likes.add(...) — instance is the user
+        prompt_ids, user_ids = pks, [instance.pk]
+    else:
+        prompt_ids, user_ids = [instance.pk], pks
+    cache_dependencies.invalidate(
+        *(cache_dependencies.prompt_key(pk) for pk in prompt_ids),
+        *(cache_dependencies.user_key(pk) for pk in user_ids),
+    )
+
+
+def _invalidate_caches_on_tags(sender, instance, **kwargs):
+    """Tag edits change the prompt's ordered tag list and the tag's listings."""
+    from django.contrib.contenttypes.models import ContentType
+    from taggit.models import Tag
+    from prompts.models import Prompt
+    from prompts.utils import cache_dependencies
+    # get_for_id is served from ContentType's in-process cache
+    content_type = ContentType.objects.get_for_id(instance.content_type_id)
+    if content_type.model_class() is not Prompt:
+        return
+    keys = [cache_dependencies.prompt_key(instance.object_id)]
+    try:
+        keys.append(cache_dependencies.tag_key(instance.tag.name))
+    except Tag.DoesNotExist:
+        pass  # Tag itself is being deleted
+    cache_dependencies.invalidate(*keys)
+
+
+# ==============================================================
+# Profile stats snapshot counters (prompts/services/profile_stats.py).
+# Views and ranks are refreshed with the leaderboards instead.
+# ==============================================================
+
+@receiver(post_save, sender='prompts.Prompt')
+@receiver(post_delete, sender='prompts.Prompt')
+def update_profile_stats_on_prompt_change(sender, instance, **kwargs):
+    """Publishing, trashing or deleting a prompt changes the author's counts."""
+    update_fields = kwargs.get('update_fields')
+    if update_fields is None or LEADERBOARD_PROMPT_FIELDS & set(update_fields):
+        from prompts.services import profile_stats
+        profile_stats.recount([instance.author_id])
+
+
+@receiver(post_save, sender='prompts.Follow')
+def update_profile_stats_on_follow(sender, instance, created, **kwargs):
+    if created:
+        from prompts.services import profile_stats
+        profile_stats.adjust(instance.following_id, follower_count=1)
+        profile_stats.adjust(instance.follower_id, following_count=1)
+
+
+@receiver(post_delete, sender='prompts.Follow')
+def update_profile_stats_on_unfollow(sender, instance, **kwargs):
+    from prompts.services import profile_stats
+    profile_stats.adjust(instance.following_id, follower_count=-1)
+    profile_stats.adjust(instance.follower_id, following_count=-1)
+
+
+def _update_profile_stats_on_like(sender, instance, action, reverse, pk_set, **kwargs):
+    """
+    Likes received by the prompt's author. prompt.likes.add() adjusts the
+    counter in place (Django only reports rows actually added); removes
+    and clears recount, since their pk_set may name rows that were never
+    there. A reverse clear is left to the scheduled refresh.
+    """
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    from prompts.models import Prompt
+    from prompts.services import profile_stats
+    if reverse:
+        author_ids = Prompt.all_objects.filter(
+            pk__in=pk_set or (),
+        ).values_list('author_id', flat=True)
+        profile_stats.recount(author_ids)
+    elif action == 'post_add':
+        if pk_set and instance.status == 1 and instance.deleted_at is None:
+            profile_stats.adjust(instance.author_id, likes_received=len(pk_set))
+    else:
+        profile_stats.recount([instance.author_id])
+
+
+# ==============================================================
+# Prompt-text near-duplicate index (prompts/services/text_duplicates.py)
+# ==============================================================
+
+@receiver(post_save, sender='prompts.Prompt')
+def index_prompt_text(sender, instance, raw=False, **kwargs):
+    """New or edited content gets a fresh MinHash signature."""
+    update_fields = kwargs.get('update_fields')
+    if raw or (update_fields is not None and 'content' not in update_fields):
+        return
+    from prompts.services import text_duplicates
+    text_duplicates.record_prompt_text(instance.pk, instance.content)
+
+
+def connect_cache_dependency_signals():
+    """
+    Connect signals that need concrete senders (M2M through, taggit).
+    Called from apps.py ready().
+    """
+    from django.db.models.signals import m2m_changed
+    from taggit.models import TaggedItem
+    from prompts.models import Prompt
+    m2m_changed.connect(
+        _invalidate_caches_on_like, sender=Prompt.likes.through,
+    )
+    m2m_changed.connect(
+        _update_profile_stats_on_like, sender=Prompt.likes.through,
+    )
+    post_save.connect(_invalidate_caches_on_tags, sender=TaggedItem)
+    post_delete.connect(_invalidate_caches_on_tags, sender=TaggedItem)
@@ -30,6 +30,10 @@ from django.db.models import F, Q
 from django.urls import reverse
 from django.utils.text import slugify
 
+# Tag rule tables live in prompts/constants.py and are compiled once by
+# prompts/utils/tag_normalizer.py; the prompt templates list some of them
+from prompts.constants import ALLOWED_AI_TAGS, BANNED_AI_TAGS, BANNED_ETHNICITY
+
 logger = logging.getLogger(__name__)
 
 # Cache TTL for NSFW moderation results (1 hour)
@@ -321,6 +325,20 @@ def test_task(message: str = "Hello from Django-Q!") -> str:
     return f"Task completed: {message}"
 
 
+def drain_notification_outbox() -> int:
+    """
+    Turn queued NotificationEvent rows into notifications.
+
+    Scheduled by prompts.services.notification_outbox after a social action
+    commits; at most one is queued at a time.
+
+    Returns:
+        Number of events processed
+    """
+    from prompts.services.notification_outbox import drain
+    return drain()
+
+
 def placeholder_nsfw_moderation(image_url: str, prompt_id: int) -> dict:
     """
     Placeholder for background NSFW moderation task.
@@ -436,6 +454,15 @@ def _call_openai_vision(
             return {'error': f'Image download failed: {image_url}'}
 
         image_data, media_type = image_result
+
+        # Same picture already analysed with the same inputs?
+        from prompts.services import image_verdicts
+        fingerprint = image_verdicts.fingerprint_base64(image_data)
+        context = image_verdicts.analysis_context(prompt_text, ai_generator, available_tags)
+        cached = image_verdicts.find_analysis(fingerprint, context)
+        if cached is not None:
+            return cached
+
         image_content = {
             "type": "image_url",
             "image_url": {
@@ -462,8 +489,9 @@ def _call_openai_vision(
 
         # Parse and validate the response
         content = response.choices[0].message.content
-        result = _parse_ai_response(content)
-        return _validate_ai_result(result)
+        result = _validate_ai_result(_parse_ai_response(content))
+        image_verdicts.store_analysis(fingerprint, context, result)
+        return result
 
     except (APITimeoutError, APIConnectionError) as e:
         logger.warning(f"[AI Generation] OpenAI API timeout/connection error: {e}")
@@ -473,12 +501,13 @@ def _call_openai_vision(
         return {'error': f"OpenAI API error: {str(e)}"}
 
 
-def _validate_and_fix_tags(tags, prompt_id=None):  # noqa: C901 — tag validation requires complex branching
+def _validate_and_fix_tags(tags, prompt_id=None):
     """
     Post-process AI-generated tags to enforce all tag rules.
 
     Checks: compound splitting, lowercase, AI tag removal, ethnicity removal,
-    deduplication, tag count enforcement, and gender pair warnings.
+    deduplication, tag count enforcement, and gender pair warnings. The rules
+    are compiled once in prompts/utils/tag_normalizer.py.
 
     Args:
         tags: List of tag strings from AI API response.
@@ -487,139 +516,34 @@ def _validate_and_fix_tags(tags, prompt_id=None):  # noqa: C901 — tag validati
     Returns:
         List of validated, cleaned tag strings.
     """
-    def _should_split_compound(compound_tag):
-        """Only split if the compound contains filler/stop words or single-char parts."""
-        if compound_tag in PRESERVE_DESPITE_STOP_WORDS:
-            return False
-        if compound_tag in PRESERVE_SINGLE_CHAR_COMPOUNDS:
-            return False
-        parts = compound_tag.split('-')
-        if len(parts) < 2:
-            return False
-        for part in parts:
-            if part in SPLIT_THESE_WORDS:
-                return True
-            if len(part) <= 1:
-                return True
-        return False
-
-    log_prefix = f"[Tag Validator] Prompt {prompt_id}" if prompt_id else "[Tag Validator]"
-    validated = []
+    return _validate_and_fix_tags_batch([tags], [prompt_id])[0]
 
-    for tag in tags:
-        tag = str(tag).strip()
-        if not tag:
-            continue
 
-        # Check 2: Lowercase enforcement
-        if tag != tag.lower():
-            logger.info(f"{log_prefix} Lowercased: '{tag}' -> '{tag.lower()}'")
-            tag = tag.lower()
-
-        def _is_banned(t):
-            """Check if a tag part is banned (ethnicity or AI)."""
-            if t in BANNED_ETHNICITY:
-                logger.info(f"{log_prefix} Removed ethnicity tag: '{t}'")
-                return True
-            if t in ALLOWED_AI_TAGS:
-                return False
-            if t in BANNED_AI_TAGS or t.startswith('ai-'):
-                logger.info(f"{log_prefix} Removed AI tag: '{t}'")
-                return True
-            return False
-
-        # Handle tags with spaces (e.g., "Modern Architecture" -> split)
-        if ' ' in tag:
-            parts = [p.strip() for p in tag.split() if p.strip()]
-            logger.info(f"{log_prefix} Split space-separated: '{tag}' -> {parts}")
-            for part in parts:
-                if not _is_banned(part):
-                    validated.append(part)
-            continue
-
-        # Check 3: AI tag removal (whole tag)
-        if tag not in ALLOWED_AI_TAGS and (tag in BANNED_AI_TAGS or tag.startswith('ai-')):
-            logger.info(f"{log_prefix} Removed AI tag: '{tag}'")
-            continue
-
-        # Check 4: Ethnicity tag removal (whole tag)
-        if tag in BANNED_ETHNICITY:
-            logger.info(f"{log_prefix} Removed ethnicity tag: '{tag}'")
-            continue
-
-        # Check 1: Compound tag handling (preserve by default)
-        if '-' in tag:
-            parts = [p.strip() for p in tag.split('-') if p.strip()]
-
-            # If any part is a banned term, split and filter
-            has_banned_part = any(
-                p in BANNED_ETHNICITY or (p not in ALLOWED_AI_TAGS and (p in BANNED_AI_TAGS or p.startswith('ai-')))
-                for p in parts
-            )
-            if has_banned_part:
-                clean_parts = [p for p in parts if not _is_banned(p)]
-                if clean_parts:
-                    logger.info(f"{log_prefix} Split compound with banned part: '{tag}' -> {clean_parts}")
-                    validated.extend(clean_parts)
-                continue
-
-            # Split only if compound contains stop/filler words
-            if _should_split_compound(tag):
-                clean_parts = [p for p in parts if p not in SPLIT_THESE_WORDS and len(p) > 1]
-                logger.info(f"{log_prefix} Split stop-word compound: '{tag}' -> {clean_parts}")
-                validated.extend(clean_parts)
-                continue
+def _validate_and_fix_tags_batch(tag_lists, prompt_ids=None):
+    """
+    _validate_and_fix_tags() for many prompts at once.
 
-            # Default: preserve the compound tag
-            validated.append(tag)
-            continue
+    Args:
+        tag_lists: One list of tag strings per prompt.
+        prompt_ids: Optional prompt IDs (same order) for logging context.
 
-        validated.append(tag)
+    Returns:
+        One list of validated tags per input list.
+    """
+    from prompts.utils.tag_normalizer import normalizer
 
-    # Check 5: Deduplicate (preserve order)
-    seen = set()
-    deduped = []
-    for tag in validated:
-        if tag not in seen:
-            seen.add(tag)
-            deduped.append(tag)
-        else:
-            logger.info(f"{log_prefix} Removed duplicate: '{tag}'")
-
-    # Check 6: Enforce tag count = 10
-    if len(deduped) > 10:
-        logger.info(f"{log_prefix} Trimmed from {len(deduped)} to 10 tags")
-        deduped = deduped[:10]
-    elif len(deduped) < 10:
-        logger.warning(f"{log_prefix} Only {len(deduped)} tags after validation (expected 10)")
-
-    # Check 7: Move demographic tags to end for consistent UX
-    # Within demographics, "male"/"female" go last (after man/woman/middle-aged/etc.)
-    content_tags = [t for t in deduped if t not in DEMOGRAPHIC_TAGS]
-    demo_other = [t for t in deduped if t in DEMOGRAPHIC_TAGS and t not in GENDER_LAST_TAGS]
-    demo_gender = [t for t in deduped if t in GENDER_LAST_TAGS]
-    deduped = content_tags + demo_other + demo_gender
-
-    # Check 8: Gender pair warnings (log only, no auto-fix)
-    tag_set = set(deduped)
-    if 'man' in tag_set and 'male' not in tag_set:
-        logger.warning(f"{log_prefix} Gender pair incomplete: 'man' without 'male'")
-    if 'woman' in tag_set and 'female' not in tag_set:
-        logger.warning(f"{log_prefix} Gender pair incomplete: 'woman' without 'female'")
-    if 'male' in tag_set and 'man' not in tag_set and 'boy' not in tag_set and 'teen-boy' not in tag_set:
-        logger.warning(f"{log_prefix} Gender pair incomplete: 'male' without 'man'/'boy'/'teen-boy'")
-    if 'female' in tag_set and 'woman' not in tag_set and 'girl' not in tag_set and 'teen-girl' not in tag_set:
-        logger.warning(f"{log_prefix} Gender pair incomplete: 'female' without 'woman'/'girl'/'teen-girl'")
-    if 'girl' in tag_set and 'female' not in tag_set:
-        logger.warning(f"{log_prefix} Gender pair incomplete: 'girl' without 'female'")
-    if 'boy' in tag_set and 'male' not in tag_set:
-        logger.warning(f"{log_prefix} Gender pair incomplete: 'boy' without 'male'")
-    if 'teen-boy' in tag_set and 'male' not in tag_set:
-        logger.warning(f"{log_prefix} Gender pair incomplete: 'teen-boy' without 'male'")
-    if 'teen-girl' in tag_set and 'female' not in tag_set:
-        logger.warning(f"{log_prefix} Gender pair incomplete: 'teen-girl' without 'female'")
-
-    return deduped
+    results = normalizer.normalize_many(tag_lists)
+    if prompt_ids is None:
+        prompt_ids = [None] * len(results)
+    log_changes = logger.isEnabledFor(logging.INFO)
+    for prompt_id, result in zip(prompt_ids, results):
+        log_prefix = f"[Tag Validator] Prompt {prompt_id}" if prompt_id else "[Tag Validator]"
+        # One line per prompt rather than one per changed tag
+        if result.notes and log_changes:
+            logger.info(f"{log_prefix} {'; '.join(result.notes)}")
+        for warning in result.warnings:
+            logger.warning(f"{log_prefix} {warning}")
+    return [result.tags for result in results]
 
 
 # Generic tags that indicate OpenAI couldn't properly analyze the image.
@@ -724,65 +648,6 @@ TAG RULES — FOLLOW EXACTLY:
      "the-big-house" (contains filler words), "running-fast" (not a search term)
    If a hyphenated tag fails this check, split it into separate tags."""
 
-# =============================================================================
-# TAG VALIDATION CONSTANTS
-# =============================================================================
-# Used by _validate_and_fix_tags() to enforce tag quality rules.
-# Module-level for performance (not re-created per call) and testability.
-# Note: The original ACCEPTABLE_COMPOUNDS whitelist (32 entries) was replaced by
-# preserve-by-default logic in Session 80. See SPLIT_THESE_WORDS below.
-
-# Words that are NEVER meaningful as part of a compound tag.
-# If a hyphenated tag contains any of these, split it.
-SPLIT_THESE_WORDS = {
-    'the', 'a', 'an', 'in', 'on', 'at', 'to', 'for', 'of', 'with', 'by',
-    'and', 'or', 'but', 'is', 'are', 'was', 'were', 'be', 'been',
-    'very', 'really', 'just', 'also', 'some', 'any', 'this', 'that',
-    'big', 'small', 'good', 'bad', 'nice', 'great',
-}
-
-# Compounds containing stop words that are still legitimate terms.
-PRESERVE_DESPITE_STOP_WORDS = {
-    'depth-of-field',
-}
-
-# Hyphenated words with single-character parts that are real words/terms.
-# Without this, the single-char check in _should_split_compound() would split them.
-PRESERVE_SINGLE_CHAR_COMPOUNDS = {
-    'x-ray', 'x-rays',
-    '3d-render', '3d-photo', '3d-effect', '3d-model', '3d-art',
-    'k-pop',
-    'e-commerce', 'e-sports',
-    'j-pop',
-    't-shirt', 't-shirts',
-}
-
-# Demographic/gender tags that should appear at the END of the tag list for UX.
-# Users see descriptive, content-specific tags first; standard demographic tags last.
-# This is display ordering only — no SEO impact.
-DEMOGRAPHIC_TAGS = {
-    'man', 'male', 'woman', 'female',
-    'boy', 'girl', 'teen-boy', 'teen-girl',
-    'child', 'kid', 'baby', 'infant',
-    'teenager', 'teen', 'person', 'couple',
-}
-
-# Within DEMOGRAPHIC_TAGS, these go last (after man/woman/middle-aged/etc.).
-# "male" and "female" are generic gender identifiers — less visually descriptive,
-# so they display after the more specific demographic terms.
-GENDER_LAST_TAGS = {'male', 'female'}
-
-# Tags that should never appear (AI-related tags waste slots)
-BANNED_AI_TAGS = {
-    'ai-art', 'ai-generated', 'ai-prompt', 'ai-colorize',
-}
-
-# AI-prefixed tags that ARE legitimate search terms (exceptions to startswith('ai-') ban).
-# These represent real product categories and high-traffic search queries.
-ALLOWED_AI_TAGS = {
-    'ai-influencer', 'ai-avatar', 'ai-headshot', 'ai-girlfriend', 'ai-boyfriend',
-}
-
 # Tags with proven standalone search traffic that Pass 2 should NEVER remove.
 # These are category-level terms that catch broad searches.
 # Includes compound tags that must never be broken apart.
@@ -799,15 +664,6 @@ PROTECTED_TAGS = {
     'interior-design', 'fantasy-art',
 }
 
-# Ethnicity terms banned from tags (belong in title/description/descriptors only)
-BANNED_ETHNICITY = {
-    'caucasian', 'african-american', 'asian', 'hispanic', 'latino', 'latina',
-    'black', 'white', 'european', 'african', 'middle-eastern', 'arab',
-    'south-asian', 'east-asian', 'southeast-asian', 'pacific-islander',
-    'indigenous', 'native-american', 'mixed-race', 'biracial', 'multiracial',
-    'ethnicity',
-}
-
 
 def _is_quality_tag_response(tags: list, prompt_id: int = None) -> bool:
     """
@@ -995,11 +851,11 @@ def _is_safe_image_url(url: str) -> bool:
         return False
 
 
-def _download_and_encode_image(url: str) -> Optional[Tuple[str, str]]:
+def _download_image(url: str) -> Optional[Tuple[bytes, str]]:
     """
-    Download image and encode as base64 with security validations.
+    Download an image with security validations.
 
-    Returns tuple of (base64_data, media_type) or None on failure.
+    Returns tuple of (image_bytes, media_type) or None on failure.
     Includes URL allowlist validation and size limits.
     """
     # Security: Validate URL is from allowed domain
@@ -1042,13 +898,26 @@ def _download_and_encode_image(url: str) -> Optional[Tuple[str, str]]:
                     logger.warning("[AI Generation] Image exceeded max size during download")
                     return None
 
-            return (base64.b64encode(content).decode('utf-8'), media_type)
+            return (bytes(content), media_type)
 
     except Exception as e:
-        logger.warning(f"[AI Generation] Failed to download image for base64 encoding: {e}")
+        logger.warning(f"[AI Generation] Failed to download image: {e}")
         return None
 
 
+def _download_and_encode_image(url: str) -> Optional[Tuple[str, str]]:
+    """
+    Download image and encode as base64 with security validations.
+
+    Returns tuple of (base64_data, media_type) or None on failure.
+    """
+    downloaded = _download_image(url)
+    if not downloaded:
+        return None
+    content, media_type = downloaded
+    return (base64.b64encode(content).decode('utf-8'), media_type)
+
+
 def _build_analysis_prompt(prompt_text: str, ai_generator: str, available_tags: list) -> str:
     """
     Build the prompt for OpenAI Vision API.
@@ -2000,70 +1869,96 @@ def rename_prompt_files_for_seo(prompt_id: int) -> dict:  # noqa: C901 — SEO r
             )
             results[field_name] = {'success': False, 'error': str(e)}
 
-    # Rename/move image variants (original, thumb, medium, large, webp).
-    # Group fields by current URL — bulk-gen prompts use the same physical file
-    # for all four fields as fallbacks. Process each unique file once, then handle
-    # mirror fields appropriately per path type.
-    image_fields = ['b2_image_url', 'b2_thumb_url', 'b2_medium_url', 'b2_large_url']
-    url_to_fields: dict = {}
-    for field_name in image_fields:
-        old_url = getattr(prompt, field_name, None)
-        if old_url:
-            url_to_fields.setdefault(old_url, []).append(field_name)
-
-    for old_url, sharing_fields in url_to_fields.items():
-        primary_field = sharing_fields[0]
-        ext = _get_extension(old_url)
-        _rename_or_move_field(primary_field, generate_seo_filename(prompt.title, ext))
-        new_url = getattr(prompt, primary_field)
-        if new_url != old_url:
-            # All sharing fields used the same physical file — mirror the new URL to
-            # each without an additional B2 operation.  For bulk-gen, the primary field
-            # (b2_image_url) was moved to large/; mirror fields (b2_thumb_url,
-            # b2_medium_url, b2_large_url) point to the same file so they also get the
-            # large/ URL.  Separate variant files are out of scope for this phase.
-            mirror_fields_to_save = []
-            for mirror_field in sharing_fields[1:]:
-                setattr(prompt, mirror_field, new_url)
-                mirror_fields_to_save.append(mirror_field)
-                updated_fields.append(mirror_field)
-                results[mirror_field] = {
-                    'success': True, 'new_url': new_url, 'mirrored': True
-                }
-            if mirror_fields_to_save:
-                prompt.save(update_fields=mirror_fields_to_save)
-
-    # For bulk-gen prompts: check if the job prefix is now empty.
-    # move_file already deleted the source file for this prompt.  Other files in
-    # bulk-gen/{job_id}/ belong to sibling prompts from the same job that have not
-    # yet been renamed — do NOT delete them here.  Only clean up if the prefix is
-    # genuinely empty (i.e., this was the last prompt in the job to be renamed).
-    if is_bulk_gen and bulk_gen_prefix:
-        try:
-            check = service.client.list_objects_v2(
-                Bucket=service.bucket, Prefix=bulk_gen_prefix, MaxKeys=1
-            )
-            if check.get('KeyCount', 0) == 0:
-                logger.info(
-                    "[SEO Rename] Bulk-gen prefix '%s' is now empty",
-                    bulk_gen_prefix,
+    def _rename_image_files():
+        """Rename/move image variants (original, thumb, medium, large, webp)."""
+        # Group fields by current URL — bulk-gen prompts use the same physical file
+        # for all four fields as fallbacks. Process each unique file once, then handle
+        # mirror fields appropriately per path type.
+        image_fields = ['b2_image_url', 'b2_thumb_url', 'b2_medium_url', 'b2_large_url']
+        url_to_fields: dict = {}
+        for field_name in image_fields:
+            old_url = getattr(prompt, field_name, None)
+            if old_url:
+                url_to_fields.setdefault(old_url, []).append(field_name)
+
+        for old_url, sharing_fields in url_to_fields.items():
+            primary_field = sharing_fields[0]
+            ext = _get_extension(old_url)
+            _rename_or_move_field(primary_field, generate_seo_filename(prompt.title, ext))
+            new_url = getattr(prompt, primary_field)
+            if new_url != old_url:
+                # All sharing fields used the same physical file — mirror the new URL to
+                # each without an additional B2 operation.  For bulk-gen, the primary field
+                # (b2_image_url) was moved to large/; mirror fields (b2_thumb_url,
+                # b2_medium_url, b2_large_url) point to the same file so they also get the
+                # large/ URL.  Separate variant files are out of scope for this phase.
+                mirror_fields_to_save = []
+                for mirror_field in sharing_fields[1:]:
+                    setattr(prompt, mirror_field, new_url)
+                    mirror_fields_to_save.append(mirror_field)
+                    updated_fields.append(mirror_field)
+                    results[mirror_field] = {
+                        'success': True, 'new_url': new_url, 'mirrored': True
+                    }
+                if mirror_fields_to_save:
+                    prompt.save(update_fields=mirror_fields_to_save)
+
+        # For bulk-gen prompts: check if the job prefix is now empty.
+        # move_file already deleted the source file for this prompt.  Other files in
+        # bulk-gen/{job_id}/ belong to sibling prompts from the same job that have not
+        # yet been renamed — do NOT delete them here.  Only clean up if the prefix is
+        # genuinely empty (i.e., this was the last prompt in the job to be renamed).
+        if is_bulk_gen and bulk_gen_prefix:
+            try:
+                check = service.client.list_objects_v2(
+                    Bucket=service.bucket, Prefix=bulk_gen_prefix, MaxKeys=1
                 )
-            else:
-                logger.info(
-                    "[SEO Rename] Bulk-gen prefix '%s' still has %d file(s); "
-                    "other prompts in this job may not be renamed yet — skipping cleanup",
-                    bulk_gen_prefix, check.get('KeyCount', 0),
+                if check.get('KeyCount', 0) == 0:
+                    logger.info(
+                        "[SEO Rename] Bulk-gen prefix '%s' is now empty",
+                        bulk_gen_prefix,
+                    )
+                else:
+                    logger.info(
+                        "[SEO Rename] Bulk-gen prefix '%s' still has %d file(s); "
+                        "other prompts in this job may not be renamed yet — skipping cleanup",
+                        bulk_gen_prefix, check.get('KeyCount', 0),
+                    )
+            except Exception as e:
+                # Non-blocking — cleanup check failure must not affect task outcome
+                logger.warning(
+                    "[SEO Rename] Bulk-gen prefix check failed for '%s': %s",
+                    bulk_gen_prefix, e,
                 )
-        except Exception as e:
-            # Non-blocking — cleanup check failure must not affect task outcome
-            logger.warning(
-                "[SEO Rename] Bulk-gen prefix check failed for '%s': %s",
-                bulk_gen_prefix, e,
-            )
 
-    # WebP variant always uses .webp extension
-    if prompt.b2_webp_url:
-        _rename_or_move_field('b2_webp_url', generate_seo_filename(prompt.title, 'webp'))
+        # WebP variant always uses .webp extension
+        if prompt.b2_webp_url:
+            _rename_or_move_field('b2_webp_url', generate_seo_filename(prompt.title, 'webp'))
+
+    # Deduplicated uploads (MediaBlob): files other owners also reference
+    # keep their names; a sole owner's moved files are recorded on the blob.
+    from prompts.services.b2_upload_service import lock_image_blob, record_blob_urls
+
+    with lock_image_blob(prompt.b2_image_url) as image_blob:
+        others = (
+            image_blob.references.exclude(prompt_id=prompt_id).count()
+            if image_blob is not None else 0
+        )
+        if others:
+            logger.info(
+                "[SEO Rename] Prompt %s shares its image with %d other owner(s), "
+                "keeping file names", prompt_id, others,
+            )
+        else:
+            _rename_image_files()
+            if image_blob is not None:
+                record_blob_urls(image_blob, {
+                    'original': prompt.b2_image_url,
+                    'thumb': prompt.b2_thumb_url,
+                    'medium': prompt.b2_medium_url,
+                    'large': prompt.b2_large_url,
+                    'webp': prompt.b2_webp_url,
+                })
 
     # Rename video file
     if prompt.b2_video_url:
@@ -2792,6 +2687,8 @@ def _apply_generation_result(job, image, result, tz, cost_per_image=None):
         image.save(update_fields=[
             'status', 'image_url', 'revised_prompt', 'completed_at',
         ])
+        from prompts.services.near_duplicates import record_generated_image
+        record_generated_image(image.id, result.image_data)
 
         # SRC-6: Download and upload source image to B2 if provided
         if image.source_image_url:
@@ -3633,6 +3530,10 @@ def create_prompt_pages_from_job(job_id, selected_image_ids):  # noqa: C901 —
                 skipped += 1
                 continue
 
+            # Near-duplicate index: the page shows the generated image
+            from prompts.services.near_duplicates import record_prompt_from_generated
+            record_prompt_from_generated(prompt_page.pk, gen_image.id)
+
             # Queue SEO rename task outside atomic block (non-blocking)
             try:
                 from django_q.tasks import async_task
@@ -3908,6 +3809,10 @@ def publish_prompt_pages_from_job(job_id, selected_image_ids):  # noqa: C901
                 skipped_count += 1
                 continue
 
+            # Near-duplicate index: the page shows the generated image
+            from prompts.services.near_duplicates import record_prompt_from_generated
+            record_prompt_from_generated(prompt_page.pk, gen_image.id)
+
             # Queue SEO rename task outside atomic block (non-blocking)
             try:
                 from django_q.tasks import async_task
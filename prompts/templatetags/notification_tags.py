@@ -1,22 +1,31 @@
 from django import template
-from django.db.models import Max
 
 from prompts.models import Notification
-from prompts.services.notifications import (
-    get_unread_count,
-    get_unread_count_by_category,
-)
+from prompts.services.notifications import get_notification_counts
 
 register = template.Library()
 
 
+def _notification_counts(context):
+    """
+    Unread counters for the current user, read once per request and
+    shared by both tags below. None for anonymous users.
+    """
+    request = context.get('request')
+    if not request or not request.user.is_authenticated:
+        return None
+    counts = getattr(request, '_notification_counts', None)
+    if counts is None:
+        counts = get_notification_counts(request.user)
+        request._notification_counts = counts
+    return counts
+
+
 @register.simple_tag(takes_context=True)
 def unread_notification_count(context):
     """Returns unread notification count for the current user."""
-    request = context.get('request')
-    if request and request.user.is_authenticated:
-        return get_unread_count(request.user)
-    return 0
+    counts = _notification_counts(context)
+    return counts['total'] if counts else 0
 
 
 @register.simple_tag(takes_context=True)
@@ -26,20 +35,13 @@ def sorted_notification_categories(context):
     Categories with notifications appear first (by recency desc),
     then categories with no notifications in default order.
     """
-    request = context.get('request')
-    if not request or not request.user.is_authenticated:
+    counts = _notification_counts(context)
+    if not counts:
         return []
 
-    # Get most recent notification date per category
-    category_recency = dict(
-        Notification.objects.filter(recipient=request.user)
-        .values('category')
-        .annotate(latest=Max('created_at'))
-        .values_list('category', 'latest')
-    )
-
-    # Get unread counts per category
-    counts = get_unread_count_by_category(request.user)
+    # Most recent notification date and unread count per category
+    category_recency = counts['latest']
+    unread = counts['by_category']
 
     # Build category list with all categories
     default_order = ['comments', 'likes', 'follows', 'collections', 'system']
@@ -50,7 +52,7 @@ def sorted_notification_categories(context):
         categories.append({
             'value': cat,
             'label': labels.get(cat, cat.title()),
-            'count': counts.get(cat, 0),
+            'count': unread.get(cat, 0),
             'latest': category_recency.get(cat),
         })
 
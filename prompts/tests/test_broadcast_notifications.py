@@ -0,0 +1,169 @@
+"""
+Tests for broadcast system notifications (one row per blast to everyone).
+
+Covers the broadcasts section of prompts/services/notifications.py, its
+merge into the system feed and unread counts, and the broadcast
+read/click/delete endpoints.
+"""
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from prompts.models import BroadcastNotification, BroadcastReceipt, Notification
+from prompts.services import notifications as service
+
+
+class BroadcastServiceTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.alice = User.objects.create_user('alice', 'alice@example.com', 'pass')
+        self.bob = User.objects.create_user('bob', 'bob@example.com', 'pass')
+
+    def _send(self, message='Hello everyone', **kwargs):
+        service.create_system_notification(message, audience='all', **kwargs)
+        return BroadcastNotification.objects.get(title=message)
+
+    def _system_count(self, user=None):
+        counts = service.get_notification_counts(user or self.alice)
+        return counts['by_category']['system']
+
+    def test_send_writes_one_row_whatever_the_audience_size(self):
+        for i in range(20):
+            User.objects.create_user(f'user{i}', password='pass')
+        with CaptureQueriesContext(connection) as queries:
+            result = service.create_system_notification('Hi', audience='all')
+        self.assertEqual(result['count'], 22)
+        inserted = [
+            q['sql'].split()[2].strip('"') for q in queries.captured_queries
+            if q['sql'].startswith('INSERT')
+        ]
+        self.assertEqual(
+            [table for table in inserted if table.startswith('prompts_')],
+            ['prompts_broadcastnotification'],
+        )
+        self.assertFalse(Notification.objects.exists())
+        self.assertFalse(BroadcastReceipt.objects.exists())
+
+    def test_broadcast_counts_for_existing_users_only(self):
+        self._send()
+        late = User.objects.create_user('late', password='pass')
+        self.assertEqual(self._system_count(), 1)
+        self.assertEqual(self._system_count(self.bob), 1)
+        self.assertEqual(self._system_count(late), 0)
+
+    def test_send_invalidates_cached_counts(self):
+        self.assertEqual(self._system_count(), 0)
+        self._send()
+        self.assertEqual(self._system_count(), 1)
+
+    def test_read_is_per_user(self):
+        broadcast = self._send()
+        self.assertTrue(service.mark_broadcast_read(broadcast.pk, self.alice))
+        self.assertTrue(service.mark_broadcast_read(broadcast.pk, self.alice))  # idempotent
+        self.assertEqual(self._system_count(), 0)
+        self.assertEqual(self._system_count(self.bob), 1)
+        self.assertEqual(BroadcastReceipt.objects.count(), 1)
+
+    def test_mark_all_and_delete_all(self):
+        self._send('First')
+        self._send('Second')
+        self.assertEqual(service.mark_all_as_read(self.alice, category='likes'), 0)
+        self.assertEqual(self._system_count(), 2)
+        self.assertEqual(service.mark_all_as_read(self.alice), 2)
+        self.assertEqual(self._system_count(), 0)
+
+        self.assertEqual(service.delete_all_notifications(self.alice, category='system'), 2)
+        self.assertFalse(service.visible_broadcasts(self.alice).exists())
+        self.assertEqual(service.visible_broadcasts(self.bob).count(), 2)
+
+    def test_expiry_time_drops_broadcast_from_counts(self):
+        soon = timezone.now() + timedelta(minutes=5)
+        self._send(expires_at=soon)
+        counts = service.get_notification_counts(self.alice)
+        self.assertEqual(counts['by_category']['system'], 1)
+        self.assertEqual(counts['next_expiry'], soon)
+
+        later = soon + timedelta(seconds=1)
+        with mock.patch('prompts.services.notifications.timezone.now', return_value=later):
+            self.assertEqual(self._system_count(), 0)
+
+    def test_expire_and_delete_batch(self):
+        broadcast = self._send()
+        self._system_count()
+        self.assertEqual(service.expire_system_notification_batch(broadcast.batch_id), 2)
+        self.assertEqual(self._system_count(), 0)
+        self.assertEqual(service.get_system_notification_batches(), [])
+
+        self.assertEqual(service.delete_system_notification_batch(broadcast.batch_id), 2)
+        self.assertFalse(BroadcastNotification.objects.exists())
+
+    def test_batches_report_reads_from_receipts(self):
+        broadcast = self._send()
+        service.mark_broadcast_read(broadcast.pk, self.alice)
+        batch, = service.get_system_notification_batches()
+        self.assertEqual(batch['batch_id'], broadcast.batch_id)
+        self.assertEqual(batch['recipient_count'], 2)
+        self.assertEqual(batch['read_count'], 1)
+        self.assertEqual(batch['read_percentage'], 50)
+
+    def test_system_feed_merges_broadcasts_by_date(self):
+        now = timezone.now()
+        self.alice.date_joined = now - timedelta(hours=1)
+        self.alice.save(update_fields=['date_joined'])
+        for minutes, title in [(30, 'Old direct'), (10, 'New direct')]:
+            note = Notification.objects.create(
+                recipient=self.alice, notification_type='system', category='system',
+                title=title, is_admin_notification=True,
+            )
+            Notification.objects.filter(pk=note.pk).update(
+                created_at=now - timedelta(minutes=minutes),
+            )
+        broadcast = self._send('Broadcast')
+        BroadcastNotification.objects.filter(pk=broadcast.pk).update(
+            created_at=now - timedelta(minutes=20),
+        )
+
+        page, has_more = service.get_notification_feed(self.alice, 'system', 0, 2)
+        self.assertEqual([n.title for n in page], ['New direct', 'Broadcast'])
+        self.assertTrue(has_more)
+        page, has_more = service.get_notification_feed(self.alice, 'system', 2, 2)
+        self.assertEqual([n.title for n in page], ['Old direct'])
+        self.assertFalse(has_more)
+
+
+class BroadcastEndpointTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.alice = User.objects.create_user('alice', 'alice@example.com', 'pass')
+        service.create_system_notification('Big news', audience='all')
+        self.broadcast = BroadcastNotification.objects.get()
+        self.client.force_login(self.alice)
+
+    def test_feed_renders_broadcast_ids(self):
+        response = self.client.get(reverse('prompts:notifications') + '?category=system')
+        self.assertContains(response, 'Big news')
+        self.assertContains(response, f'data-notification-id="broadcast-{self.broadcast.pk}"')
+
+    def test_read_click_and_delete(self):
+        url = f'/api/notifications/broadcast-{self.broadcast.pk}/read/'
+        self.assertEqual(self.client.post(url).status_code, 200)
+        self.assertEqual(service.get_unread_count(self.alice), 0)
+
+        self.client.post(f'/api/notifications/broadcast-{self.broadcast.pk}/click/')
+        self.broadcast.refresh_from_db()
+        self.assertEqual(self.broadcast.click_count, 1)
+
+        response = self.client.post(f'/notifications/delete/broadcast-{self.broadcast.pk}/')
+        self.assertEqual(response.json()['status'], 'ok')
+        response = self.client.get(reverse('prompts:notifications') + '?category=system')
+        self.assertNotContains(response, 'Big news')
+        self.assertEqual(self.client.post(url).status_code, 404)
@@ -0,0 +1,223 @@
+"""
+Tests for pipelined bulk moderation.
+
+Covers ModerationOrchestrator.bulk_moderate_prompts, the moderate_prompts
+management command that drives it, and prompts/utils/rate_limiter.py.
+The OpenAI text and Vision services are mocked.
+"""
+import threading
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import SimpleTestCase, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from prompts.management.commands.moderate_prompts import get_run_checkpoint
+from prompts.models import ContentFlag, ModerationLog, Prompt
+from prompts.services.orchestrator import ModerationOrchestrator
+from prompts.utils.rate_limiter import RateLimiter
+
+APPROVED_TEXT = {'status': 'approved', 'is_safe': True, 'raw_response': {'flagged_details': []}}
+APPROVED_VISION = {'status': 'approved', 'is_safe': True, 'raw_response': {}}
+
+
+class BulkModerationTestBase(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.author = User.objects.create_user('author', 'author@example.com', 'pass')
+        self.prompts = [
+            Prompt.objects.create(
+                title=f'Prompt {i}', slug=f'prompt-{i}', content='A calm lake',
+                author=self.author, status=0, moderation_status='pending',
+                b2_image_url=f'https://media.example.com/{i}.jpg',
+            )
+            for i in range(5)
+        ]
+        patcher = mock.patch.multiple(
+            'prompts.services.orchestrator',
+            OpenAIModerationService=mock.DEFAULT,
+            VisionModerationService=mock.DEFAULT,
+        )
+        services = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.text = services['OpenAIModerationService'].return_value
+        self.vision = services['VisionModerationService'].return_value
+        self.text.moderate_prompt.return_value = APPROVED_TEXT
+        self.vision.moderate_visual_content.return_value = APPROVED_VISION
+        self.orchestrator = ModerationOrchestrator()
+
+    def _bulk(self, **kwargs):
+        kwargs.setdefault('requests_per_second', 0)
+        return self.orchestrator.bulk_moderate_prompts(**kwargs)
+
+
+class BulkModerationTests(BulkModerationTestBase):
+
+    def test_text_and_vision_calls_overlap(self):
+        # Each call waits for the other half of its pair; sequential
+        # execution would break the barrier and flag the prompt
+        barrier = threading.Barrier(2, timeout=5)
+
+        def text(prompt):
+            barrier.wait()
+            return APPROVED_TEXT
+
+        def vision(prompt, refresh_verdicts=False):
+            barrier.wait()
+            return APPROVED_VISION
+
+        self.text.moderate_prompt.side_effect = text
+        self.vision.moderate_visual_content.side_effect = vision
+        stats = self._bulk(prompts=self.prompts[:1], workers=2)
+        self.assertEqual(stats['approved'], 1)
+
+    def test_rate_limit_charged_per_request_not_per_text(self):
+        with mock.patch('prompts.services.orchestrator.RateLimiter') as limiter_class:
+            stats = self._bulk(requests_per_second=5)
+        limiter = limiter_class.return_value
+        self.assertEqual(stats['approved'], 5)
+        # Vision calls take a token each; text checks are charged by the
+        # batcher once per shared request
+        self.assertEqual(limiter.acquire.call_count, 5)
+        self.text.batching.assert_called_once_with(limiter=limiter)
+
+    def test_logs_written_in_one_batch(self):
+        with CaptureQueriesContext(connection) as queries:
+            stats = self._bulk()
+        self.assertEqual(stats['total_processed'], 5)
+        self.assertEqual(stats['approved'], 5)
+        log_inserts = [
+            q for q in queries.captured_queries
+            if q['sql'].startswith('INSERT INTO "prompts_moderationlog"')
+        ]
+        self.assertEqual(len(log_inserts), 1)
+        self.assertEqual(ModerationLog.objects.count(), 15)
+        self.assertFalse(Prompt.objects.filter(moderation_status='pending').exists())
+
+    def test_outcomes_match_single_prompt_moderation(self):
+        flagged = {
+            'status': 'rejected',
+            'flagged_categories': ['violence/graphic'],
+            'raw_response': {'flagged_details': [
+                {'category': 'violence/graphic', 'confidence': 0.9, 'severity': 'critical'},
+            ]},
+        }
+        self.text.moderate_prompt.side_effect = (
+            lambda prompt: flagged if prompt.pk == self.prompts[2].pk else APPROVED_TEXT
+        )
+        self.vision.moderate_visual_content.side_effect = RuntimeError('timeout')
+        seen = []
+        stats = self._bulk(on_result=lambda prompt, result: seen.append(prompt.pk))
+
+        self.assertEqual(seen, [p.pk for p in self.prompts])
+        self.assertEqual((stats['rejected'], stats['flagged']), (1, 4))
+        rejected = Prompt.objects.get(pk=self.prompts[2].pk)
+        self.assertEqual((rejected.moderation_status, rejected.status), ('rejected', 0))
+        self.assertEqual(ContentFlag.objects.get().category, 'violence/graphic')
+        self.assertEqual(
+            ModerationLog.objects.filter(service='openai_vision', notes='timeout').count(), 5,
+        )
+
+    def test_forced_remoderation_reuses_stored_verdicts(self):
+        prompt = self.prompts[0]
+        Prompt.objects.filter(pk=prompt.pk).update(moderation_status='approved')
+        prompt.refresh_from_db()
+        self.orchestrator.moderate_prompt(prompt, force=True)
+        self.vision.moderate_visual_content.assert_called_once_with(
+            prompt, refresh_verdicts=False,
+        )
+
+    def test_skips_finished_and_checkpointed_prompts(self):
+        Prompt.objects.filter(pk=self.prompts[0].pk).update(moderation_status='approved')
+        started = timezone.now() - timedelta(minutes=5)
+        Prompt.objects.filter(pk=self.prompts[1].pk).update(
+            moderation_completed_at=timezone.now(),
+        )
+        stats = self._bulk(prompts=Prompt.objects.all(), completed_since=started)
+        self.assertEqual(stats['skipped'], 1)
+        self.assertEqual(stats['total_processed'], 3)
+        self.assertEqual(self.text.moderate_prompt.call_count, 3)
+
+
+class ModeratePromptsCommandTests(BulkModerationTestBase):
+
+    def test_interrupted_all_run_resumes(self):
+        Prompt.objects.update(moderation_status='approved')
+        apply_status = ModerationOrchestrator._apply_overall_status
+        saved = []
+
+        def fail_second_batch(orchestrator, prompt, overall_result):
+            if len(saved) == 3:
+                raise RuntimeError('database went away')
+            saved.append(prompt.pk)
+            apply_status(orchestrator, prompt, overall_result)
+
+        # Batches of 3: the first is saved, the second fails to write
+        with mock.patch(
+            'prompts.services.orchestrator.BULK_MODERATION_WRITE_BATCH', 3,
+        ), mock.patch.object(
+            ModerationOrchestrator, '_apply_overall_status', fail_second_batch,
+        ):
+            call_command('moderate_prompts', '--all', '--rate', '0', stdout=StringIO())
+        self.assertIsNotNone(get_run_checkpoint())
+        cache.clear()  # the checkpoint must survive cache eviction
+
+        out = StringIO()
+        call_command('moderate_prompts', '--all', '--resume', '--rate', '0', stdout=out)
+        self.assertIn('2 prompts left', out.getvalue())
+        self.assertEqual(self.text.moderate_prompt.call_count, 7)
+        self.assertIsNone(get_run_checkpoint())
+
+    def test_all_reuses_stored_verdicts_unless_refreshed(self):
+        Prompt.objects.update(moderation_status='approved')
+        call_command('moderate_prompts', '--all', '--rate', '0', stdout=StringIO())
+        self.assertEqual(
+            {call.kwargs['refresh_verdicts'] for call in self.vision.moderate_visual_content.call_args_list},
+            {False},
+        )
+
+        self.vision.moderate_visual_content.reset_mock()
+        call_command(
+            'moderate_prompts', '--all', '--refresh-verdicts', '--rate', '0', stdout=StringIO(),
+        )
+        self.assertEqual(
+            {call.kwargs['refresh_verdicts'] for call in self.vision.moderate_visual_content.call_args_list},
+            {True},
+        )
+
+    def test_resume_without_checkpoint_says_so(self):
+        out = StringIO()
+        call_command('moderate_prompts', '--all', '--resume', '--rate', '0', stdout=out)
+        self.assertIn('No unfinished --all run recorded', out.getvalue())
+        self.assertEqual(self.text.moderate_prompt.call_count, 5)
+
+
+class RateLimiterTests(SimpleTestCase):
+
+    @mock.patch('prompts.utils.rate_limiter.time')
+    def test_waits_for_next_token(self, mock_time):
+        clock = [100.0]
+        mock_time.monotonic.side_effect = lambda: clock[0]
+
+        def sleep(seconds):
+            clock[0] += seconds
+        mock_time.sleep.side_effect = sleep
+
+        limiter = RateLimiter(requests_per_second=2)
+        for _ in range(4):
+            limiter.acquire()
+        # Burst of 2 immediately, then one token every half second
+        self.assertAlmostEqual(clock[0], 101.0)
+
+    def test_zero_rate_never_waits(self):
+        with mock.patch('prompts.utils.rate_limiter.time.sleep') as sleep:
+            for _ in range(100):
+                RateLimiter(0).acquire()
+        sleep.assert_not_called()
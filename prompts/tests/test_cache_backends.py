@@ -0,0 +1,116 @@
+"""
+Tests for the two-tier cache backend.
+
+Covers prompts/cache_backends.TieredCache: L1 hits, cross-process
+invalidation via generation stamps, per-key L1 bypass and pass-through
+mode. A second TieredCache instance over the same L2 alias stands in for
+another web process.
+"""
+from django.core.cache import caches
+from django.test import SimpleTestCase, override_settings
+
+from prompts.cache_backends import TieredCache
+
+
+def _tiered_caches(**options):
+    return {
+        'default': {
+            'BACKEND': 'prompts.cache_backends.TieredCache',
+            'LOCATION': 'shared',
+            'TIMEOUT': 300,
+            'OPTIONS': {
+                'L1_MAX_ENTRIES': 100,
+                'L1_TIMEOUT': 30,
+                'VERSION_CHECK_INTERVAL': 0,
+                'L1_BYPASS_PREFIXES': ['rl:'],
+                **options,
+            },
+        },
+        'shared': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'tiered-cache-tests',
+        },
+    }
+
+
+class TieredCacheTests(SimpleTestCase):
+    """Behaviour of the L1/L2 split."""
+
+    def setUp(self):
+        self.override = override_settings(CACHES=_tiered_caches())
+        self.override.enable()
+        self.cache = caches['default']
+        self.l2 = caches['shared']
+        self.cache.clear()
+
+    def tearDown(self):
+        self.cache.clear()
+        self.override.disable()
+
+    def _other_process(self, **options):
+        params = _tiered_caches(**options)['default']
+        return TieredCache(params['LOCATION'], params)
+
+    def test_reads_are_served_from_l1(self):
+        self.cache.set('site_settings', {'auto_approve': True})
+        # Remove from L2 behind the backend's back: L1 still answers
+        self.l2.delete('site_settings')
+        self.assertEqual(self.cache.get('site_settings'), {'auto_approve': True})
+
+    def test_l1_returns_copies(self):
+        self.cache.set('tags', ['a'])
+        self.cache.get('tags').append('b')
+        self.assertEqual(self.cache.get('tags'), ['a'])
+
+    def test_writes_in_another_process_invalidate_l1(self):
+        other = self._other_process()
+        self.cache.set('leaderboard', [1, 2])
+        self.assertEqual(other.get('leaderboard'), [1, 2])
+
+        self.cache.set('leaderboard', [3])
+        self.assertEqual(other.get('leaderboard'), [3])
+
+        self.cache.delete('leaderboard')
+        self.assertIsNone(other.get('leaderboard'))
+
+    def test_generation_checks_are_throttled(self):
+        other = self._other_process(VERSION_CHECK_INTERVAL=3600)
+        self.cache.set('key', 'old')
+        self.assertEqual(other.get('key'), 'old')
+        self.cache.set('key', 'new')
+        # Within the check interval the other process may serve its L1 copy
+        self.assertEqual(other.get('key'), 'old')
+
+    def test_bypass_prefixes_skip_l1(self):
+        self.cache.set('rl:counter', 1)
+        self.l2.delete('rl:counter')
+        self.assertIsNone(self.cache.get('rl:counter'))
+
+    def test_counters_are_shared(self):
+        other = self._other_process()
+        self.cache.set('hits', 1)
+        other.get('hits')
+        self.cache.incr('hits')
+        self.assertEqual(other.get('hits'), 2)
+
+    def test_get_many_mixes_l1_and_l2(self):
+        self.cache.set('a', 1)
+        self.l2.set('b', 2)
+        self.assertEqual(self.cache.get_many(['a', 'b', 'c']), {'a': 1, 'b': 2})
+
+    def test_l1_is_bounded(self):
+        small = self._other_process(L1_MAX_ENTRIES=2)
+        for key in ('a', 'b', 'c'):
+            small.set(key, key)
+        self.assertEqual(len(small._l1), 2)
+
+    def test_zero_timeout_is_not_kept_in_l1(self):
+        self.cache.set('gone', 'x', 0)
+        self.assertIsNone(self.cache.get('gone'))
+
+    def test_pass_through_when_l1_disabled(self):
+        passthrough = self._other_process(L1_TIMEOUT=0)
+        passthrough.set('key', 'value')
+        self.l2.delete('key')
+        self.assertIsNone(passthrough.get('key'))
+        self.assertEqual(len(passthrough._l1), 0)
@@ -0,0 +1,152 @@
+"""
+Tests for the surrogate-key cache dependency registry and the model
+signals that bump it.
+
+Covers prompts/utils/cache_dependencies.py and the cache invalidation
+receivers in prompts/signals.py.
+"""
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from prompts.models import Follow, Prompt, SiteSettings
+from prompts.services.leaderboard import LeaderboardService
+from prompts.utils import cache_dependencies as deps
+from prompts.utils.cached_computation import cached_computation, get_metrics, reset_metrics
+
+
+def _generation(surrogate_key):
+    return cache.get(deps.GENERATION_PREFIX + surrogate_key)
+
+
+class RegistryTests(TestCase):
+    """get_or_set / invalidate semantics."""
+
+    def setUp(self):
+        cache.clear()
+        self.calls = 0
+
+    def _compute(self):
+        self.calls += 1
+        return self.calls
+
+    def test_value_cached_until_a_dependency_is_bumped(self):
+        key_deps = [deps.prompt_key(1), deps.user_key(2)]
+        self.assertEqual(deps.get_or_set('entry', self._compute, 60, key_deps), 1)
+        self.assertEqual(deps.get_or_set('entry', self._compute, 60, key_deps), 1)
+
+        deps.invalidate(deps.user_key(2))
+        self.assertEqual(deps.get_or_set('entry', self._compute, 60, key_deps), 2)
+
+    def test_unrelated_invalidation_keeps_entry(self):
+        deps.get_or_set('entry', self._compute, 60, [deps.prompt_key(1)])
+        deps.invalidate(deps.prompt_key(2), deps.tag_key('Portrait'))
+        self.assertEqual(deps.get_or_set('entry', self._compute, 60, [deps.prompt_key(1)]), 1)
+
+    def test_evicted_generation_is_a_miss(self):
+        deps.get_or_set('entry', self._compute, 60, [deps.prompt_key(1)])
+        cache.delete(deps.GENERATION_PREFIX + deps.prompt_key(1))
+        self.assertIsNone(deps.get_value('entry', [deps.prompt_key(1)]))
+
+    def test_change_during_compute_invalidates_result(self):
+        def racing_compute():
+            deps.invalidate(deps.prompt_key(1))  # a write lands mid-compute
+            return 'built-from-old-data'
+
+        deps.get_or_set('entry', racing_compute, 60, [deps.prompt_key(1)])
+        self.assertIsNone(deps.get_value('entry', [deps.prompt_key(1)]))
+
+    def test_entry_read_with_different_dependencies_is_a_miss(self):
+        deps.set_value('entry', 'v', 60, [deps.prompt_key(1)])
+        self.assertIsNone(deps.get_value('entry', [deps.prompt_key(1), deps.LEADERBOARD]))
+
+    @override_settings(CACHED_COMPUTATION_BACKGROUND=False)
+    def test_cached_computation_refreshes_bumped_value(self):
+        reset_metrics()
+        key_deps = [deps.LEADERBOARD]
+        cached_computation('cc_dep', self._compute, ttl=60, name='dep', depends_on=key_deps)
+        deps.invalidate(deps.LEADERBOARD)
+        self.assertEqual(
+            cached_computation('cc_dep', self._compute, ttl=60, name='dep', depends_on=key_deps),
+            2,
+        )
+        self.assertEqual(get_metrics()['dep']['stale'], 1)
+        self.assertEqual(get_metrics()['dep']['recompute'], 2)
+
+
+class SignalInvalidationTests(TestCase):
+    """Model changes bump the surrogate keys their cached data depends on."""
+
+    def setUp(self):
+        cache.clear()
+        self.author = User.objects.create_user(username='author', password='pw')
+        self.fan = User.objects.create_user(username='fan', password='pw')
+        self.prompt = Prompt.objects.create(
+            title='Dependent', slug='dependent', content='c',
+            author=self.author, status=1,
+        )
+
+    def test_prompt_save_bumps_prompt_and_author(self):
+        before = (_generation(deps.prompt_key(self.prompt.pk)),
+                  _generation(deps.user_key(self.author.pk)))
+        self.prompt.title = 'Edited'
+        self.prompt.save()
+        after = (_generation(deps.prompt_key(self.prompt.pk)),
+                 _generation(deps.user_key(self.author.pk)))
+        self.assertNotEqual(before[0], after[0])
+        self.assertNotEqual(before[1], after[1])
+
+    def test_ordering_save_does_not_bump_leaderboard(self):
+        leaderboard_gen = _generation(deps.LEADERBOARD)
+        self.prompt.order = 5
+        self.prompt.save(update_fields=['order'])
+        self.assertEqual(_generation(deps.LEADERBOARD), leaderboard_gen)
+
+        self.prompt.status = 0
+        self.prompt.save(update_fields=['status'])
+        self.assertNotEqual(_generation(deps.LEADERBOARD), leaderboard_gen)
+
+    def test_like_bumps_prompt_and_liker(self):
+        before = _generation(deps.user_key(self.fan.pk))
+        self.prompt.likes.add(self.fan)
+        self.assertNotEqual(_generation(deps.user_key(self.fan.pk)), before)
+        self.assertIsNotNone(_generation(deps.prompt_key(self.prompt.pk)))
+
+    def test_clearing_likes_bumps_every_former_liker(self):
+        self.prompt.likes.add(self.fan, self.author)
+        before = {pk: _generation(deps.user_key(pk)) for pk in (self.fan.pk, self.author.pk)}
+        self.prompt.likes.clear()
+        for pk, generation in before.items():
+            self.assertNotEqual(_generation(deps.user_key(pk)), generation)
+
+    def test_clearing_a_users_likes_bumps_the_prompts(self):
+        self.prompt.likes.add(self.fan)
+        before = _generation(deps.prompt_key(self.prompt.pk))
+        self.fan.prompt_likes.clear()
+        self.assertNotEqual(_generation(deps.prompt_key(self.prompt.pk)), before)
+
+    def test_tag_change_bumps_tag_key(self):
+        self.prompt.tags.add('Portrait')
+        self.assertIsNotNone(_generation(deps.tag_key('portrait')))
+
+    def test_follow_counts_refresh_on_follow_and_unfollow(self):
+        profile = self.author.userprofile
+        self.assertEqual(profile.follower_count, 0)
+        Follow.objects.create(follower=self.fan, following=self.author)
+        self.assertEqual(profile.follower_count, 1)
+        Follow.objects.filter(follower=self.fan, following=self.author).delete()
+        self.assertEqual(profile.follower_count, 0)
+
+    def test_site_settings_save_refreshes_cached_settings(self):
+        settings_obj = SiteSettings.get_settings()
+        original = settings_obj.auto_approve_comments
+        settings_obj.auto_approve_comments = not original
+        settings_obj.save()
+        self.assertEqual(SiteSettings.get_settings().auto_approve_comments, not original)
+
+    def test_leaderboard_invalidation_covers_every_limit(self):
+        LeaderboardService.get_most_active('all', limit=100)
+        reset_metrics()
+        LeaderboardService.invalidate_cache()
+        LeaderboardService.get_most_active('all', limit=100)
+        self.assertEqual(get_metrics()['leaderboard_active']['recompute'], 1)
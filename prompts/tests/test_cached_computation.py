@@ -0,0 +1,214 @@
+"""
+Tests for the cached_computation helper (single flight, early refresh,
+stale-while-revalidate) and its callers.
+
+Covers prompts/utils/cached_computation.py.
+"""
+import time
+from unittest.mock import patch
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from prompts.services.leaderboard import LeaderboardService
+from prompts.utils import cache_dependencies
+from prompts.utils.cached_computation import (
+    COLD_WAIT_FIRST_STEP,
+    COLD_WAIT_MAX_STEP,
+    LOCK_PREFIX,
+    _compute_and_store,
+    cached_computation,
+    get_metrics,
+    reset_metrics,
+)
+
+
+class Counter:
+    """Callable that records how often it ran."""
+
+    def __init__(self, value='v'):
+        self.calls = 0
+        self.value = value
+
+    def __call__(self):
+        self.calls += 1
+        return f'{self.value}{self.calls}'
+
+
+@override_settings(CACHED_COMPUTATION_BACKGROUND=False)
+class CachedComputationTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        reset_metrics()
+
+    def _envelope(self, key):
+        return cache.get(key)['value']
+
+    def _store(self, key, envelope):
+        entry = cache.get(key)
+        entry['value'] = envelope
+        cache.set(key, entry, 60)
+
+    def _expire(self, key):
+        envelope = self._envelope(key)
+        envelope['fresh_until'] = time.time() - 1
+        self._store(key, envelope)
+
+    def test_cold_miss_computes_once_then_hits(self):
+        compute = Counter()
+        self.assertEqual(cached_computation('cc_test', compute, ttl=60, name='t'), 'v1')
+        self.assertEqual(cached_computation('cc_test', compute, ttl=60, name='t'), 'v1')
+        self.assertEqual(compute.calls, 1)
+        self.assertEqual(get_metrics()['t'], {'miss': 1, 'recompute': 1, 'hit': 1})
+
+    def test_lock_released_after_compute(self):
+        cached_computation('cc_test', Counter(), ttl=60)
+        self.assertIsNone(cache.get(LOCK_PREFIX + 'cc_test'))
+
+    def test_expired_value_recomputed_inline_without_background(self):
+        compute = Counter()
+        cached_computation('cc_test', compute, ttl=60, name='t')
+        self._expire('cc_test')
+        self.assertEqual(cached_computation('cc_test', compute, ttl=60, name='t'), 'v2')
+        self.assertEqual(get_metrics()['t']['stale'], 1)
+
+    def test_stale_value_served_while_another_request_recomputes(self):
+        compute = Counter()
+        cached_computation('cc_test', compute, ttl=60)
+        self._expire('cc_test')
+        cache.add(LOCK_PREFIX + 'cc_test', 1, 30)  # someone else holds it
+
+        self.assertEqual(cached_computation('cc_test', compute, ttl=60), 'v1')
+        self.assertEqual(compute.calls, 1)
+
+    def test_stale_value_served_when_recompute_fails(self):
+        cached_computation('cc_test', Counter(), ttl=60, name='t')
+        self._expire('cc_test')
+
+        def broken():
+            raise RuntimeError('boom')
+
+        self.assertEqual(cached_computation('cc_test', broken, ttl=60, name='t'), 'v1')
+        self.assertEqual(get_metrics()['t']['error'], 1)
+        self.assertIsNone(cache.get(LOCK_PREFIX + 'cc_test'))
+
+    def test_cold_miss_error_propagates(self):
+        def broken():
+            raise RuntimeError('boom')
+
+        with self.assertRaises(RuntimeError):
+            cached_computation('cc_test', broken, ttl=60)
+        self.assertIsNone(cache.get(LOCK_PREFIX + 'cc_test'))
+
+    def test_cold_miss_waits_for_lock_holder_result(self):
+        cache.add(LOCK_PREFIX + 'cc_test', 1, 30)  # someone else holds it
+        compute = Counter()
+        polls = 8
+
+        def holder_finishes_late(seconds):
+            if sleep.call_count == polls:
+                _compute_and_store('cc_test', lambda: 'theirs', 60, 60, 't', [])
+
+        with patch('prompts.utils.cached_computation.time.sleep') as sleep, \
+                CaptureQueriesContext(connection) as queries:
+            sleep.side_effect = holder_finishes_late
+            self.assertEqual(cached_computation('cc_test', compute, ttl=60), 'theirs')
+        self.assertEqual(compute.calls, 0)
+        steps = [c.args[0] for c in sleep.call_args_list]
+        self.assertEqual(len(steps), polls)
+        self.assertEqual(steps[:2], [COLD_WAIT_FIRST_STEP, COLD_WAIT_FIRST_STEP * 2])
+        self.assertEqual(max(steps), COLD_WAIT_MAX_STEP)
+        reads = [q for q in queries if q['sql'].startswith('SELECT "cache_key", "value"')]
+        self.assertEqual(len(reads), 1 + polls)  # the miss, then each poll
+
+    def test_cold_miss_takes_over_when_lock_holder_gives_up(self):
+        cache.add(LOCK_PREFIX + 'cc_test', 1, 30)
+        compute = Counter()
+
+        def holder_fails(seconds):
+            if sleep.call_count == 2:
+                cache.delete(LOCK_PREFIX + 'cc_test')
+
+        with patch('prompts.utils.cached_computation.time.sleep') as sleep:
+            sleep.side_effect = holder_fails
+            self.assertEqual(cached_computation('cc_test', compute, ttl=60), 'v1')
+        self.assertEqual(sleep.call_count, 2)
+        self.assertIsNone(cache.get(LOCK_PREFIX + 'cc_test'))
+
+    def test_cold_miss_waits_at_most_lock_timeout(self):
+        cache.add(LOCK_PREFIX + 'cc_test', 1, 30)
+        compute = Counter()
+
+        with patch('prompts.utils.cached_computation.time.sleep'):
+            value = cached_computation('cc_test', compute, ttl=60, lock_timeout=0.05)
+        self.assertEqual(value, 'v1')
+        # The lock still belongs to the holder
+        self.assertIsNotNone(cache.get(LOCK_PREFIX + 'cc_test'))
+
+    def test_retired_value_served_while_lock_holder_recomputes(self):
+        compute = Counter()
+        cached_computation('cc_test', compute, ttl=60, name='t', depends_on=['dep'])
+        cache_dependencies.invalidate('dep')
+        cache.add(LOCK_PREFIX + 'cc_test', 1, 30)  # someone else recomputes
+
+        with patch('prompts.utils.cached_computation.time.sleep') as sleep:
+            value = cached_computation('cc_test', compute, ttl=60, name='t', depends_on=['dep'])
+        self.assertEqual(value, 'v1')
+        self.assertEqual(compute.calls, 1)
+        sleep.assert_not_called()
+        self.assertEqual(get_metrics()['t']['stale'], 1)
+
+    def test_retired_value_refreshed_by_lock_winner(self):
+        compute = Counter()
+        cached_computation('cc_test', compute, ttl=60, depends_on=['dep'])
+        cache_dependencies.invalidate('dep')
+
+        self.assertEqual(cached_computation('cc_test', compute, ttl=60, depends_on=['dep']), 'v2')
+        self.assertEqual(cached_computation('cc_test', compute, ttl=60, depends_on=['dep']), 'v2')
+
+    def test_fresh_value_not_refreshed_early_when_beta_zero(self):
+        compute = Counter()
+        cached_computation('cc_test', compute, ttl=60)
+        envelope = self._envelope('cc_test')
+        envelope['fresh_until'] = time.time() + 0.5
+        envelope['delta'] = 100
+        self._store('cc_test', envelope)
+
+        cached_computation('cc_test', compute, ttl=60, beta=0)
+        self.assertEqual(compute.calls, 1)
+
+    def test_early_refresh_when_compute_is_slow_relative_to_remaining(self):
+        compute = Counter()
+        cached_computation('cc_test', compute, ttl=60)
+        envelope = self._envelope('cc_test')
+        envelope['fresh_until'] = time.time() + 0.001
+        envelope['delta'] = 1000  # last compute took "forever"
+        self._store('cc_test', envelope)
+
+        self.assertEqual(cached_computation('cc_test', compute, ttl=60), 'v2')
+
+
+class LeaderboardCachedComputationTests(TestCase):
+    """Leaderboard reads go through cached_computation."""
+
+    def setUp(self):
+        cache.clear()
+        reset_metrics()
+        User.objects.create_user(username='creator', password='pw')
+
+    def test_second_read_is_a_hit(self):
+        first = LeaderboardService.get_most_active('all', limit=5)
+        with self.assertNumQueries(1):  # the cache read itself
+            second = LeaderboardService.get_most_active('all', limit=5)
+        self.assertEqual([u.pk for u in first], [u.pk for u in second])
+        self.assertEqual(get_metrics()['leaderboard_active']['hit'], 1)
+
+    def test_invalidate_cache_forces_recompute(self):
+        LeaderboardService.get_most_viewed('all')
+        LeaderboardService.invalidate_cache()
+        LeaderboardService.get_most_viewed('all')
+        self.assertEqual(get_metrics()['leaderboard_viewed']['recompute'], 2)
@@ -0,0 +1,237 @@
+"""
+Tests for reuse of Vision API results by image fingerprint.
+
+Covers prompts/utils/image_hashing.py, prompts/services/image_verdicts.py
+and the lookups in VisionModerationService.moderate_image_url /
+moderate_visual_content and tasks._call_openai_vision. Downloads and the
+OpenAI client are mocked.
+"""
+import base64
+import json
+import random
+from datetime import timedelta
+from io import BytesIO
+from unittest.mock import MagicMock, patch
+
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+from PIL import Image, ImageDraw
+
+from prompts.models import ImageVerdict
+from prompts.services import image_verdicts
+from prompts.services.vision_moderation import VisionModerationService
+from prompts.tasks import _call_openai_vision
+from prompts.utils.image_hashing import ImageFingerprint, fingerprint_bytes, hamming
+
+VERDICT = {'flagged': True, 'categories': ['nudity'], 'severity': 'high', 'explanation': 'x'}
+SAFE = {'flagged': False, 'categories': [], 'severity': 'low', 'explanation': ''}
+POLICY = image_verdicts.moderation_policy('Analyze this image', 'gpt-4o-mini')
+ANALYSIS = {'title': 'Blue Circles', 'description': 'd', 'tags': ['abstract']}
+
+
+def make_image(seed=1, size=(400, 300)):
+    rng = random.Random(seed)
+    image = Image.new('RGB', size, 'white')
+    draw = ImageDraw.Draw(image)
+    for _ in range(30):
+        x, y = rng.randint(0, 300), rng.randint(0, 200)
+        draw.ellipse(
+            [x, y, x + rng.randint(10, 100), y + rng.randint(10, 100)],
+            fill=tuple(rng.randint(0, 255) for _ in range(3)),
+        )
+    return image
+
+
+def encode(image, fmt='JPEG', **kwargs):
+    buffer = BytesIO()
+    image.save(buffer, fmt, **kwargs)
+    return buffer.getvalue()
+
+
+def mock_completion(content):
+    return MagicMock(
+        choices=[MagicMock(message=MagicMock(content=content))],
+        model='gpt-4o-mini',
+        usage=MagicMock(prompt_tokens=1, completion_tokens=1, total_tokens=2),
+    )
+
+
+class ImageHashingTests(SimpleTestCase):
+
+    def test_reencoded_copies_hash_alike(self):
+        image = make_image()
+        original = fingerprint_bytes(encode(image, quality=95))
+        for variant in [
+            encode(image, 'PNG'),
+            encode(image, quality=40),
+            encode(image.resize((200, 150))),
+        ]:
+            fingerprint = fingerprint_bytes(variant)
+            self.assertNotEqual(fingerprint.sha256, original.sha256)
+            self.assertLessEqual(hamming(fingerprint.phash, original.phash), 2)
+            self.assertLessEqual(hamming(fingerprint.dhash, original.dhash), 2)
+
+    def test_different_images_hash_apart(self):
+        first = fingerprint_bytes(encode(make_image(seed=1)))
+        second = fingerprint_bytes(encode(make_image(seed=2)))
+        self.assertGreater(hamming(first.phash, second.phash), 10)
+
+
+@override_settings(IMAGE_VERDICT_REUSE=True)
+class VerdictStoreTests(TestCase):
+
+    def setUp(self):
+        self.fingerprint = ImageFingerprint(sha256='a' * 64, phash=(1 << 64) - 1, dhash=0)
+
+    def _near(self, bits):
+        # Flip `bits` bits spread across different bands
+        flips = sum(1 << (i * 13) for i in range(bits))
+        return ImageFingerprint(
+            sha256='b' * 64, phash=self.fingerprint.phash ^ flips, dhash=flips,
+        )
+
+    def test_near_duplicates_within_distance_reuse_verdict(self):
+        image_verdicts.store_moderation(self.fingerprint, POLICY, VERDICT)
+        self.assertEqual(image_verdicts.find_moderation(self._near(3), POLICY), VERDICT)
+        self.assertIsNone(image_verdicts.find_moderation(self._near(4), POLICY))
+
+    def test_approvals_need_exact_bytes(self):
+        image_verdicts.store_moderation(self.fingerprint, POLICY, SAFE)
+        self.assertEqual(image_verdicts.find_moderation(self.fingerprint, POLICY), SAFE)
+        self.assertIsNone(image_verdicts.find_moderation(self._near(1), POLICY))
+
+        # Flagged at a severity that is still approved: exact bytes only
+        image_verdicts.store_moderation(self.fingerprint, POLICY, {**VERDICT, 'severity': 'medium'})
+        self.assertIsNone(image_verdicts.find_moderation(self._near(1), POLICY))
+
+    def test_verdicts_need_matching_policy(self):
+        image_verdicts.store_moderation(self.fingerprint, POLICY, VERDICT)
+        changed = image_verdicts.moderation_policy('Analyze this image again', 'gpt-4o-mini')
+        self.assertIsNone(image_verdicts.find_moderation(self.fingerprint, changed))
+        self.assertIsNone(image_verdicts.find_moderation(self._near(1), changed))
+
+    @patch('prompts.services.image_verdicts.IMAGE_VERDICT_MAX_DISTANCE', 0)
+    def test_zero_distance_requires_identical_hashes(self):
+        image_verdicts.store_moderation(self.fingerprint, POLICY, VERDICT)
+        self.assertIsNone(image_verdicts.find_moderation(self._near(1), POLICY))
+        same_picture = ImageFingerprint('c' * 64, self.fingerprint.phash, self.fingerprint.dhash)
+        self.assertEqual(image_verdicts.find_moderation(same_picture, POLICY), VERDICT)
+
+    def test_expired_verdicts_are_ignored(self):
+        image_verdicts.store_moderation(self.fingerprint, POLICY, VERDICT)
+        ImageVerdict.objects.update(moderated_at=timezone.now() - timedelta(days=365))
+        self.assertIsNone(image_verdicts.find_moderation(self.fingerprint, POLICY))
+
+    def test_analysis_needs_matching_context(self):
+        context = image_verdicts.analysis_context('a cat', 'midjourney', ['cat'])
+        image_verdicts.store_analysis(self.fingerprint, context, ANALYSIS)
+        image_verdicts.store_analysis(self.fingerprint, context, {'error': 'timeout'})
+        self.assertEqual(image_verdicts.find_analysis(self.fingerprint, context), ANALYSIS)
+        other = image_verdicts.analysis_context('a dog', 'midjourney', ['cat'])
+        self.assertIsNone(image_verdicts.find_analysis(self.fingerprint, other))
+
+    @override_settings(IMAGE_VERDICT_REUSE=False)
+    def test_disabled_store_never_downloads(self):
+        with patch('prompts.tasks._download_image') as download:
+            self.assertIsNone(image_verdicts.fingerprint_url('https://cdn.promptfinder.net/a.jpg'))
+        download.assert_not_called()
+
+
+@override_settings(IMAGE_VERDICT_REUSE=True, OPENAI_API_KEY='sk-test')
+class VisionReuseTests(TestCase):
+
+    def setUp(self):
+        image = make_image()
+        self.copies = {
+            'https://cdn.promptfinder.net/original.jpg': encode(image, quality=95),
+            'https://cdn.promptfinder.net/reupload.png': encode(image, 'PNG'),
+        }
+        patcher = patch(
+            'prompts.tasks._download_image',
+            side_effect=lambda url: (self.copies[url], 'image/jpeg'),
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _service(self, content):
+        with patch.dict('os.environ', {'OPENAI_API_KEY': 'sk-test'}):
+            service = VisionModerationService()
+        service.client = MagicMock()
+        service.client.chat.completions.create.return_value = mock_completion(content)
+        return service
+
+    def test_reupload_skips_vision_call(self):
+        service = self._service(json.dumps(VERDICT))
+        first = service.moderate_image_url('https://cdn.promptfinder.net/original.jpg')
+        second = service.moderate_image_url('https://cdn.promptfinder.net/reupload.png')
+        self.assertEqual(service.client.chat.completions.create.call_count, 1)
+        self.assertEqual(first, second)
+        self.assertEqual(second['status'], 'flagged')
+
+    def test_reupload_of_approved_image_is_judged_again(self):
+        service = self._service(json.dumps(SAFE))
+        service.moderate_image_url('https://cdn.promptfinder.net/original.jpg')
+        service.moderate_image_url('https://cdn.promptfinder.net/original.jpg')
+        self.assertEqual(service.client.chat.completions.create.call_count, 1)
+        service.moderate_image_url('https://cdn.promptfinder.net/reupload.png')
+        self.assertEqual(service.client.chat.completions.create.call_count, 2)
+
+    def test_policy_change_invalidates_verdicts(self):
+        service = self._service(json.dumps(VERDICT))
+        service.moderate_image_url('https://cdn.promptfinder.net/original.jpg')
+        service.MODERATION_PROMPT += '\n- Weapons'
+        service.moderate_image_url('https://cdn.promptfinder.net/original.jpg')
+        self.assertEqual(service.client.chat.completions.create.call_count, 2)
+
+    def test_unparseable_responses_are_not_stored(self):
+        service = self._service("I'm sorry, but I can't help with that.")
+        result = service.moderate_image_url('https://cdn.promptfinder.net/original.jpg')
+        self.assertEqual(result['status'], 'rejected')
+        self.assertFalse(ImageVerdict.objects.exists())
+
+    def test_prompt_moderation_reuses_upload_verdict(self):
+        self._service(json.dumps(VERDICT)).moderate_image_url(
+            'https://cdn.promptfinder.net/original.jpg',
+        )
+        service = self._service(json.dumps(VERDICT))
+        prompt = MagicMock(
+            id=1, b2_image_url='https://cdn.promptfinder.net/reupload.png',
+            featured_image=None, featured_video=None,
+        )
+        prompt.is_video.return_value = False
+        result = service.moderate_visual_content(prompt)
+        service.client.chat.completions.create.assert_not_called()
+        self.assertEqual(result['raw_response']['reused_verdict'], True)
+        self.assertEqual(result['status'], 'flagged')
+
+    def test_refreshed_verdict_asks_again(self):
+        service = self._service(json.dumps(VERDICT))
+        service.moderate_image_url('https://cdn.promptfinder.net/original.jpg')
+        service.client.chat.completions.create.return_value = mock_completion(json.dumps(SAFE))
+        prompt = MagicMock(
+            id=1, b2_image_url='https://cdn.promptfinder.net/original.jpg',
+            featured_image=None, featured_video=None,
+        )
+        prompt.is_video.return_value = False
+
+        result = service.moderate_visual_content(prompt, refresh_verdicts=True)
+
+        self.assertEqual(service.client.chat.completions.create.call_count, 2)
+        self.assertEqual(result['status'], 'approved')
+        self.assertEqual(ImageVerdict.objects.get().moderation, SAFE)
+
+    @patch('openai.OpenAI')
+    def test_ai_analysis_reused_for_same_inputs(self, MockOpenAI):
+        client = MockOpenAI.return_value
+        client.chat.completions.create.return_value = mock_completion(json.dumps(ANALYSIS))
+        encoded = base64.b64encode(self.copies['https://cdn.promptfinder.net/original.jpg'])
+        with patch(
+            'prompts.tasks._download_and_encode_image',
+            return_value=(encoded.decode(), 'image/jpeg'),
+        ):
+            first = _call_openai_vision('https://cdn.promptfinder.net/original.jpg', 'a', 'dall-e', [])
+            second = _call_openai_vision('https://cdn.promptfinder.net/original.jpg', 'a', 'dall-e', [])
+            _call_openai_vision('https://cdn.promptfinder.net/original.jpg', 'b', 'dall-e', [])
+        self.assertEqual(first['title'], 'Blue Circles')
+        self.assertEqual(second, first)
+        self.assertEqual(client.chat.completions.create.call_count, 2)
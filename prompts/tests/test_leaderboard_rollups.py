@@ -0,0 +1,104 @@
+"""
+Tests for the precomputed leaderboard tables.
+
+Covers LeaderboardService.rebuild_boards / _read_board / get_user_rank
+and the rebuild_leaderboards management command.
+"""
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase
+
+from prompts.models import Comment, LeaderboardEntry, Prompt
+from prompts.services.leaderboard import LeaderboardService
+from prompts.utils import cache_dependencies as deps
+
+
+class LeaderboardRollupTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.alice = User.objects.create_user(username='alice', password='pw')
+        self.bob = User.objects.create_user(username='bob', password='pw')
+        self.carol = User.objects.create_user(username='carol', password='pw')
+        self.lurker = User.objects.create_user(username='lurker', password='pw')
+
+        # alice: 2 uploads (20), bob: 1 upload (10), carol: 1 upload (10)
+        for index, author in enumerate([self.alice, self.alice, self.bob, self.carol]):
+            Prompt.objects.create(
+                title=f'Prompt {index}', slug=f'prompt-{index}', content='c',
+                author=author, status=1,
+            )
+
+    def _board(self, metric, period):
+        return list(
+            LeaderboardEntry.objects.filter(metric=metric, period=period)
+            .order_by('rank', 'user_id')
+            .values_list('user__username', 'score', 'rank')
+        )
+
+    def test_rebuild_dense_ranks_ties(self):
+        LeaderboardService.rebuild_boards(metrics=['active'], periods=['all'])
+        self.assertEqual(
+            self._board('active', 'all'),
+            [('alice', 20, 1), ('bob', 10, 2), ('carol', 10, 2)],
+        )
+
+    def test_rebuild_replaces_previous_board(self):
+        LeaderboardService.rebuild_boards(metrics=['active'], periods=['all'])
+        Comment.objects.create(
+            prompt=Prompt.objects.get(slug='prompt-0'), author=self.carol,
+            body='nice', approved=True,
+        )
+        LeaderboardService.rebuild_boards(metrics=['active'], periods=['all'])
+        self.assertEqual(
+            self._board('active', 'all'),
+            [('alice', 20, 1), ('carol', 12, 2), ('bob', 10, 3)],
+        )
+
+    def test_reads_come_from_the_board_after_rebuild(self):
+        LeaderboardService.rebuild_boards()
+        results = LeaderboardService.get_most_active('all', limit=10)
+        self.assertEqual([u.username for u in results], ['alice', 'bob', 'carol'])
+        self.assertEqual(results[0].activity_score, 20)
+        self.assertEqual(results[0].prompt_count, 2)
+        self.assertEqual(results[2].leaderboard_rank, 2)
+
+    def test_rebuild_retires_cached_reads(self):
+        before = cache.get(deps.GENERATION_PREFIX + deps.LEADERBOARD)
+        LeaderboardService.rebuild_boards(metrics=['views'], periods=['week'])
+        self.assertNotEqual(cache.get(deps.GENERATION_PREFIX + deps.LEADERBOARD), before)
+
+    def test_user_rank_from_board(self):
+        LeaderboardService.rebuild_boards(metrics=['active'], periods=['all'])
+        with self.assertNumQueries(1):
+            rank = LeaderboardService.get_user_rank(self.carol, metric='active', period='all')
+        self.assertEqual(rank, 2)
+        with self.assertNumQueries(2):  # own row, then whether the board exists
+            self.assertIsNone(
+                LeaderboardService.get_user_rank(self.lurker, metric='active', period='all')
+            )
+
+    def test_user_rank_falls_back_to_live_query_without_board(self):
+        self.assertEqual(
+            LeaderboardService.get_user_rank(self.alice, metric='active', period='all'), 1,
+        )
+        self.assertIsNone(
+            LeaderboardService.get_user_rank(self.lurker, metric='active', period='all')
+        )
+
+    def test_deactivated_user_hidden_before_next_rebuild(self):
+        LeaderboardService.rebuild_boards(metrics=['active'], periods=['all'])
+        self.alice.is_active = False
+        self.alice.save()
+        LeaderboardService.invalidate_cache()
+        results = LeaderboardService.get_most_active('all', limit=10)
+        self.assertNotIn(self.alice.pk, [u.pk for u in results])
+
+    def test_management_command(self):
+        out = StringIO()
+        call_command('rebuild_leaderboards', '--metric', 'active', '--period', 'all', stdout=out)
+        self.assertIn('Leaderboard active/all: 3 ranked users', out.getvalue())
+        self.assertFalse(LeaderboardEntry.objects.filter(metric='views').exists())
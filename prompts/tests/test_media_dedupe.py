@@ -0,0 +1,388 @@
+"""
+Tests for content-addressed image deduplication.
+
+Covers the MediaBlob index in prompts/services/b2_upload_service.py:
+upload_image reuse, generate_image_variants after a quick upload,
+per-owner references released by delete_image / Prompt.hard_delete /
+b2_delete_upload, handed to the prompt by upload_submit, released by
+prompt_edit or once the upload session is over, and the SEO rename of
+deduplicated files. B2 is replaced by an in-memory storage.
+"""
+from datetime import timedelta
+from io import BytesIO
+from unittest.mock import patch
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.contrib.sessions.backends.db import SessionStore
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from PIL import Image
+
+from prompts.models import MediaBlob, MediaBlobReference, Prompt
+from prompts.services import b2_upload_service
+from prompts.services.b2_upload_service import (
+    delete_image,
+    generate_image_variants,
+    release_abandoned_session_references,
+    upload_image,
+)
+from prompts.tasks import rename_prompt_files_for_seo
+
+
+class MemoryStorage:
+    files = {}
+
+    def save(self, path, content):
+        self.files[path] = content.read()
+        return path
+
+    def url(self, path):
+        return f'https://media.promptfinder.net/{path}'
+
+    def exists(self, path):
+        return path in self.files
+
+    def delete(self, path):
+        self.files.pop(path, None)
+
+
+class MemoryRenameService:
+    """B2RenameService.rename_file over MemoryStorage."""
+
+    def rename_file(self, old_url, new_filename):
+        old_path = old_url.split('media.promptfinder.net/', 1)[1]
+        new_path = f"{old_path.rsplit('/', 1)[0]}/{new_filename}"
+        MemoryStorage.files[new_path] = MemoryStorage.files.pop(old_path)
+        return {
+            'success': True, 'new_url': MemoryStorage().url(new_path),
+            'old_url': old_url, 'error': None,
+        }
+
+
+def make_upload(color='red', name='cat.png'):
+    buffer = BytesIO()
+    Image.new('RGB', (640, 480), color).save(buffer, 'PNG')
+    buffer.seek(0)
+    buffer.name = name
+    return buffer
+
+
+def upload(color='red', name='cat.png', session_key='session-a', **kwargs):
+    return upload_image(make_upload(color, name), session_key=session_key, **kwargs)
+
+
+class MediaDedupeTests(TestCase):
+
+    def setUp(self):
+        MemoryStorage.files = {}
+        patcher = patch.object(b2_upload_service, 'B2MediaStorage', MemoryStorage)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_identical_bytes_reuse_stored_urls(self):
+        first = upload()
+        written = dict(MemoryStorage.files)
+        with patch.object(b2_upload_service, 'process_upload') as process:
+            second = upload(name='copy.png', session_key='session-b')
+        process.assert_not_called()
+        self.assertEqual(MemoryStorage.files, written)
+        self.assertTrue(second['deduplicated'])
+        self.assertEqual(second['filename'], first['filename'])
+        self.assertEqual(second['urls'], first['urls'])
+        self.assertEqual(second['info'], first['info'])
+        self.assertEqual(MediaBlob.objects.get().references.count(), 2)
+
+    def test_owner_holds_one_reference_however_often_it_uploads(self):
+        upload()
+        upload()
+        self.assertEqual(MediaBlobReference.objects.get().session_key, 'session-a')
+
+    def test_upload_needs_an_owner(self):
+        with self.assertRaises(ValueError):
+            upload_image(make_upload())
+
+    def test_different_bytes_are_stored_separately(self):
+        first = upload('red')
+        second = upload('blue')
+        self.assertNotEqual(first['filename'], second['filename'])
+        self.assertFalse(second['deduplicated'])
+        self.assertEqual(len(MemoryStorage.files), 10)
+
+    def test_quick_upload_then_full_upload_adds_missing_variants(self):
+        quick = upload(quick_mode=True)
+        self.assertEqual(set(quick['urls']), {'original', 'thumb'})
+        full = upload(session_key='session-b')
+        self.assertTrue(full['deduplicated'])
+        self.assertEqual(full['filename'], quick['filename'])
+        self.assertEqual(full['urls']['thumb'], quick['urls']['thumb'])
+        self.assertEqual(set(full['urls']), {'original', 'thumb', 'medium', 'large', 'webp'})
+        self.assertEqual(len(MemoryStorage.files), 5)
+
+    def test_variants_for_stored_image_are_not_regenerated(self):
+        upload()
+        quick = upload(quick_mode=True, session_key='session-b')
+        with patch.object(b2_upload_service, 'process_upload') as process:
+            result = generate_image_variants(make_upload().getvalue(), quick['filename'])
+        process.assert_not_called()
+        self.assertEqual(set(result['urls']), {'thumb', 'medium', 'large', 'webp'})
+
+    def test_variants_after_quick_upload_skip_thumbnail(self):
+        quick = upload(quick_mode=True)
+        result = generate_image_variants(make_upload().getvalue(), quick['filename'])
+        self.assertEqual(result['urls']['thumb'], quick['urls']['thumb'])
+        self.assertEqual(len(MemoryStorage.files), 5)
+        self.assertEqual(len(MediaBlob.objects.get().urls), 5)
+
+    def test_delete_keeps_files_until_last_reference(self):
+        result = upload()
+        upload(session_key='session-b')
+
+        first = delete_image(result['filename'], session_key='session-a')
+        self.assertTrue(first['retained'])
+        self.assertEqual(len(MemoryStorage.files), 5)
+
+        second = delete_image(result['filename'], session_key='session-b')
+        self.assertFalse(second['retained'])
+        self.assertEqual(len(second['deleted']), 5)
+        self.assertEqual(MemoryStorage.files, {})
+        self.assertFalse(MediaBlob.objects.exists())
+
+    def test_repeated_release_by_one_owner_keeps_shared_files(self):
+        result = upload()
+        upload(session_key='session-b')
+
+        for _ in range(3):
+            delete_image(result['filename'], session_key='session-a')
+        delete_image(result['filename'], session_key='session-c')
+        delete_image(result['filename'])
+
+        self.assertEqual(len(MemoryStorage.files), 5)
+        self.assertEqual(MediaBlobReference.objects.get().session_key, 'session-b')
+
+    def test_failed_upgrade_releases_reference(self):
+        upload(quick_mode=True)
+        with patch.object(b2_upload_service, 'upload_to_b2', side_effect=ValueError('B2 down')):
+            result = upload(session_key='session-b')
+        self.assertFalse(result['success'])
+        self.assertEqual(MediaBlobReference.objects.get().session_key, 'session-a')
+
+    def test_failed_upgrade_keeps_reference_already_held(self):
+        upload(quick_mode=True)
+        with patch.object(b2_upload_service, 'upload_to_b2', side_effect=ValueError('B2 down')):
+            self.assertFalse(upload()['success'])
+        self.assertEqual(MediaBlobReference.objects.get().session_key, 'session-a')
+        self.assertEqual(len(MemoryStorage.files), 2)
+
+    def _prompt(self, title, urls=None):
+        author, _ = User.objects.get_or_create(username='author')
+        urls = urls or {}
+        return Prompt.objects.create(
+            title=title, slug=title.lower().replace(' ', '-'), content='x', author=author,
+            b2_image_url=urls.get('original', ''), b2_thumb_url=urls.get('thumb', ''),
+            b2_medium_url=urls.get('medium', ''), b2_large_url=urls.get('large', ''),
+            b2_webp_url=urls.get('webp', ''),
+        )
+
+    def _prompt_with_upload(self, title):
+        """A prompt that uploaded its own image, as prompt_edit does."""
+        prompt = self._prompt(title)
+        urls = upload(session_key=None, prompt_id=prompt.pk)['urls']
+        Prompt.objects.filter(pk=prompt.pk).update(
+            b2_image_url=urls['original'], b2_thumb_url=urls['thumb'],
+            b2_medium_url=urls['medium'], b2_large_url=urls['large'],
+            b2_webp_url=urls['webp'],
+        )
+        prompt.refresh_from_db()
+        return prompt
+
+    def test_hard_delete_releases_shared_image(self):
+        prompts = [self._prompt_with_upload(f'Shared {i}') for i in range(2)]
+
+        prompts[0].hard_delete()
+        self.assertEqual(len(MemoryStorage.files), 5)
+        prompts[1].hard_delete()
+        self.assertEqual(MemoryStorage.files, {})
+
+    def test_image_shared_with_expired_session_is_deleted(self):
+        prompt = self._prompt_with_upload('Shared')
+        upload(session_key='gone')  # Same bytes; the session expired unsubmitted
+
+        prompt.hard_delete()
+        self.assertEqual(len(MemoryStorage.files), 5)
+        stats = release_abandoned_session_references()
+        self.assertEqual((stats['released'], stats['deleted']), (1, 1))
+        self.assertEqual(MemoryStorage.files, {})
+        self.assertFalse(MediaBlob.objects.exists())
+
+    def test_live_session_keeps_its_upload_until_cookie_age(self):
+        session = SessionStore()
+        session.create()
+        upload(session_key=session.session_key)
+
+        self.assertEqual(release_abandoned_session_references()['released'], 0)
+        self.assertEqual(len(MemoryStorage.files), 5)
+
+        later = timezone.now() + timedelta(seconds=settings.SESSION_COOKIE_AGE + 1)
+        self.assertEqual(release_abandoned_session_references(later)['released'], 1)
+        self.assertEqual(MemoryStorage.files, {})
+
+    @patch('prompts.services.b2_rename.B2RenameService', MemoryRenameService)
+    def test_seo_rename_keeps_shared_files_in_place(self):
+        prompt = self._prompt_with_upload('Red Square')
+        original = prompt.b2_image_url
+        upload()
+
+        rename_prompt_files_for_seo(prompt.pk)
+
+        prompt.refresh_from_db()
+        self.assertEqual(prompt.b2_image_url, original)
+        self.assertEqual(len(MemoryStorage.files), 5)
+
+    @patch('prompts.services.b2_rename.B2RenameService', MemoryRenameService)
+    def test_seo_rename_of_sole_owner_updates_blob(self):
+        prompt = self._prompt_with_upload('Red Square')
+
+        rename_prompt_files_for_seo(prompt.pk)
+
+        prompt.refresh_from_db()
+        self.assertIn('red-square', prompt.b2_image_url)
+        blob = MediaBlob.objects.get()
+        self.assertEqual(blob.urls['original'], prompt.b2_image_url)
+        self.assertEqual(blob.urls['webp'], prompt.b2_webp_url)
+
+        # Identical bytes now reuse the renamed files, and the last
+        # release deletes them wherever they were moved
+        reused = upload()
+        self.assertEqual(reused['urls']['original'], prompt.b2_image_url)
+        prompt.hard_delete()
+        delete_image(reused['filename'], session_key='session-a')
+        self.assertEqual(MemoryStorage.files, {})
+
+
+class DeleteUploadOwnershipTests(TestCase):
+    """b2_delete_upload only releases images the caller's session holds."""
+
+    def setUp(self):
+        MemoryStorage.files = {}
+        patcher = patch.object(b2_upload_service, 'B2MediaStorage', MemoryStorage)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        User.objects.create_user(username='uploader', password='pass')
+        self.client.login(username='uploader', password='pass')
+        self.url = reverse('prompts:b2_delete_upload')
+
+    def _delete(self, filename):
+        return self.client.post(
+            self.url, {'file_key': filename, 'is_video': False},
+            content_type='application/json',
+        )
+
+    def test_owner_releases_its_upload(self):
+        result = upload(session_key=self.client.session.session_key)
+        response = self._delete(result['filename'])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(MemoryStorage.files, {})
+
+    def test_shared_filename_cannot_be_released_by_another_user(self):
+        result = upload(session_key='someone-else')
+        for _ in range(2):
+            self.assertEqual(self._delete(result['filename']).status_code, 403)
+        self.assertEqual(len(MemoryStorage.files), 5)
+        self.assertEqual(MediaBlobReference.objects.count(), 1)
+
+
+@patch('prompts.views.upload_views.async_task')
+@patch(
+    'prompts.services.profanity_filter.ProfanityFilterService.check_text',
+    return_value=(True, [], 'none'),
+)
+class PromptImageOwnershipTests(TestCase):
+    """upload_submit and prompt_edit move references between owners."""
+
+    def setUp(self):
+        MemoryStorage.files = {}
+        patcher = patch.object(b2_upload_service, 'B2MediaStorage', MemoryStorage)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.user = User.objects.create_user(username='uploader', password='pass')
+        self.client.login(username='uploader', password='pass')
+
+    def _submit(self, color='red'):
+        """Upload through the session, then submit it as a draft prompt."""
+        session = self.client.session
+        if not session.session_key:
+            session.save()
+        result = upload(color, session_key=session.session_key)
+        session['upload_is_b2'] = True
+        session['upload_b2_filename'] = result['filename']
+        for version, url in result['urls'].items():
+            session[f'upload_b2_{version}'] = url
+        session.save()
+        self.client.post(reverse('prompts:upload_submit'), {
+            'content': 'A red square on a plain background',
+            'ai_generator': 'midjourney',
+            'tags': '[]',
+            'save_as_draft': '1',
+        })
+        return result, Prompt.objects.get(b2_image_url=result['urls']['original'])
+
+    def test_submit_hands_session_reference_to_prompt(self, *mocks):
+        _, prompt = self._submit()
+
+        reference = MediaBlobReference.objects.get()
+        self.assertEqual(reference.prompt_id, prompt.pk)
+        self.assertEqual(reference.session_key, '')
+
+        prompt.hard_delete()
+        self.assertEqual(MemoryStorage.files, {})
+        self.assertFalse(MediaBlob.objects.exists())
+
+    def test_session_cannot_delete_submitted_image(self, *mocks):
+        result, prompt = self._submit()
+
+        # Same bytes again from the same session, then cancelled
+        upload(session_key=self.client.session.session_key)
+        response = self.client.post(
+            reverse('prompts:b2_delete_upload'),
+            {'file_key': result['filename'], 'is_video': False},
+            content_type='application/json',
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(MemoryStorage.files), 5)
+        self.assertEqual(
+            list(MediaBlobReference.objects.values_list('prompt_id', flat=True)),
+            [prompt.pk],
+        )
+
+    @patch('prompts.services.b2_rename.B2RenameService', MemoryRenameService)
+    def test_seo_rename_moves_submitted_image(self, *mocks):
+        result, prompt = self._submit()
+
+        rename_prompt_files_for_seo(prompt.pk)
+
+        prompt.refresh_from_db()
+        self.assertNotEqual(prompt.b2_image_url, result['urls']['original'])
+        self.assertEqual(MediaBlob.objects.get().urls['original'], prompt.b2_image_url)
+
+    def test_edit_releases_replaced_image(self, *mocks):
+        _, prompt = self._submit('red')
+        old_files = set(MemoryStorage.files)
+
+        self.client.post(reverse('prompts:prompt_edit', args=[prompt.slug]), {
+            'title': prompt.title,
+            'content': prompt.content,
+            'excerpt': prompt.excerpt,
+            'tags': 'square',
+            'ai_generator': 'midjourney',
+            'featured_media': make_upload('blue', 'dog.png'),
+        })
+
+        prompt.refresh_from_db()
+        self.assertFalse(old_files & set(MemoryStorage.files))
+        self.assertEqual(len(MemoryStorage.files), 5)
+        self.assertEqual(MediaBlob.objects.get().urls['original'], prompt.b2_image_url)
+
+        prompt.hard_delete()
+        self.assertEqual(MemoryStorage.files, {})
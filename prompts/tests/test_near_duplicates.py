@@ -0,0 +1,221 @@
+"""
+Tests for the near-duplicate image index.
+
+Covers prompts/utils/hash_bands.py, prompts/services/near_duplicates.py
+(recording, cross-worker catch-up including rows committed out of order,
+upload warnings, duplicate groups), the visual-similarity candidates in
+get_related_prompts and the report_duplicate_images command.
+"""
+import random
+from datetime import timedelta
+from io import StringIO
+from unittest.mock import patch
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+
+from prompts.models import BulkGenerationJob, GeneratedImage, ImageHash, Prompt
+from prompts.services import near_duplicates
+from prompts.utils.hash_bands import HashBandIndex
+from prompts.utils.image_hashing import ImageFingerprint, hamming, to_signed
+from prompts.utils.related import get_related_prompts
+
+
+def flip(value, bits):
+    """value with the given bit positions inverted."""
+    for bit in bits:
+        value ^= 1 << bit
+    return value
+
+
+BASE = 0x0F0F_3C3C_5A5A_A5A5
+
+
+class HashBandIndexTests(SimpleTestCase):
+
+    def test_search_matches_brute_force(self):
+        rng = random.Random(7)
+        values = [rng.getrandbits(64) for _ in range(300)]
+        values += [flip(values[0], rng.sample(range(64), rng.randint(0, 8))) for _ in range(50)]
+        bands = HashBandIndex(max_distance=6)
+        for key, value in enumerate(values):
+            bands.add(value, key)
+        self.assertEqual(len(bands), len(values))
+
+        for query in values[:20] + [rng.getrandbits(64) for _ in range(5)]:
+            for radius in (0, 4, 6):
+                expected = sorted(
+                    (hamming(query, value), key)
+                    for key, value in enumerate(values) if hamming(query, value) <= radius
+                )
+                self.assertEqual(sorted(bands.search(query, radius)), expected)
+
+    def test_finds_differences_spread_over_every_band(self):
+        bands = HashBandIndex(max_distance=6)
+        spread = flip(BASE, [0, 10, 20, 30, 40, 50])  # one bit in six of seven bands
+        bands.add(spread, 'spread')
+        self.assertEqual(bands.search(BASE, 6), [(6, 'spread')])
+
+    def test_results_are_nearest_first(self):
+        bands = HashBandIndex(max_distance=6)
+        bands.add(flip(BASE, [1, 2, 3]), 'far')
+        bands.add(BASE, 'same')
+        bands.add(flip(BASE, [5]), 'near')
+        self.assertEqual([key for _, key in bands.search(BASE, 6)], ['same', 'near', 'far'])
+
+    def test_radius_beyond_bands_is_rejected(self):
+        bands = HashBandIndex(max_distance=6)
+        with self.assertRaises(ValueError):
+            bands.search(BASE, 7)
+
+
+@override_settings(NEAR_DUPLICATE_INDEX=True)
+class NearDuplicateIndexTests(TestCase):
+
+    def setUp(self):
+        near_duplicates.index.reset()
+        self.addCleanup(near_duplicates.index.reset)
+        self.author = User.objects.create_user('author', password='x')
+
+    def _prompt(self, title, phash=None, status=1):
+        prompt = Prompt.objects.create(
+            title=title, slug=title.lower().replace(' ', '-'), content='x',
+            author=self.author, status=status,
+        )
+        if phash is not None:
+            near_duplicates.record_prompt(prompt.pk, phash, phash)
+        return prompt
+
+    def test_find_similar_within_distance(self):
+        original = self._prompt('Original', BASE)
+        edited = self._prompt('Edited', flip(BASE, [0, 9, 40]))
+        self._prompt('Different', ~BASE & (2 ** 64 - 1))
+
+        matches = near_duplicates.find_similar(BASE, BASE)
+        self.assertEqual(
+            [(m.object_id, m.distance) for m in matches],
+            [(original.pk, 0), (edited.pk, 3)],
+        )
+        self.assertEqual(near_duplicates.find_similar(BASE, BASE, max_distance=2)[0].object_id, original.pk)
+        self.assertEqual(len(near_duplicates.find_similar(BASE, BASE, max_distance=2)), 1)
+
+    def test_radius_is_capped_to_index_maximum(self):
+        near = self._prompt('Near', flip(BASE, range(6)))
+        self._prompt('Far', flip(BASE, range(12)))
+
+        matches = near_duplicates.find_similar(BASE, BASE, max_distance=20)
+        self.assertEqual([m.object_id for m in matches], [near.pk])
+
+    def test_warm_builds_index_before_first_lookup(self):
+        prompt = self._prompt('Stored')
+        ImageHash.objects.create(prompt=prompt, phash=to_signed(BASE), dhash=to_signed(BASE))
+
+        near_duplicates.index.warm()
+        with self.assertNumQueries(0):
+            matches = near_duplicates.find_similar(BASE, BASE)
+        self.assertEqual([m.object_id for m in matches], [prompt.pk])
+
+    def test_rehashed_prompt_is_found_by_new_hash_only(self):
+        prompt = self._prompt('Replaced', BASE)
+        other = flip(BASE, range(0, 64, 2))
+        near_duplicates.record_prompt(prompt.pk, other, other)
+
+        self.assertEqual(near_duplicates.find_similar(BASE, BASE), [])
+        self.assertEqual(near_duplicates.find_similar(other, other)[0].object_id, prompt.pk)
+        self.assertEqual(ImageHash.objects.filter(prompt=prompt).count(), 1)
+
+    def test_catches_up_with_rows_from_other_workers(self):
+        first = self._prompt('First', BASE)
+        self.assertEqual(len(near_duplicates.find_similar(BASE, BASE)), 1)
+
+        # Another worker records a hash; this process sees it after the sync interval
+        second = self._prompt('Second')
+        ImageHash.objects.create(prompt=second, phash=to_signed(BASE), dhash=to_signed(BASE))
+        self.assertEqual(len(near_duplicates.find_similar(BASE, BASE)), 1)
+        with patch('prompts.services.near_duplicates.NEAR_DUPLICATE_SYNC_SECONDS', 0):
+            ids = {m.object_id for m in near_duplicates.find_similar(BASE, BASE)}
+        self.assertEqual(ids, {first.pk, second.pk})
+
+    def test_catches_up_with_rows_committed_out_of_order(self):
+        first = self._prompt('First')
+        ImageHash.objects.create(id=500, prompt=first, phash=to_signed(BASE), dhash=to_signed(BASE))
+        self.assertEqual(len(near_duplicates.find_similar(BASE, BASE)), 1)
+
+        # A transaction that started before that sync commits after it:
+        # lower id and an earlier timestamp than rows already indexed
+        late = self._prompt('Late')
+        row = ImageHash.objects.create(id=10, prompt=late, phash=to_signed(BASE), dhash=to_signed(BASE))
+        ImageHash.objects.filter(pk=row.pk).update(created_at=timezone.now() - timedelta(seconds=60))
+        with patch('prompts.services.near_duplicates.NEAR_DUPLICATE_SYNC_SECONDS', 0):
+            ids = {m.object_id for m in near_duplicates.find_similar(BASE, BASE)}
+        self.assertEqual(ids, {first.pk, late.pk})
+
+    def test_disabled_index_records_nothing(self):
+        prompt = self._prompt('Quiet')
+        with self.settings(NEAR_DUPLICATE_INDEX=False):
+            near_duplicates.record_prompt(prompt.pk, BASE, BASE)
+            self.assertEqual(near_duplicates.find_similar(BASE, BASE), [])
+        self.assertFalse(ImageHash.objects.exists())
+
+    def test_upload_duplicates_lists_published_prompts_only(self):
+        published = self._prompt('Sunset Beach', BASE)
+        self._prompt('Draft Copy', BASE, status=0)
+        trashed = self._prompt('Trashed Copy', flip(BASE, [1]))
+        trashed.soft_delete(self.author)
+
+        warnings = near_duplicates.upload_duplicates(ImageFingerprint('x', BASE, BASE))
+        self.assertEqual(warnings, [{
+            'title': published.title,
+            'url': f'/prompt/{published.slug}/',
+            'distance': 0,
+        }])
+        self.assertEqual(near_duplicates.upload_duplicates(None), [])
+
+    def test_published_generated_image_shares_hashes(self):
+        job = BulkGenerationJob.objects.create(created_by=self.author, total_prompts=1)
+        image = GeneratedImage.objects.create(job=job, prompt_text='p', prompt_order=0)
+        near_duplicates._record((near_duplicates.GENERATED, image.pk), BASE, BASE)
+        prompt = self._prompt('Published Image')
+
+        near_duplicates.record_prompt_from_generated(prompt.pk, image.pk)
+
+        stored = ImageHash.objects.get(prompt=prompt)
+        self.assertEqual(stored.phash, to_signed(BASE))
+        kinds = {m.kind for m in near_duplicates.find_similar(BASE, BASE)}
+        self.assertEqual(kinds, {near_duplicates.PROMPT, near_duplicates.GENERATED})
+        only_prompts = near_duplicates.find_similar(BASE, BASE, kind=near_duplicates.PROMPT)
+        self.assertEqual([m.object_id for m in only_prompts], [prompt.pk])
+
+    def test_duplicate_groups_join_chains(self):
+        a = self._prompt('A', BASE)
+        b = self._prompt('B', flip(BASE, range(5)))
+        c = self._prompt('C', flip(BASE, range(10)))
+        self._prompt('Alone', flip(BASE, range(0, 64, 2)))
+
+        groups = near_duplicates.duplicate_groups(max_distance=5)
+        self.assertEqual(groups, [{
+            (near_duplicates.PROMPT, a.pk), (near_duplicates.PROMPT, b.pk),
+            (near_duplicates.PROMPT, c.pk),
+        }])
+
+    def test_related_prompts_include_visual_matches(self):
+        source = self._prompt('Source', BASE)
+        source.tags.add('portrait')
+        lookalike = self._prompt('Lookalike', flip(BASE, [3, 7]))
+        self._prompt('Unrelated', flip(BASE, range(0, 64, 2)))
+
+        self.assertEqual(get_related_prompts(source), [lookalike])
+
+    def test_report_command_lists_groups(self):
+        a = self._prompt('Twin One', BASE)
+        b = self._prompt('Twin Two', flip(BASE, [2]))
+        out = StringIO()
+
+        call_command('report_duplicate_images', stdout=out)
+
+        output = out.getvalue()
+        self.assertIn('Group 1 (2 images)', output)
+        self.assertIn(f'prompt #{a.pk} [published] Twin One', output)
+        self.assertIn(f'prompt #{b.pk} [published] Twin Two', output)
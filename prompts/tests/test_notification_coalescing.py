@@ -0,0 +1,206 @@
+"""
+Tests for write-time notification deduplication and roll-up.
+
+Covers create_notification's dedupe_key / aggregate_key handling in
+prompts/services/notifications.py, retract_actors() and the reverse
+signal handlers for rolled-up notifications.
+"""
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from prompts.models import Follow, Notification, Prompt
+from prompts.services import notifications as service
+
+
+class NotificationDedupeTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.alice = User.objects.create_user('alice', 'alice@example.com', 'pass')
+        self.bob = User.objects.create_user('bob', 'bob@example.com', 'pass')
+
+    def _comment(self):
+        return service.create_notification(
+            recipient=self.alice, sender=self.bob,
+            notification_type='comment_on_prompt', title='bob commented',
+            message='Nice!', link='/prompt/p/#comments',
+        )
+
+    def test_duplicate_collides_on_constraint_without_lookup(self):
+        self.assertIsNotNone(self._comment())
+        with CaptureQueriesContext(connection) as queries:
+            self.assertIsNone(self._comment())
+        self.assertFalse(any(
+            q['sql'].startswith('SELECT') and '"prompts_notification"' in q['sql']
+            for q in queries.captured_queries
+        ))
+        self.assertEqual(Notification.objects.count(), 1)
+
+    def _at(self, when):
+        return mock.patch('prompts.services.notifications.timezone.now', return_value=when)
+
+    def test_same_event_after_the_window_is_kept(self):
+        self._comment()
+        later = timezone.now() + timedelta(seconds=service.DUPLICATE_WINDOW_SECONDS)
+        with self._at(later):
+            self.assertIsNotNone(self._comment())
+        self.assertEqual(Notification.objects.count(), 2)
+
+    def test_window_slides_from_the_latest_notification(self):
+        # Just before a minute boundary: a fixed bucket would let the
+        # repeat two seconds later through
+        start = timezone.now().replace(second=59, microsecond=0)
+        with self._at(start):
+            self._comment()
+        with self._at(start + timedelta(seconds=2)):
+            self.assertIsNone(self._comment())
+        with self._at(start + timedelta(seconds=service.DUPLICATE_WINDOW_SECONDS - 1)):
+            self.assertIsNone(self._comment())
+        with self._at(start + timedelta(seconds=service.DUPLICATE_WINDOW_SECONDS + 1)):
+            self.assertIsNotNone(self._comment())
+        self.assertEqual(Notification.objects.count(), 2)
+
+    def test_bulk_path_uses_the_same_window(self):
+        entry = {
+            'recipient': self.alice, 'sender': self.bob,
+            'notification_type': 'comment_on_prompt', 'title': 'bob commented',
+            'message': 'Nice!', 'link': '/prompt/p/#comments',
+        }
+        service.create_notifications([entry, entry])
+        self.assertEqual(Notification.objects.count(), 1)
+        later = timezone.now() + timedelta(seconds=service.DUPLICATE_WINDOW_SECONDS)
+        with self._at(later):
+            service.create_notifications([entry])
+        self.assertEqual(Notification.objects.count(), 2)
+
+
+class NotificationRollUpTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.author = User.objects.create_user('author', 'author@example.com', 'pass')
+        self.fans = [
+            User.objects.create_user(f'fan{i}', f'fan{i}@example.com', 'pass')
+            for i in range(4)
+        ]
+        self.prompt = Prompt.objects.create(
+            title='P', slug='p', content='c', author=self.author, status=1,
+        )
+
+    def _likes(self):
+        return Notification.objects.filter(
+            recipient=self.author, notification_type='prompt_liked',
+        )
+
+    def test_likes_on_one_prompt_roll_up(self):
+        service.get_notification_counts(self.author)
+        self.prompt.likes.add(self.fans[0])
+        self.prompt.likes.add(self.fans[1])
+        notification = self._likes().get()
+        self.assertEqual(notification.title, 'fan1 and 1 other liked your prompt')
+
+        self.prompt.likes.add(self.fans[2], self.fans[3])
+        notification = self._likes().get()
+        self.assertEqual(notification.actor_count, 4)
+        self.assertEqual(notification.sender, self.fans[3])
+        self.assertEqual(notification.title, 'fan3 and 3 others liked your prompt')
+        self.assertEqual(service.get_unread_count(self.author), 1)
+
+    def _like_event(self, fan):
+        return service.create_notification(
+            recipient=self.author, sender=fan,
+            notification_type='prompt_liked', title=f'{fan.username} liked your prompt',
+            link='/prompt/p/',
+        )
+
+    def test_double_fire_from_latest_actor_is_ignored(self):
+        self.assertIsNotNone(self._like_event(self.fans[0]))
+        self.assertIsNone(self._like_event(self.fans[0]))
+        self.assertEqual(self._likes().get().actor_count, 1)
+
+    def test_repeat_from_earlier_actor_is_not_counted_again(self):
+        for fan in (self.fans[0], self.fans[1], self.fans[0]):
+            self._like_event(fan)
+        notification = self._likes().get()
+        self.assertEqual(notification.actor_count, 2)
+        self.assertEqual(notification.actor_ids, [self.fans[0].pk, self.fans[1].pk])
+        self.assertEqual(notification.sender, self.fans[1])
+
+    def test_like_unlike_toggling_does_not_inflate_the_count(self):
+        self.prompt.likes.add(self.fans[0])
+        self.prompt.likes.add(self.fans[1])
+        for _ in range(3):
+            self.prompt.likes.remove(self.fans[0])
+            self.prompt.likes.add(self.fans[0])
+        notification = self._likes().get()
+        self.assertEqual(notification.actor_count, 2)
+        self.assertEqual(notification.title, 'fan0 and 1 other liked your prompt')
+
+    def test_unlike_takes_actor_out_of_roll_up(self):
+        self.prompt.likes.add(self.fans[0])
+        self.prompt.likes.add(self.fans[1])
+        self.prompt.likes.add(self.fans[2])
+
+        self.prompt.likes.remove(self.fans[2])
+        notification = self._likes().get()
+        self.assertEqual(notification.actor_count, 2)
+        self.assertEqual(notification.sender, self.fans[1])
+        self.assertEqual(notification.title, 'fan1 and 1 other liked your prompt')
+
+        self.prompt.likes.remove(self.fans[0])
+        self.assertEqual(self._likes().get().title, 'fan1 liked your prompt')
+        self.prompt.likes.remove(self.fans[1])
+        self.assertFalse(self._likes().exists())
+        self.assertEqual(service.get_unread_count(self.author), 0)
+
+    def test_bulk_roll_up_counts_distinct_actors(self):
+        entries = [{
+            'recipient': self.author, 'sender': fan, 'notification_type': 'prompt_liked',
+            'title': f'{fan.username} liked your prompt', 'link': '/prompt/p/',
+        } for fan in (self.fans[0], self.fans[1], self.fans[0])]
+        service.create_notifications(entries)
+        service.create_notifications(entries[:1] + [dict(entries[0], sender=self.fans[2])])
+        notification = self._likes().get()
+        self.assertEqual(notification.actor_count, 3)
+        self.assertEqual(notification.title, 'fan2 and 2 others liked your prompt')
+
+    def test_read_notification_starts_a_new_roll_up(self):
+        self.prompt.likes.add(self.fans[0])
+        service.mark_all_as_read(self.author)
+        self.prompt.likes.add(self.fans[1])
+        self.assertEqual(self._likes().count(), 2)
+        self.assertEqual(self._likes().filter(is_read=False).get().actor_count, 1)
+
+    def test_other_prompts_are_separate_targets(self):
+        other = Prompt.objects.create(
+            title='Q', slug='q', content='c', author=self.author, status=1,
+        )
+        self.prompt.likes.add(self.fans[0])
+        other.likes.add(self.fans[1])
+        self.assertEqual(self._likes().count(), 2)
+
+    def test_follows_roll_up_and_unfollow_leaves_the_others(self):
+        Follow.objects.create(follower=self.fans[0], following=self.author)
+        follow = Follow.objects.create(follower=self.fans[1], following=self.author)
+        notification = Notification.objects.get(notification_type='new_follower')
+        self.assertEqual(notification.title, 'fan1 and 1 other started following you')
+        self.assertEqual(notification.link, '/users/fan1/')
+
+        follow.delete()
+        notification.refresh_from_db()
+        self.assertEqual(notification.title, 'fan0 started following you')
+        self.assertEqual(notification.link, '/users/fan0/')
+        self.assertEqual(notification.actor_count, 1)
+
+    def test_expired_roll_up_releases_target(self):
+        self.prompt.likes.add(self.fans[0])
+        service.expire_notifications(self._likes())
+        self.prompt.likes.add(self.fans[1])
+        self.assertEqual(self._likes().filter(is_expired=False).get().actor_count, 1)
@@ -0,0 +1,162 @@
+"""
+Tests for the cached per-user, per-category unread notification counters.
+
+Covers the counters section of prompts/services/notifications.py, the
+Notification post_save receiver and the notification template tags.
+"""
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.template import Context
+from django.test import RequestFactory, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from prompts.models import Notification, NotificationCounter, Prompt
+from prompts.services import notifications as service
+from prompts.templatetags.notification_tags import (
+    sorted_notification_categories,
+    unread_notification_count,
+)
+
+
+class NotificationCounterTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.alice = User.objects.create_user('alice', 'alice@example.com', 'pass')
+        self.bob = User.objects.create_user('bob', 'bob@example.com', 'pass')
+        self.carol = User.objects.create_user('carol', 'carol@example.com', 'pass')
+
+    def _notify(self, sender, notification_type='new_follower', link=''):
+        return service.create_notification(
+            recipient=self.alice, sender=sender,
+            notification_type=notification_type, title='t', link=link,
+        )
+
+    def _counts(self):
+        return service.get_notification_counts(self.alice)
+
+    def test_first_read_reconciles_from_notifications(self):
+        self._notify(self.bob)
+        self.assertFalse(NotificationCounter.objects.filter(user=self.alice).exists())
+        counts = self._counts()
+        self.assertEqual(counts['total'], 1)
+        self.assertEqual(counts['by_category']['follows'], 1)
+        self.assertEqual(
+            NotificationCounter.objects.filter(user=self.alice).count(),
+            len(Notification.Category.values),
+        )
+
+    def test_warm_read_does_not_touch_notifications_table(self):
+        self._counts()
+        self._notify(self.bob)
+        self._counts()  # re-cache after the write
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(self._counts()['total'], 1)
+        self.assertFalse(
+            any('"prompts_notification"' in q['sql'] for q in queries.captured_queries)
+        )
+
+    def test_create_read_and_delete_adjust_counters(self):
+        self._counts()
+        first = self._notify(self.bob)
+        second = self._notify(self.carol, 'prompt_liked', link='/prompt/x/')
+        self.assertEqual(self._counts()['by_category'], {
+            'comments': 0, 'likes': 1, 'follows': 1, 'collections': 0, 'system': 0,
+        })
+
+        service.mark_as_read(first.pk, self.alice)
+        service.mark_as_read(first.pk, self.alice)  # idempotent
+        self.assertEqual(self._counts()['total'], 1)
+
+        service.delete_notification(self.alice, second.pk)
+        self.assertEqual(self._counts()['total'], 0)
+        self.assertEqual(
+            NotificationCounter.objects.get(user=self.alice, category='likes').unread_count, 0,
+        )
+
+    def test_mark_all_and_delete_all(self):
+        self._counts()
+        self._notify(self.bob)
+        self._notify(self.carol, 'prompt_liked', link='/prompt/x/')
+        service.mark_all_as_read(self.alice, category='likes')
+        self.assertEqual(self._counts()['total'], 1)
+
+        service.delete_all_notifications(self.alice)
+        counts = self._counts()
+        self.assertEqual(counts['total'], 0)
+        self.assertEqual(counts['latest'], {})
+
+    def test_unlike_removes_like_from_counter(self):
+        prompt = Prompt.objects.create(
+            title='P', slug='p', content='c', author=self.alice, status=1,
+        )
+        self._counts()
+        prompt.likes.add(self.bob)
+        self.assertEqual(self._counts()['by_category']['likes'], 1)
+        prompt.likes.remove(self.bob)
+        self.assertEqual(self._counts()['by_category']['likes'], 0)
+
+    def test_passed_expiry_triggers_reconciliation(self):
+        soon = timezone.now() + timedelta(minutes=5)
+        Notification.objects.create(
+            recipient=self.alice, notification_type='system', category='system',
+            title='Short-lived', expires_at=soon,
+        )
+        self.assertEqual(self._counts()['total'], 1)
+        self.assertEqual(self._counts()['next_expiry'], soon)
+
+        later = soon + timedelta(seconds=1)
+        with mock.patch('prompts.services.notifications.timezone.now', return_value=later):
+            self.assertEqual(self._counts()['total'], 0)
+
+    def test_expire_notifications(self):
+        self._counts()
+        self._notify(self.bob)
+        service.expire_notifications(Notification.objects.filter(recipient=self.alice))
+        self.assertEqual(self._counts()['total'], 0)
+
+    def test_system_blast_recounts_recipients(self):
+        self._counts()
+        service.create_system_notification('Hello everyone', audience='all')
+        self.assertEqual(self._counts()['by_category']['system'], 1)
+
+    def test_old_counters_are_reconciled(self):
+        self._counts()
+        # Drift the stored counter, then age it past the reconcile interval
+        NotificationCounter.objects.filter(user=self.alice, category='follows').update(
+            unread_count=7,
+            reconciled_at=timezone.now() - service.COUNTER_RECONCILE_INTERVAL - timedelta(1),
+        )
+        cache.clear()
+        self.assertEqual(self._counts()['by_category']['follows'], 0)
+
+
+class NotificationTagTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.alice = User.objects.create_user('alice', 'alice@example.com', 'pass')
+        self.bob = User.objects.create_user('bob', 'bob@example.com', 'pass')
+        service.create_notification(
+            recipient=self.alice, sender=self.bob,
+            notification_type='new_follower', title='t',
+        )
+
+    def test_both_tags_share_one_counts_read(self):
+        request = RequestFactory().get('/')
+        request.user = self.alice
+        context = Context({'request': request})
+        with mock.patch(
+            'prompts.templatetags.notification_tags.get_notification_counts',
+            wraps=service.get_notification_counts,
+        ) as counts:
+            self.assertEqual(unread_notification_count(context), 1)
+            categories = sorted_notification_categories(context)
+        self.assertEqual(counts.call_count, 1)
+        self.assertEqual(categories[0]['value'], 'follows')
+        self.assertEqual(categories[0]['count'], 1)
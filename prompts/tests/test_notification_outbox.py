@@ -0,0 +1,139 @@
+"""
+Tests for the notification outbox.
+
+Covers prompts/services/notification_outbox.py, create_notifications()
+in prompts/services/notifications.py and the enqueueing signal handlers.
+"""
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from prompts.models import (
+    Collection, CollectionItem, Comment, Follow, Notification, NotificationCounter,
+    NotificationEvent, Prompt,
+)
+from prompts.services import notification_outbox as outbox
+from prompts.services import notifications as service
+
+
+@override_settings(NOTIFICATION_OUTBOX_ASYNC=True)
+class NotificationOutboxTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.author = User.objects.create_user('author', 'author@example.com', 'pass')
+        self.fans = [
+            User.objects.create_user(f'fan{i}', f'fan{i}@example.com', 'pass')
+            for i in range(3)
+        ]
+        self.prompt = Prompt.objects.create(
+            title='P', slug='p', content='c', author=self.author, status=1,
+        )
+
+    def test_like_only_queues_an_event(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.prompt.likes.add(self.fans[0])
+        self.assertFalse(any(
+            '"prompts_notification"' in q['sql'] for q in queries.captured_queries
+        ))
+        event = NotificationEvent.objects.get()
+        self.assertEqual(event.kind, NotificationEvent.Kind.LIKE)
+        self.assertEqual((event.actor_id, event.object_id), (self.fans[0].pk, self.prompt.pk))
+        self.assertFalse(Notification.objects.exists())
+
+    def test_drain_writes_notifications_and_empties_outbox(self):
+        service.get_notification_counts(self.author)
+        for fan in self.fans:
+            self.prompt.likes.add(fan)
+        Follow.objects.create(follower=self.fans[0], following=self.author)
+        Comment.objects.create(prompt=self.prompt, author=self.fans[1], body='Nice!')
+
+        self.assertEqual(outbox.drain(), 5)
+        self.assertFalse(NotificationEvent.objects.exists())
+        like = Notification.objects.get(notification_type='prompt_liked')
+        self.assertEqual(like.actor_count, 3)
+        self.assertEqual(like.title, 'fan2 and 2 others liked your prompt')
+        self.assertEqual(
+            Notification.objects.get(notification_type='comment_on_prompt').message, 'Nice!',
+        )
+        self.assertEqual(service.get_unread_count(self.author), 3)
+
+    def test_drain_keeps_counters_so_badge_skips_notification_table(self):
+        service.get_notification_counts(self.author)
+        counters = NotificationCounter.objects.filter(user=self.author).count()
+        self.prompt.likes.add(self.fans[0])
+        Comment.objects.create(prompt=self.prompt, author=self.fans[1], body='Nice!')
+        outbox.drain()
+        # A repeat of the same comment within the window is not counted again
+        service.create_notifications([{
+            'recipient': self.author, 'sender': self.fans[1],
+            'notification_type': 'comment_on_prompt',
+            'title': Notification.objects.get(notification_type='comment_on_prompt').title,
+            'message': 'Nice!', 'link': Notification.objects.get(
+                notification_type='comment_on_prompt').link,
+        }])
+
+        self.assertEqual(NotificationCounter.objects.filter(user=self.author).count(), counters)
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(service.get_unread_count(self.author), 2)
+        self.assertFalse(any(
+            '"prompts_notification"' in q['sql'] for q in queries.captured_queries
+        ))
+
+    def test_aggregated_insert_folds_into_concurrently_opened_notification(self):
+        real_roll_up = service._roll_up
+        calls = []
+
+        def racing_roll_up(*args, **kwargs):
+            calls.append(args)
+            if len(calls) == 1:
+                # Another writer opens the notification after our lookup
+                service.create_notification(
+                    self.author, 'prompt_liked', 'fan0 liked your prompt',
+                    sender=self.fans[0], link=args[4],
+                )
+                return None, False
+            return real_roll_up(*args, **kwargs)
+
+        self.prompt.likes.add(self.fans[1], self.fans[2])
+        with mock.patch.object(service, '_roll_up', racing_roll_up):
+            self.assertEqual(outbox.drain(), 2)
+        like = Notification.objects.get(notification_type='prompt_liked')
+        self.assertEqual(like.actor_count, 3)
+        self.assertEqual(like.sender, self.fans[2])
+
+    def test_batch_rolls_into_open_notification(self):
+        self.prompt.likes.add(self.fans[0])
+        outbox.drain()
+        self.prompt.likes.add(self.fans[1], self.fans[2])
+        outbox.drain()
+        like = Notification.objects.get(notification_type='prompt_liked')
+        self.assertEqual(like.actor_count, 3)
+        self.assertEqual(like.sender, self.fans[2])
+
+    def test_undone_and_private_actions_are_skipped(self):
+        self.prompt.likes.add(self.fans[0])
+        self.prompt.likes.remove(self.fans[0])
+        collection = Collection.objects.create(user=self.fans[1], title='Mine', slug='mine')
+        CollectionItem.objects.create(collection=collection, prompt=self.prompt)
+        # Made private before the drain ran
+        Collection.objects.filter(pk=collection.pk).update(is_private=True)
+        self.assertEqual(outbox.drain(), 2)
+        self.assertFalse(Notification.objects.exists())
+
+    def test_drain_task_scheduled_once_per_window(self):
+        with mock.patch('django_q.tasks.async_task') as async_task:
+            with self.captureOnCommitCallbacks(execute=True):
+                self.prompt.likes.add(self.fans[0])
+            with self.captureOnCommitCallbacks(execute=True):
+                self.prompt.likes.add(self.fans[1])
+            async_task.assert_called_once_with('prompts.tasks.drain_notification_outbox')
+
+            outbox.drain()
+            with self.captureOnCommitCallbacks(execute=True):
+                self.prompt.likes.add(self.fans[2])
+            self.assertEqual(async_task.call_count, 2)
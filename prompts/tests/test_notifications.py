@@ -14,8 +14,8 @@ from django.urls import reverse
 from django.utils import timezone
 
 from prompts.models import (
-    Collection, CollectionItem, Comment, Follow, Notification,
-    NOTIFICATION_TYPE_CATEGORY_MAP, Prompt,
+    BroadcastNotification, Collection, CollectionItem, Comment, Follow,
+    Notification, NOTIFICATION_TYPE_CATEGORY_MAP, Prompt,
 )
 from prompts.services.notifications import (
     create_notification, delete_all_notifications, delete_notification,
@@ -291,12 +291,14 @@ class TestNotificationService(NotificationTestBase):
             sender=self.user2,
             notification_type='prompt_liked',
             title='Like 1',
+            link='/prompt/one/',
         )
         create_notification(
             recipient=self.user1,
             sender=self.user3,
             notification_type='prompt_liked',
             title='Like 2',
+            link='/prompt/two/',
         )
         create_notification(
             recipient=self.user1,
@@ -1351,6 +1353,8 @@ class NotificationReverseSignalTests(NotificationTestBase):
     def test_unlike_only_deletes_own_notification(self):
         """Unliking only removes that user's notification, not others'."""
         self.prompt.likes.add(self.user2)
+        # Read, so the next like opens its own notification (not a roll-up)
+        mark_all_as_read(self.user1)
         self.prompt.likes.add(self.user3)
         self.assertEqual(
             Notification.objects.filter(
@@ -1392,6 +1396,8 @@ class NotificationReverseSignalTests(NotificationTestBase):
             follower=self.user2,
             following=self.user1,
         )
+        # Read, so the next follow opens its own notification (not a roll-up)
+        mark_all_as_read(self.user1)
         Follow.objects.create(
             follower=self.user3,
             following=self.user1,
@@ -1745,7 +1751,7 @@ class TestComposeSystemNotification(TestCase):
         )
 
     def test_compose_system_notification_all_users(self):
-        """POST with action=send creates notifications for all active users."""
+        """POST with action=send stores one broadcast for all active users."""
         self.client.force_login(self.staff_user)
         response = self.client.post(
             reverse('prompts:system_notifications'),
@@ -1757,14 +1763,14 @@ class TestComposeSystemNotification(TestCase):
         )
         self.assertEqual(response.status_code, 200)
         self.assertContains(response, 'Sent to 3 users.')
+        # One row regardless of audience size; no per-user rows
+        self.assertFalse(Notification.objects.exists())
         # Title is auto-derived from message
-        notifs = Notification.objects.filter(
-            notification_type='system',
+        notif = BroadcastNotification.objects.get(
             title='Test System Message body',
         )
-        self.assertEqual(notifs.count(), 3)
+        self.assertEqual(notif.recipient_count, 3)
         # Verify system notification contract fields
-        notif = notifs.first()
         self.assertTrue(notif.is_admin_notification)
         self.assertIsNone(notif.sender)
         self.assertEqual(notif.category, 'system')
@@ -1825,11 +1831,8 @@ class TestComposeSystemNotification(TestCase):
         )
         self.assertEqual(response.status_code, 200)
         # Should default to 'all' and send to all 3 active users
-        count = Notification.objects.filter(
-            notification_type='system',
-            title='Invalid audience test',
-        ).count()
-        self.assertEqual(count, 3)
+        notif = BroadcastNotification.objects.get(title='Invalid audience test')
+        self.assertEqual(notif.recipient_count, 3)
 
     def test_compose_with_html_message(self):
         """HTML message stores sanitized HTML in title field."""
@@ -1843,9 +1846,7 @@ class TestComposeSystemNotification(TestCase):
             },
         )
         self.assertContains(response, 'Sent to 3 users.')
-        notif = Notification.objects.filter(
-            notification_type='system',
-        ).first()
+        notif = BroadcastNotification.objects.get()
         self.assertIn('<b>Important</b>', notif.title)
         self.assertEqual(notif.message, '')
 
@@ -1873,15 +1874,16 @@ class TestSystemNotificationDisplay(NotificationTestBase):
         """Expired notifications don't appear in user's notification list."""
         from prompts.services.notifications import (
             create_system_notification,
+            expire_system_notification_batch,
         )
         create_system_notification(
             message='Old announcement',
             audience='all',
         )
-        # Manually expire them
-        Notification.objects.filter(
-            title='Old announcement'
-        ).update(is_expired=True)
+        # Manually expire it
+        expire_system_notification_batch(
+            BroadcastNotification.objects.get(title='Old announcement').batch_id
+        )
 
         self.client.force_login(self.user1)
         response = self.client.get(
@@ -1893,6 +1895,7 @@ class TestSystemNotificationDisplay(NotificationTestBase):
         """Expired notifications don't count in unread badge."""
         from prompts.services.notifications import (
             create_system_notification,
+            expire_system_notification_batch,
             get_unread_count,
         )
         create_system_notification(
@@ -1902,9 +1905,9 @@ class TestSystemNotificationDisplay(NotificationTestBase):
         count_before = get_unread_count(self.user1)
         self.assertGreater(count_before, 0)
 
-        Notification.objects.filter(
-            title='Expiring notice'
-        ).update(is_expired=True)
+        expire_system_notification_batch(
+            BroadcastNotification.objects.get(title='Expiring notice').batch_id
+        )
 
         count_after = get_unread_count(self.user1)
         self.assertEqual(count_after, count_before - 1)
@@ -1913,6 +1916,11 @@ class TestSystemNotificationDisplay(NotificationTestBase):
 class TestAutoMarkSystemNotificationsRead(NotificationTestBase):
     """Tests for auto-marking system notifications as read on page load."""
 
+    def _broadcast(self, title):
+        """The broadcast as user1 sees it (with their is_read)."""
+        from prompts.services.notifications import visible_broadcasts
+        return visible_broadcasts(self.user1).get(title=title)
+
     def test_system_notifications_auto_marked_on_page_load(self):
         """Loading the system tab marks all system notifications as read."""
         from prompts.services.notifications import create_system_notification
@@ -1920,17 +1928,13 @@ class TestAutoMarkSystemNotificationsRead(NotificationTestBase):
             message='Auto-read test',
             audience='all',
         )
-        notif = Notification.objects.get(
-            recipient=self.user1, title='Auto-read test'
-        )
-        self.assertFalse(notif.is_read)
+        self.assertFalse(self._broadcast('Auto-read test').is_read)
 
         self.client.force_login(self.user1)
         self.client.get(
             reverse('prompts:notifications') + '?category=system'
         )
-        notif.refresh_from_db()
-        self.assertTrue(notif.is_read)
+        self.assertTrue(self._broadcast('Auto-read test').is_read)
 
     def test_non_system_notifications_not_auto_marked(self):
         """Loading the system tab does NOT mark non-system notifications."""
@@ -1959,10 +1963,7 @@ class TestAutoMarkSystemNotificationsRead(NotificationTestBase):
         self.client.get(
             reverse('prompts:notifications') + '?category=likes'
         )
-        notif = Notification.objects.get(
-            recipient=self.user1, title='Stay unread'
-        )
-        self.assertFalse(notif.is_read)
+        self.assertFalse(self._broadcast('Stay unread').is_read)
 
     def test_auto_mark_only_on_first_page(self):
         """Load More requests (offset > 0) do NOT trigger auto-mark."""
@@ -1975,10 +1976,7 @@ class TestAutoMarkSystemNotificationsRead(NotificationTestBase):
         self.client.get(
             reverse('prompts:notifications') + '?category=system&offset=15'
         )
-        notif = Notification.objects.get(
-            recipient=self.user1, title='Offset test'
-        )
-        self.assertFalse(notif.is_read)
+        self.assertFalse(self._broadcast('Offset test').is_read)
 
     def test_system_tab_badge_clears_after_page_load(self):
         """System tab badge count should be 0 after auto-mark."""
@@ -2002,19 +2000,20 @@ class TestAutoMarkSystemNotificationsRead(NotificationTestBase):
         from prompts.services.notifications import create_system_notification
         create_system_notification(message='Blast A', audience='all')
         create_system_notification(message='Blast B', audience='all')
-        unread = Notification.objects.filter(
-            recipient=self.user1, is_admin_notification=True, is_read=False,
-        ).count()
-        self.assertEqual(unread, 2)
+        Notification.objects.create(
+            recipient=self.user1, notification_type='system',
+            category='system', title='Direct', is_admin_notification=True,
+        )
+        self.assertEqual(get_unread_count(self.user1), 3)
 
         self.client.force_login(self.user1)
         self.client.get(
             reverse('prompts:notifications') + '?category=system'
         )
-        unread_after = Notification.objects.filter(
+        self.assertEqual(get_unread_count(self.user1), 0)
+        self.assertFalse(Notification.objects.filter(
             recipient=self.user1, is_admin_notification=True, is_read=False,
-        ).count()
-        self.assertEqual(unread_after, 0)
+        ).exists())
 
 
 class TestDeleteSystemNotification(TestCase):
@@ -2039,8 +2038,8 @@ class TestDeleteSystemNotification(TestCase):
             message='Maintenance Notice',
             audience='all',
         )
-        self.assertGreater(
-            Notification.objects.filter(title='Maintenance Notice').count(), 0
+        self.assertTrue(
+            BroadcastNotification.objects.filter(title='Maintenance Notice').exists()
         )
 
         # Use batch_id from the service (matches how template works)
@@ -2057,10 +2056,10 @@ class TestDeleteSystemNotification(TestCase):
         )
         self.assertEqual(response.status_code, 200)
         self.assertContains(response, 'Notification deleted successfully')
-        self.assertContains(response, 'user feeds')
-        # Notifications should be hard-deleted
-        self.assertEqual(
-            Notification.objects.filter(title='Maintenance Notice').count(), 0
+        self.assertContains(response, 'Removed from 2 user feeds')
+        # Broadcast should be hard-deleted
+        self.assertFalse(
+            BroadcastNotification.objects.filter(title='Maintenance Notice').exists()
         )
 
     def test_delete_batch_missing_batch_id(self):
@@ -2139,9 +2138,7 @@ class TestSystemNotificationValidation(TestCase):
             },
         )
         self.assertContains(response, 'Sent to')
-        notif = Notification.objects.filter(
-            title='No Link Field'
-        ).first()
+        notif = BroadcastNotification.objects.get(title='No Link Field')
         # Link field is no longer processed — notification has empty link
         self.assertEqual(notif.link, '')
 
@@ -2413,21 +2410,19 @@ class TestCreateSystemNotificationNewAPI(TestCase):
             audience='all',
         )
         self.assertEqual(result['count'], 1)
-        notif = Notification.objects.filter(
-            notification_type='system'
-        ).first()
+        notif = BroadcastNotification.objects.get()
         self.assertEqual(notif.title, 'Scheduled maintenance tonight')
 
     def test_batch_id_set_on_all_notifications(self):
-        """All notifications in a blast share the same 8-char batch_id."""
+        """All notifications in a fanned-out blast share the same 8-char batch_id."""
         from prompts.services.notifications import (
             create_system_notification,
         )
         # Create a second user so we get multiple notifications
-        User.objects.create_user('svcuser2', 'svc2@example.com', 'pass')
+        user2 = User.objects.create_user('svcuser2', 'svc2@example.com', 'pass')
         create_system_notification(
             message='Batch ID check',
-            audience='all',
+            audience=[self.user1.pk, user2.pk],
         )
         notifs = Notification.objects.filter(title='Batch ID check')
         batch_ids = set(notifs.values_list('batch_id', flat=True))
@@ -2446,9 +2441,7 @@ class TestCreateSystemNotificationNewAPI(TestCase):
             message='<p><strong>Breaking</strong> news for <em>everyone</em></p>',
             audience='all',
         )
-        notif = Notification.objects.filter(
-            notification_type='system'
-        ).first()
+        notif = BroadcastNotification.objects.get()
         self.assertIn('<strong>Breaking</strong>', notif.title)
         self.assertIn('<em>everyone</em>', notif.title)
 
@@ -2461,9 +2454,7 @@ class TestCreateSystemNotificationNewAPI(TestCase):
             message='<p>Test notification</p>',
             audience='all',
         )
-        notif = Notification.objects.filter(
-            notification_type='system'
-        ).first()
+        notif = BroadcastNotification.objects.get()
         self.assertEqual(notif.message, '')
 
     def test_empty_html_gets_default_title(self):
@@ -2475,9 +2466,7 @@ class TestCreateSystemNotificationNewAPI(TestCase):
             message='<p><br></p>',
             audience='all',
         )
-        notif = Notification.objects.filter(
-            notification_type='system'
-        ).first()
+        notif = BroadcastNotification.objects.get()
         self.assertEqual(notif.title, 'System Notification')
 
     def test_created_by_in_log(self):
@@ -2506,9 +2495,7 @@ class TestCreateSystemNotificationNewAPI(TestCase):
             message='<p>Hello</p><script>alert("xss")</script><b>bold</b>',
             audience='all',
         )
-        notif = Notification.objects.filter(
-            notification_type='system'
-        ).first()
+        notif = BroadcastNotification.objects.get()
         # script tag should be stripped; p and b are allowed
         self.assertNotIn('<script>', notif.title)
         self.assertIn('<p>', notif.title)
@@ -2549,13 +2536,13 @@ class TestDeleteSystemNotificationBatch(TestCase):
             message='Delete Me',
             audience='all',
         )
-        notif = Notification.objects.filter(
+        notif = BroadcastNotification.objects.filter(
             title='Delete Me'
         ).first()
         count = delete_system_notification_batch(notif.batch_id)
         self.assertEqual(count, 1)
         self.assertEqual(
-            Notification.objects.filter(title='Delete Me').count(), 0
+            BroadcastNotification.objects.filter(title='Delete Me').count(), 0
         )
 
     def test_delete_no_matching_rows_returns_zero(self):
@@ -2583,17 +2570,17 @@ class TestDeleteSystemNotificationBatch(TestCase):
         create_system_notification(message='Batch A', audience='all')
         create_system_notification(message='Batch B', audience='all')
 
-        notif_a = Notification.objects.filter(title='Batch A').first()
-        notif_b = Notification.objects.filter(title='Batch B').first()
+        notif_a = BroadcastNotification.objects.filter(title='Batch A').first()
+        notif_b = BroadcastNotification.objects.filter(title='Batch B').first()
         # Verify batches have different batch_ids
         self.assertNotEqual(notif_a.batch_id, notif_b.batch_id)
 
         delete_system_notification_batch(notif_a.batch_id)
         self.assertEqual(
-            Notification.objects.filter(title='Batch A').count(), 0
+            BroadcastNotification.objects.filter(title='Batch A').count(), 0
         )
         self.assertGreater(
-            Notification.objects.filter(title='Batch B').count(), 0
+            BroadcastNotification.objects.filter(title='Batch B').count(), 0
         )
 
 
@@ -2646,7 +2633,7 @@ class TestBatchDisplay(TestCase):
             message='Expired Batch',
             audience='all',
         )
-        Notification.objects.filter(
+        BroadcastNotification.objects.filter(
             title='Expired Batch'
         ).update(is_expired=True)
 
@@ -2837,9 +2824,7 @@ class TestBleachProtocolSanitization(TestCase):
             message='<a href="javascript:alert(1)">click</a>',
             audience='all',
         )
-        notif = Notification.objects.filter(
-            notification_type='system'
-        ).first()
+        notif = BroadcastNotification.objects.get()
         self.assertNotIn('javascript:', notif.title)
 
     def test_valid_https_href_preserved(self):
@@ -2851,9 +2836,7 @@ class TestBleachProtocolSanitization(TestCase):
             message='<a href="https://example.com">link</a>',
             audience='all',
         )
-        notif = Notification.objects.filter(
-            notification_type='system'
-        ).first()
+        notif = BroadcastNotification.objects.get()
         self.assertIn('https://example.com', notif.title)
 
     def test_onclick_attribute_stripped(self):
@@ -2865,8 +2848,6 @@ class TestBleachProtocolSanitization(TestCase):
             message='<p onclick="alert(1)">text</p>',
             audience='all',
         )
-        notif = Notification.objects.filter(
-            notification_type='system'
-        ).first()
+        notif = BroadcastNotification.objects.get()
         self.assertNotIn('onclick', notif.title)
         self.assertIn('<p>', notif.title)
@@ -0,0 +1,172 @@
+"""
+Tests for batched OpenAI text moderation.
+
+Covers OpenAIModerationService.moderate_texts, the verdict cache and the
+batching() window in prompts/services/openai_moderation.py. Requests go
+through the real OpenAI client to a local stub of the moderations
+endpoint.
+"""
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+from openai import OpenAI
+
+from prompts.services.openai_moderation import OpenAIModerationService
+
+CATEGORIES = [
+    'harassment', 'harassment/threatening', 'hate', 'hate/threatening',
+    'illicit', 'illicit/violent', 'self-harm', 'self-harm/instructions',
+    'self-harm/intent', 'sexual', 'sexual/minors', 'violence', 'violence/graphic',
+]
+
+LOCMEM_CACHE = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'openai-moderation-tests',
+    }
+}
+
+
+class StubModerationHandler(BaseHTTPRequestHandler):
+    """POST /v1/moderations: texts containing 'attack' are violent."""
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+        inputs = body['input'] if isinstance(body['input'], list) else [body['input']]
+        self.server.requests.append(inputs)
+        if self.server.fail:
+            self.send_response(500)
+            self.end_headers()
+            return
+        results = []
+        for text in inputs:
+            violent = 'attack' in text.lower()
+            results.append({
+                'flagged': violent,
+                'categories': {c: violent and c == 'violence' for c in CATEGORIES},
+                'category_scores': {c: 0.9 if violent and c == 'violence' else 0.01 for c in CATEGORIES},
+                'category_applied_input_types': {c: ['text'] for c in CATEGORIES},
+            })
+        payload = json.dumps({
+            'id': 'modr-stub', 'model': 'omni-moderation-latest', 'results': results,
+        }).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+
+@override_settings(OPENAI_API_KEY='sk-test', CACHES=LOCMEM_CACHE)
+class ModerationBatchingTests(SimpleTestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.server = ThreadingHTTPServer(('127.0.0.1', 0), StubModerationHandler)
+        cls.server.requests = []
+        cls.server.fail = False
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+        super().tearDownClass()
+
+    def setUp(self):
+        cache.clear()
+        self.server.requests.clear()
+        self.server.fail = False
+        self.service = OpenAIModerationService()
+        self.service.client = OpenAI(
+            api_key='sk-test',
+            base_url=f'http://127.0.0.1:{self.server.server_port}/v1',
+            max_retries=0,
+        )
+
+    def test_one_request_for_many_texts(self):
+        results = self.service.moderate_texts([
+            'A calm lake', 'An attack at dawn', '', 'A  calm LAKE ',
+        ])
+        self.assertEqual(self.server.requests, [['A calm lake', 'An attack at dawn']])
+        self.assertEqual([is_safe for is_safe, _, _ in results], [True, False, True, True])
+        self.assertEqual(results[1][1][0]['category'], 'violence')
+        self.assertEqual(results[1][2], 0.9)
+
+    def test_verdicts_cached_by_normalised_text(self):
+        self.service.moderate_texts(['An attack at dawn'])
+        is_safe, _, _ = self.service.moderate_text('an ATTACK at   dawn')
+        self.assertFalse(is_safe)
+        self.assertEqual(len(self.server.requests), 1)
+
+    def test_batches_split_on_size_limits(self):
+        texts = [f'prompt number {i}' for i in range(7)]
+        with mock.patch('prompts.services.openai_moderation.MODERATION_BATCH_MAX_INPUTS', 3):
+            self.service.moderate_texts(texts)
+        self.assertEqual([len(r) for r in self.server.requests], [3, 3, 1])
+
+    def test_api_errors_flag_every_text_and_are_not_cached(self):
+        self.server.fail = True
+        results = self.service.moderate_texts(['one', 'two'])
+        self.assertEqual([r[1][0]['category'] for r in results], ['api_error'] * 2)
+        self.server.fail = False
+        self.assertTrue(self.service.moderate_text('one')[0])
+
+    def test_concurrent_callers_share_a_request(self):
+        results = {}
+
+        def check(i):
+            results[i] = self.service.moderate_text(f'attack plan {i}' if i % 2 else f'garden {i}')
+
+        with self.service.batching(linger=0.5):
+            threads = [threading.Thread(target=check, args=(i,)) for i in range(8)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join(5)
+        self.assertEqual(len(self.server.requests), 1)
+        self.assertEqual(len(self.server.requests[0]), 8)
+        self.assertEqual(
+            [results[i][0] for i in range(8)],
+            [True, False] * 4,
+        )
+
+    def test_rate_limiter_charged_once_per_request(self):
+        limiter = mock.Mock()
+        with self.service.batching(linger=0.5, limiter=limiter):
+            threads = [
+                threading.Thread(target=self.service.moderate_text, args=(f'text {i}',))
+                for i in range(8)
+            ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join(5)
+        self.assertEqual(len(self.server.requests), 1)
+        self.assertEqual(limiter.acquire.call_count, 1)
+
+        # Cached verdicts cost no token
+        self.service.moderate_texts(['text 1', 'text 2'], limiter=limiter)
+        self.assertEqual(limiter.acquire.call_count, 1)
+
+    def test_full_batch_sent_without_waiting_for_linger(self):
+        with mock.patch('prompts.services.openai_moderation.MODERATION_BATCH_MAX_INPUTS', 2):
+            with self.service.batching(linger=30):
+                threads = [
+                    threading.Thread(target=self.service.moderate_text, args=(f'text {i}',))
+                    for i in range(2)
+                ]
+                for thread in threads:
+                    thread.start()
+                for thread in threads:
+                    thread.join(5)
+                self.assertFalse(any(thread.is_alive() for thread in threads))
+        self.assertEqual(len(self.server.requests), 1)
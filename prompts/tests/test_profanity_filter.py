@@ -0,0 +1,175 @@
+"""
+Tests for the compiled profanity word matchers.
+
+Covers WordMatcher / get_word_matcher and the MatcherRegistry in
+prompts/services/profanity_filter.py, and the checks that run on them
+(check_text, check_texts_with_provider, validate_prompts). Results are
+checked against the per-word ``\\b<word>\\b`` search the matcher replaces.
+"""
+import re
+from unittest import mock
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import SimpleTestCase, TestCase
+from django.test.utils import CaptureQueriesContext
+
+from prompts.models import ProfanityWord
+from prompts.services.bulk_generation import BulkGenerationService
+from prompts.services.profanity_filter import (
+    ProfanityFilterService,
+    WordMatcher,
+    get_matcher_registry,
+    get_word_matcher,
+)
+
+
+def per_word_search(entries, text):
+    """The pre-matcher check_text loop: one regex per word."""
+    found = []
+    for word, severity in entries:
+        pattern = r'\b' + re.escape(word) + r'\b'
+        positions = [m.start() for m in re.finditer(pattern, text)]
+        if positions:
+            found.append({
+                'word': word, 'severity': severity,
+                'count': len(positions), 'positions': positions,
+            })
+    return found
+
+
+class WordMatcherTests(SimpleTestCase):
+
+    ENTRIES = (
+        ('bad', 'low'),
+        ('bad word', 'high'),
+        ('word', 'medium'),
+        ('badger', 'critical'),
+        ('a.b', 'low'),
+        ('-x', 'low'),
+        ('o o', 'low'),
+    )
+
+    def test_matches_per_word_search(self):
+        matcher = WordMatcher(self.ENTRIES)
+        for text in [
+            '',
+            'a bad word here',
+            'badger badgers bad-word wordy sword',
+            'bad word bad word word',
+            'a.b a.bc xa.b -x y-x',
+            'o o o o',
+            'nothing to see',
+        ]:
+            with self.subTest(text=text):
+                self.assertEqual(matcher.find(text), per_word_search(self.ENTRIES, text))
+
+    def test_overlapping_phrases_all_reported(self):
+        found = WordMatcher(self.ENTRIES).find('a bad word')
+        self.assertEqual(
+            [(w['word'], w['positions']) for w in found],
+            [('bad', [2]), ('bad word', [2]), ('word', [6])],
+        )
+
+    def test_matcher_compiled_once_per_list(self):
+        entries = (('matcheronce', 'low'),)
+        self.assertIs(get_word_matcher(entries), get_word_matcher(tuple(entries)))
+        self.assertIsNot(
+            get_word_matcher(entries),
+            get_word_matcher(entries + (('another', 'low'),)),
+        )
+
+
+class CheckTextTests(TestCase):
+
+    def setUp(self):
+        cache.delete('profanity_word_list')
+        ProfanityWord.objects.create(word='meh', severity='low')
+        ProfanityWord.objects.create(word='awful', severity='critical')
+        ProfanityWord.objects.create(
+            word='advisoryonly', severity='medium', block_scope='provider_advisory',
+        )
+
+    def test_results_sorted_by_severity(self):
+        is_clean, found, severity = ProfanityFilterService().check_text(
+            'Meh. Truly AWFUL, meh advisoryonly',
+        )
+        self.assertFalse(is_clean)
+        self.assertEqual(severity, 'critical')
+        self.assertEqual(found, [
+            {'word': 'awful', 'severity': 'critical', 'count': 1, 'positions': [11]},
+            {'word': 'meh', 'severity': 'low', 'count': 2, 'positions': [0, 18]},
+        ])
+
+    def test_refresh_picks_up_new_words(self):
+        service = ProfanityFilterService()
+        self.assertTrue(service.check_text('brand new term')[0])
+        ProfanityWord.objects.create(word='new term', severity='high')
+        service.refresh_word_list()
+        self.assertEqual(service.check_text('brand new term')[2], 'high')
+
+
+class MatcherRegistryTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        ProfanityWord.objects.create(word='awful', severity='critical')
+        ProfanityWord.objects.create(
+            word='topless', severity='medium', block_scope='provider_advisory',
+            affected_providers=['gpt-image-1.5', 'google/nano-banana-2'],
+        )
+        self.service = ProfanityFilterService()
+
+    def _word_queries(self, queries):
+        return [
+            q for q in queries.captured_queries
+            if '"prompts_profanityword"' in q['sql']
+        ]
+
+    def test_batch_loads_once_and_checks_every_text(self):
+        texts = ['a topless portrait', 'something awful', 'a clean prompt'] * 70
+        with CaptureQueriesContext(connection) as queries:
+            results = self.service.check_texts_with_provider(texts, 'gpt-image-1.5')
+        self.assertEqual(len(self._word_queries(queries)), 1)
+        self.assertEqual(
+            [r['reason'] for r in results[:3]],
+            ['provider_advisory', 'universal_block', 'clean'],
+        )
+        with CaptureQueriesContext(connection) as queries:
+            results = self.service.check_texts_with_provider(texts, 'flux-schnell')
+        self.assertEqual(self._word_queries(queries), [])
+        self.assertEqual(results[0]['reason'], 'clean')
+
+    def test_per_provider_scopes(self):
+        registry = get_matcher_registry()
+        self.assertEqual(
+            sorted(registry.advisory), ['google/nano-banana-2', 'gpt-image-1.5'],
+        )
+        self.assertEqual(registry.universal.search('awful topless'), ['awful'])
+
+    def test_word_save_and_delete_invalidate_registry(self):
+        result = self.service.check_text_with_provider('very nsfwish', 'gpt-image-1.5')
+        self.assertTrue(result['allowed'])
+
+        word = ProfanityWord.objects.create(word='nsfwish', severity='high')
+        result = self.service.check_text_with_provider('very nsfwish', 'gpt-image-1.5')
+        self.assertEqual(result['reason'], 'universal_block')
+
+        word.delete()
+        self.assertTrue(
+            self.service.check_text_with_provider('very nsfwish', 'gpt-image-1.5')['allowed']
+        )
+
+    def test_validate_prompts_uses_one_batch_check(self):
+        prompts = [f'portrait number {i}' for i in range(200)] + ['topless portrait']
+        with mock.patch.object(
+            ProfanityFilterService, 'check_text_with_provider',
+        ) as single:
+            result = BulkGenerationService().validate_prompts(
+                prompts, provider_id='gpt-image-1.5',
+            )
+        single.assert_not_called()
+        self.assertEqual(
+            [(e['prompt_num'], e['reason']) for e in result['errors']],
+            [(201, 'provider_advisory')],
+        )
@@ -0,0 +1,135 @@
+"""
+Tests for the per-user profile stats snapshot.
+
+Covers prompts/services/profile_stats.py, the counter receivers in
+prompts/signals.py and the profile views that read the snapshot.
+"""
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from prompts.models import Follow, Prompt, UserProfileStats
+from prompts.services import profile_stats
+from prompts.services.leaderboard import LeaderboardService
+
+
+class ProfileStatsSnapshotTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.author = User.objects.create_user(username='author', password='pw')
+        self.fan = User.objects.create_user(username='fan', password='pw')
+        self.other = User.objects.create_user(username='other', password='pw')
+        self.prompt = Prompt.objects.create(
+            title='First', slug='first', content='c', author=self.author, status=1,
+        )
+        Prompt.objects.create(
+            title='Draft', slug='draft', content='c', author=self.author, status=0,
+        )
+        self.prompt.likes.add(self.fan)
+
+    def _snapshot(self):
+        return UserProfileStats.objects.get(user=self.author)
+
+    def test_snapshot_built_on_first_use(self):
+        self.assertFalse(UserProfileStats.objects.filter(user=self.author).exists())
+        snapshot = profile_stats.get_snapshot(self.author)
+        self.assertEqual(snapshot.prompt_count, 1)
+        self.assertEqual(snapshot.likes_received, 1)
+        self.assertEqual(snapshot.version, 1)
+        self.assertTrue(UserProfileStats.objects.filter(user=self.author).exists())
+
+    def test_joined_snapshot_costs_no_query(self):
+        profile_stats.get_snapshot(self.author)
+        user = User.objects.select_related('profile_stats').get(pk=self.author.pk)
+        with self.assertNumQueries(0):
+            profile_stats.get_snapshot(user)
+
+    def test_likes_adjust_counter_and_version(self):
+        profile_stats.get_snapshot(self.author)
+        self.prompt.likes.add(self.other)
+        snapshot = self._snapshot()
+        self.assertEqual(snapshot.likes_received, 2)
+        self.assertEqual(snapshot.version, 2)
+
+        # Removing a like that was never there must not undercount
+        self.prompt.likes.remove(self.other, self.author)
+        self.assertEqual(self._snapshot().likes_received, 1)
+
+        self.fan.prompt_likes.clear()
+        self.other.prompt_likes.add(self.prompt)
+        self.assertEqual(self._snapshot().likes_received, 1)
+
+    def test_follow_and_unfollow_adjust_both_users(self):
+        profile_stats.get_snapshot(self.author)
+        profile_stats.get_snapshot(self.fan)
+        Follow.objects.create(follower=self.fan, following=self.author)
+        self.assertEqual(self._snapshot().follower_count, 1)
+        self.assertEqual(UserProfileStats.objects.get(user=self.fan).following_count, 1)
+
+        Follow.objects.filter(follower=self.fan, following=self.author).delete()
+        self.assertEqual(self._snapshot().follower_count, 0)
+        self.assertEqual(UserProfileStats.objects.get(user=self.fan).following_count, 0)
+
+    def test_trashing_a_prompt_recounts_author(self):
+        profile_stats.get_snapshot(self.author)
+        self.prompt.deleted_at = timezone.now()
+        self.prompt.save(update_fields=['deleted_at'])
+        snapshot = self._snapshot()
+        self.assertEqual(snapshot.prompt_count, 0)
+        self.assertEqual(snapshot.likes_received, 0)
+
+    def test_ordering_save_does_not_touch_snapshot(self):
+        version = profile_stats.get_snapshot(self.author).version
+        self.prompt.order = 3
+        self.prompt.save(update_fields=['order'])
+        self.assertEqual(self._snapshot().version, version)
+
+    def test_refresh_snapshots_fills_views_and_ranks(self):
+        profile_stats.get_snapshot(self.author)
+        self.prompt.views.create(user=self.fan, ip_hash='a', viewed_at=timezone.now())
+        self.prompt.views.create(user=self.other, ip_hash='b', viewed_at=timezone.now())
+        # Drift the counter; the refresh corrects it
+        UserProfileStats.objects.filter(user=self.author).update(likes_received=9)
+
+        LeaderboardService.rebuild_boards()
+        self.assertEqual(profile_stats.refresh_snapshots(), 1)
+        snapshot = self._snapshot()
+        self.assertEqual(snapshot.total_views, 2)
+        self.assertEqual(snapshot.all_time_rank, 1)
+        self.assertEqual(snapshot.thirty_day_rank, 1)
+        self.assertEqual(snapshot.likes_received, 1)
+        self.assertEqual(snapshot.version, 2)
+
+    def test_adjust_rejects_unknown_fields(self):
+        with self.assertRaises(ValueError):
+            profile_stats.adjust(self.author.pk, total_views=1)
+
+
+class ProfileViewSnapshotTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.author = User.objects.create_user(username='author', password='pw')
+        self.fan = User.objects.create_user(username='fan', password='pw')
+        Prompt.objects.create(
+            title='First', slug='first', content='c', author=self.author, status=1,
+        )
+        Follow.objects.create(follower=self.fan, following=self.author)
+
+    def test_profile_context_from_snapshot(self):
+        response = self.client.get(reverse('prompts:user_profile', args=['author']))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['total_prompts'], 1)
+        self.assertEqual(response.context['follower_count'], 1)
+        self.assertEqual(response.context['following_count'], 0)
+        self.assertEqual(response.context['version'], 1)
+
+    def test_collections_profile_uses_same_snapshot(self):
+        self.client.get(reverse('prompts:user_profile', args=['author']))
+        response = self.client.get(reverse('prompts:user_collections', args=['author']))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['total_prompts'], 1)
+        self.assertEqual(UserProfileStats.objects.count(), 1)
@@ -0,0 +1,263 @@
+"""
+Tests for the consolidated prompt detail loader.
+
+Covers prompts/services/prompt_detail.py: slug resolution, the shared and
+viewer cache layers, signal-driven invalidation, comment pagination and
+query budgets for the prompt_detail view.
+"""
+from datetime import timedelta
+
+from django.contrib.auth.models import AnonymousUser, User
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from prompts.models import Comment, DeletedPrompt, Follow, Prompt, SlugRedirect
+from prompts.services.prompt_detail import (
+    COMMENTS_PAGE_SIZE,
+    build_shared,
+    get_comment_page,
+    get_overlay,
+    get_shared,
+    load_prompt_detail,
+    resolve_slug,
+)
+from prompts.services.view_rollups import reset_rollup_watermark
+
+LOCMEM_CACHE = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'prompt-detail-tests',
+    }
+}
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class PromptDetailLoaderTests(TestCase):
+    """Loader behaviour and cache invalidation."""
+
+    def setUp(self):
+        cache.clear()
+        reset_rollup_watermark()
+        self.author = User.objects.create_user(username='author', password='pw')
+        self.viewer = User.objects.create_user(username='viewer', password='pw')
+        self.prompt = Prompt.objects.create(
+            title='Detail Prompt', slug='detail-prompt', content='c',
+            author=self.author, status=1,
+        )
+        for i in range(6):
+            other = Prompt.objects.create(
+                title=f'Other {i}', slug=f'other-{i}', content='c',
+                author=self.author, status=1,
+            )
+            if i == 2:
+                other.likes.add(self.viewer)
+        Comment.objects.create(
+            prompt=self.prompt, author=self.viewer, body='Nice', approved=True,
+        )
+
+    def tearDown(self):
+        reset_rollup_watermark()
+
+    def test_resolve_slug_prefers_live_prompt(self):
+        SlugRedirect.objects.create(old_slug='old-slug', prompt=self.prompt)
+        with self.assertNumQueries(1):
+            resolution = resolve_slug('detail-prompt')
+        self.assertEqual(resolution.prompt, self.prompt)
+        self.assertEqual(resolve_slug('old-slug').redirect_slug, 'detail-prompt')
+        self.assertIsNone(resolve_slug('missing').prompt)
+
+    def test_resolve_slug_finds_deleted_record(self):
+        DeletedPrompt.objects.create(
+            slug='gone-prompt', original_title='Gone',
+            ai_generator='midjourney', created_at=timezone.now(),
+            expires_at=timezone.now() + timedelta(days=30),
+        )
+        self.assertEqual(
+            resolve_slug('gone-prompt').deleted_record.original_title, 'Gone'
+        )
+
+    def test_more_from_author_count_and_order(self):
+        shared = build_shared(self.prompt)
+        self.assertEqual(shared.author_total_prompts, 6)
+        self.assertEqual(len(shared.more_from_author), 4)
+        self.assertEqual(shared.more_from_author[0].slug, 'other-2')
+        self.assertEqual(len(shared.approved_comments), 1)
+
+    def test_shared_layer_served_from_cache(self):
+        get_shared(self.prompt)
+        with self.assertNumQueries(0):
+            get_shared(self.prompt)
+
+    def test_overlay_for_anonymous_costs_nothing(self):
+        with self.assertNumQueries(0):
+            overlay = get_overlay(self.prompt, AnonymousUser())
+        self.assertFalse(overlay.liked)
+
+    def test_overlay_reflects_like_and_follow(self):
+        self.assertFalse(get_overlay(self.prompt, self.viewer).liked)
+
+        self.prompt.likes.add(self.viewer)
+        Follow.objects.create(follower=self.viewer, following=self.author)
+
+        overlay = get_overlay(self.prompt, self.viewer)
+        self.assertTrue(overlay.liked)
+        self.assertTrue(overlay.is_following_author)
+        self.assertEqual(get_shared(self.prompt).number_of_likes, 1)
+
+    def test_comment_invalidates_shared_layer(self):
+        self.assertEqual(len(get_shared(self.prompt).approved_comments), 1)
+        Comment.objects.create(
+            prompt=self.prompt, author=self.author, body='Thanks', approved=True,
+        )
+        self.assertEqual(len(get_shared(self.prompt).approved_comments), 2)
+
+    def test_pending_comments_only_in_own_overlay(self):
+        Comment.objects.create(
+            prompt=self.prompt, author=self.viewer, body='Pending', approved=False,
+        )
+        own = load_prompt_detail(self.prompt, self.viewer)
+        other = load_prompt_detail(self.prompt, self.author)
+        self.assertEqual(len(own.comments), 2)
+        self.assertEqual(len(other.comments), 1)
+
+    def test_drafts_are_not_cached(self):
+        self.prompt.status = 0
+        self.prompt.save()
+        get_shared(self.prompt)
+        with CaptureQueriesContext(connection) as queries:
+            get_shared(self.prompt)
+        self.assertGreater(len(queries), 0)
+
+
+# Uncached detail view for an anonymous viewer: the loader's shared layer
+# (comments, tags, likes, "more from this author", related candidates,
+# view count) is about ten queries; the rest is the first request's
+# session, SiteSettings row and PromptView write.
+COLD_QUERY_BUDGET = 27
+
+
+@override_settings(CACHES=LOCMEM_CACHE, DEBUG=True)
+class PromptDetailViewQueryTests(TestCase):
+    """Query budget for the prompt_detail view."""
+
+    def setUp(self):
+        cache.clear()
+        reset_rollup_watermark()
+        self.author = User.objects.create_user(username='author', password='pw')
+        self.viewer = User.objects.create_user(username='viewer', password='pw')
+        self.prompt = Prompt.objects.create(
+            title='Budget Prompt', slug='budget-prompt', content='c',
+            author=self.author, status=1,
+        )
+        self.url = reverse('prompts:prompt_detail', args=['budget-prompt'])
+
+    def tearDown(self):
+        reset_rollup_watermark()
+
+    def _count_queries(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url, HTTP_USER_AGENT='Mozilla/5.0')
+        self.assertEqual(response.status_code, 200)
+        return len(queries), response
+
+    def test_warm_cache_needs_far_fewer_queries(self):
+        self.client.force_login(self.viewer)
+        cold, response = self._count_queries()
+        warm, response = self._count_queries()
+
+        self.assertLessEqual(cold, COLD_QUERY_BUDGET + 1)  # + the viewer overlay
+        self.assertLess(warm, cold)
+        self.assertLessEqual(warm, 10)
+        self.assertEqual(response.context['comment_count'], 0)
+        self.assertFalse(response.context['prompt_is_liked'])
+
+    def test_anonymous_query_budgets(self):
+        cold, _ = self._count_queries()
+        warm, _ = self._count_queries()
+
+        self.assertLessEqual(cold, COLD_QUERY_BUDGET)
+        self.assertLessEqual(warm, 10)
+
+    def test_like_is_visible_on_next_request(self):
+        self.client.force_login(self.viewer)
+        self._count_queries()
+        self.prompt.likes.add(self.viewer)
+        _, response = self._count_queries()
+        self.assertTrue(response.context['prompt_is_liked'])
+        self.assertEqual(response.context['number_of_likes'], 1)
+
+
+@override_settings(CACHES=LOCMEM_CACHE, DEBUG=True)
+class CommentPaginationTests(TestCase):
+    """Cursor pagination, the comments endpoint and the maintained count."""
+
+    def setUp(self):
+        cache.clear()
+        reset_rollup_watermark()
+        self.author = User.objects.create_user(username='author', password='pw')
+        self.prompt = Prompt.objects.create(
+            title='Busy Prompt', slug='busy-prompt', content='c',
+            author=self.author, status=1,
+        )
+        self.total = COMMENTS_PAGE_SIZE * 2 + 5
+        Comment.objects.bulk_create([
+            Comment(prompt=self.prompt, author=self.author, body=f'c{i}', approved=True)
+            for i in range(self.total)
+        ])
+        # bulk_create skips signals; the count is refreshed on the next save
+        Comment.objects.create(
+            prompt=self.prompt, author=self.author, body='hidden', approved=False,
+        )
+        self.prompt.refresh_from_db()
+
+    def tearDown(self):
+        reset_rollup_watermark()
+
+    def test_count_is_maintained(self):
+        self.assertEqual(self.prompt.approved_comment_count, self.total)
+
+        comment = Comment.objects.filter(prompt=self.prompt, approved=True).first()
+        comment.delete()
+        self.prompt.refresh_from_db()
+        self.assertEqual(self.prompt.approved_comment_count, self.total - 1)
+
+    def test_pages_cover_every_approved_comment_once(self):
+        seen, cursor = [], None
+        while True:
+            page, cursor = get_comment_page(self.prompt, cursor=cursor)
+            seen.extend(c.pk for c in page)
+            if not cursor:
+                break
+        self.assertEqual(len(seen), self.total)
+        self.assertEqual(len(set(seen)), self.total)
+
+    def test_detail_renders_first_page_only(self):
+        response = self.client.get(
+            reverse('prompts:prompt_detail', args=['busy-prompt']),
+            HTTP_USER_AGENT='Mozilla/5.0',
+        )
+        self.assertEqual(len(response.context['comments']), COMMENTS_PAGE_SIZE)
+        self.assertEqual(response.context['comment_count'], self.total)
+        self.assertTrue(response.context['next_comments_cursor'])
+        self.assertContains(response, 'load-more-comments')
+
+    def test_comments_endpoint_pages(self):
+        _, cursor = get_comment_page(self.prompt)
+        url = reverse('prompts:comments_ajax', args=['busy-prompt'])
+
+        data = self.client.get(url, {'cursor': cursor}).json()
+        self.assertTrue(data['has_more'])
+        self.assertEqual(data['html'].count('comment-card'), COMMENTS_PAGE_SIZE)
+
+        data = self.client.get(url, {'cursor': data['next_cursor']}).json()
+        self.assertFalse(data['has_more'])
+        self.assertEqual(data['html'].count('comment-card'), 5)
+
+    def test_comments_endpoint_rejects_bad_cursor(self):
+        url = reverse('prompts:comments_ajax', args=['busy-prompt'])
+        response = self.client.get(url, {'cursor': 'not-a-cursor'})
+        self.assertEqual(response.status_code, 400)
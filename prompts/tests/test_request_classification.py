@@ -0,0 +1,146 @@
+"""
+Tests for the shared request classifier (bot detection, client IP, IP hash).
+
+Covers prompts/utils/request_classification.py, PromptView.record_view
+and the django-ratelimit IP key.
+"""
+from django.contrib.auth.models import AnonymousUser, User
+from django.core.cache import cache
+from django.test import RequestFactory, TestCase, override_settings
+
+from prompts.constants import BOT_USER_AGENT_PATTERNS
+from prompts.models import Prompt, PromptView
+from prompts.utils import request_classification
+from prompts.utils.request_classification import (
+    classify_request,
+    get_client_ip,
+    hash_ip,
+    is_bot_user_agent,
+    ratelimit_client_ip,
+)
+
+SAMPLE_USER_AGENTS = [
+    '',
+    'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 '
+    '(KHTML, like Gecko) Chrome/124.0 Safari/537.36',
+    'Mozilla/5.0 (compatible; Googlebot/2.1; +http://www.google.com/bot.html)',
+    'Mozilla/5.0 (compatible; AhrefsBot/7.0; +http://ahrefs.com/robot/)',
+    'facebookexternalhit/1.1',
+    'curl/8.4.0',
+    'python-requests/2.32.4',
+    'Mozilla/5.0 (iPhone; CPU iPhone OS 17_0 like Mac OS X) Safari/604.1',
+    'SomeCRAWLER/1.0',
+]
+
+
+class BotDetectionTests(TestCase):
+    """The compiled matcher must agree with the original substring scan."""
+
+    def test_parity_with_substring_scan(self):
+        for ua in SAMPLE_USER_AGENTS:
+            expected = (not ua) or any(
+                pattern in ua.lower() for pattern in BOT_USER_AGENT_PATTERNS
+            )
+            self.assertEqual(is_bot_user_agent(ua), expected, ua)
+
+    def test_repeated_user_agents_are_memoised(self):
+        is_bot_user_agent.cache_clear()
+        ua = 'Mozilla/5.0 (compatible; bingbot/2.0)'
+        is_bot_user_agent(ua)
+        is_bot_user_agent(ua)
+        self.assertEqual(is_bot_user_agent.cache_info().hits, 1)
+
+    def test_prompt_view_is_bot_delegates(self):
+        self.assertTrue(PromptView._is_bot('Googlebot'))
+        self.assertFalse(PromptView._is_bot(SAMPLE_USER_AGENTS[1]))
+
+
+class ClientIpTests(TestCase):
+    """Client IP extraction and hashing."""
+
+    def setUp(self):
+        self.factory = RequestFactory()
+
+    @override_settings(TRUSTED_PROXIES=['10.0.0.0/8'])
+    def test_forwarded_for_skips_trusted_proxies(self):
+        request = self.factory.get(
+            '/', HTTP_X_FORWARDED_FOR='203.0.113.7, 10.1.2.3',
+            REMOTE_ADDR='10.9.9.9',
+        )
+        self.assertEqual(get_client_ip(request), '203.0.113.7')
+
+    @override_settings(TRUSTED_PROXIES=['10.0.0.0/8'])
+    def test_invalid_forwarded_for_falls_back_to_remote_addr(self):
+        request = self.factory.get(
+            '/', HTTP_X_FORWARDED_FOR='not-an-ip', REMOTE_ADDR='198.51.100.4',
+        )
+        self.assertEqual(get_client_ip(request), '198.51.100.4')
+
+    def test_hash_is_peppered_and_stable(self):
+        self.assertEqual(hash_ip('1.2.3.4'), hash_ip('1.2.3.4'))
+        self.assertNotEqual(hash_ip('1.2.3.4'), hash_ip('1.2.3.5'))
+        self.assertEqual(len(hash_ip('1.2.3.4')), 64)
+        self.assertEqual(PromptView._hash_ip('1.2.3.4'), hash_ip('1.2.3.4'))
+
+
+class ClassifyRequestTests(TestCase):
+    """Per-request memoisation shared by every caller."""
+
+    def setUp(self):
+        self.factory = RequestFactory()
+
+    def test_classification_computed_once_per_request(self):
+        request = self.factory.get('/', HTTP_USER_AGENT='Googlebot')
+        first = classify_request(request)
+        self.assertIs(classify_request(request), first)
+        self.assertTrue(first.is_bot)
+        self.assertEqual(first.ip_hash, hash_ip(first.ip))
+
+    def test_ratelimit_key_and_view_tracking_share_one_classification(self):
+        calls = []
+        original = request_classification.get_client_ip
+
+        def counting_get_client_ip(request):
+            calls.append(request)
+            return original(request)
+
+        request_classification.get_client_ip = counting_get_client_ip
+        try:
+            request = self.factory.get('/', REMOTE_ADDR='192.0.2.1')
+            self.assertEqual(ratelimit_client_ip(request), '192.0.2.1')
+            self.assertEqual(classify_request(request).ip_hash, hash_ip('192.0.2.1'))
+            self.assertEqual(len(calls), 1)
+        finally:
+            request_classification.get_client_ip = original
+
+
+class RecordViewClassificationTests(TestCase):
+    """PromptView.record_view uses the shared classification."""
+
+    def setUp(self):
+        cache.clear()
+        self.factory = RequestFactory()
+        author = User.objects.create_user(username='author', password='pw')
+        self.prompt = Prompt.objects.create(
+            title='Classified', slug='classified', content='c',
+            author=author, status=1,
+        )
+
+    def _request(self, user_agent):
+        request = self.factory.get('/', HTTP_USER_AGENT=user_agent)
+        request.user = AnonymousUser()
+        request.session = self.client.session
+        return request
+
+    def test_bot_views_are_not_recorded(self):
+        view, created = PromptView.record_view(
+            self.prompt, self._request('Mozilla/5.0 (compatible; Googlebot/2.1)')
+        )
+        self.assertIsNone(view)
+        self.assertFalse(created)
+
+    def test_human_view_stores_shared_ip_hash(self):
+        request = self._request(SAMPLE_USER_AGENTS[1])
+        view, created = PromptView.record_view(self.prompt, request)
+        self.assertTrue(created)
+        self.assertEqual(view.ip_hash, classify_request(request).ip_hash)
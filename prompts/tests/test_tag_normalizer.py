@@ -0,0 +1,298 @@
+"""
+Golden-output parity tests for the compiled tag normaliser.
+
+prompts/utils/tag_normalizer.py replaced the hand-rolled loop that used to
+live in tasks._validate_and_fix_tags(). GOLDEN_CASES are that function's
+outputs recorded before the switch; legacy_validate_and_fix_tags() below is
+the same function (logging removed) used as an oracle for generated inputs.
+"""
+
+import logging
+import random
+from unittest import TestCase
+from unittest.mock import patch
+
+from prompts.constants import (
+    ALLOWED_AI_TAGS,
+    BANNED_AI_TAGS,
+    BANNED_ETHNICITY,
+    DEMOGRAPHIC_TAGS,
+    GENDER_LAST_TAGS,
+    PRESERVE_DESPITE_STOP_WORDS,
+    PRESERVE_SINGLE_CHAR_COMPOUNDS,
+    SPLIT_THESE_WORDS,
+)
+from prompts.tasks import _validate_and_fix_tags, _validate_and_fix_tags_batch
+from prompts.utils import tag_normalizer
+from prompts.utils.tag_normalizer import TagNormalizer, normalizer
+
+
+def legacy_validate_and_fix_tags(tags):  # noqa: C901 — verbatim copy of the previous implementation
+    """tasks._validate_and_fix_tags() as it was before the compiled engine."""
+    def _should_split_compound(compound_tag):
+        if compound_tag in PRESERVE_DESPITE_STOP_WORDS:
+            return False
+        if compound_tag in PRESERVE_SINGLE_CHAR_COMPOUNDS:
+            return False
+        parts = compound_tag.split('-')
+        if len(parts) < 2:
+            return False
+        for part in parts:
+            if part in SPLIT_THESE_WORDS:
+                return True
+            if len(part) <= 1:
+                return True
+        return False
+
+    def _is_banned(t):
+        if t in BANNED_ETHNICITY:
+            return True
+        if t in ALLOWED_AI_TAGS:
+            return False
+        return t in BANNED_AI_TAGS or t.startswith('ai-')
+
+    validated = []
+    for tag in tags:
+        tag = str(tag).strip()
+        if not tag:
+            continue
+        tag = tag.lower()
+        if ' ' in tag:
+            parts = [p.strip() for p in tag.split() if p.strip()]
+            validated.extend(part for part in parts if not _is_banned(part))
+            continue
+        if tag not in ALLOWED_AI_TAGS and (tag in BANNED_AI_TAGS or tag.startswith('ai-')):
+            continue
+        if tag in BANNED_ETHNICITY:
+            continue
+        if '-' in tag:
+            parts = [p.strip() for p in tag.split('-') if p.strip()]
+            if any(_is_banned(p) for p in parts):
+                validated.extend(p for p in parts if not _is_banned(p))
+                continue
+            if _should_split_compound(tag):
+                validated.extend(p for p in parts if p not in SPLIT_THESE_WORDS and len(p) > 1)
+                continue
+            validated.append(tag)
+            continue
+        validated.append(tag)
+
+    seen = set()
+    deduped = []
+    for tag in validated:
+        if tag not in seen:
+            seen.add(tag)
+            deduped.append(tag)
+    deduped = deduped[:10]
+
+    content_tags = [t for t in deduped if t not in DEMOGRAPHIC_TAGS]
+    demo_other = [t for t in deduped if t in DEMOGRAPHIC_TAGS and t not in GENDER_LAST_TAGS]
+    demo_gender = [t for t in deduped if t in GENDER_LAST_TAGS]
+    return content_tags + demo_other + demo_gender
+
+
+# (input, output of the pre-engine _validate_and_fix_tags)
+GOLDEN_CASES = [
+    ([],
+     []),
+    (['', '  ', '  portrait  '],
+     ['portrait']),
+    (['Portrait', 'SOFT-LIGHTING', 'Warm-Tones'],
+     ['portrait', 'soft-lighting', 'warm-tones']),
+    (['Modern Architecture', 'city'],
+     ['modern', 'architecture', 'city']),
+    (['Asian Woman', 'ai-art portrait'],
+     ['portrait', 'woman']),
+    (['black-woman', 'white-man', 'asian-girl'],
+     ['woman', 'man', 'girl']),
+    (['ai-art', 'ai-generated', 'ai-portrait', 'ai-influencer', 'ai-avatar'],
+     ['ai-influencer', 'ai-avatar']),
+    (['ai-art-style', 'ai-influencer-fashion', 'neon-ai-glow'],
+     ['neon-ai-glow']),
+    (['caucasian', 'african-american', 'middle-eastern', 'native-american'],
+     []),
+    (['the-sunset', 'with-lighting', 'a-dog', 'big-city', 'depth-of-field'],
+     ['sunset', 'lighting', 'dog', 'city', 'depth-of-field']),
+    (['x-ray', '3d-render', 'k-pop', 't-shirt', 'x-men', 'a-frame', 'e-bike'],
+     ['x-ray', '3d-render', 'k-pop', 't-shirt', 'men', 'frame', 'bike']),
+    (['sunset-', '-sunset', 'a--b', 'sun--set', '-', '--'],
+     ['sunset', 'sun', 'set']),
+    (['double-exposure', 'the-portrait', 'high-contrast', 'with-lighting'],
+     ['double-exposure', 'portrait', 'high-contrast', 'lighting']),
+    (['male', 'portrait', 'man', 'female', 'woman', 'cinematic', 'couple', 'child'],
+     ['portrait', 'cinematic', 'man', 'woman', 'couple', 'child', 'male', 'female']),
+    (['man', 'portrait', 'cinematic'],
+     ['portrait', 'cinematic', 'man']),
+    (['woman', 'portrait'],
+     ['portrait', 'woman']),
+    (['girl', 'child'],
+     ['girl', 'child']),
+    (['boy', 'child'],
+     ['boy', 'child']),
+    (['teen-boy', 'sports'],
+     ['sports', 'teen-boy']),
+    (['teen-girl', 'fashion'],
+     ['fashion', 'teen-girl']),
+    (['male'],
+     ['male']),
+    (['female', 'girl'],
+     ['girl', 'female']),
+    (['female', 'teen-girl'],
+     ['teen-girl', 'female']),
+    (['tag0', 'tag1', 'tag2', 'tag3', 'tag4', 'tag5', 'tag6', 'tag7', 'tag8', 'tag9', 'tag10', 'tag11', 'tag12', 'tag13'],
+     ['tag0', 'tag1', 'tag2', 'tag3', 'tag4', 'tag5', 'tag6', 'tag7', 'tag8', 'tag9']),
+    (['a', 'b', 'a', 'A', 'b ', ' c'],
+     ['a', 'b', 'c']),
+    (['portrait', 'Portrait', 'portrait portrait', 'portrait-of-a-woman'],
+     ['portrait', 'woman']),
+    (['black', 'black-history', 'white-background', 'white'],
+     ['history', 'background']),
+    (['mixed-race', 'mixed-media', 'ethnicity', 'biracial-couple'],
+     ['mixed-media', 'couple']),
+    (['ai-colorize', 'AI-Art', 'Ai-Headshot', 'ai-'],
+     ['ai-headshot']),
+    ([123, None, 4.5, True],
+     ['123', 'none', '4.5', 'true']),
+    (['Sci-Fi City', 'sci-fi', 'pin up', 'pin-up'],
+     ['sci-fi', 'city', 'pin', 'up', 'pin-up']),
+    (['very-very-nice', 'really-big-house', 'just-a-test'],
+     ['house', 'test']),
+    (['native', 'indigenous-art', 'pacific-islander-dance'],
+     ['native', 'art', 'pacific-islander-dance']),
+    (['man woman', 'male female', 'boy-girl'],
+     ['boy-girl', 'man', 'woman', 'male', 'female']),
+    (['  Soft   Light  ', 'soft light', 'soft-light'],
+     ['soft', 'light', 'soft-light']),
+    (['tab\tseparated', 'new\nline', 'non\xa0breaking'],
+     ['tab\tseparated', 'new\nline', 'non\xa0breaking']),
+    (['déjà-vu', 'café', 'ÉCOLE', 'straße'],
+     ['déjà-vu', 'café', 'école', 'straße']),
+    (['teen', 'teenager', 'kid', 'baby', 'infant', 'person', 'elderly', 'middle-aged'],
+     ['elderly', 'middle-aged', 'teen', 'teenager', 'kid', 'baby', 'infant', 'person']),
+    (['e-commerce', 'e-sports', 'j-pop', 'x-rays', 't-shirts', '3d-photo', '3d-art'],
+     ['e-commerce', 'e-sports', 'j-pop', 'x-rays', 't-shirts', '3d-photo', '3d-art']),
+    (['3d', '2d-art', 'b-movie', 'u-turn'],
+     ['3d', '2d-art', 'movie', 'turn']),
+    (['south-asian-bride', 'east-asian', 'southeast-asian-food'],
+     ['south', 'bride', 'southeast', 'food']),
+    (['portrait', 'ai-art', 'asian', 'woman', 'female', 'soft-lighting', 'bokeh', 'the-city', 'cinematic', 'moody', 'golden-hour', 'street-style', 'man', 'male'],
+     ['portrait', 'soft-lighting', 'bokeh', 'city', 'cinematic', 'moody', 'golden-hour', 'street-style', 'woman', 'female']),
+    (['ai-robot', 'double-exposure', 'white', 'couple', 'child', 'Woman', 'film-noir', 'teen-boy', 'black-cat', 'anime', 'Woman', 'x-ray', 'big-city', 'female', 'big-city'],
+     ['double-exposure', 'film-noir', 'cat', 'anime', 'x-ray', 'city', 'couple', 'child', 'woman', 'teen-boy']),
+    (['black-cat', 'neon lights', 'asian', 'child', '3d-render', '3d-render', 'of-the-night', 'Woman', 'asian', '3d-render'],
+     ['cat', 'neon', 'lights', '3d-render', 'night', 'child', 'woman']),
+    (['of-the-night', 'portrait', 'black-cat', 'child', 'ai-robot', 'of-the-night', 'female', 'neon lights', 'high-contrast', 'ai-robot'],
+     ['night', 'portrait', 'cat', 'neon', 'lights', 'high-contrast', 'child', 'female']),
+    (['male', 'ai-robot', 'ai-influencer-style', 'Cyberpunk', 'film-noir', '  ', 'man', 'sun-', 'ai-influencer-style', 'man', 'film-noir', 'baby', 'of-the-night', 'moody'],
+     ['cyberpunk', 'film-noir', 'sun', 'night', 'moody', 'man', 'baby', 'male']),
+    (['baby', 'watercolor', 'moody', 'boy'],
+     ['watercolor', 'moody', 'baby', 'boy']),
+    (['double-exposure', 'moody'],
+     ['double-exposure', 'moody']),
+    (['portrait', 'big-city', 'portrait', '  '],
+     ['portrait', 'city']),
+    (['couple', 'film-noir', 'black-cat', 'depth-of-field', 'watercolor', 'female', 'male', 'ai-avatar', 'k-pop', 'white', 'child', 'the-sunset', 'moody'],
+     ['film-noir', 'cat', 'depth-of-field', 'watercolor', 'ai-avatar', 'k-pop', 'couple', 'child', 'female', 'male']),
+    (['Woman'],
+     ['woman']),
+    (['ai-avatar', 'moody', 'sun-', 'Golden Hour', 'watercolor', 'sun-', '-'],
+     ['ai-avatar', 'moody', 'sun', 'golden', 'hour', 'watercolor']),
+    (['Woman', '-', 'man', 'double-exposure', 'ai-art', 'soft-lighting', 'asian', 'high-contrast', 'watercolor', 'portrait', 'boy', 'teen-boy', 'big-city', 'film-noir', 'moody'],
+     ['double-exposure', 'soft-lighting', 'high-contrast', 'watercolor', 'portrait', 'city', 'woman', 'man', 'boy', 'teen-boy']),
+    (['Woman', 'boy', 'depth-of-field', 'of-the-night', 'neon lights', 'man', 'Woman', 'portrait', 'depth-of-field', 'male', 'ai-art', 'x-ray', 'soft-lighting', 'boy', 'big-city'],
+     ['depth-of-field', 'night', 'neon', 'lights', 'portrait', 'x-ray', 'woman', 'boy', 'man', 'male']),
+    ([],
+     []),
+    (['hispanic-family', 'ai-art', 'white', '  ', 'boy'],
+     ['family', 'boy']),
+    ([],
+     []),
+]
+
+
+def generated_tag_lists(count, seed=50):
+    """Random tag lists mixing every rule table with case/space/hyphen noise."""
+    rng = random.Random(seed)
+    words = sorted(
+        SPLIT_THESE_WORDS | PRESERVE_DESPITE_STOP_WORDS | PRESERVE_SINGLE_CHAR_COMPOUNDS
+        | BANNED_ETHNICITY | BANNED_AI_TAGS | ALLOWED_AI_TAGS | DEMOGRAPHIC_TAGS
+        | {'portrait', 'neon', 'soft', 'lighting', 'x', '3d', 'ai', 'cat', 'sci-fi', ''}
+    )
+
+    def tag():
+        parts = [rng.choice(words) for _ in range(rng.choice((1, 1, 2, 3)))]
+        text = rng.choice(('-', ' ', '--', ' - ')).join(parts)
+        if rng.random() < 0.2:
+            text = text.title()
+        if rng.random() < 0.1:
+            text = f'  {text} '
+        return text
+
+    return [[tag() for _ in range(rng.randint(0, 15))] for _ in range(count)]
+
+
+class GoldenOutputTests(TestCase):
+
+    def test_validate_and_fix_tags_matches_golden_outputs(self):
+        for tags, expected in GOLDEN_CASES:
+            with self.subTest(tags=tags):
+                self.assertEqual(_validate_and_fix_tags(list(tags)), expected)
+
+    def test_legacy_oracle_matches_golden_outputs(self):
+        for tags, expected in GOLDEN_CASES:
+            with self.subTest(tags=tags):
+                self.assertEqual(legacy_validate_and_fix_tags(tags), expected)
+
+    def test_generated_inputs_match_legacy_function(self):
+        logging.disable(logging.CRITICAL)
+        self.addCleanup(logging.disable, logging.NOTSET)
+        for tags in generated_tag_lists(2000):
+            with self.subTest(tags=tags):
+                self.assertEqual(_validate_and_fix_tags(tags), legacy_validate_and_fix_tags(tags))
+
+
+class TagNormalizerTests(TestCase):
+
+    def test_batch_matches_single_calls(self):
+        tag_lists = generated_tag_lists(50, seed=7)
+        logging.disable(logging.CRITICAL)
+        self.addCleanup(logging.disable, logging.NOTSET)
+        self.assertEqual(
+            _validate_and_fix_tags_batch(tag_lists),
+            [_validate_and_fix_tags(tags) for tags in tag_lists],
+        )
+
+    def test_batch_logs_once_per_prompt(self):
+        with self.assertLogs('prompts.tasks', level='INFO') as cm:
+            _validate_and_fix_tags_batch(
+                [['The-Sunset', 'ai-art'], ['portrait']], prompt_ids=[1, 2],
+            )
+        infos = [line for line in cm.output if line.startswith('INFO')]
+        self.assertEqual(len(infos), 1)
+        self.assertIn('Prompt 1', infos[0])
+        self.assertIn("Removed AI tag: 'ai-art'", infos[0])
+        self.assertTrue(any('Prompt 2' in line and 'Only 1 tags' in line for line in cm.output))
+
+    def test_notes_and_warnings(self):
+        result = normalizer.normalize(['Man', 'man', 'black-cat'])
+        self.assertEqual(result.tags, ['cat', 'man'])
+        self.assertIn("Lowercased: 'Man' -> 'man'", result.notes)
+        self.assertIn("Removed duplicate: 'man'", result.notes)
+        self.assertIn("Removed ethnicity tag: 'black'", result.notes)
+        self.assertIn("Gender pair incomplete: 'man' without 'male'", result.warnings)
+
+    def test_rules_come_from_the_given_tables(self):
+        custom = TagNormalizer(
+            split_words={'of'}, preserve_compounds={'state-of-art'},
+            banned_ethnicity=set(), banned_ai={'ai-art'}, allowed_ai=set(),
+            demographic={'person'}, gender_last=set(),
+        )
+        result = custom.normalize(['person', 'state-of-art', 'cup-of-tea', 'black'])
+        self.assertEqual(result.tags, ['state-of-art', 'cup', 'tea', 'black', 'person'])
+
+    def test_resolved_tags_memo_is_bounded(self):
+        custom = TagNormalizer.from_constants()
+        with patch.object(tag_normalizer, 'RESOLVED_CACHE_SIZE', 2):
+            first = custom.normalize(['a', 'b', 'c', 'Portrait'])
+        self.assertLessEqual(len(custom._resolved), 2)
+        self.assertEqual(first.tags, ['a', 'b', 'c', 'portrait'])
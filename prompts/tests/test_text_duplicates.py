@@ -0,0 +1,158 @@
+"""
+Tests for near-duplicate prompt-text detection.
+
+Covers prompts/utils/minhash.py, prompts/services/text_duplicates.py
+(signal and bulk-job indexing, bucket lookups, groups), the warnings from
+BulkGenerationService.validate_prompts, the upload submit notice data and
+the report_duplicate_prompt_texts command.
+"""
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from prompts.models import Prompt, PromptTextBand, PromptTextSignature
+from prompts.services import text_duplicates
+from prompts.services.bulk_generation import BulkGenerationService
+from prompts.utils.minhash import BANDS, band_keys, minhash, shingles, similarity
+
+FOX = (
+    'A red fox standing in fresh snow at dawn, soft golden light, '
+    'shallow depth of field, ultra detailed fur, cinematic composition'
+)
+FOX_EDITED = FOX + ', 8k'
+CITY = (
+    'Neon cyberpunk city street at night, rain soaked pavement, '
+    'reflections of holographic signs, crowded market stalls, moody'
+)
+
+
+def jaccard(first, second):
+    a, b = shingles(first), shingles(second)
+    return len(a & b) / len(a | b)
+
+
+class MinHashTests(SimpleTestCase):
+
+    def test_similarity_tracks_jaccard(self):
+        for other in (FOX, FOX_EDITED, FOX.replace('red', 'grey'), CITY):
+            self.assertAlmostEqual(
+                similarity(minhash(FOX), minhash(other)), jaccard(FOX, other), delta=0.2,
+            )
+        self.assertEqual(similarity(minhash(FOX), minhash(FOX.upper() + '!!')), 1.0)
+
+    def test_band_keys(self):
+        keys = band_keys(minhash(FOX))
+        self.assertEqual(len(keys), BANDS)
+        self.assertTrue(all(-(1 << 63) <= key < (1 << 63) for key in keys))
+        self.assertTrue(set(keys) & set(band_keys(minhash(FOX_EDITED))))
+        self.assertFalse(set(keys) & set(band_keys(minhash(CITY))))
+
+    def test_empty_text(self):
+        self.assertEqual(minhash(' ... '), [])
+        self.assertEqual(band_keys([]), [])
+        self.assertEqual(similarity([], []), 0.0)
+
+
+@override_settings(PROMPT_TEXT_INDEX=True, OPENAI_API_KEY='test-key')
+class TextDuplicateTests(TestCase):
+
+    def setUp(self):
+        self.author = User.objects.create_user('author', password='x')
+
+    def _prompt(self, title, content, status=1):
+        return Prompt.objects.create(
+            title=title, slug=title.lower().replace(' ', '-'), content=content,
+            author=self.author, status=status,
+        )
+
+    def test_saved_prompt_is_indexed(self):
+        prompt = self._prompt('Fox', FOX)
+        signature = PromptTextSignature.objects.get(prompt=prompt)
+        self.assertEqual(signature.minhash, minhash(FOX))
+        self.assertEqual(signature.bands.count(), BANDS)
+
+    def test_lookup_finds_edited_text_in_two_queries(self):
+        fox = self._prompt('Fox', FOX)
+        self._prompt('City', CITY)
+
+        with self.assertNumQueries(2):
+            matches = text_duplicates.find_similar_prompt_texts(FOX_EDITED, 0.7)
+        self.assertEqual([(m.kind, m.object_id) for m in matches], [('prompt', fox.pk)])
+        self.assertGreaterEqual(matches[0].similarity, 0.7)
+        self.assertEqual(text_duplicates.find_similar_prompt_texts('Portrait of an old sailor', 0.7), [])
+
+    def test_content_edit_reindexes(self):
+        prompt = self._prompt('Fox', FOX)
+        prompt.content = CITY
+        prompt.save()
+
+        self.assertEqual(text_duplicates.find_similar_prompt_texts(FOX), [])
+        self.assertEqual(text_duplicates.find_similar_prompt_texts(CITY)[0].object_id, prompt.pk)
+        self.assertEqual(PromptTextBand.objects.count(), BANDS)
+
+    def test_saves_without_content_skip_indexing(self):
+        prompt = self._prompt('Fox', FOX)
+        with CaptureQueriesContext(connection) as queries:
+            prompt.save(update_fields=['needs_seo_review'])
+        self.assertFalse([q for q in queries if 'prompttext' in q['sql']])
+
+    def test_disabled_index_is_inert(self):
+        with self.settings(PROMPT_TEXT_INDEX=False):
+            self._prompt('Fox', FOX)
+            self.assertEqual(text_duplicates.find_similar_prompt_texts(FOX), [])
+        self.assertFalse(PromptTextSignature.objects.exists())
+
+    def test_similar_published_prompts(self):
+        published = self._prompt('Snow Fox', FOX)
+        self._prompt('Draft Fox', FOX, status=0)
+        new = self._prompt('New Fox', FOX_EDITED)
+
+        notices = text_duplicates.similar_published_prompts(FOX_EDITED, exclude_id=new.pk)
+        self.assertEqual([n['title'] for n in notices], [published.title])
+        self.assertEqual(notices[0]['url'], f'/prompt/{published.slug}/')
+
+    def test_create_job_indexes_one_text_per_prompt(self):
+        job = BulkGenerationService().create_job(
+            user=self.author, prompts=[FOX, CITY], images_per_prompt=3,
+        )
+        self.assertEqual(PromptTextSignature.objects.filter(generated_image__job=job).count(), 2)
+        matches = text_duplicates.find_similar_prompt_texts(FOX_EDITED)
+        self.assertEqual([m.kind for m in matches], [text_duplicates.GENERATED])
+
+    def test_validate_prompts_warns_about_near_duplicates(self):
+        self._prompt('Fox', FOX)
+        result = BulkGenerationService().validate_prompts([CITY, FOX_EDITED, CITY + ', 4k'])
+
+        self.assertTrue(result['valid'])
+        self.assertEqual(
+            [(w['prompt_num'], w['message']) for w in result['warnings']],
+            [(2, 'Very similar to an existing prompt'), (3, 'Very similar to prompt 1')],
+        )
+
+    def test_duplicate_groups_and_report(self):
+        fox = self._prompt('Fox', FOX)
+        copy = self._prompt('Fox Copy', FOX_EDITED)
+        self._prompt('City', CITY)
+
+        groups = text_duplicates.duplicate_text_groups()
+        self.assertEqual(groups, [{('prompt', fox.pk), ('prompt', copy.pk)}])
+
+        out = StringIO()
+        call_command('report_duplicate_prompt_texts', stdout=out)
+        self.assertIn('Group 1 (2 texts)', out.getvalue())
+        self.assertIn(f'prompt #{copy.pk} [published] Fox Copy', out.getvalue())
+
+    def test_report_backfill_indexes_old_prompts(self):
+        with self.settings(PROMPT_TEXT_INDEX=False):
+            self._prompt('Fox', FOX)
+            self._prompt('Fox Copy', FOX_EDITED)
+        out = StringIO()
+
+        call_command('report_duplicate_prompt_texts', '--backfill', stdout=out)
+
+        self.assertIn('Indexed 2 prompt text(s)', out.getvalue())
+        self.assertIn('Group 1 (2 texts)', out.getvalue())
@@ -0,0 +1,95 @@
+"""
+Tests for the top-N-per-group query helper and its callers.
+
+Covers prompts/utils/top_n.py, LeaderboardService.attach_thumbnails_bulk
+and prompt_detail._more_from_author.
+"""
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.db.models import Count
+from django.test import TestCase
+
+from prompts.models import Prompt
+from prompts.services.leaderboard import LeaderboardService
+from prompts.services.prompt_detail import _more_from_author
+from prompts.utils.top_n import top_n_per_group
+
+
+class TopNPerGroupTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.fans = [
+            User.objects.create_user(username=f'fan{i}', password='pw') for i in range(3)
+        ]
+        cls.authors = []
+        for a in range(3):
+            author = User.objects.create_user(username=f'author{a}', password='pw')
+            cls.authors.append(author)
+            # author0 has 6 prompts, author1 has 2, author2 has none
+            for p in range({0: 6, 1: 2, 2: 0}[a]):
+                prompt = Prompt.objects.create(
+                    title=f'A{a} P{p}', slug=f'a{a}-p{p}', content='c',
+                    author=author, status=1,
+                )
+                # Prompt p gets min(p, 3) likes
+                prompt.likes.add(*cls.fans[:min(p, 3)])
+
+    def _queryset(self):
+        return Prompt.objects.filter(
+            author__in=self.authors,
+        ).annotate(likes_count=Count('likes'))
+
+    def _run(self, **kwargs):
+        return top_n_per_group(
+            self._queryset(),
+            partition_by='author_id',
+            order_by=['-likes_count', '-id'],
+            n=3,
+            **kwargs,
+        )
+
+    def _expected(self):
+        return [
+            'A0 P5', 'A0 P4', 'A0 P3',  # 3 likes each, newest id first
+            'A1 P1', 'A1 P0',
+        ]
+
+    def test_trims_each_group_in_one_query(self):
+        with self.assertNumQueries(1):
+            rows = self._run(count_as='group_total')
+        self.assertEqual([r.title for r in rows], self._expected())
+        self.assertEqual([r.group_row_number for r in rows], [1, 2, 3, 1, 2])
+        self.assertEqual([r.group_total for r in rows], [6, 6, 6, 2, 2])
+
+    def test_fallback_without_window_support_matches(self):
+        with mock.patch.object(connection.features, 'supports_over_clause', False):
+            rows = self._run(count_as='group_total')
+        self.assertEqual([r.title for r in rows], self._expected())
+        self.assertEqual([r.group_row_number for r in rows], [1, 2, 3, 1, 2])
+        self.assertEqual([r.group_total for r in rows], [6, 6, 6, 2, 2])
+
+    def test_zero_n_returns_nothing(self):
+        self.assertEqual(
+            top_n_per_group(self._queryset(), 'author_id', ['-id'], n=0), [],
+        )
+
+    def test_attach_thumbnails_bulk(self):
+        creators = list(User.objects.filter(pk__in=[a.pk for a in self.authors]).annotate(
+            prompt_count=Count('prompts'),
+        ).order_by('username'))
+        with self.assertNumQueries(1):
+            LeaderboardService.attach_thumbnails_bulk(creators, limit=5)
+        self.assertEqual(len(creators[0].thumbnails), 5)
+        self.assertEqual(creators[0].remaining_count, 1)
+        self.assertEqual(len(creators[1].thumbnails), 2)
+        self.assertEqual(creators[2].thumbnails, [])
+
+    def test_more_from_author(self):
+        current = Prompt.objects.get(slug='a0-p5')
+        with self.assertNumQueries(1):
+            rows, total = _more_from_author(current)
+        self.assertEqual([r.title for r in rows], ['A0 P4', 'A0 P3', 'A0 P2', 'A0 P1'])
+        self.assertEqual(total, 5)
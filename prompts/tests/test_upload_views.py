@@ -3,6 +3,7 @@ Tests for upload_submit view — SEO rename task queuing (N4H-UPLOAD-RENAME-FIX)
 
 Confirms rename_prompt_files_for_seo is queued after a successful B2 image upload,
 and is NOT queued when b2_image_url is absent (e.g. video B2 upload).
+Also covers b2_upload_complete failing closed when a video cannot be analyzed.
 """
 from unittest.mock import patch
 
@@ -93,3 +94,37 @@ class UploadSubmitRenameTests(TestCase):
 
         self.assertIn(response.status_code, [200, 302], 'View should complete without error')
         mock_async_task.assert_not_called()
+
+
+class B2UploadCompleteVideoTests(TestCase):
+    """A video whose frames cannot be read is blocked, not waved through."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='testuser', password='testpass',
+        )
+        self.client.login(username='testuser', password='testpass')
+        session = self.client.session
+        session['pending_direct_upload'] = {
+            'key': 'media/videos/2026/10/original/test-uuid.mp4',
+            'filename': 'test-uuid.mp4',
+            'cdn_url': 'https://cdn.example.com/file/bucket/test-uuid.mp4',
+            'content_type': 'video/mp4',
+            'is_video': True,
+        }
+        session.save()
+
+    @patch('prompts.services.vision_moderation.VisionModerationService')
+    @patch('prompts.services.video_processor.analyze_video',
+           side_effect=RuntimeError('FFmpeg timed out'))
+    @patch('prompts.views.upload_api_views.requests.get')
+    @patch('prompts.views.upload_api_views.verify_upload_exists', return_value={'exists': True})
+    def test_analysis_failure_blocks_upload(self, mock_verify, mock_get, mock_analyze, mock_vision):
+        mock_get.return_value.content = b'video-bytes'
+        response = self.client.post(reverse('prompts:b2_upload_complete'))
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()['moderation_status'], 'error')
+        self.assertIn('Unable to verify video content', response.json()['error'])
+        mock_analyze.assert_called_once()
+        mock_vision.assert_not_called()
@@ -9,7 +9,8 @@ enforcement, and gender pair warnings.
 import logging
 from unittest import TestCase
 
-from prompts.tasks import _validate_and_fix_tags, DEMOGRAPHIC_TAGS
+from prompts.constants import DEMOGRAPHIC_TAGS
+from prompts.tasks import _validate_and_fix_tags
 
 
 # ---------------------------------------------------------------------------
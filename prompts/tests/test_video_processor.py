@@ -9,6 +9,7 @@ Tests cover:
 - Video metadata extraction via FFprobe
 - Video validation (type, size, duration)
 - Thumbnail extraction
+- One-pass frame extraction (analyze_video) and frame thumbnails
 - Error handling and edge cases
 """
 
@@ -22,11 +23,14 @@ from django.core.exceptions import ValidationError
 from django.core.files.uploadedfile import SimpleUploadedFile, InMemoryUploadedFile
 from django.test import TestCase, override_settings
 
+from prompts.services import video_processor
 from prompts.services.video_processor import (
     check_ffmpeg_available,
     get_video_metadata,
     validate_video,
     extract_thumbnail,
+    analyze_video,
+    make_thumbnail,
     ALLOWED_VIDEO_TYPES,
     ALLOWED_VIDEO_EXTENSIONS,
     MAX_VIDEO_SIZE,
@@ -349,6 +353,99 @@ class TestExtractThumbnail(TestCase):
         mock_remove.assert_called_once_with('/output/thumb.jpg')
 
 
+def _jpeg(color, size=(320, 180), **kwargs):
+    from io import BytesIO
+    from PIL import Image
+    output = BytesIO()
+    Image.new('RGB', size, color).save(output, 'JPEG', **kwargs)
+    return output.getvalue()
+
+
+class TestAnalyzeVideo(TestCase):
+    """Test one-pass frame extraction."""
+
+    METADATA = {'duration': 20.0, 'width': 320, 'height': 180}
+
+    def setUp(self):
+        video_processor._analysis_cache.clear()
+        fd, self.video_path = tempfile.mkstemp(suffix='.mp4')
+        os.write(fd, b'fake video bytes')
+        os.close(fd)
+        self.addCleanup(os.remove, self.video_path)
+        self.frames = [_jpeg(c) for c in ('red', 'green', 'blue', 'white')]
+
+    def _ffmpeg_output(self, frames):
+        return MagicMock(returncode=0, stdout=b''.join(frames), stderr=b'')
+
+    @patch('prompts.services.video_processor.subprocess.run')
+    def test_one_ffmpeg_run_seeks_each_frame(self, mock_run):
+        mock_run.return_value = self._ffmpeg_output(self.frames)
+
+        analysis = analyze_video(
+            self.video_path, num_frames=3, thumbnail_at=1.0, metadata=self.METADATA,
+        )
+
+        mock_run.assert_called_once()
+        cmd = mock_run.call_args[0][0]
+        # One input per timestamp, each seeked before it is opened
+        seeks = [cmd[i + 1] for i, arg in enumerate(cmd) if arg == '-ss']
+        self.assertEqual(seeks, ['1.000', '5.000', '10.000', '15.000'])
+        self.assertEqual(cmd.count('-i'), 4)
+        self.assertLess(cmd.index('-ss'), cmd.index('-i'))
+        self.assertNotIn('select=', ' '.join(cmd))
+        self.assertIn('concat=n=4', cmd[cmd.index('-filter_complex') + 1])
+        self.assertEqual(cmd[cmd.index('-frames:v') + 1], '4')
+        self.assertEqual(analysis['frames'], self.frames[1:])
+        self.assertEqual(analysis['frame_times'], [5.0, 10.0, 15.0])
+        self.assertEqual(analysis['thumbnail_frame'], self.frames[0])
+
+    @patch('prompts.services.video_processor.subprocess.run')
+    def test_seek_past_the_end_drops_only_the_latest_frame(self, mock_run):
+        mock_run.return_value = self._ffmpeg_output(self.frames[:2])
+
+        analysis = analyze_video(self.video_path, num_frames=3, metadata=self.METADATA)
+
+        self.assertEqual(analysis['frames'], self.frames[:2])
+        self.assertEqual(analysis['frame_times'], [5.0, 10.0])
+
+    @patch('prompts.services.video_processor.subprocess.run')
+    @patch('prompts.services.video_processor.get_video_metadata')
+    def test_identical_file_reuses_analysis(self, mock_metadata, mock_run):
+        mock_metadata.return_value = self.METADATA
+        mock_run.return_value = self._ffmpeg_output(self.frames[:3])
+
+        first = analyze_video(self.video_path)
+        second = analyze_video(self.video_path)
+
+        self.assertIs(first, second)
+        self.assertEqual(mock_metadata.call_count, 1)
+        self.assertEqual(mock_run.call_count, 1)
+
+    @patch('prompts.services.video_processor.subprocess.run')
+    def test_jpeg_split_ignores_markers_in_headers(self, mock_run):
+        # A comment containing an EOI marker must not end the image early
+        tricky = _jpeg('red', comment=b'\xff\xd9 not the end')
+        mock_run.return_value = self._ffmpeg_output([tricky, self.frames[1]])
+
+        analysis = analyze_video(self.video_path, num_frames=2, metadata=self.METADATA)
+
+        self.assertEqual(analysis['frames'], [tricky, self.frames[1]])
+
+    @patch('prompts.services.video_processor.subprocess.run')
+    def test_no_frames_raises(self, mock_run):
+        mock_run.return_value = MagicMock(returncode=1, stdout=b'', stderr=b'Invalid data')
+        with self.assertRaises(ValidationError):
+            analyze_video(self.video_path, metadata=self.METADATA)
+
+    def test_make_thumbnail_crops_to_size(self):
+        from io import BytesIO
+        from PIL import Image
+        thumb = make_thumbnail(_jpeg('red', size=(1024, 576)), size='600x600')
+        self.assertEqual(Image.open(BytesIO(thumb)).size, (600, 600))
+        with self.assertRaises(ValidationError):
+            make_thumbnail(self.frames[0], size='invalid')
+
+
 class TestB2UploadServiceVideoFunctions(TestCase):
     """Test video functions in b2_upload_service.py."""
 
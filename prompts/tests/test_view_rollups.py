@@ -0,0 +1,212 @@
+"""
+Tests for PromptView daily rollups and retention compaction.
+
+Covers prompts/services/view_rollups.py and the rollup_prompt_views
+management command.
+"""
+from datetime import datetime, time, timedelta, timezone as dt_timezone
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from prompts.models import Prompt, PromptView, PromptViewDaily
+from prompts.services.leaderboard import LeaderboardService
+from prompts.services.view_rollups import (
+    compact_views,
+    count_views,
+    get_rollup_watermark,
+    prompt_views_expression,
+    reset_rollup_watermark,
+    rollup_views,
+)
+
+
+class ViewRollupTests(TestCase):
+    """Rollup, compaction and rollup-backed view counts."""
+
+    def setUp(self):
+        cache.clear()
+        reset_rollup_watermark()
+        self.author = User.objects.create_user(username='author', password='pw')
+        self.viewer = User.objects.create_user(username='viewer', password='pw')
+        self.prompt = Prompt.objects.create(
+            title='Rolled Prompt',
+            slug='rolled-prompt',
+            content='content',
+            author=self.author,
+            status=1,
+        )
+        self.now = timezone.now()
+
+    def tearDown(self):
+        reset_rollup_watermark()
+
+    def _view(self, days_ago, user=None, session_key=''):
+        view = PromptView.objects.create(
+            prompt=self.prompt, user=user, session_key=session_key,
+        )
+        PromptView.objects.filter(pk=view.pk).update(
+            viewed_at=self.now - timedelta(days=days_ago)
+        )
+        return view
+
+    def test_counts_use_raw_rows_before_first_rollup(self):
+        """Without rollups, counts fall back to the raw table."""
+        self._view(3, user=self.viewer)
+        self._view(0, session_key='anon1')
+
+        self.assertIsNone(get_rollup_watermark())
+        self.assertEqual(self.prompt.get_view_count(), 2)
+        self.assertEqual(count_views(since=self.now - timedelta(days=1), prompt=self.prompt), 1)
+
+    def test_rollup_aggregates_complete_days(self):
+        """One rollup row per prompt-day, today is left raw."""
+        self._view(2, user=self.viewer)
+        self._view(2, session_key='anon1')
+        self._view(1, session_key='anon2')
+        self._view(0, session_key='anon3')
+
+        result = rollup_views()
+
+        self.assertEqual(result['rows'], 2)
+        two_days_ago = PromptViewDaily.objects.get(
+            day=(self.now - timedelta(days=2)).date()
+        )
+        self.assertEqual(two_days_ago.unique_views, 2)
+        self.assertEqual(two_days_ago.authenticated_views, 1)
+        self.assertFalse(
+            PromptViewDaily.objects.filter(day=self.now.date()).exists()
+        )
+
+    def test_counts_unchanged_by_rollup_and_compaction(self):
+        """Rollup + compaction must not change any reported count."""
+        self._view(40, user=self.viewer)
+        self._view(10, session_key='anon1')
+        self._view(0, session_key='anon2')
+        week_ago = self.now - timedelta(days=7)
+
+        before_total = self.prompt.get_view_count()
+        before_week = count_views(since=week_ago, prompt=self.prompt)
+
+        rollup_views()
+        deleted = compact_views(retention_days=30)
+
+        self.assertEqual(deleted, 1)
+        self.assertEqual(PromptView.objects.count(), 2)
+        self.assertEqual(self.prompt.get_view_count(), before_total)
+        self.assertEqual(count_views(since=week_ago, prompt=self.prompt), before_week)
+
+    def _view_at(self, viewed_at, session_key):
+        view = PromptView.objects.create(prompt=self.prompt, session_key=session_key)
+        PromptView.objects.filter(pk=view.pk).update(viewed_at=viewed_at)
+
+    def test_window_starting_mid_day_counts_only_its_part_of_that_day(self):
+        """A rolled-up first day is counted from raw rows after since."""
+        day = (self.now - timedelta(days=3)).astimezone(dt_timezone.utc).date()
+        midnight = datetime.combine(day, time.min, tzinfo=dt_timezone.utc)
+        self._view_at(midnight + timedelta(hours=2), 'early')
+        self._view_at(midnight + timedelta(hours=20), 'late')
+        self._view(1, session_key='yesterday')
+        since = midnight + timedelta(hours=12)
+        rollup_views()
+
+        self.assertEqual(count_views(since=since, prompt=self.prompt), 2)
+        annotated = Prompt.objects.annotate(
+            views_count=prompt_views_expression(since=since)
+        ).get(pk=self.prompt.pk)
+        self.assertEqual(annotated.views_count, 2)
+        self.assertEqual(count_views(since=midnight, prompt=self.prompt), 3)
+
+    @override_settings(PROMPT_VIEW_RETENTION_DAYS=2)
+    def test_window_past_retention_counts_whole_first_day(self):
+        """Raw rows of a compacted first day are gone; its rollup is used."""
+        day = (self.now - timedelta(days=3)).astimezone(dt_timezone.utc).date()
+        midnight = datetime.combine(day, time.min, tzinfo=dt_timezone.utc)
+        self._view_at(midnight + timedelta(hours=2), 'early')
+        self._view_at(midnight + timedelta(hours=20), 'late')
+        rollup_views()
+        compact_views()
+
+        since = midnight + timedelta(hours=12)
+        self.assertEqual(count_views(since=since, prompt=self.prompt), 2)
+
+    def test_rollup_is_idempotent(self):
+        """Re-running the rollup does not double count."""
+        self._view(3, session_key='anon1')
+        rollup_views()
+        rollup_views()
+        self.assertEqual(self.prompt.get_view_count(), 1)
+        self.assertEqual(PromptViewDaily.objects.count(), 1)
+
+    def test_compaction_keeps_unrolled_rows(self):
+        """Raw rows newer than the watermark are never compacted."""
+        self._view(40, session_key='anon1')
+        self.assertEqual(compact_views(retention_days=1), 0)
+        self.assertEqual(PromptView.objects.count(), 1)
+
+    def test_prompt_views_expression_matches_count(self):
+        """The annotate helper agrees with count_views after a rollup."""
+        self._view(5, user=self.viewer)
+        rollup_views()
+        self._view(0, session_key='anon1')
+
+        annotated = Prompt.objects.annotate(
+            views_count=prompt_views_expression()
+        ).get(pk=self.prompt.pk)
+        self.assertEqual(annotated.views_count, 2)
+
+    def test_leaderboard_reads_rollups(self):
+        """Most Viewed still ranks authors after raw rows are compacted."""
+        self._view(50, user=self.viewer)
+        self._view(1, session_key='anon1')
+        rollup_views()
+        compact_views(retention_days=30)
+
+        results = LeaderboardService.get_most_viewed(period='all')
+        self.assertEqual(results[0].id, self.author.id)
+        self.assertEqual(results[0].total_views, 2)
+
+        cache.clear()
+        weekly = LeaderboardService.get_most_viewed(period='week')
+        self.assertEqual(weekly[0].total_views, 1)
+
+
+class RollupCommandTests(TestCase):
+    """Tests for the rollup_prompt_views management command."""
+
+    def setUp(self):
+        cache.clear()
+        reset_rollup_watermark()
+        author = User.objects.create_user(username='author', password='pw')
+        self.prompt = Prompt.objects.create(
+            title='Cmd Prompt', slug='cmd-prompt', content='c',
+            author=author, status=1,
+        )
+        view = PromptView.objects.create(prompt=self.prompt, session_key='a')
+        PromptView.objects.filter(pk=view.pk).update(
+            viewed_at=timezone.now() - timedelta(days=120)
+        )
+
+    def tearDown(self):
+        reset_rollup_watermark()
+
+    @override_settings(PROMPT_VIEW_RETENTION_DAYS=90)
+    def test_command_rolls_up_and_compacts(self):
+        out = StringIO()
+        call_command('rollup_prompt_views', stdout=out)
+
+        self.assertEqual(PromptViewDaily.objects.count(), 1)
+        self.assertEqual(PromptView.objects.count(), 0)
+        self.assertEqual(self.prompt.get_view_count(), 1)
+        self.assertIn('deleted 1 raw rows', out.getvalue())
+
+    def test_dry_run_keeps_raw_rows(self):
+        out = StringIO()
+        call_command('rollup_prompt_views', '--dry-run', stdout=out)
+
+        self.assertEqual(PromptView.objects.count(), 1)
+        self.assertIn('would be deleted', out.getvalue())
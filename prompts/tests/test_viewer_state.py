@@ -0,0 +1,107 @@
+"""
+Tests for the viewer state service used by card grids.
+
+Covers prompts/services/viewer_state.py and its use by listing views
+(liked/saved state without prefetching the likes M2M).
+"""
+from django.contrib.auth.models import AnonymousUser, User
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from prompts.models import Collection, CollectionItem, Prompt
+from prompts.services.viewer_state import attach_viewer_state, get_viewer_state
+
+
+class ViewerStateTests(TestCase):
+    """Query budget and correctness of get_viewer_state/attach_viewer_state."""
+
+    def setUp(self):
+        cache.clear()
+        self.author = User.objects.create_user(username='author', password='pw')
+        self.viewer = User.objects.create_user(username='viewer', password='pw')
+        self.prompts = [
+            Prompt.objects.create(
+                title=f'Card {i}', slug=f'card-{i}', content='c',
+                author=self.author, status=1,
+            )
+            for i in range(3)
+        ]
+        fans = [
+            User.objects.create_user(username=f'fan{i}', password='pw')
+            for i in range(5)
+        ]
+        self.prompts[0].likes.add(self.viewer, *fans)
+        self.prompts[1].likes.add(fans[0])
+
+        collection = Collection.objects.create(
+            user=self.viewer, title='Saved', slug='saved',
+        )
+        CollectionItem.objects.create(collection=collection, prompt=self.prompts[2])
+
+    def test_logged_in_viewer_costs_two_queries(self):
+        with self.assertNumQueries(2):
+            state = get_viewer_state(self.viewer, self.prompts)
+
+        self.assertEqual(state.liked_ids, {self.prompts[0].pk})
+        self.assertEqual(state.saved_ids, {self.prompts[2].pk})
+        self.assertEqual(state.like_counts[self.prompts[0].pk], 6)
+        self.assertEqual(state.like_counts[self.prompts[2].pk], 0)
+
+    def test_anonymous_viewer_costs_one_query(self):
+        with self.assertNumQueries(1):
+            state = get_viewer_state(AnonymousUser(), self.prompts)
+        self.assertFalse(state.liked_ids)
+        self.assertEqual(state.like_counts[self.prompts[1].pk], 1)
+
+    def test_attach_sets_card_attributes(self):
+        attach_viewer_state(self.prompts, self.viewer)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.prompts[0].number_of_likes(), 6)
+        self.assertTrue(self.prompts[0].viewer_liked)
+        self.assertFalse(self.prompts[1].viewer_liked)
+        self.assertTrue(self.prompts[2].viewer_saved)
+
+    def test_deleted_collections_do_not_count_as_saved(self):
+        Collection.objects.filter(user=self.viewer).update(is_deleted=True)
+        state = get_viewer_state(self.viewer, self.prompts)
+        self.assertFalse(state.saved_ids)
+
+    def test_empty_page(self):
+        with self.assertNumQueries(0):
+            self.assertEqual(get_viewer_state(self.viewer, []).like_counts, {})
+
+
+@override_settings(DEBUG=True)
+class CardGridViewerStateTests(TestCase):
+    """Card grids render liked state from the viewer state service."""
+
+    def setUp(self):
+        cache.clear()
+        self.author = User.objects.create_user(username='author', password='pw')
+        self.viewer = User.objects.create_user(username='viewer', password='pw')
+        self.prompt = Prompt.objects.create(
+            title='Grid Card', slug='grid-card', content='c',
+            author=self.author, status=1,
+        )
+        self.prompt.likes.add(self.viewer)
+
+    def test_profile_grid_marks_liked_cards(self):
+        self.client.force_login(self.viewer)
+        response = self.client.get(
+            reverse('prompts:user_profile', args=['author'])
+        )
+        self.assertEqual(response.status_code, 200)
+        card = response.context['prompts'][0]
+        self.assertTrue(card.viewer_liked)
+        self.assertContains(response, 'like-section liked')
+
+    def test_grid_marks_saved_cards(self):
+        collection = Collection.objects.create(user=self.viewer, title='Mine', slug='mine')
+        CollectionItem.objects.create(collection=collection, prompt=self.prompt)
+        self.client.force_login(self.viewer)
+        response = self.client.get(
+            reverse('prompts:user_profile', args=['author'])
+        )
+        self.assertTrue(response.context['prompts'][0].viewer_saved)
+        self.assertContains(response, 'save-to-collection-btn is-saved')
@@ -37,6 +37,7 @@ urlpatterns = [
     path('prompt/', RedirectView.as_view(url='/prompts/', permanent=True)),
     # Related prompts AJAX endpoint (must be before catch-all slug pattern)
     path('prompt/<slug:slug>/related/', prompt_list_views.related_prompts_ajax, name='related_prompts_ajax'),
+    path('prompt/<slug:slug>/comments/', prompt_comment_views.comments_ajax, name='comments_ajax'),
     path('prompt/<slug:slug>/', prompt_list_views.prompt_detail, name='prompt_detail'),
     path('prompt/<slug:slug>/edit/', prompt_edit_views.prompt_edit, name='prompt_edit'),
     path('prompt/<slug:slug>/delete/', prompt_trash_views.prompt_delete, name='prompt_delete'),
@@ -182,6 +183,9 @@ urlpatterns = [
     path('api/notifications/<int:notification_id>/read/', notification_views.mark_read_api, name='notification_mark_read_api'),
     path('api/notifications/<int:notification_id>/click/', notification_views.notification_click, name='notification_click'),
     path('notifications/delete/<int:notification_id>/', notification_views.delete_notification_view, name='delete_notification'),
+    path('api/notifications/broadcast-<int:broadcast_id>/read/', notification_views.mark_broadcast_read_api, name='broadcast_mark_read_api'),
+    path('api/notifications/broadcast-<int:broadcast_id>/click/', notification_views.broadcast_click, name='broadcast_click'),
+    path('notifications/delete/broadcast-<int:broadcast_id>/', notification_views.delete_broadcast_view, name='delete_broadcast'),
     path('notifications/delete-all/', notification_views.delete_all_notifications_view, name='delete_all_notifications'),
 
     # System Notifications Admin (Phase P2-A)
@@ -0,0 +1,183 @@
+"""
+Cache dependency registry for PromptFinder.
+
+Cached entries declare the surrogate keys they were built from —
+'prompt:123', 'user:45', 'tag:portrait', 'leaderboard' — and model
+signals (prompts/signals.py) bump those keys when the underlying rows
+change. Invalidation is O(1) per surrogate key and never needs to know
+which concrete cache keys exist.
+
+How it works:
+- Each surrogate key has a generation counter in the cache
+  ('sk_gen:<surrogate>', no expiry), a time_ns() stamp.
+- An entry is stored with the generations of its surrogate keys at the
+  time its data was read. Reading it fetches the entry and the current
+  generations in one get_many; any mismatch (bumped or evicted
+  counter) is a miss.
+- invalidate() writes new stamps for the given surrogate keys in one
+  set_many.
+
+Because stale entries are rejected on read, TTLs only bound drift from
+changes no signal sees (view counts, time windows), not correctness.
+
+Usage:
+    from prompts.utils import cache_dependencies as deps
+
+    value = deps.get_or_set(
+        'followers_count_45', lambda: ..., timeout=3600,
+        depends_on=[deps.user_key(45)],
+    )
+
+    deps.invalidate(deps.prompt_key(prompt.pk), deps.user_key(prompt.author_id))
+"""
+import logging
+import time
+
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+GENERATION_PREFIX = 'sk_gen:'
+
+# Global surrogate keys
+LEADERBOARD = 'leaderboard'
+NOTIFICATIONS = 'notifications'  # every user's notification counters
+SITE_SETTINGS = 'site_settings'
+PROFANITY_WORDS = 'profanity_words'  # compiled profanity matchers
+
+_MISSING = object()
+
+
+def prompt_key(prompt_id):
+    return f'prompt:{prompt_id}'
+
+
+def user_key(user_id):
+    return f'user:{user_id}'
+
+
+def tag_key(tag_name):
+    return f'tag:{str(tag_name).lower()}'
+
+
+def notifications_key(user_id):
+    return f'notifications:{user_id}'
+
+
+def _generation_key(surrogate_key):
+    return GENERATION_PREFIX + surrogate_key
+
+
+def current_generations(depends_on):
+    """
+    Generations to record with an entry that is about to be computed.
+
+    Call this BEFORE reading the data, so a change that lands during the
+    computation still invalidates the result. Missing counters are
+    initialised, so an entry never records "no generation" (an evicted
+    counter then reads as a mismatch rather than as a match).
+
+    Returns:
+        dict: {surrogate_key: generation}
+    """
+    depends_on = list(dict.fromkeys(depends_on))
+    if not depends_on:
+        return {}
+    found = cache.get_many([_generation_key(k) for k in depends_on])
+    generations = {}
+    for surrogate_key in depends_on:
+        gen_key = _generation_key(surrogate_key)
+        generation = found.get(gen_key)
+        if generation is None:
+            generation = time.time_ns()
+            if not cache.add(gen_key, generation, None):
+                generation = cache.get(gen_key, generation)
+        generations[surrogate_key] = generation
+    return generations
+
+
+def is_current(recorded):
+    """True if none of the recorded surrogate keys has been bumped since."""
+    if not recorded:
+        return True
+    found = cache.get_many([_generation_key(k) for k in recorded])
+    return all(
+        found.get(_generation_key(k)) == generation
+        for k, generation in recorded.items()
+    )
+
+
+def get_entry(key, depends_on=(), default=None):
+    """
+    Read an entry stored with set_value(), retired or not. One cache
+    round trip.
+
+    Returns:
+        tuple: (value, current) — current is False once any of its
+        surrogate keys has been bumped; (default, False) if absent
+    """
+    depends_on = list(dict.fromkeys(depends_on))
+    gen_keys = [_generation_key(k) for k in depends_on]
+    found = cache.get_many([key, *gen_keys])
+    entry = found.get(key)
+    if not isinstance(entry, dict) or 'deps' not in entry:
+        return default, False
+    recorded = entry['deps']
+    current = set(recorded) == set(depends_on) and all(
+        found.get(gen_key) == recorded[surrogate_key]
+        for surrogate_key, gen_key in zip(depends_on, gen_keys)
+    )
+    return entry['value'], current
+
+
+def get_value(key, depends_on=(), default=None):
+    """
+    Read an entry stored with set_value(), rejecting it if any of its
+    surrogate keys has been bumped. One cache round trip.
+    """
+    value, current = get_entry(key, depends_on, default)
+    return value if current else default
+
+
+def set_value(key, value, timeout, depends_on=(), generations=None):
+    """
+    Store value under key, tagged with its surrogate keys.
+
+    Args:
+        key: Cache key
+        value: Value to cache
+        timeout: Seconds (an upper bound; signals invalidate earlier)
+        depends_on: Surrogate keys the value was built from
+        generations: Result of current_generations() taken before the
+            value was computed (default: read now)
+    """
+    if generations is None:
+        generations = current_generations(depends_on)
+    cache.set(key, {'value': value, 'deps': generations}, timeout)
+
+
+def get_or_set(key, compute, timeout, depends_on=()):
+    """Return the cached value, or compute, store and return it."""
+    value = get_value(key, depends_on, _MISSING)
+    if value is not _MISSING:
+        return value
+    generations = current_generations(depends_on)
+    value = compute()
+    set_value(key, value, timeout, depends_on, generations)
+    return value
+
+
+def invalidate(*surrogate_keys):
+    """
+    Retire every entry that depends on any of the given surrogate keys.
+
+    One set_many regardless of how many entries depend on them.
+    """
+    surrogate_keys = [k for k in dict.fromkeys(surrogate_keys) if k]
+    if not surrogate_keys:
+        return
+    stamp = time.time_ns()
+    cache.set_many(
+        {_generation_key(k): stamp for k in surrogate_keys}, timeout=None,
+    )
+    logger.debug(f"[CacheDependencies] Invalidated {surrogate_keys}")
@@ -0,0 +1,218 @@
+"""
+Cached computation helper for PromptFinder.
+
+Wraps expensive aggregates (leaderboards, profile stats, search IDs) so a
+key expiring under load does not make every concurrent request recompute
+it at once:
+
+- Single flight: only the request holding a short lock (cache.add)
+  recomputes; everyone else keeps serving the previous value.
+- Probabilistic early refresh (XFetch): as a value nears the end of its
+  fresh window, requests become increasingly likely to refresh it early,
+  scaled by how long the computation took last time — so refreshes are
+  spread out instead of all landing on the expiry instant.
+- Stale-while-revalidate: after the fresh window, the value is still
+  served for `stale_ttl` seconds while a background thread recomputes.
+- Dependencies: `depends_on` surrogate keys (prompts/utils/
+  cache_dependencies.py) retire the value as soon as a model signal bumps
+  one of them. A retired value is refreshed at once, and served like a
+  stale one while the lock holder recomputes it.
+- Cold misses (nothing cached at all) wait for the lock holder's result
+  instead of piling on, polling with backoff for up to `lock_timeout`.
+  If the holder gives up the lock without storing a value, the next
+  waiter to take the lock computes it.
+
+Metrics (hits, stale hits, misses, recomputes, errors) are counted per
+process and available from get_metrics().
+
+Usage:
+    result = cached_computation(
+        f'leaderboard_viewed_{period}_{limit}',
+        lambda: list(queryset),
+        ttl=300,
+        name='leaderboard_viewed',
+        depends_on=[cache_dependencies.LEADERBOARD],
+    )
+"""
+import logging
+import math
+import random
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import close_old_connections
+
+from prompts.utils import cache_dependencies
+
+logger = logging.getLogger(__name__)
+
+LOCK_PREFIX = 'cc_lock:'
+DEFAULT_LOCK_TIMEOUT = 30  # seconds a recompute may hold the lock
+# Sleep between polls while a cold miss waits for the lock holder: doubles
+# from the first step up to the cap (each poll is one read and one add)
+COLD_WAIT_FIRST_STEP = 0.02
+COLD_WAIT_MAX_STEP = 0.5
+
+_metrics = Counter()
+_metrics_lock = threading.Lock()
+_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix='cached-computation')
+
+
+def _record(name, event):
+    with _metrics_lock:
+        _metrics[(name, event)] += 1
+
+
+def get_metrics():
+    """
+    Per-process counters.
+
+    Returns:
+        dict: {name: {'hit': n, 'stale': n, 'miss': n, 'recompute': n, 'error': n}}
+    """
+    with _metrics_lock:
+        snapshot = dict(_metrics)
+    result = {}
+    for (name, event), count in snapshot.items():
+        result.setdefault(name, {})[event] = count
+    return result
+
+
+def reset_metrics():
+    """Clear the per-process counters (tests)."""
+    with _metrics_lock:
+        _metrics.clear()
+
+
+def _background_enabled():
+    return getattr(settings, 'CACHED_COMPUTATION_BACKGROUND', True)
+
+
+def _compute_and_store(key, compute, ttl, stale_ttl, name, depends_on,
+                       release_lock=True):
+    """Run compute(), store the envelope, release the lock if we hold it."""
+    # Generations are read before the data so a concurrent change wins
+    generations = cache_dependencies.current_generations(depends_on)
+    started = time.monotonic()
+    try:
+        value = compute()
+    except Exception:
+        _record(name, 'error')
+        logger.exception(f"[CachedComputation] Recompute failed for {key}")
+        if release_lock:
+            cache.delete(LOCK_PREFIX + key)
+        raise
+    delta = time.monotonic() - started
+    envelope = {
+        'value': value,
+        'fresh_until': time.time() + ttl,
+        'delta': delta,
+    }
+    cache_dependencies.set_value(
+        key, envelope, ttl + stale_ttl, depends_on, generations,
+    )
+    if release_lock:
+        cache.delete(LOCK_PREFIX + key)
+    _record(name, 'recompute')
+    logger.debug(f"[CachedComputation] Recomputed {key} in {delta:.3f}s")
+    return value
+
+
+def _background_recompute(key, compute, ttl, stale_ttl, name, depends_on):
+    try:
+        _compute_and_store(key, compute, ttl, stale_ttl, name, depends_on)
+    except Exception:
+        pass  # Already logged; stale value keeps being served
+    finally:
+        close_old_connections()
+
+
+def _needs_refresh(envelope, beta):
+    """XFetch: refresh early with probability rising towards fresh_until."""
+    remaining = envelope['fresh_until'] - time.time()
+    if remaining <= 0:
+        return True
+    # -log(U) is Exp(1); scaled by last compute time and beta
+    early = envelope.get('delta', 0) * beta * -math.log(1.0 - random.random())
+    return early >= remaining
+
+
+def cached_computation(key, compute, ttl, stale_ttl=None, beta=1.0,
+                       lock_timeout=DEFAULT_LOCK_TIMEOUT, name=None,
+                       depends_on=()):
+    """
+    Return the cached result of compute(), recomputing it safely.
+
+    Args:
+        key: Cache key for the result
+        compute: Zero-argument callable producing the value (must be
+            picklable output; runs in a background thread on refresh)
+        ttl: Seconds the value is considered fresh
+        stale_ttl: Extra seconds a stale value may be served while it is
+            recomputed (default: same as ttl)
+        beta: Early-refresh aggressiveness (0 disables early refresh)
+        lock_timeout: Seconds the single-flight lock is held at most, and
+            so how long a cold miss waits for the holder's result
+        name: Metrics bucket (default: the key itself)
+        depends_on: Surrogate keys (see cache_dependencies) whose
+            invalidation retires the value immediately
+
+    Returns:
+        The computed (possibly slightly stale) value
+    """
+    if stale_ttl is None:
+        stale_ttl = ttl
+    name = name or key
+    depends_on = list(depends_on)
+    lock_key = LOCK_PREFIX + key
+
+    envelope, current = cache_dependencies.get_entry(key, depends_on)
+    if isinstance(envelope, dict) and 'fresh_until' in envelope:
+        if current and not _needs_refresh(envelope, beta):
+            _record(name, 'hit')
+            return envelope['value']
+
+        _record(name, 'stale')
+        if cache.add(lock_key, 1, lock_timeout):
+            if _background_enabled():
+                _executor.submit(
+                    _background_recompute, key, compute, ttl, stale_ttl, name,
+                    depends_on,
+                )
+            else:
+                try:
+                    return _compute_and_store(
+                        key, compute, ttl, stale_ttl, name, depends_on,
+                    )
+                except Exception:
+                    pass  # Serve the stale value below
+        return envelope['value']
+
+    # Cold miss: nothing to serve yet
+    _record(name, 'miss')
+    if cache.add(lock_key, 1, lock_timeout):
+        return _compute_and_store(key, compute, ttl, stale_ttl, name, depends_on)
+
+    # Someone else is computing it — wait for their result. The lock
+    # expires after lock_timeout, so a holder that died is replaced then.
+    deadline = time.monotonic() + lock_timeout
+    step = COLD_WAIT_FIRST_STEP
+    while time.monotonic() < deadline:
+        time.sleep(step)
+        step = min(step * 2, COLD_WAIT_MAX_STEP)
+        envelope = cache_dependencies.get_value(key, depends_on)
+        if isinstance(envelope, dict) and 'fresh_until' in envelope:
+            return envelope['value']
+        if cache.add(lock_key, 1, lock_timeout):
+            # The holder finished without storing a value (failed, or the
+            # entry was retired meanwhile): take over
+            return _compute_and_store(key, compute, ttl, stale_ttl, name, depends_on)
+
+    logger.warning(f"[CachedComputation] {key} not computed within {lock_timeout}s, computing inline")
+    return _compute_and_store(
+        key, compute, ttl, stale_ttl, name, depends_on, release_lock=False,
+    )
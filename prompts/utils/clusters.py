@@ -0,0 +1,48 @@
+"""
+Connected components of "looks like" pairs, for duplicate reports.
+
+A union-find over hashable nodes: link() every matching pair, then
+groups() returns the clusters, so a chain of small edits (A ~ B ~ C)
+forms one group even when A and C are not a match themselves.
+
+Usage:
+    clusters = Clusters()
+    clusters.link(('prompt', 1), ('prompt', 2))
+    clusters.groups()   # -> [{('prompt', 1), ('prompt', 2)}]
+"""
+
+
+class Clusters:
+
+    __slots__ = ('_parent',)
+
+    def __init__(self):
+        self._parent = {}
+
+    def _root(self, node):
+        parent = self._parent
+        while parent.setdefault(node, node) != node:
+            parent[node] = parent[parent[node]]  # Path halving
+            node = parent[node]
+        return node
+
+    def link(self, first, second) -> None:
+        """Put both nodes in the same cluster."""
+        self._parent[self._root(first)] = self._root(second)
+
+    def groups(self, label=None):
+        """
+        Clusters of two or more nodes, largest first.
+
+        Args:
+            label: Optional node -> member function (default: the node)
+        """
+        groups = {}
+        for node in self._parent:
+            groups.setdefault(self._root(node), set()).add(
+                node if label is None else label(node)
+            )
+        return sorted(
+            (group for group in groups.values() if len(group) > 1),
+            key=len, reverse=True,
+        )
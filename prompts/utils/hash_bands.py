@@ -0,0 +1,84 @@
+"""
+Band index over 64-bit hashes for "everything within distance d" queries.
+
+The hash is split into max_distance + 1 bands of roughly equal width. Two
+hashes within max_distance bits differ in at most max_distance bands, so
+they agree exactly on at least one (the same pigeonhole argument as the
+pHash band columns in prompts/services/image_verdicts.py). A search looks
+up the query's value of each band in a dict, and checks the exact distance
+of those candidates only — for random 64-bit hashes, each band matches
+about 1 in 2^(64 / bands) of the indexed items.
+
+The index only grows, and add() only appends to lists and inserts dict
+keys, so searches may run concurrently with one writer without a lock.
+Callers that remove or re-hash items check results against their own
+current mapping.
+
+Usage:
+    bands = HashBandIndex(max_distance=6)
+    bands.add(phash, ('prompt', 42))
+    bands.search(query_phash, 6)   # -> [(distance, key), ...] nearest first
+"""
+from .image_hashing import hamming
+
+
+class HashBandIndex:
+
+    __slots__ = ('max_distance', '_bands', '_tables', '_size')
+
+    def __init__(self, max_distance: int):
+        self.max_distance = max_distance
+        count = max_distance + 1
+        width, extra = divmod(64, count)
+        self._bands = []  # (shift, mask) per band
+        shift = 0
+        for i in range(count):
+            bits = width + (1 if i < extra else 0)
+            self._bands.append((shift, (1 << bits) - 1))
+            shift += bits
+        # Per band: band value -> ([hash, ...], [key, ...]) in parallel
+        self._tables = [{} for _ in range(count)]
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    def add(self, value: int, key) -> None:
+        """Insert key under hash value."""
+        for (shift, mask), table in zip(self._bands, self._tables):
+            band = (value >> shift) & mask
+            bucket = table.get(band)
+            if bucket is None:
+                bucket = table.setdefault(band, ([], []))
+            # Key first: a concurrent search that sees the hash finds its key
+            bucket[1].append(key)
+            bucket[0].append(value)
+        self._size += 1
+
+    def search(self, value: int, max_distance: int):
+        """
+        (distance, key) for every key within max_distance, nearest first.
+
+        Raises:
+            ValueError: max_distance is beyond what the bands guarantee
+        """
+        if max_distance > self.max_distance:
+            raise ValueError(
+                f'Band index finds matches up to {self.max_distance} bits, not {max_distance}'
+            )
+        found = {}
+        for (shift, mask), table in zip(self._bands, self._tables):
+            bucket = table.get((value >> shift) & mask)
+            if bucket is None:
+                continue
+            hashes, keys = bucket
+            near = [
+                i for i, other in enumerate(hashes)
+                if (value ^ other).bit_count() <= max_distance
+            ]
+            for i in near:
+                found[(hashes[i], keys[i])] = hamming(value, hashes[i])
+        return sorted(
+            ((distance, key) for (_, key), distance in found.items()),
+            key=lambda item: item[0],
+        )
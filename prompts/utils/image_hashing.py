@@ -0,0 +1,113 @@
+"""
+Image fingerprints for recognising images we have already seen.
+
+- sha256: exact bytes
+- phash: 64-bit perceptual hash (low-frequency DCT of a 32x32 greyscale
+  thumbnail, one bit per coefficient above the median)
+- dhash: 64-bit difference hash (brightness gradient of a 9x8 thumbnail)
+
+Re-encoding, resizing and light compression leave the perceptual hashes
+within a few bits of each other, so "near-identical" is a small Hamming
+distance. Only Pillow is needed: the 8x8 corner of the DCT is computed
+from a precomputed cosine table rather than a full transform.
+
+Usage:
+    fingerprint = fingerprint_bytes(image_bytes)
+    if hamming(fingerprint.phash, other.phash) <= 3:
+        ...
+"""
+import hashlib
+import math
+from dataclasses import dataclass
+from io import BytesIO
+
+from PIL import Image
+
+HASH_BITS = 64
+_DCT_SIZE = 32
+_LOW_FREQ = 8
+
+# _COSINES[k][n] = cos(pi * k * (2n + 1) / 2N) for the 8 lowest frequencies
+_COSINES = [
+    [math.cos(math.pi * k * (2 * n + 1) / (2 * _DCT_SIZE)) for n in range(_DCT_SIZE)]
+    for k in range(_LOW_FREQ)
+]
+
+
+@dataclass(frozen=True)
+class ImageFingerprint:
+    sha256: str
+    phash: int
+    dhash: int
+
+
+def _bits_to_int(bits) -> int:
+    value = 0
+    for bit in bits:
+        value = (value << 1) | bool(bit)
+    return value
+
+
+def phash(image: Image.Image) -> int:
+    """64-bit DCT perceptual hash of a PIL image."""
+    pixels = list(
+        image.convert('L').resize((_DCT_SIZE, _DCT_SIZE), Image.Resampling.LANCZOS).getdata()
+    )
+    rows = [pixels[r * _DCT_SIZE:(r + 1) * _DCT_SIZE] for r in range(_DCT_SIZE)]
+    # Separable DCT-II: low frequencies along each row, then down the columns
+    row_freqs = [
+        [sum(p * c for p, c in zip(row, cosines)) for cosines in _COSINES]
+        for row in rows
+    ]
+    coefficients = [
+        sum(cosines[r] * row_freqs[r][k] for r in range(_DCT_SIZE))
+        for cosines in _COSINES
+        for k in range(_LOW_FREQ)
+    ]
+    median = sorted(coefficients)[HASH_BITS // 2 - 1:HASH_BITS // 2 + 1]
+    median = sum(median) / 2
+    return _bits_to_int(c > median for c in coefficients)
+
+
+def dhash(image: Image.Image) -> int:
+    """64-bit horizontal difference hash of a PIL image."""
+    pixels = list(
+        image.convert('L').resize((_LOW_FREQ + 1, _LOW_FREQ), Image.Resampling.LANCZOS).getdata()
+    )
+    width = _LOW_FREQ + 1
+    return _bits_to_int(
+        pixels[r * width + c + 1] > pixels[r * width + c]
+        for r in range(_LOW_FREQ)
+        for c in range(_LOW_FREQ)
+    )
+
+
+def hamming(a: int, b: int) -> int:
+    """Number of differing bits between two hashes."""
+    return (a ^ b).bit_count()
+
+
+def fingerprint_bytes(data: bytes) -> ImageFingerprint:
+    """
+    Fingerprint encoded image bytes.
+
+    Raises:
+        PIL.UnidentifiedImageError / OSError: data is not a readable image
+    """
+    with Image.open(BytesIO(data)) as image:
+        image.draft('L', (_DCT_SIZE * 2, _DCT_SIZE * 2))  # JPEG: decode at reduced size
+        return ImageFingerprint(
+            sha256=hashlib.sha256(data).hexdigest(),
+            phash=phash(image),
+            dhash=dhash(image),
+        )
+
+
+def to_signed(value: int) -> int:
+    """Unsigned 64-bit hash -> signed value for a BigIntegerField."""
+    return value - (1 << HASH_BITS) if value >= 1 << (HASH_BITS - 1) else value
+
+
+def to_unsigned(value: int) -> int:
+    """Inverse of to_signed()."""
+    return value + (1 << HASH_BITS) if value < 0 else value
@@ -0,0 +1,84 @@
+"""
+MinHash signatures and LSH band keys for near-duplicate prompt texts.
+
+A text is normalised (lowercased, punctuation dropped), cut into
+overlapping word shingles, and summarised by a MinHash signature: for
+each of SIGNATURE_SIZE hash functions, the smallest hash over all
+shingles. The fraction of positions where two signatures agree estimates
+the Jaccard similarity of their shingle sets, so "the same prompt with a
+few words changed" scores high regardless of text length.
+
+For lookups the signature is split into BANDS bands of ROWS values; each
+band hashes to one 64-bit bucket key. Two texts share at least one bucket
+with probability 1 - (1 - s^ROWS)^BANDS (about 98.8% at s=0.7, 12% at
+s=0.3), so an indexed bucket lookup returns the likely matches without
+scanning every text.
+
+Usage:
+    signature = minhash('A red fox in the snow, cinematic')
+    buckets = band_keys(signature)
+    similarity(signature, other_signature)   # 0.0 - 1.0
+"""
+import hashlib
+import random
+import re
+import struct
+
+SHINGLE_WORDS = 3
+SIGNATURE_SIZE = 64
+BANDS = 16
+ROWS = SIGNATURE_SIZE // BANDS
+
+_PRIME = (1 << 61) - 1
+_WORD_RE = re.compile(r'\w+')
+
+# Fixed coefficients: signatures must be comparable across processes/deploys
+_rng = random.Random(20240611)
+_PERMUTATIONS = [
+    (_rng.randrange(1, _PRIME), _rng.randrange(0, _PRIME)) for _ in range(SIGNATURE_SIZE)
+]
+del _rng
+
+
+def _hash64(data: bytes) -> int:
+    return int.from_bytes(hashlib.blake2b(data, digest_size=8).digest(), 'big')
+
+
+def shingles(text: str) -> set:
+    """Word n-grams of the normalised text (the words themselves if shorter)."""
+    words = _WORD_RE.findall(text.lower())
+    if len(words) <= SHINGLE_WORDS:
+        return {' '.join(words)} if words else set()
+    return {
+        ' '.join(words[i:i + SHINGLE_WORDS])
+        for i in range(len(words) - SHINGLE_WORDS + 1)
+    }
+
+
+def minhash(text: str) -> list:
+    """SIGNATURE_SIZE-value MinHash signature; empty for text without words."""
+    hashed = [_hash64(shingle.encode()) for shingle in shingles(text)]
+    if not hashed:
+        return []
+    return [
+        min((a * value + b) % _PRIME for value in hashed)
+        for a, b in _PERMUTATIONS
+    ]
+
+
+def band_keys(signature: list) -> list:
+    """One signed 64-bit bucket key per band (band number included)."""
+    keys = []
+    for band in range(BANDS if signature else 0):
+        rows = signature[band * ROWS:(band + 1) * ROWS]
+        key = _hash64(struct.pack(f'>H{ROWS}Q', band, *rows))
+        # Stored in a BigIntegerField
+        keys.append(key - (1 << 64) if key >= (1 << 63) else key)
+    return keys
+
+
+def similarity(first: list, second: list) -> float:
+    """Estimated Jaccard similarity of the texts behind two signatures."""
+    if not first or len(first) != len(second):
+        return 0.0
+    return sum(a == b for a, b in zip(first, second)) / len(first)
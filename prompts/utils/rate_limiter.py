@@ -0,0 +1,46 @@
+"""
+Blocking rate limiter for outbound API calls made from worker threads.
+
+A token bucket shared by every thread of a pool: acquire() returns
+immediately while tokens remain and otherwise sleeps until the next one
+is due, so a pool of any size stays under the configured request rate.
+The bucket holds at most ``burst`` tokens (default: one second's worth).
+
+Usage:
+    limiter = RateLimiter(requests_per_second=5)
+
+    def call_api(item):
+        limiter.acquire()
+        return client.post(item)
+"""
+import threading
+import time
+
+
+class RateLimiter:
+    """Thread-safe token bucket. A rate of 0 or None disables limiting."""
+
+    def __init__(self, requests_per_second, burst=None):
+        self.rate = requests_per_second or 0
+        self.capacity = burst or max(1, self.rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Take one token, sleeping until one is available."""
+        if not self.rate:
+            return
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(
+                    self.capacity,
+                    self._tokens + (now - self._updated) * self.rate,
+                )
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
@@ -13,6 +13,12 @@ related prompts based on 6 weighted factors:
 Content similarity (tags + categories + descriptors) = 90% of score.
 Non-relevance factors (generator + engagement + recency) = 10% tiebreakers.
 
+Visual similarity (+5% bonus): prompts whose images are near-duplicates
+(within NEAR_DUPLICATE_MAX_DISTANCE bits, the radius the index in
+prompts/services/near_duplicates.py serves) join the candidate pool, and
+every candidate within RELATED_VISUAL_MAX_DISTANCE bits of pHash scores up
+to W_VISUAL extra. Only applies when both images are indexed.
+
 Phase 2B-9: Rebalanced from 70/30 to 90/10 split for topical relevance.
 Phase 2B-9b: Added inverse frequency weighting for tags and categories.
 Phase 2B-9c: Extended IDF weighting to descriptors. Rebalanced weights to
@@ -42,6 +48,7 @@ W_DESCRIPTOR = 0.35
 W_GENERATOR = 0.05
 W_ENGAGEMENT = 0.03
 W_RECENCY = 0.02
+W_VISUAL = 0.05
 
 
 def _get_tag_idf_weights(total_prompts):
@@ -120,12 +127,63 @@ def _get_descriptor_idf_weights(total_prompts):
     }
 
 
+def _candidate_filter(prompt, prompt_tags, prompt_categories, prompt_descriptors):
+    """
+    Q selecting prompts related to prompt, or None if nothing can be.
+
+    Candidates share a tag, category or descriptor. Generator is left out
+    to avoid pulling in prompts that only match on platform (e.g., all
+    Midjourney prompts), unless the prompt has no content metadata at all.
+    Near-duplicate images qualify on their own (in-memory index lookup).
+    """
+    from prompts.constants import NEAR_DUPLICATE_MAX_DISTANCE
+    from prompts.services import near_duplicates
+
+    filter_q = Q()
+    if prompt_tags:
+        filter_q |= Q(tags__in=prompt_tags)
+    if prompt_categories:
+        filter_q |= Q(categories__in=prompt_categories)
+    if prompt_descriptors:
+        filter_q |= Q(descriptors__in=prompt_descriptors)
+    if not filter_q and prompt.ai_generator:
+        # No tags, no categories, and no descriptors — fall back to same AI generator
+        filter_q = Q(ai_generator=prompt.ai_generator)
+
+    visual_ids = list(near_duplicates.similar_prompt_ids(prompt.id, NEAR_DUPLICATE_MAX_DISTANCE))
+    if visual_ids:
+        filter_q |= Q(id__in=visual_ids)
+    return filter_q or None
+
+
+def _add_visual_bonus(prompt, scored):
+    """
+    Add W_VISUAL times the pHash closeness to each (candidate, score) pair.
+
+    Only candidates whose image is indexed get a bonus (no queries).
+    """
+    from prompts.constants import RELATED_VISUAL_MAX_DISTANCE
+    from prompts.services import near_duplicates
+
+    visual_scores = near_duplicates.visual_similarity(
+        prompt.id, [candidate.id for candidate, _ in scored], RELATED_VISUAL_MAX_DISTANCE,
+    )
+    if not visual_scores:
+        return scored
+    return [
+        (candidate, total + visual_scores.get(candidate.id, 0.0) * W_VISUAL)
+        for candidate, total in scored
+    ]
+
+
 def get_related_prompts(prompt, limit=60):
     """
-    Score and rank related prompts using 6 weighted factors.
+    Score and rank related prompts using 6 weighted factors plus the
+    visual-similarity bonus.
 
     Pre-filters candidates to avoid scoring entire database:
-    Only scores prompts sharing at least 1 tag, 1 category, OR 1 descriptor.
+    Only scores prompts sharing at least 1 tag, 1 category, OR 1 descriptor,
+    or with a visually similar image.
     Falls back to same AI generator only when prompt has no content metadata.
 
     Args:
@@ -152,29 +210,17 @@ def get_related_prompts(prompt, limit=60):
         deleted_at__isnull=False  # Exclude soft-deleted
     )
 
-    # Filter to prompts sharing tags, categories, or descriptors (content overlap).
-    # Generator excluded from pre-filter to avoid pulling in irrelevant candidates
-    # that only match on platform (e.g., all Midjourney prompts).
-    if prompt_tags or prompt_categories or prompt_descriptors:
-        filter_q = Q()
-        if prompt_tags:
-            filter_q |= Q(tags__in=prompt_tags)
-        if prompt_categories:
-            filter_q |= Q(categories__in=prompt_categories)
-        if prompt_descriptors:
-            filter_q |= Q(descriptors__in=prompt_descriptors)
-        candidates = candidates.filter(filter_q)
-    else:
-        # No tags, no categories, and no descriptors — fall back to same AI generator
-        if prompt.ai_generator:
-            candidates = candidates.filter(ai_generator=prompt.ai_generator)
-        else:
-            return []
+    # Filter to prompts sharing tags, categories, or descriptors (content overlap),
+    # or with a visually similar image
+    filter_q = _candidate_filter(prompt, prompt_tags, prompt_categories, prompt_descriptors)
+    if filter_q is None:
+        return []
+    candidates = candidates.filter(filter_q)
 
     candidates = candidates.distinct().select_related(
         'author'
-    ).prefetch_related('tags', 'categories', 'descriptors', 'likes').annotate(
-        likes_count=Count('likes')  # Annotate for scoring; prefetch for template user check
+    ).prefetch_related('tags', 'categories', 'descriptors').annotate(
+        likes_count=Count('likes')  # For scoring; viewer state via attach_viewer_state()
     )
 
     # Safety cap: if too many candidates, limit to most recent 500
@@ -275,6 +321,9 @@ def get_related_prompts(prompt, limit=60):
 
         scored.append((candidate, total))
 
+    # 7. Visual similarity (W_VISUAL) — pHash closeness bonus
+    scored = _add_visual_bonus(prompt, scored)
+
     # Sort by score desc, then created_on desc (tiebreaker)
     scored.sort(key=lambda x: (-x[1], -x[0].created_on.timestamp()))
 
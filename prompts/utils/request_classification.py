@@ -0,0 +1,155 @@
+"""
+Request classification utilities for PromptFinder.
+
+One shared place to answer "who is this request from?" for view tracking,
+rate limiting and any other middleware or view that needs it:
+
+- Client IP (X-Forwarded-For validated against settings.TRUSTED_PROXIES)
+- Peppered SHA-256 IP hash (privacy-preserving analytics/rate-limit key)
+- Bot detection against BOT_USER_AGENT_PATTERNS
+
+Performance:
+- The bot pattern list is compiled once, at import, into a single regex
+- Bot verdicts for recently seen user-agent strings are memoised in a
+  bounded LRU (crawlers reuse a handful of UA strings)
+- The classification is computed at most once per request, on first
+  classify_request() call, and stored on the request object
+"""
+import hashlib
+import ipaddress
+import os
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+
+from django.conf import settings
+
+from prompts.constants import BOT_USER_AGENT_PATTERNS
+
+# Single alternation over every pattern — one pass over the UA string
+# instead of one substring scan per pattern.
+BOT_USER_AGENT_REGEX = re.compile(
+    '|'.join(re.escape(pattern) for pattern in BOT_USER_AGENT_PATTERNS),
+    re.IGNORECASE,
+)
+
+USER_AGENT_CACHE_SIZE = 4096
+IP_HASH_CACHE_SIZE = 4096
+
+# Attribute used to memoise the classification on the request object
+_REQUEST_ATTR = '_pf_classification'
+
+
+@dataclass(frozen=True)
+class RequestClassification:
+    """Per-request facts shared by view tracking and rate limiting."""
+    ip: str
+    ip_hash: str
+    user_agent: str
+    is_bot: bool
+
+
+@lru_cache(maxsize=USER_AGENT_CACHE_SIZE)
+def is_bot_user_agent(user_agent):
+    """
+    Detect if a user-agent string belongs to a known bot.
+
+    Returns True for a missing user-agent (suspicious) or any
+    BOT_USER_AGENT_PATTERNS match (case-insensitive substring).
+    """
+    if not user_agent:
+        return True
+    return BOT_USER_AGENT_REGEX.search(user_agent) is not None
+
+
+@lru_cache(maxsize=8)
+def _trusted_networks(proxy_ranges):
+    """Parse TRUSTED_PROXIES once per distinct setting value."""
+    return tuple(ipaddress.ip_network(r) for r in proxy_ranges)
+
+
+def get_client_ip(request):
+    """
+    Extract client IP address from request, validating proxy headers.
+
+    Security: Only trusts X-Forwarded-For headers when behind known proxies
+    to prevent IP spoofing attacks. Falls back to REMOTE_ADDR if not behind
+    trusted proxy or header is missing.
+
+    Args:
+        request: Django request object
+
+    Returns:
+        str: Client IP address (validated)
+    """
+    # Get X-Forwarded-For header (set by proxies/load balancers)
+    x_forwarded_for = request.META.get('HTTP_X_FORWARDED_FOR')
+
+    if x_forwarded_for:
+        networks = _trusted_networks(
+            tuple(getattr(settings, 'TRUSTED_PROXIES', []))
+        )
+
+        # Iterate from rightmost IP (closest to our server) backwards
+        # Stop at first IP that's NOT in our trusted proxy list
+        for ip in reversed([ip.strip() for ip in x_forwarded_for.split(',')]):
+            try:
+                ip_obj = ipaddress.ip_address(ip)
+            except ValueError:
+                # Invalid IP format, skip it
+                continue
+            if not any(ip_obj in network for network in networks):
+                return ip
+
+    # Fallback to REMOTE_ADDR (direct connection or no valid X-Forwarded-For)
+    return request.META.get('REMOTE_ADDR', '0.0.0.0')
+
+
+@lru_cache(maxsize=IP_HASH_CACHE_SIZE)
+def _peppered_sha256(pepper, ip_address):
+    return hashlib.sha256(f"{pepper}:{ip_address}".encode()).hexdigest()
+
+
+def hash_ip(ip_address):
+    """
+    Hash IP address with server-side pepper for enhanced privacy.
+
+    The pepper prevents rainbow table attacks on hashed IPs.
+    Falls back to SECRET_KEY prefix if IP_HASH_PEPPER not set.
+    """
+    pepper = os.environ.get('IP_HASH_PEPPER', settings.SECRET_KEY[:16])
+    return _peppered_sha256(pepper, ip_address)
+
+
+def classify_request(request):
+    """
+    Classify a request (IP, IP hash, bot verdict), once per request.
+
+    Safe to call repeatedly from middleware, views and models — the
+    result is stored on the request after the first call.
+
+    Returns:
+        RequestClassification
+    """
+    classification = getattr(request, _REQUEST_ATTR, None)
+    if classification is None:
+        user_agent = request.META.get('HTTP_USER_AGENT', '')
+        ip = get_client_ip(request)
+        classification = RequestClassification(
+            ip=ip,
+            ip_hash=hash_ip(ip),
+            user_agent=user_agent,
+            is_bot=is_bot_user_agent(user_agent),
+        )
+        setattr(request, _REQUEST_ATTR, classification)
+    return classification
+
+
+def ratelimit_client_ip(request):
+    """
+    Client IP for django-ratelimit's key='ip' (RATELIMIT_IP_META_KEY).
+
+    Shares the per-request classification so rate limiting sees the same
+    proxy-validated IP as view tracking.
+    """
+    return classify_request(request).ip
@@ -0,0 +1,197 @@
+"""
+Compiled normalisation of AI-generated tags.
+
+_validate_and_fix_tags() (tasks.py) runs for every upload, backfill, bulk
+publish and Pass 2 review. The rule tables in prompts/constants.py are
+compiled once into frozen lookups, and each distinct raw tag is resolved
+once per process and remembered: AI responses reuse a small vocabulary, so
+normalising a list is mostly dict lookups.
+
+Per tag (after str() and strip()):
+1. lowercase
+2. space-separated: split into words, dropping banned words
+3. whole tag banned (AI or ethnicity): dropped
+4. hyphenated: a banned part drops that part; a stop-word or single-char
+   part splits the compound into its meaningful parts (unless the compound
+   is on a preserve list); otherwise the compound is kept whole
+Per list: deduplicate (first wins), keep TAG_COUNT, move demographic tags
+to the end (male/female very last) and report incomplete gender pairs.
+
+Usage:
+    result = normalizer.normalize(['Soft-Lighting', 'ai-art', 'man'])
+    result.tags      # ['soft-lighting', 'man']
+    result.notes     # what was changed, for logging
+    result.warnings  # short list / incomplete gender pairs
+    normalizer.normalize_many([tags_a, tags_b])
+"""
+from dataclasses import dataclass
+from typing import List, Tuple
+
+from prompts import constants
+
+TAG_COUNT = 10
+
+# Distinct raw tags remembered per process before the memo is reset
+RESOLVED_CACHE_SIZE = 20000
+
+# tag -> any of these must also be present, else a warning
+GENDER_PAIRS = (
+    ('man', ('male',)),
+    ('woman', ('female',)),
+    ('male', ('man', 'boy', 'teen-boy')),
+    ('female', ('woman', 'girl', 'teen-girl')),
+    ('girl', ('female',)),
+    ('boy', ('male',)),
+    ('teen-boy', ('male',)),
+    ('teen-girl', ('female',)),
+)
+
+
+@dataclass(frozen=True)
+class NormalizedTags:
+    tags: List[str]
+    notes: Tuple[str, ...]
+    warnings: Tuple[str, ...]
+
+
+class TagNormalizer:
+    """Tag rules compiled from constant tables (see module docstring)."""
+
+    def __init__(self, *, split_words, preserve_compounds, banned_ethnicity,
+                 banned_ai, allowed_ai, demographic, gender_last):
+        self._split_words = frozenset(split_words)
+        self._preserve = frozenset(preserve_compounds)
+        self._banned_ethnicity = frozenset(banned_ethnicity)
+        self._banned_ai = frozenset(banned_ai)
+        self._allowed_ai = frozenset(allowed_ai)
+        # Stable sort key: content 0, demographic 1, male/female 2
+        self._rank = {tag: 1 for tag in demographic}
+        self._rank.update({tag: 2 for tag in gender_last})
+        self._pairs = tuple(
+            (tag, frozenset(required),
+             f"Gender pair incomplete: '{tag}' without "
+             + '/'.join(f"'{other}'" for other in required))
+            for tag, required in GENDER_PAIRS
+        )
+        self._resolved = {}
+
+    @classmethod
+    def from_constants(cls):
+        return cls(
+            split_words=constants.SPLIT_THESE_WORDS,
+            preserve_compounds=(
+                constants.PRESERVE_DESPITE_STOP_WORDS
+                | constants.PRESERVE_SINGLE_CHAR_COMPOUNDS
+            ),
+            banned_ethnicity=constants.BANNED_ETHNICITY,
+            banned_ai=constants.BANNED_AI_TAGS,
+            allowed_ai=constants.ALLOWED_AI_TAGS,
+            demographic=constants.DEMOGRAPHIC_TAGS,
+            gender_last=constants.GENDER_LAST_TAGS,
+        )
+
+    def _ban_reason(self, tag):
+        """'ethnicity', 'AI' or None."""
+        if tag in self._banned_ethnicity:
+            return 'ethnicity'
+        if tag in self._allowed_ai:
+            return None
+        if tag in self._banned_ai or tag.startswith('ai-'):
+            return 'AI'
+        return None
+
+    def _keep_parts(self, parts, notes):
+        kept = []
+        for part in parts:
+            reason = self._ban_reason(part)
+            if reason:
+                notes.append(f"Removed {reason} tag: '{part}'")
+            else:
+                kept.append(part)
+        return kept
+
+    def _resolve(self, raw):
+        """(output tags, notes) for one stripped, non-empty raw tag."""
+        notes = []
+        tag = raw.lower()
+        if tag != raw:
+            notes.append(f"Lowercased: '{raw}' -> '{tag}'")
+
+        if ' ' in tag:
+            parts = tag.split()
+            notes.append(f"Split space-separated: '{tag}' -> {parts}")
+            return tuple(self._keep_parts(parts, notes)), tuple(notes)
+
+        reason = self._ban_reason(tag)
+        if reason:
+            notes.append(f"Removed {reason} tag: '{tag}'")
+            return (), tuple(notes)
+
+        if '-' not in tag:
+            return (tag,), tuple(notes)
+
+        parts = [part.strip() for part in tag.split('-') if part.strip()]
+        if any(self._ban_reason(part) for part in parts):
+            clean = self._keep_parts(parts, notes)
+            if clean:
+                notes.append(f"Split compound with banned part: '{tag}' -> {clean}")
+            return tuple(clean), tuple(notes)
+
+        if tag not in self._preserve and any(
+            part in self._split_words or len(part) <= 1
+            for part in tag.split('-')
+        ):
+            clean = [p for p in parts if p not in self._split_words and len(p) > 1]
+            notes.append(f"Split stop-word compound: '{tag}' -> {clean}")
+            return tuple(clean), tuple(notes)
+
+        return (tag,), tuple(notes)
+
+    def normalize(self, tags) -> NormalizedTags:
+        """Apply every tag rule to one prompt's tags."""
+        resolved = self._resolved
+        validated = []
+        notes = []
+        for raw in tags:
+            raw = str(raw).strip()
+            if not raw:
+                continue
+            entry = resolved.get(raw)
+            if entry is None:
+                if len(resolved) >= RESOLVED_CACHE_SIZE:
+                    resolved.clear()
+                entry = resolved[raw] = self._resolve(raw)
+            validated.extend(entry[0])
+            notes.extend(entry[1])
+
+        deduped = list(dict.fromkeys(validated))
+        if len(deduped) != len(validated):
+            seen = set()
+            for tag in validated:
+                if tag in seen:
+                    notes.append(f"Removed duplicate: '{tag}'")
+                seen.add(tag)
+
+        warnings = []
+        if len(deduped) > TAG_COUNT:
+            notes.append(f"Trimmed from {len(deduped)} to {TAG_COUNT} tags")
+            deduped = deduped[:TAG_COUNT]
+        elif len(deduped) < TAG_COUNT:
+            warnings.append(f"Only {len(deduped)} tags after validation (expected {TAG_COUNT})")
+
+        rank = self._rank
+        deduped.sort(key=lambda tag: rank.get(tag, 0))
+
+        present = set(deduped)
+        warnings.extend(
+            message for tag, required, message in self._pairs
+            if tag in present and not required & present
+        )
+        return NormalizedTags(deduped, tuple(notes), tuple(warnings))
+
+    def normalize_many(self, tag_lists) -> List[NormalizedTags]:
+        """normalize() for many prompts, sharing the resolved-tag memo."""
+        return [self.normalize(tags) for tags in tag_lists]
+
+
+normalizer = TagNormalizer.from_constants()
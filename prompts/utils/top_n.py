@@ -0,0 +1,104 @@
+"""
+Top-N-per-group query utility.
+
+Fetches the first N rows of each group (e.g. each author's 5 most liked
+prompts) in one query using ROW_NUMBER() OVER (PARTITION BY ...), so the
+database trims each group instead of Python receiving every row and
+throwing most of them away.
+
+On backends without window function support (SQLite older than 3.25)
+the same ordering is fetched and trimmed in Python.
+
+Usage:
+    from prompts.utils.top_n import top_n_per_group
+
+    thumbnails = top_n_per_group(
+        Prompt.objects.filter(author_id__in=ids).annotate(likes_count=Count('likes')),
+        partition_by='author_id',
+        order_by=['-likes_count', '-created_on'],
+        n=5,
+    )
+"""
+from django.db import connections
+from django.db.models import Count, F, Window
+from django.db.models.functions import RowNumber
+
+ROW_NUMBER_ATTR = 'group_row_number'
+
+
+def _order_expressions(order_by):
+    """'-field' / 'field' strings to F() expressions for the OVER clause."""
+    expressions = []
+    for field in order_by:
+        if field.startswith('-'):
+            expressions.append(F(field[1:]).desc())
+        else:
+            expressions.append(F(field).asc())
+    return expressions
+
+
+def top_n_per_group(queryset, partition_by, order_by, n, count_as=None):
+    """
+    First ``n`` rows of each ``partition_by`` group, in ``order_by`` order.
+
+    Args:
+        queryset: Base queryset (filters, annotations, select_related)
+        partition_by: Field name defining the groups (e.g. 'author_id')
+        order_by: Field names ranking rows within a group ('-' for desc);
+            include a unique tiebreaker for stable results
+        n: Rows to keep per group
+        count_as: Optional attribute name that receives the total number
+            of rows in the row's group (before trimming)
+
+    Returns:
+        list: Model instances ordered by group, then rank within it. Each
+        carries ``group_row_number`` (1-based).
+    """
+    if n <= 0:
+        return []
+
+    order_by = list(order_by)
+    connection = connections[queryset.db]
+
+    if connection.features.supports_over_clause:
+        annotations = {
+            ROW_NUMBER_ATTR: Window(
+                expression=RowNumber(),
+                partition_by=[F(partition_by)],
+                order_by=_order_expressions(order_by),
+            ),
+        }
+        if count_as:
+            annotations[count_as] = Window(
+                expression=Count('pk'),
+                partition_by=[F(partition_by)],
+            )
+        return list(
+            queryset.annotate(**annotations)
+            .filter(**{f'{ROW_NUMBER_ATTR}__lte': n})
+            .order_by(partition_by, ROW_NUMBER_ATTR)
+        )
+
+    # Fallback: fetch every row in group order and trim here
+    rows = []
+    group_rows = []
+    current_group = object()
+    for obj in queryset.order_by(partition_by, *order_by).iterator(chunk_size=2000):
+        group = getattr(obj, partition_by)
+        if group != current_group:
+            rows.extend(_finish_group(group_rows, n, count_as))
+            group_rows = []
+            current_group = group
+        group_rows.append(obj)
+    rows.extend(_finish_group(group_rows, n, count_as))
+    return rows
+
+
+def _finish_group(group_rows, n, count_as):
+    """Trim one fallback group to n rows and stamp the annotations."""
+    kept = group_rows[:n]
+    for row_number, obj in enumerate(kept, start=1):
+        setattr(obj, ROW_NUMBER_ATTR, row_number)
+        if count_as:
+            setattr(obj, count_as, len(group_rows))
+    return kept
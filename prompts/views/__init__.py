@@ -23,6 +23,7 @@ from .prompt_edit_views import (
 from .prompt_comment_views import (
     comment_edit,
     comment_delete,
+    comments_ajax,
 )
 from .prompt_trash_views import (
     prompt_delete,
@@ -170,6 +171,7 @@ __all__ = [
     'related_prompts_ajax',  # Related prompts AJAX endpoint
     'comment_edit',
     'comment_delete',
+    'comments_ajax',
     'prompt_edit',
     'prompt_delete',
     'trash_bin',
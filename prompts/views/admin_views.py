@@ -323,10 +323,6 @@ def prompt_move_up(request, slug):
         prompt.save(update_fields=['order'])
         previous_prompt.save(update_fields=['order'])
 
-        # Clear caches
-        for page in range(1, 5):
-            cache.delete(f"prompt_list_None_None_{page}")
-
         messages.success(request, f'Moved "{prompt.title}" up.')
     else:
         messages.warning(request, f'"{prompt.title}" is already at the top.')
@@ -356,10 +352,6 @@ def prompt_move_down(request, slug):
         prompt.save(update_fields=['order'])
         next_prompt.save(update_fields=['order'])
 
-        # Clear caches
-        for page in range(1, 5):
-            cache.delete(f"prompt_list_None_None_{page}")
-
         messages.success(request, f'Moved "{prompt.title}" down.')
     else:
         messages.warning(request, f'"{prompt.title}" is already at the bottom.')
@@ -387,10 +379,6 @@ def prompt_set_order(request, slug):
     prompt.order = new_order
     prompt.save(update_fields=['order'])
 
-    # Clear caches
-    for page in range(1, 5):
-        cache.delete(f"prompt_list_None_None_{page}")
-
     return JsonResponse({
         'success': True,
         'message': f'Updated order for "{prompt.title}" to {new_order}'
@@ -432,13 +420,6 @@ def bulk_reorder_prompts(request):
                     logger.warning(f"Prompt not found during reorder: {slug}")
                     continue
 
-        # Clear caches after bulk update
-        for page in range(1, 10):
-            cache.delete(f"prompt_list_None_None_{page}")
-            # Clear tag-filtered caches too
-            for tag in ['art', 'portrait', 'landscape', 'photography']:
-                cache.delete(f"prompt_list_{tag}_None_{page}")
-
         return JsonResponse({
             'success': True,
             'updated_count': updated_count,
@@ -241,7 +241,7 @@ def api_validate_prompts(request):
     Validates a list of prompt texts before generation.
 
     Body JSON: {"prompts": ["prompt 1", "prompt 2", ...]}
-    Returns: {"valid": bool, "errors": [...]}
+    Returns: {"valid": bool, "errors": [...], "warnings": [...]}
     """
     try:
         data = json.loads(request.body)
@@ -21,7 +21,9 @@ from django.db.models import Count
 from django.urls import reverse
 from django.utils.text import slugify
 
-from ..models import Collection, CollectionItem, Prompt, UserProfile, PromptView
+from ..models import Collection, CollectionItem, Prompt, UserProfile
+from ..services.viewer_state import attach_viewer_state
+from .user_views import get_profile_stats
 
 logger = logging.getLogger(__name__)
 
@@ -421,6 +423,8 @@ def collection_detail(request, slug):
     paginator = Paginator(items, 24)  # 24 prompts per page
     page_number = request.GET.get('page')
     page_obj = paginator.get_page(page_number)
+    page_obj.object_list = list(page_obj.object_list)
+    attach_viewer_state([item.prompt for item in page_obj.object_list], request.user)
 
     context = {
         'collection': collection,
@@ -640,11 +644,11 @@ def user_collections(request, username):
     Template:
         prompts/collections_profile.html
     """
-    from django.core.cache import cache
-    from prompts.services.leaderboard import LeaderboardService
-
-    # Get the user (404 if not found)
-    profile_user = get_object_or_404(User, username=username)
+    # Get the user (404 if not found), with profile and stats snapshot
+    profile_user = get_object_or_404(
+        User.objects.select_related('userprofile', 'profile_stats'),
+        username=username,
+    )
 
     # Get user's profile
     profile = profile_user.userprofile
@@ -678,54 +682,8 @@ def user_collections(request, username):
         # Recent (default): Most recently updated first
         collections = collections.order_by('-updated_at')
 
-    # Calculate profile stats (same as user_profile view)
-    total_prompts = Prompt.objects.filter(
-        author=profile_user,
-        status=1,
-        deleted_at__isnull=True
-    ).count()
-
-    total_likes = profile.get_total_likes()
-
-    # Cache key for profile stats
-    cache_key = f'pf_profile_stats_v1_{profile_user.id}'
-    cached_stats = cache.get(cache_key)
-
-    if cached_stats and isinstance(cached_stats, dict):
-        total_views = cached_stats.get('total_views', 0)
-        all_time_rank = cached_stats.get('all_time_rank')
-        thirty_day_rank = cached_stats.get('thirty_day_rank')
-    else:
-        # Compute stats
-        try:
-            total_views = PromptView.objects.filter(prompt__author=profile_user).count()
-        except Exception:
-            total_views = 0
-
-        try:
-            all_time_rank = LeaderboardService.get_user_rank(
-                user=profile_user,
-                metric='views',
-                period='all'
-            )
-        except Exception:
-            all_time_rank = None
-
-        try:
-            thirty_day_rank = LeaderboardService.get_user_rank(
-                user=profile_user,
-                metric='active',
-                period='month'
-            )
-        except Exception:
-            thirty_day_rank = None
-
-        # Cache for 5 minutes
-        cache.set(cache_key, {
-            'total_views': total_views,
-            'all_time_rank': all_time_rank,
-            'thirty_day_rank': thirty_day_rank,
-        }, 300)
+    # Profile header stats: one snapshot read (same as user_profile view)
+    profile_stats = get_profile_stats(profile_user)
 
     # Trash count (owner only)
     trash_count = 0
@@ -780,12 +738,8 @@ def user_collections(request, username):
         'is_own_profile': is_own_profile,
         'sort': sort_order,  # Bug #4 fix: Template expects 'sort' not 'sort_order'
         'active_tab': 'collections',
-        # Profile stats
-        'total_prompts': total_prompts,
-        'total_likes': total_likes,
-        'total_views': total_views,
-        'all_time_rank': all_time_rank,
-        'thirty_day_rank': thirty_day_rank,
+        # Profile stats (totals, ranks, follower/following counts)
+        **profile_stats,
         'trash_count': trash_count,
     }
 
@@ -6,11 +6,13 @@ from django.contrib.auth.decorators import login_required
 from django.utils import timezone
 from datetime import timedelta
 from django.db import models
-from prompts.models import Prompt, PromptView
+from prompts.models import Prompt
 from django.core.paginator import Paginator
 from django.db.models import Q, Count
 from taggit.models import Tag
 from prompts.constants import AI_GENERATORS, VALID_PROMPT_TYPES, VALID_DATE_FILTERS, VALID_SORT_OPTIONS
+from prompts.services.view_rollups import count_views
+from prompts.services.viewer_state import attach_viewer_state
 import logging
 
 logger = logging.getLogger(__name__)
@@ -58,9 +60,10 @@ def inspiration_index(request):
         status=1,
         deleted_at__isnull=True,
         created_on__gte=week_ago
-    ).select_related('author').prefetch_related('tags', 'likes').annotate(
+    ).select_related('author').prefetch_related('tags').annotate(
         likes_count=models.Count('likes', distinct=True)
     ).order_by('-likes_count', '-created_on')[:24]
+    trending_prompts = attach_viewer_state(list(trending_prompts), request.user)
 
     context = {
         'generators': generators_with_counts,
@@ -112,7 +115,7 @@ def ai_generator_category(request, generator_slug):
         ai_generator__iexact=generator['choice_value'],
         status=1,  # Published only
         deleted_at__isnull=True  # Not deleted
-    ).select_related('author').prefetch_related('tags', 'likes')
+    ).select_related('author').prefetch_related('tags')
 
     # Get total prompt count for this generator (before filters)
     prompt_count = prompts.count()
@@ -124,11 +127,11 @@ def ai_generator_category(request, generator_slug):
     # Get total views for this generator's prompts
     # Uses single aggregated query to avoid N+1
     # Use __iexact for case-insensitive matching
-    total_views = PromptView.objects.filter(
+    total_views = count_views(
         prompt__ai_generator__iexact=generator['choice_value'],
         prompt__status=1,
         prompt__deleted_at__isnull=True
-    ).count()
+    )
 
     # Calculate related generators (Phase I.3)
     # Single aggregated query: Get prompt counts for all generators, exclude current
@@ -202,6 +205,9 @@ def ai_generator_category(request, generator_slug):
     paginator = Paginator(prompts, 24)
     page_number = request.GET.get('page')
     page_obj = paginator.get_page(page_number)
+    page_obj.object_list = attach_viewer_state(
+        list(page_obj.object_list), request.user
+    )
 
     # SEO fields (optimized for search engines)
     page_title = f"{generator['name']} Prompts"
@@ -14,7 +14,7 @@ from django.views.decorators.http import require_POST
 from django_ratelimit.decorators import ratelimit
 from django_q.tasks import async_task
 
-from prompts.services.b2_upload_service import delete_image, delete_video
+from prompts.services.b2_upload_service import delete_image, delete_video, holds_image
 from prompts.services.vision_moderation import VisionModerationService
 
 logger = logging.getLogger(__name__)
@@ -275,6 +275,9 @@ def b2_delete_upload(request):
     - User cancels upload
     - Upload session expires
 
+    Deduplicated images are shared by content, so only a session holding
+    a reference to one may release it (403 otherwise).
+
     Request body (JSON):
         file_key: The B2 file key/path to delete
         is_video: bool (optional, defaults to False)
@@ -310,6 +313,15 @@ def b2_delete_upload(request):
 
         is_video = data.get('is_video', False)
 
+        # Deduplicated images may be shared: only an owner releases them
+        session_key = request.session.session_key
+        if not is_video and holds_image(file_key, session_key) is False:
+            logger.warning(f"Refusing to delete B2 file not held by this session: {file_key}")
+            return JsonResponse({
+                'success': False,
+                'error': 'You do not have permission to delete this file',
+            }, status=403)
+
         # Log deletion request
         logger.info(f"Deleting B2 file: {file_key}, is_video={is_video}")
 
@@ -317,7 +329,7 @@ def b2_delete_upload(request):
         if is_video:
             success = delete_video(file_key)
         else:
-            success = delete_image(file_key)
+            success = delete_image(file_key, session_key=session_key)
 
         if success:
             logger.info(f"Successfully deleted B2 file: {file_key}")
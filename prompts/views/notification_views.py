@@ -17,10 +17,15 @@ from prompts.models import Follow, Notification
 from prompts.services.notifications import (
     delete_all_notifications,
     delete_notification,
+    dismiss_broadcasts,
+    get_notification_counts,
+    get_notification_feed,
     get_unread_count,
-    get_unread_count_by_category,
+    mark_admin_notifications_read,
     mark_all_as_read,
     mark_as_read,
+    mark_broadcast_read,
+    record_broadcast_click,
 )
 
 logger = logging.getLogger(__name__)
@@ -34,12 +39,12 @@ def unread_count_api(request):
     """
     GET /api/notifications/unread-count/
     Returns JSON with total unread count and per-category counts.
+    Served from the cached unread counters (see get_notification_counts).
     """
-    total = get_unread_count(request.user)
-    categories = get_unread_count_by_category(request.user)
+    counts = get_notification_counts(request.user)
     return JsonResponse({
-        'total': total,
-        'categories': categories,
+        'total': counts['total'],
+        'categories': counts['by_category'],
     })
 
 
@@ -71,6 +76,19 @@ def mark_read_api(request, notification_id):
     return JsonResponse({'status': 'error', 'message': 'Not found'}, status=404)
 
 
+@login_required
+@require_POST
+def mark_broadcast_read_api(request, broadcast_id):
+    """
+    POST /api/notifications/broadcast-<id>/read/
+    Marks a single broadcast (system notification to everyone) as read.
+    """
+    success = mark_broadcast_read(broadcast_id, request.user)
+    if success:
+        return JsonResponse({'status': 'ok'})
+    return JsonResponse({'status': 'error', 'message': 'Not found'}, status=404)
+
+
 @login_required
 @require_POST
 def delete_notification_view(request, notification_id):
@@ -82,6 +100,16 @@ def delete_notification_view(request, notification_id):
     return JsonResponse({'status': 'error'}, status=404)
 
 
+@login_required
+@require_POST
+def delete_broadcast_view(request, broadcast_id):
+    """Remove a broadcast from the current user's feed via AJAX."""
+    if dismiss_broadcasts(request.user, [broadcast_id]):
+        unread = get_unread_count(request.user)
+        return JsonResponse({'status': 'ok', 'unread_count': unread})
+    return JsonResponse({'status': 'error'}, status=404)
+
+
 @login_required
 @require_POST
 def delete_all_notifications_view(request):
@@ -103,6 +131,14 @@ def notification_click(request, notification_id):
     return JsonResponse({'status': 'ok'})
 
 
+@login_required
+@require_POST
+def broadcast_click(request, broadcast_id):
+    """POST /api/notifications/broadcast-<id>/click/ — fire-and-forget click tracking."""
+    record_broadcast_click(broadcast_id, request.user)
+    return JsonResponse({'status': 'ok'})
+
+
 @login_required
 def notifications_page(request):
     """
@@ -119,31 +155,16 @@ def notifications_page(request):
     offset = int(request.GET.get('offset', 0))
     limit = NOTIFICATIONS_PER_PAGE
 
-    from django.utils import timezone
-    now = timezone.now()
-    qs = Notification.objects.filter(
-        recipient=request.user,
-        category=category,
-    ).exclude(
-        is_expired=True
-    ).exclude(
-        expires_at__lte=now
-    ).select_related('sender', 'sender__userprofile').order_by('-created_at')
-
-    # Fetch one extra to determine if more exist
-    notifications_list = list(qs[offset:offset + limit + 1])
-    has_more = len(notifications_list) > limit
-    notifications_list = notifications_list[:limit]
+    # System tab includes broadcasts (announcements to every user)
+    notifications_list, has_more = get_notification_feed(
+        request.user, category, offset, limit,
+    )
 
     # Auto-mark system notifications as seen (page load = seen).
     # Only system/admin notifications — user notifications (comments, likes,
     # follows) still require manual "Mark as read".
     if category == 'system' and offset == 0:
-        Notification.objects.filter(
-            recipient=request.user,
-            is_admin_notification=True,
-            is_read=False,
-        ).update(is_read=True)
+        mark_admin_notifications_read(request.user)
 
     # For AJAX requests (Load More), return partial HTML
     if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
@@ -159,8 +180,9 @@ def notifications_page(request):
         })
 
     # Get per-category unread counts for tab badges
-    category_counts = get_unread_count_by_category(request.user)
-    total_unread = get_unread_count(request.user)
+    counts = get_notification_counts(request.user)
+    category_counts = counts['by_category']
+    total_unread = counts['total']
 
     # Get IDs of users the current user already follows (for Follow Back button)
     following_ids = set(
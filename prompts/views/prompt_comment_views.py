@@ -2,18 +2,19 @@
 prompt_comment_views.py — Comment edit and delete views.
 
 Split from prompt_views.py in Session 134.
-Contains: comment_edit, comment_delete
+Contains: comment_edit, comment_delete, comments_ajax
 """
 
 from django.shortcuts import render, get_object_or_404
 from django.contrib import messages
-from django.http import HttpResponseRedirect
+from django.http import HttpResponseRedirect, JsonResponse
+from django.template.loader import render_to_string
 from django.urls import reverse
 from django.contrib.auth.decorators import login_required
 from django.views.decorators.http import require_POST
 from prompts.models import Prompt, Comment
-from django.core.cache import cache
 from prompts.forms import CommentForm
+from prompts.services.prompt_detail import get_comment_page
 import logging
 
 logger = logging.getLogger(__name__)
@@ -25,8 +26,8 @@ def comment_edit(request, slug, comment_id):
     Allow users to edit their own comments on prompts.
 
     Users can only edit comments they authored. Edited comments are reset to
-    unapproved status and must be re-approved by admin. Clears relevant caches
-    after successful edit.
+    unapproved status and must be re-approved by admin. Cached detail data is
+    retired by the Comment signals.
 
     Variables:
         slug: URL slug of the prompt
@@ -62,9 +63,6 @@ def comment_edit(request, slug, comment_id):
             comment.approved = False
             comment.save()
 
-            # Clear relevant caches
-            cache.delete(f"prompt_detail_{slug}_{request.user.id}")
-
             messages.add_message(
                 request, messages.SUCCESS,
                 'Comment updated and awaiting approval!'
@@ -97,8 +95,8 @@ def comment_delete(request, slug, comment_id):
     Allow users to delete their own comments.
 
     Users can only delete comments they authored. Permanently removes the
-    comment from the database and clears relevant caches. Redirects back to
-    the prompt detail page.
+    comment from the database (the Comment signals retire cached detail
+    data). Redirects back to the prompt detail page.
 
     Variables:
         slug: URL slug of the prompt
@@ -127,9 +125,6 @@ def comment_delete(request, slug, comment_id):
 
     comment.delete()
 
-    # Clear relevant caches
-    cache.delete(f"prompt_detail_{slug}_{request.user.id}")
-
     messages.add_message(
         request, messages.SUCCESS,
         'Comment deleted successfully!'
@@ -137,3 +132,44 @@ def comment_delete(request, slug, comment_id):
     return HttpResponseRedirect(
         reverse('prompts:prompt_detail', args=[slug])
     )
+
+
+def comments_ajax(request, slug):
+    """
+    AJAX endpoint for loading more approved comments.
+
+    Cursor-paginated (keyset on created_on, id), so every page costs the
+    same regardless of how many comments the prompt has. The first page
+    is rendered server-side by prompt_detail, which hands out the first
+    cursor.
+
+    Args:
+        request: HTTP request object
+        slug: URL slug of the prompt
+
+    Returns:
+        JsonResponse with 'html' (rendered comment cards), 'next_cursor'
+        and 'has_more' (boolean); 400 for a malformed cursor
+
+    URL: /prompt/<slug>/comments/?cursor=<cursor>
+    """
+    prompt = get_object_or_404(Prompt, slug=slug, status=1, deleted_at__isnull=True)
+
+    try:
+        comments, next_cursor = get_comment_page(
+            prompt, cursor=request.GET.get('cursor') or None
+        )
+    except ValueError:
+        return JsonResponse({'error': 'Invalid cursor'}, status=400)
+
+    html = render_to_string(
+        'prompts/partials/_comment_list.html',
+        {'comments': comments, 'prompt': prompt},
+        request=request
+    )
+
+    return JsonResponse({
+        'html': html,
+        'next_cursor': next_cursor,
+        'has_more': bool(next_cursor),
+    })
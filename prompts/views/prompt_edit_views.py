@@ -21,8 +21,9 @@ from django.db.models import Count
 from django.core.cache import cache
 from taggit.models import Tag
 from prompts.forms import PromptForm
-from prompts.services import ModerationOrchestrator
+from prompts.services import ModerationOrchestrator, near_duplicates
 from prompts.services.b2_upload_service import (
+    release_image_url,
     upload_image as b2_upload_image,
     upload_video as b2_upload_video,
 )
@@ -37,8 +38,8 @@ def prompt_edit(request, slug):
     Allow users to edit their own AI prompts.
 
     Users can only edit prompts they created. Updates the prompt with new
-    content, image, tags, and other metadata. Clears relevant caches after
-    successful update.
+    content, image, tags, and other metadata. Cached data is retired by the
+    Prompt signals after a successful update.
 
     Variables:
         slug: URL slug of the prompt being edited
@@ -94,6 +95,7 @@ def prompt_edit(request, slug):
             # Handle media upload if new media provided (B2 storage)
             featured_media = prompt_form.cleaned_data.get('featured_media')
             detected_media_type = prompt_form.cleaned_data.get('_detected_media_type')
+            old_b2_image_url = prompt.b2_image_url
 
             if featured_media and detected_media_type:
                 try:
@@ -137,7 +139,9 @@ def prompt_edit(request, slug):
                             })
                     else:  # image
                         # Upload image to B2 with all variants
-                        result = b2_upload_image(featured_media, featured_media.name)
+                        result = b2_upload_image(
+                            featured_media, featured_media.name, prompt_id=prompt.pk,
+                        )
                         if result and result.get('success'):
                             urls = result.get('urls', {})
                             # Set B2 image URLs
@@ -150,6 +154,13 @@ def prompt_edit(request, slug):
                             clear_cloudinary_fields(prompt)
                             clear_b2_video_urls(prompt)
                             prompt.is_video = False
+                            # Replace the image's near-duplicate index entry
+                            featured_media.seek(0)
+                            image_hashes = near_duplicates.fingerprint(featured_media.read())
+                            if image_hashes:
+                                near_duplicates.record_prompt(
+                                    prompt.pk, image_hashes.phash, image_hashes.dhash,
+                                )
                         else:
                             error_msg = result.get('error', 'Unknown error') if result else 'Upload service unavailable'
                             messages.error(request, f"Image upload failed: {error_msg}")
@@ -173,6 +184,11 @@ def prompt_edit(request, slug):
             prompt.save()
             prompt_form.save_m2m()
 
+            # The replaced image loses this prompt's reference (identical
+            # bytes re-uploaded keep the same URL and the same reference)
+            if old_b2_image_url and old_b2_image_url != prompt.b2_image_url:
+                release_image_url(old_b2_image_url, prompt.pk)
+
             # If user explicitly wants draft (not published), skip moderation
             if not is_published and not prompt.requires_manual_review:
                 # User chose to save as draft - keep status=0 and skip moderation
@@ -185,12 +201,6 @@ def prompt_edit(request, slug):
                     'Toggle "Published" to make it public.'
                 )
 
-                # Clear relevant caches
-                cache.delete(f"prompt_detail_{slug}_{request.user.id}")
-                cache.delete(f"prompt_detail_{slug}_anonymous")
-                for page in range(1, 5):
-                    cache.delete(f"prompt_list_None_None_{page}")
-
                 return HttpResponseRedirect(
                     reverse('prompts:prompt_detail', args=[slug])
                 )
@@ -202,12 +212,6 @@ def prompt_edit(request, slug):
                     'Your prompt is still pending admin approval. It cannot be published until approved.'
                 )
 
-                # Clear relevant caches
-                cache.delete(f"prompt_detail_{slug}_{request.user.id}")
-                cache.delete(f"prompt_detail_{slug}_anonymous")
-                for page in range(1, 5):
-                    cache.delete(f"prompt_list_None_None_{page}")
-
                 return HttpResponseRedirect(
                     reverse('prompts:prompt_detail', args=[slug])
                 )
@@ -262,13 +266,6 @@ def prompt_edit(request, slug):
                     'Prompt updated but requires manual review due to a technical issue.'
                 )
 
-            # Clear relevant caches when prompt is updated
-            cache.delete(f"prompt_detail_{slug}_{request.user.id}")
-            cache.delete(f"prompt_detail_{slug}_anonymous")
-            # Clear list caches
-            for page in range(1, 5):
-                cache.delete(f"prompt_list_None_None_{page}")
-
             return HttpResponseRedirect(
                 reverse('prompts:prompt_detail', args=[slug])
             )
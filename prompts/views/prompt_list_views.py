@@ -10,13 +10,16 @@ from django.contrib import messages
 from django.http import JsonResponse, HttpResponseRedirect, Http404
 from django.template.loader import render_to_string
 from prompts.utils.related import get_related_prompts
+from prompts.services.view_rollups import prompt_views_expression
+from prompts.services.prompt_detail import load_prompt_detail, resolve_slug
+from prompts.services.viewer_state import attach_viewer_state
+from prompts.utils.cached_computation import cached_computation
 from django.urls import reverse
 from django.utils.html import escape
 from django.db import models
-from prompts.models import Prompt, Comment, SlugRedirect
+from prompts.models import Prompt
 from django.views import generic
-from django.db.models import Q, Prefetch, Count
-from django.core.cache import cache
+from django.db.models import Q, Count
 from django.utils import timezone
 from datetime import timedelta
 from prompts.forms import CommentForm
@@ -91,25 +94,24 @@ class PromptList(generic.ListView):
         # Search filtering
         search_query = self.request.GET.get('search', '').strip()
         if search_query:
-            # Try to get from cache first (60 second cache)
+            # Matching IDs cached for 60 seconds (single-flight recompute)
             cache_key = f"search_{hashlib.md5(search_query.encode(), usedforsecurity=False).hexdigest()}"
-            cached_ids = cache.get(cache_key)
+            base_queryset = queryset
 
-            if cached_ids is not None:
-                queryset = queryset.filter(id__in=cached_ids)
-            else:
-                queryset = queryset.filter(
+            def _search_ids():
+                matches = base_queryset.filter(
                     Q(title__icontains=search_query) |
                     Q(content__icontains=search_query) |
                     Q(excerpt__icontains=search_query) |
                     Q(author__username__icontains=search_query) |
                     Q(tags__name__icontains=search_query)
                 ).distinct()
+                return list(matches.values_list('id', flat=True)[:500])
 
-                # Cache the filtered IDs
-                result_ids = list(queryset.values_list('id', flat=True)[:500])
-                cache.set(cache_key, result_ids, 60)
-                queryset = queryset.filter(id__in=result_ids)
+            result_ids = cached_computation(
+                cache_key, _search_ids, ttl=60, name='search_ids',
+            )
+            queryset = queryset.filter(id__in=result_ids)
 
             self.search_query = search_query
             return queryset.order_by('-created_on')
@@ -173,10 +175,7 @@ class PromptList(generic.ListView):
                         'likes',
                         filter=Q(likes__userprofile__user__date_joined__gte=trending_cutoff)
                     ),
-                    recent_views=Count(
-                        'views',
-                        filter=Q(views__viewed_at__gte=trending_cutoff)
-                    ),
+                    recent_views=prompt_views_expression(since=trending_cutoff),
                     trending_score=Greatest(
                         Coalesce(F('recent_likes'), Value(0)) * Value(3) +
                         Coalesce(F('recent_views'), Value(0)),
@@ -207,10 +206,7 @@ class PromptList(generic.ListView):
                     'likes',
                     filter=Q(likes__userprofile__user__date_joined__gte=trending_cutoff)
                 ),
-                recent_views=Count(
-                    'views',
-                    filter=Q(views__viewed_at__gte=trending_cutoff)
-                ),
+                recent_views=prompt_views_expression(since=trending_cutoff),
                 trending_score=Greatest(
                     Coalesce(F('recent_likes'), Value(0)) * Value(3) +
                     Coalesce(F('recent_views'), Value(0)),
@@ -249,6 +245,11 @@ class PromptList(generic.ListView):
         # AI Generators for platform dropdown (Phase I.2 - DRY fix)
         context['ai_generators'] = AI_GENERATORS
 
+        # Liked/saved state + like totals for the page's cards (3 queries).
+        # Evaluating the page fills its result cache, so the template
+        # iterates the same instances.
+        attach_viewer_state(list(context['prompt_list']), self.request.user)
+
         return context
 
 
@@ -280,133 +281,70 @@ def prompt_detail(request, slug):
     """
     start_time = time.time()
 
-    # Check for slug redirect (admin changed slug → 301 to current URL)
-    slug_redirect = SlugRedirect.objects.select_related('prompt').filter(
-        old_slug=slug
-    ).first()
-    if slug_redirect:
+    # Prompt first (1 query); SlugRedirect / DeletedPrompt only on a miss
+    resolution = resolve_slug(slug)
+
+    if resolution.redirect_slug:
+        # Admin changed slug → 301 to current URL
         return redirect(
             'prompts:prompt_detail',
-            slug=slug_redirect.prompt.slug,
+            slug=resolution.redirect_slug,
             permanent=True
         )
 
-    # SEO Phase 2: Check for permanently deleted prompts first
-    # If prompt was hard-deleted, check DeletedPrompt table for redirect info
-    try:
-        from prompts.models import DeletedPrompt
-        deleted_record = DeletedPrompt.objects.filter(slug=slug).first()
-
-        if deleted_record and not deleted_record.is_expired:
-            # Found a deleted prompt record that hasn't expired
-            if deleted_record.is_strong_match and deleted_record.redirect_to_slug:
-                # Strong match (≥0.75 score): 301 permanent redirect
-                response = redirect('prompts:prompt_detail', slug=deleted_record.redirect_to_slug)
-                response.status_code = 301
-                return response
-            else:
-                # Weak match (<0.75) or no match: 410 Gone with category suggestions
-                # Find prompts in same AI generator category
-                category_prompts = Prompt.objects.filter(
-                    ai_generator=deleted_record.ai_generator,
-                    status=1,
-                    deleted_at__isnull=True
-                ).order_by('-created_on')[:6]
-
-                return render(
-                    request,
-                    'prompts/prompt_gone.html',
-                    {
-                        'original_title': deleted_record.original_title,
-                        'ai_generator': deleted_record.get_ai_generator_display(),
-                        'category_prompts': category_prompts,
-                    },
-                    status=410  # 410 Gone
-                )
-    except ImportError:
-        # Model not migrated yet, continue with normal flow
-        pass
-
-    # Cache individual prompt details for 10 minutes
-    cache_key = (
-        f"prompt_detail_{slug}_"
-        f"{request.user.id if request.user.is_authenticated else 'anonymous'}"
-    )
-
-    # Use all_objects to include deleted prompts (needed for back button detection)
-    prompt_queryset = Prompt.all_objects.select_related(
-        'author',
-        'author__userprofile',
-    ).prefetch_related(
-        'tags',
-        'likes',
-        Prefetch(
-            'comments',
-            queryset=Comment.objects.select_related(
-                'author',
-                'author__userprofile',
-            ).order_by('created_on')
-        )
-    )
-
-    if request.user.is_authenticated:
-        prompt = get_object_or_404(prompt_queryset, slug=slug)
-
-        # Check if prompt is deleted (handles browser back button after deletion)
-        if prompt.deleted_at is not None:
-            if prompt.author == request.user:
-                # Owner: Redirect to trash with helpful message
-                from django.utils.html import escape
-                messages.info(
-                    request,
-                    f'This prompt "{escape(prompt.title)}" is in your trash. '
-                    f'You can restore it from there.'
-                )
-                return redirect('prompts:trash_bin')
-            elif request.user.is_staff:
-                # Staff: Redirect to admin trash dashboard
-                messages.info(
-                    request,
-                    f'This prompt is in the trash. View in admin dashboard.'
-                )
-                return redirect('admin_trash_dashboard')
-            else:
-                # Non-owner/Bot: Show HTTP 200 "Temporarily Unavailable" page
-                # SEO Strategy: Keeps URL in search index, preserves SEO value if restored
-                from django.utils.html import escape
-
-                # Find similar prompts (tag-based matching)
-                similar_prompts = Prompt.objects.filter(
-                    tags__in=prompt.tags.all(),
-                    status=1,
-                    deleted_at__isnull=True
-                ).exclude(
-                    id=prompt.id
-                ).distinct().order_by('-created_on')[:6]
-
-                return render(
-                    request,
-                    'prompts/prompt_temporarily_unavailable.html',
-                    {
-                        'prompt_title': escape(prompt.title),
-                        'similar_prompts': similar_prompts,
-                        'can_restore': False,
-                    },
-                    status=200  # Explicit HTTP 200 OK
-                )
+    # SEO Phase 2: permanently deleted prompts
+    # If prompt was hard-deleted, the DeletedPrompt record has redirect info
+    deleted_record = resolution.deleted_record
+    if deleted_record:
+        if deleted_record.is_strong_match and deleted_record.redirect_to_slug:
+            # Strong match (≥0.75 score): 301 permanent redirect
+            response = redirect('prompts:prompt_detail', slug=deleted_record.redirect_to_slug)
+            response.status_code = 301
+            return response
+        else:
+            # Weak match (<0.75) or no match: 410 Gone with category suggestions
+            # Find prompts in same AI generator category
+            category_prompts = Prompt.objects.filter(
+                ai_generator=deleted_record.ai_generator,
+                status=1,
+                deleted_at__isnull=True
+            ).order_by('-created_on')[:6]
 
-        if prompt.status != 1 and prompt.author != request.user:
-            raise Http404("Prompt not found")
-    else:
-        # Anonymous users: Include deleted prompts in query (for SEO strategy)
-        prompt = get_object_or_404(prompt_queryset, slug=slug)
+            return render(
+                request,
+                'prompts/prompt_gone.html',
+                {
+                    'original_title': deleted_record.original_title,
+                    'ai_generator': deleted_record.get_ai_generator_display(),
+                    'category_prompts': category_prompts,
+                },
+                status=410  # 410 Gone
+            )
 
-        # Check if prompt is deleted
-        if prompt.deleted_at is not None:
-            # Anonymous user viewing deleted prompt: Show "Temporarily Unavailable" page
-            # SEO Strategy: HTTP 200 keeps URL in search index, preserves SEO value if restored
-            from django.utils.html import escape
+    prompt = resolution.prompt
+    if prompt is None:
+        raise Http404("Prompt not found")
 
+    # Check if prompt is deleted (handles browser back button after deletion)
+    if prompt.deleted_at is not None:
+        if request.user.is_authenticated and prompt.author_id == request.user.id:
+            # Owner: Redirect to trash with helpful message
+            messages.info(
+                request,
+                f'This prompt "{escape(prompt.title)}" is in your trash. '
+                f'You can restore it from there.'
+            )
+            return redirect('prompts:trash_bin')
+        elif request.user.is_staff:
+            # Staff: Redirect to admin trash dashboard
+            messages.info(
+                request,
+                f'This prompt is in the trash. View in admin dashboard.'
+            )
+            return redirect('admin_trash_dashboard')
+        else:
+            # Non-owner/Anonymous/Bot: Show HTTP 200 "Temporarily Unavailable" page
+            # SEO Strategy: Keeps URL in search index, preserves SEO value if restored
             # Find similar prompts (tag-based matching)
             similar_prompts = Prompt.objects.filter(
                 tags__in=prompt.tags.all(),
@@ -427,18 +365,9 @@ def prompt_detail(request, slug):
                 status=200  # Explicit HTTP 200 OK for SEO
             )
 
-        # Check if prompt is not published (draft)
-        if prompt.status != 1:
-            raise Http404("Prompt not found")
-
-    # Materialize prefetched comments once to avoid repeated iteration
-    all_comments = list(prompt.comments.all())
-    approved_comments = [c for c in all_comments if c.approved]
-    if request.user.is_authenticated:
-        comments = [c for c in all_comments if c.approved or c.author == request.user]
-    else:
-        comments = approved_comments
-    comment_count = len(approved_comments)
+    # Drafts are only visible to their author
+    if prompt.status != 1 and prompt.author_id != request.user.id:
+        raise Http404("Prompt not found")
 
     if request.method == "POST":
         comment_form = CommentForm(data=request.POST)
@@ -456,11 +385,9 @@ def prompt_detail(request, slug):
                 # Fail secure: require moderation if SiteSettings unavailable
                 comment.approved = False
 
+            # Cached detail data is invalidated by the Comment post_save signal
             comment.save()
 
-            # Clear cache when new comment is added
-            cache.delete(cache_key)
-
             if comment.approved:
                 messages.add_message(
                     request, messages.SUCCESS,
@@ -475,13 +402,6 @@ def prompt_detail(request, slug):
     else:
         comment_form = CommentForm()
 
-    # Use prefetched likes cache to avoid extra queries
-    all_likes = list(prompt.likes.all())
-    liked = False
-    if request.user.is_authenticated:
-        liked = request.user in all_likes
-    number_of_likes = len(all_likes)
-
     # Record view (Phase G Part B) - only for published, non-deleted prompts
     view_created = False
     if prompt.status == 1 and prompt.deleted_at is None:
@@ -492,80 +412,23 @@ def prompt_detail(request, slug):
             # Don't fail the page load if view tracking fails
             logger.warning(f"Failed to record view for prompt {slug}: {e}")
 
-    # Get view count and visibility for template
-    view_count = prompt.get_view_count()
-    can_see_views = prompt.can_see_view_count(request.user)
-
-    # Check if current user follows the prompt author (for Follow button)
-    is_following_author = False
-    if request.user.is_authenticated and request.user != prompt.author:
-        from prompts.models import Follow
-        is_following_author = Follow.objects.filter(
-            follower=request.user,
-            following=prompt.author
-        ).exists()
-
-    # Phase J.2: Get more prompts from this author (up to 4 most popular)
-    # Ordered by likes count, excludes current prompt, only published prompts
-    # Note: Count is already imported at top of file
-    author_other_prompts_qs = Prompt.objects.filter(
-        author=prompt.author,
-        status=1,
-        deleted_at__isnull=True,
-    ).exclude(id=prompt.id)
-
-    # Get total count first (single COUNT query), then fetch top 4
-    author_total_prompts = author_other_prompts_qs.count()
-
-    more_from_author = list(
-        author_other_prompts_qs
-        .annotate(likes_count=Count('likes'))
-        .order_by('-likes_count', '-created_on')[:4]
-    )
-
-    # Phase J.2 Fix 3: Track count for placeholder logic in template
-    more_from_author_count = len(more_from_author)
-
-    # Calculate remaining count beyond the 4 shown
-    author_remaining_count = max(0, author_total_prompts - 4)
-
-    # Related prompts (Phase: Related Prompts Feature)
-    related_page_size = 18  # Match homepage paginate_by
-    all_related = get_related_prompts(prompt, limit=60)
-    related_prompts = all_related[:related_page_size]
-    has_more_related = len(all_related) > related_page_size
+    # Comments, likes, follow state, more-from-author, related prompts and
+    # view count, batched and cached (shared layer + per-viewer overlay)
+    detail = load_prompt_detail(prompt, request.user, view_created=view_created)
 
     end_time = time.time()
     logger.warning(
         f"DEBUG: prompt_detail view took {end_time - start_time:.3f} seconds"
     )
 
+    context = detail.as_context()
+    context["comment_form"] = comment_form
+    attach_viewer_state(context["related_prompts"], request.user)
+
     # Create response with cache-busting headers
     # Prevents browser from caching this page, ensuring back button
     # always makes a fresh server request (needed for deleted prompt detection)
-    response = render(
-        request,
-        "prompts/prompt_detail.html",
-        {
-            "prompt": prompt,
-            "ordered_tags": prompt.ordered_tags(),
-            "comments": comments,
-            "comment_count": comment_count,
-            "comment_form": comment_form,
-            "number_of_likes": number_of_likes,
-            "prompt_is_liked": liked,
-            "view_count": view_count,
-            "can_see_views": can_see_views,
-            "is_following_author": is_following_author,
-            "more_from_author": more_from_author,
-            "more_from_author_count": more_from_author_count,
-            "author_remaining_count": author_remaining_count,
-            # Related prompts (Phase: Related Prompts Feature)
-            "related_prompts": related_prompts,
-            "has_more_related": has_more_related,
-            "related_prompt_slug": prompt.slug,
-        },
-    )
+    response = render(request, "prompts/prompt_detail.html", context)
 
     # Add cache-control headers to prevent browser caching
     response['Cache-Control'] = 'no-cache, no-store, must-revalidate, max-age=0'
@@ -605,7 +468,7 @@ def related_prompts_ajax(request, slug):
     all_related = get_related_prompts(prompt, limit=60)
     start = (page - 1) * page_size
     end = start + page_size
-    page_prompts = all_related[start:end]
+    page_prompts = attach_viewer_state(all_related[start:end], request.user)
     has_more = end < len(all_related)
 
     html = render_to_string(
@@ -15,7 +15,6 @@ from django.views.decorators.http import require_POST
 from django.utils.html import escape
 from django.utils.http import url_has_allowed_host_and_scheme
 from prompts.models import Prompt
-from django.core.cache import cache
 from django.views.decorators.cache import never_cache
 import logging
 
@@ -54,12 +53,6 @@ def prompt_delete(request, slug):
             hasattr(request.user, 'is_premium') and request.user.is_premium
         ) else 5
 
-        # Clear relevant caches when prompt is deleted
-        cache.delete(f"prompt_detail_{slug}_{request.user.id}")
-        cache.delete(f"prompt_detail_{slug}_anonymous")
-        for page in range(1, 5):
-            cache.delete(f"prompt_list_None_None_{page}")
-
         # Create undo links for quick restoration
         from django.middleware.csrf import get_token
         trash_url = reverse('prompts:trash_bin')
@@ -164,12 +157,6 @@ def prompt_restore(request, slug):
     prompt.deleted_at = None
     prompt.save(update_fields=['deleted_at', 'status'])
 
-    # Clear caches
-    cache.delete(f"prompt_detail_{slug}_{request.user.id}")
-    cache.delete(f"prompt_detail_{slug}_anonymous")
-    cache.delete("prompt_list")
-    cache.delete("trash_bin")
-
     # Create link to restored prompt with XSS protection
     prompt_url = reverse('prompts:prompt_detail', args=[prompt.slug])
     messages.success(
@@ -239,11 +226,6 @@ def prompt_publish(request, slug):
         from prompts.tasks import queue_pass2_review
         queue_pass2_review(prompt.pk)
 
-        # Clear caches
-        cache.delete(f"prompt_detail_{slug}_{request.user.id}")
-        cache.delete(f"prompt_detail_{slug}_anonymous")
-        cache.delete("prompt_list")
-
         messages.success(
             request,
             f'Your prompt "{escape(prompt.title)}" has been published and is now visible to everyone!'
@@ -293,11 +275,6 @@ def prompt_publish(request, slug):
         )
         return redirect('prompts:prompt_detail', slug=slug)
 
-    # Clear relevant caches
-    cache.delete(f"prompt_detail_{slug}_{request.user.id}")
-    cache.delete(f"prompt_detail_{slug}_anonymous")
-    cache.delete("prompt_list")
-
     # Success message with XSS protection
     messages.success(
         request,
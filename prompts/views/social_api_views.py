@@ -10,7 +10,6 @@ from django.contrib import messages
 from django.http import JsonResponse, HttpResponseRedirect
 from django.urls import reverse
 from django.contrib.auth.decorators import login_required
-from django.core.cache import cache
 from django.views.decorators.http import require_POST
 from prompts.models import Prompt
 from prompts.forms import CollaborateForm
@@ -70,7 +69,7 @@ def prompt_like(request, slug):
 
     Logged-in users can like or unlike prompts. Toggles the like status and
     returns JSON response for AJAX requests or redirects for regular requests.
-    Clears relevant caches when like status changes.
+    Cached like state is retired by the likes m2m_changed signal.
 
     Variables:
         slug: URL slug of the prompt being liked/unliked
@@ -84,7 +83,7 @@ def prompt_like(request, slug):
     URL: /prompt/<slug>/like/
     """
     prompt = get_object_or_404(
-        Prompt.objects.select_related('author').prefetch_related('likes'),
+        Prompt.objects.select_related('author'),
         slug=slug
     )
 
@@ -95,10 +94,6 @@ def prompt_like(request, slug):
         prompt.likes.add(request.user)
         liked = True
 
-    # Clear relevant caches when like status changes
-    cache.delete(f"prompt_detail_{slug}_{request.user.id}")
-    cache.delete(f"prompt_detail_{slug}_anonymous")
-
     if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
         data = {
             'liked': liked,
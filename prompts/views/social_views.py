@@ -2,7 +2,6 @@ from django.shortcuts import get_object_or_404
 from django.http import JsonResponse, Http404
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.models import User
-from django.core.cache import cache
 from django.views.decorators.http import require_POST
 from prompts.email_utils import should_send_email
 import logging
@@ -60,12 +59,8 @@ def follow_user(request, username):
         following_count = request.user.following_set.count()
         logger.info(f"DEBUG: Updated counts - {user_to_follow.username} has {follower_count} followers, {request.user.username} follows {following_count} users")
 
-        # Clear cache for follower/following counts
-        cache_key_followers = f'followers_count_{user_to_follow.id}'
-        cache_key_following = f'following_count_{request.user.id}'
-        cache.delete(cache_key_followers)
-        cache.delete(cache_key_following)
-        logger.info(f"DEBUG: Cache cleared for keys: {cache_key_followers}, {cache_key_following}")
+        # Cached follower/following counts are retired by the Follow
+        # signals (user:<id> surrogate keys)
 
         response_data = {
             'success': True,
@@ -147,12 +142,8 @@ def unfollow_user(request, username):
         following_count = request.user.following_set.count()
         logger.info(f"DEBUG: Updated counts - {user_to_unfollow.username} has {follower_count} followers, {request.user.username} follows {following_count} users")
 
-        # Clear cache for follower/following counts
-        cache_key_followers = f'followers_count_{user_to_unfollow.id}'
-        cache_key_following = f'following_count_{request.user.id}'
-        cache.delete(cache_key_followers)
-        cache.delete(cache_key_following)
-        logger.info(f"DEBUG: Cache cleared for keys: {cache_key_followers}, {cache_key_following}")
+        # Cached follower/following counts are retired by the Follow
+        # signals (user:<id> surrogate keys)
 
         response_data = {
             'success': True,
@@ -28,6 +28,7 @@ from prompts.services.b2_presign_service import (
     verify_upload_exists,
     AVATAR_MAX_SIZE,
 )
+from prompts.services import near_duplicates
 
 # =============================================================================
 # L8-ERRORS: RATE LIMIT DOCUMENTATION
@@ -144,7 +145,13 @@ def b2_upload_api(request):
         if is_video:
             result = upload_video(uploaded_file, uploaded_file.name)
         else:
-            result = upload_image(uploaded_file, uploaded_file.name, quick_mode=quick_mode)
+            # The upload session owns the image until upload_submit hands it to the prompt
+            if not request.session.session_key:
+                request.session.save()
+            result = upload_image(
+                uploaded_file, uploaded_file.name, quick_mode=quick_mode,
+                session_key=request.session.session_key,
+            )
 
         if result['success']:
             # Increment rate limit counter on successful upload
@@ -454,13 +461,35 @@ def b2_presign_upload(request):
     })
 
 
-def _generate_image_thumbnail(cdn_url, filename):
-    """Download original image and generate thumbnail. Returns thumb URL or None."""
-    _logger = logging.getLogger(__name__)
+def _download_upload(cdn_url):
+    """Download a just-uploaded original. Returns bytes or None."""
     try:
         image_response = requests.get(cdn_url, timeout=10)
         image_response.raise_for_status()
-        result = generate_image_variants(image_response.content, filename)
+        return image_response.content
+    except Exception as e:
+        logger.error(f"Image download error: {e}")
+        return None
+
+
+def _remember_upload_hashes(request, image_hashes):
+    """
+    Keep an upload's perceptual hashes for upload_submit.
+
+    Returns the published prompts it looks like (near_duplicates.upload_duplicates).
+    """
+    if image_hashes is None:
+        request.session.pop('upload_image_hashes', None)
+        return []
+    request.session['upload_image_hashes'] = [image_hashes.phash, image_hashes.dhash]
+    return near_duplicates.upload_duplicates(image_hashes)
+
+
+def _generate_image_thumbnail(image_bytes, filename):
+    """Generate thumbnail from the original image bytes. Returns thumb URL or None."""
+    _logger = logging.getLogger(__name__)
+    try:
+        result = generate_image_variants(image_bytes, filename)
         if result.get('success') and result.get('urls', {}).get('thumb'):
             _logger.info(f"Image thumbnail generated: {result['urls']['thumb']}")
             return result['urls']['thumb']
@@ -505,12 +534,17 @@ def b2_upload_complete(request):
 
     # For images: generate thumbnail synchronously, defer medium/large/webp to Step 2
     if not is_video:
-        thumb_url = _generate_image_thumbnail(cdn_url, filename)
+        image_bytes = _download_upload(cdn_url)
+        thumb_url = _generate_image_thumbnail(image_bytes, filename) if image_bytes else None
         if thumb_url:
             urls['thumb'] = thumb_url
         else:
             logger.warning("Image thumbnail generation failed")
 
+        # Near-duplicate warning; hashes are recorded on the Prompt at submit
+        image_hashes = near_duplicates.fingerprint(image_bytes)
+        duplicates = _remember_upload_hashes(request, image_hashes)
+
         # Still defer medium/large/webp to Step 2
         request.session['pending_variant_url'] = cdn_url
         request.session['pending_variant_filename'] = filename
@@ -520,7 +554,7 @@ def b2_upload_complete(request):
     # For videos: generate thumbnail synchronously (required for display)
     if is_video:
         try:
-            from prompts.services.video_processor import extract_thumbnail, get_video_metadata, extract_moderation_frames
+            from prompts.services.video_processor import analyze_video, make_thumbnail
             import tempfile
             import os
 
@@ -532,33 +566,36 @@ def b2_upload_complete(request):
                 # Determine extension
                 ext = '.' + filename.rsplit('.', 1)[1] if '.' in filename else '.mp4'
                 temp_video_path = os.path.join(temp_dir, f'video{ext}')
-                temp_thumb_path = os.path.join(temp_dir, 'thumb.jpg')
 
                 # Write video to temp file
                 with open(temp_video_path, 'wb') as f:
                     f.write(response.content)
 
-                # Phase M5: Extract video dimensions for CLS prevention
-                video_width = None
-                video_height = None
+                # One probe + one FFmpeg run: dimensions and the frames at
+                # 25%, 50%, 75% of the duration, as in-memory JPEGs
                 try:
-                    metadata = get_video_metadata(temp_video_path)
-                    video_width = metadata.get('width')
-                    video_height = metadata.get('height')
-                    logger.info(f"Extracted video dimensions: {video_width}x{video_height}")
+                    analysis = analyze_video(temp_video_path, num_frames=3)
                 except Exception as e:
-                    logger.warning(f"Failed to extract video dimensions: {e}")
+                    # Fail-closed: frames that cannot be read cannot be moderated
+                    logger.error(f"Video analysis failed, blocking upload: {e}")
+                    return JsonResponse({
+                        'success': False,
+                        'error': 'Unable to verify video content. Please try again.',
+                        'moderation_status': 'error'
+                    }, status=400)
+                frames = analysis['frames']
+                # Phase M5: Extract video dimensions for CLS prevention
+                video_width = analysis['metadata'].get('width')
+                video_height = analysis['metadata'].get('height')
+                logger.info(f"Extracted video dimensions: {video_width}x{video_height}")
 
                 # Phase M1+M2: Video NSFW Moderation
-                # Extract frames at 25%, 50%, 75% of video duration for analysis
-                frame_paths = []
                 try:
-                    frame_paths = extract_moderation_frames(temp_video_path, num_frames=3)
-                    logger.info(f"Extracted {len(frame_paths)} frames for moderation")
+                    logger.info(f"Extracted {len(frames)} frames for moderation")
 
-                    if frame_paths:
+                    if frames:
                         from prompts.services.vision_moderation import VisionModerationService
-                        video_moderation_result = VisionModerationService().moderate_video_frames(frame_paths)
+                        video_moderation_result = VisionModerationService().moderate_video_frames(frames)
                         logger.info(f"Video moderation result: {video_moderation_result}")
 
                         # Handle unsafe content based on severity
@@ -567,13 +604,6 @@ def b2_upload_complete(request):
 
                             # Only hard-block 'critical' severity (hardcore NSFW)
                             if severity == 'critical':
-                                # Clean up temp files before returning
-                                for fp in frame_paths:
-                                    try:
-                                        if os.path.exists(fp):
-                                            os.remove(fp)
-                                    except Exception: # nosec B110 - Cleanup errors shouldn't block response
-                                        pass
                                 return JsonResponse({
                                     'success': False,
                                     'error': 'Video contains content that violates our guidelines.',
@@ -593,20 +623,11 @@ def b2_upload_complete(request):
                 except Exception as e:
                     # Fail-closed: Any moderation error blocks the upload
                     logger.exception(f"Video moderation failed: {e}")
-                    # Note: Cleanup handled by finally block
                     return JsonResponse({
                         'success': False,
                         'error': 'Unable to verify video content. Please try again.',
                         'moderation_status': 'error'
                     }, status=400)
-                finally:
-                    # Always clean up frame files (if not already cleaned in error handlers)
-                    for fp in frame_paths:
-                        try:
-                            if os.path.exists(fp):
-                                os.remove(fp)
-                        except Exception: # nosec B110 - Cleanup errors shouldn't block response
-                            pass
 
                 # Extract thumbnail (preserve aspect ratio, max 600px on longest side)
                 if video_width and video_height:
@@ -622,42 +643,20 @@ def b2_upload_complete(request):
                 best_frame_index = 0  # Default to first analyzed frame (index 0)
                 if video_moderation_result and 'best_thumbnail_frame' in video_moderation_result:
                     best_frame_index = video_moderation_result['best_thumbnail_frame'] - 1  # Convert 1-indexed to 0-indexed
+                if not 0 <= best_frame_index < len(frames):
+                    best_frame_index = 0  # Default to 25%
 
-                # Calculate timestamp from frame index (frames at 25%, 50%, 75%)
-                if metadata and 'duration' in metadata:
-                    duration = metadata['duration']
-                    frame_positions = [0.25, 0.50, 0.75]
-                    if 0 <= best_frame_index < len(frame_positions):
-                        thumb_timestamp_seconds = duration * frame_positions[best_frame_index]
-                    else:
-                        thumb_timestamp_seconds = duration * 0.25  # Default to 25%
-                    # Format as HH:MM:SS
-                    hours = int(thumb_timestamp_seconds // 3600)
-                    minutes = int((thumb_timestamp_seconds % 3600) // 60)
-                    seconds = int(thumb_timestamp_seconds % 60)
-                    thumb_timestamp = f'{hours:02d}:{minutes:02d}:{seconds:02d}'
-                else:
-                    thumb_timestamp = '00:00:01'  # Fallback
+                logger.info(f"Using thumbnail frame {best_frame_index} (AI-selected: {'best_thumbnail_frame' in video_moderation_result if video_moderation_result else False})")
 
-                logger.info(f"Using thumbnail timestamp: {thumb_timestamp} (frame_index: {best_frame_index}, AI-selected: {'best_thumbnail_frame' in video_moderation_result if video_moderation_result else False})")
-
-                extract_thumbnail(
-                    temp_video_path,
-                    temp_thumb_path,
-                    timestamp=thumb_timestamp,
-                    size=thumb_size
-                )
+                # The thumbnail is cropped from the already-extracted frame
+                thumb_bytes = make_thumbnail(frames[best_frame_index], size=thumb_size)
 
                 # Upload thumbnail
-                if os.path.exists(temp_thumb_path):
-                    from django.core.files.base import ContentFile
-                    from prompts.services.b2_upload_service import get_video_upload_path
-
-                    with open(temp_thumb_path, 'rb') as f:
-                        thumb_content = ContentFile(f.read())
+                from django.core.files.base import ContentFile
+                from prompts.services.b2_upload_service import get_video_upload_path
 
-                    thumb_path = get_video_upload_path(filename, 'thumb')
-                    urls['thumb'] = upload_to_b2(thumb_content, thumb_path)
+                thumb_path = get_video_upload_path(filename, 'thumb')
+                urls['thumb'] = upload_to_b2(ContentFile(thumb_bytes), thumb_path)
 
         except Exception as e:
             logger.exception(f"Error generating video thumbnail: {e}")
@@ -737,6 +736,9 @@ def b2_upload_complete(request):
         'video_height': video_height if is_video else None,
     }
 
+    if not is_video and duplicates:
+        response_data['duplicates'] = duplicates
+
     # Include video moderation status and AI job ID in response
     if is_video and video_moderation_result:
         if not video_moderation_result.get('is_safe', True):
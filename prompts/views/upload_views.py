@@ -14,7 +14,8 @@ from django.utils import timezone
 from datetime import timedelta
 from csp.decorators import csp_exempt
 from prompts.forms import PromptForm
-from prompts.services import ModerationOrchestrator
+from prompts.services import ModerationOrchestrator, near_duplicates, text_duplicates
+from prompts.services.b2_upload_service import claim_image_url
 from prompts.constants import DEFAULT_AI_TITLES
 from prompts.utils.source_credit import parse_source_credit
 from django_q.tasks import async_task
@@ -148,6 +149,7 @@ def clear_upload_session(request):
         # Direct upload
         'direct_upload_urls', 'pending_direct_upload',
         'direct_upload_filename', 'direct_upload_is_video',
+        'upload_image_hashes',
         # AI suggestions
         'ai_title', 'ai_description', 'ai_tags', 'ai_image_warning',
     ]
@@ -479,6 +481,18 @@ def upload_submit(request):
     # Uses _save_with_unique_title to handle duplicate title race conditions
     _save_with_unique_title(prompt)
 
+    # The prompt takes over the upload session's reference to its image
+    if prompt.b2_image_url:
+        claim_image_url(prompt.b2_image_url, prompt.pk, request.session.session_key)
+
+    # Near-duplicate index: hashes computed when the upload completed
+    image_hashes = request.session.get('upload_image_hashes')
+    if prompt.b2_image_url and image_hashes:
+        near_duplicates.record_prompt(prompt.pk, *image_hashes)
+
+    # Near-duplicate prompt text (the content was indexed on save)
+    similar_prompts = text_duplicates.similar_published_prompts(content, exclude_id=prompt.pk)
+
     # N4-Refactor: AI content generation now runs during NSFW check (cache-based)
     # Mark as complete if AI already ran, otherwise it will need SEO review
     if ai_complete:
@@ -631,6 +645,13 @@ def upload_submit(request):
         from prompts.tasks import queue_pass2_review
         queue_pass2_review(prompt.pk)
 
+    if similar_prompts:
+        messages.info(
+            request,
+            f'Heads up: your prompt text is very similar to '
+            f'"{similar_prompts[0]["title"]}".'
+        )
+
     # N4-Refactor: Clean up AI job from cache
     if ai_job_id:
         cache.delete(f'ai_job_{ai_job_id}')
@@ -640,10 +661,6 @@ def upload_submit(request):
     clear_upload_session(request)
     logger.info(f"Cleared all upload session keys for user {request.user.id}")
 
-    # Clear list caches when new prompt is created
-    for page in range(1, 5):
-        cache.delete(f"prompt_list_None_None_{page}")
-
     # N4-Refactor: Return JSON for AJAX requests with prompt detail URL
     # AI processing is complete (ran during upload), so go directly to final page
     if is_ajax:
@@ -657,6 +674,7 @@ def upload_submit(request):
             'title': prompt.title,
             'slug': prompt.slug,
             'ai_complete': ai_complete,
+            'similar_prompts': similar_prompts,
             'message': 'Your prompt has been created!'
         })
 
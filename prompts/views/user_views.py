@@ -9,12 +9,42 @@ from django.core.paginator import Paginator
 from django.views.decorators.http import require_POST
 import logging
 
-from prompts.models import Prompt, Comment, UserProfile, Collection, CollectionItem
+from prompts.models import Prompt, UserProfile, Collection, CollectionItem
 from prompts.forms import CommentForm
+from prompts.services.viewer_state import attach_viewer_state
 
 logger = logging.getLogger(__name__)
 
 
+def get_profile_stats(profile_user):
+    """
+    Profile header metrics from the user's stats snapshot (one read, or
+    none if the caller fetched the user with select_related('profile_stats')).
+
+    Shared by the profile and profile collections pages. Counters are kept
+    current by signals; views and ranks are refreshed hourly with the
+    leaderboards (see prompts/services/profile_stats.py).
+
+    Returns:
+        dict: {'total_prompts', 'total_likes', 'total_views',
+        'all_time_rank', 'thirty_day_rank', 'follower_count',
+        'following_count', 'version'}
+    """
+    from prompts.services.profile_stats import get_snapshot
+
+    snapshot = get_snapshot(profile_user)
+    return {
+        'total_prompts': snapshot.prompt_count,
+        'total_likes': snapshot.likes_received,
+        'total_views': snapshot.total_views,
+        'all_time_rank': snapshot.all_time_rank,
+        'thirty_day_rank': snapshot.thirty_day_rank,
+        'follower_count': snapshot.follower_count,
+        'following_count': snapshot.following_count,
+        'version': snapshot.version,
+    }
+
+
 def user_profile(request, username, active_tab=None):
     """
     Display public user profile page with user's prompts.
@@ -66,8 +96,11 @@ def user_profile(request, username, active_tab=None):
     Raises:
         Http404: If user with given username doesn't exist
     """
-    # Get the user (404 if not found)
-    profile_user = get_object_or_404(User, username=username)
+    # Get the user (404 if not found), with profile and stats snapshot
+    profile_user = get_object_or_404(
+        User.objects.select_related('userprofile', 'profile_stats'),
+        username=username,
+    )
 
     # Get user's profile (should always exist due to signals)
     profile = profile_user.userprofile
@@ -89,11 +122,8 @@ def user_profile(request, username, active_tab=None):
         'author'  # ForeignKey - join User table (avoids N queries for prompt.author)
     ).prefetch_related(
         'tags',   # ManyToMany - separate query fetches all tags (avoids N queries)
-        'likes',  # ManyToMany - separate query fetches all likes (avoids N queries)
-        Prefetch(
-            'comments',  # Reverse FK - fetch only approved comments
-            queryset=Comment.objects.filter(approved=True)
-        )
+        # Likes: viewer state + totals attached per page (attach_viewer_state)
+        # Comments: cards don't render them (approved_comment_count if needed)
     )
 
     # Base queryset: Show drafts ONLY to owner, published to everyone else
@@ -124,100 +154,17 @@ def user_profile(request, username, active_tab=None):
 
     # Apply sorting
     if sort_order == 'views':
-        # Sort by view count (most views first)
-        from prompts.models import PromptView
+        # Sort by view count (most views first, from daily rollups)
+        from prompts.services.view_rollups import prompt_views_expression
         prompts = prompts.annotate(
-            views_count=Count('views')
+            views_count=prompt_views_expression()
         ).order_by('-views_count', '-created_on')
     else:
         # Default: sort by recency
         prompts = prompts.order_by('-created_on')
 
-    # Calculate stats
-    total_prompts = Prompt.objects.filter(
-        author=profile_user,
-        status=1,
-        deleted_at__isnull=True
-    ).count()
-
-    total_likes = profile.get_total_likes()
-
-    # Calculate profile metrics (Phase G enhancement)
-    # Uses 5-minute caching to improve performance (same TTL as leaderboard)
-    from django.core.cache import cache
-    from prompts.models import PromptView
-    from prompts.services.leaderboard import LeaderboardService
-
-    # Cache key validation function (security hardening)
-    # Prevents cache poisoning by validating user_id before key generation
-    def _get_profile_stats_cache_key(user_id):
-        """
-        Generate a validated cache key for profile stats.
-
-        Security measures:
-        1. Validates user_id is a positive integer
-        2. Uses versioned prefix (allows cache invalidation on schema changes)
-        3. Returns None if validation fails (triggers fresh calculation)
-        """
-        if not isinstance(user_id, int) or user_id <= 0:
-            return None
-        return f'pf_profile_stats_v1_{user_id}'
-
-    # Get validated cache key
-    cache_key = _get_profile_stats_cache_key(profile_user.id)
-
-    # Only use cache if key is valid
-    cached_stats = cache.get(cache_key) if cache_key else None
-
-    if cached_stats:
-        # Validate cached data structure before using (prevents corrupted cache data)
-        if isinstance(cached_stats, dict) and 'total_views' in cached_stats:
-            total_views = cached_stats.get('total_views', 0)
-            all_time_rank = cached_stats.get('all_time_rank')
-            thirty_day_rank = cached_stats.get('thirty_day_rank')
-        else:
-            # Invalid cache data structure - recalculate
-            cached_stats = None
-
-    if not cached_stats:
-        # Compute stats with error handling for each metric
-        # Total Views: Sum of all unique views across user's prompts
-        try:
-            total_views = PromptView.objects.filter(prompt__author=profile_user).count()
-        except Exception as e:
-            logger.error(f"Failed to get total views for user {profile_user.id}: {e}")
-            total_views = 0
-
-        # All-time Rank: Position on Most Viewed leaderboard (all time)
-        try:
-            all_time_rank = LeaderboardService.get_user_rank(
-                user=profile_user,
-                metric='views',
-                period='all'
-            )
-        except Exception as e:
-            logger.error(f"Failed to get all-time rank for user {profile_user.id}: {e}")
-            all_time_rank = None
-
-        # 30-day Rank: Position on Most Active leaderboard (past 30 days)
-        try:
-            thirty_day_rank = LeaderboardService.get_user_rank(
-                user=profile_user,
-                metric='active',
-                period='month'
-            )
-        except Exception as e:
-            logger.error(f"Failed to get 30-day rank for user {profile_user.id}: {e}")
-            thirty_day_rank = None
-
-        # Cache results for 5 minutes (300 seconds) - aligns with leaderboard cache TTL
-        # Only cache if we have a valid key (security: prevents cache pollution)
-        if cache_key:
-            cache.set(cache_key, {
-                'total_views': total_views,
-                'all_time_rank': all_time_rank,
-                'thirty_day_rank': thirty_day_rank,
-            }, 300)
+    # Profile header stats: one snapshot read (joined above)
+    profile_stats = get_profile_stats(profile_user)
 
     # Trash tab data (only for owner)
     trash_items = []
@@ -286,7 +233,7 @@ def user_profile(request, username, active_tab=None):
                 else:  # recency (default)
                     trash_items_qs = trash_items_qs.order_by('-deleted_at')
 
-                trash_items = list(trash_items_qs)
+                trash_items = attach_viewer_state(list(trash_items_qs), request.user)
             else:
                 # Apply sorting to collections trash
                 if trash_sort_order == 'oldest':
@@ -324,6 +271,10 @@ def user_profile(request, username, active_tab=None):
     page_number = request.GET.get('page', 1)
     page_obj = paginator.get_page(page_number)
 
+    # Liked/saved state + like totals for the page's cards. Evaluating the
+    # page fills its result cache, so the template sees the same instances.
+    attach_viewer_state(list(page_obj.object_list), request.user)
+
     # Compute total trash count for profile nav badge
     total_trash_count = trash_count + deleted_collections_count
 
@@ -332,11 +283,7 @@ def user_profile(request, username, active_tab=None):
         'profile': profile,
         'prompts': page_obj.object_list,  # Prompts for current page
         'page_obj': page_obj,  # Paginator object for load more
-        'total_prompts': total_prompts,
-        'total_likes': total_likes,
-        'total_views': total_views,  # Phase G: Total views across all prompts
-        'all_time_rank': all_time_rank,  # Phase G: Most Viewed leaderboard position
-        'thirty_day_rank': thirty_day_rank,  # Phase G: Most Active leaderboard position (30 days)
+        **profile_stats,  # total_prompts/likes/views, ranks, follower/following counts
         'media_filter': media_filter,
         'sort_order': sort_order,  # Sort order for profile prompts
         'is_own_profile': is_owner,
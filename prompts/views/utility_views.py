@@ -10,64 +10,17 @@ from django.views.decorators.http import require_POST
 from django.utils.http import url_has_allowed_host_and_scheme
 from django.conf import settings
 from prompts.email_utils import should_send_email
+# get_client_ip lives with the shared request classifier; re-exported here
+# (and from prompts.views) for existing importers.
+from prompts.utils.request_classification import classify_request, get_client_ip  # noqa: F401
 from django.template.response import TemplateResponse
 from django.views.generic import TemplateView  # Session 173-C
 import hmac
-import hashlib
 import logging
 
 logger = logging.getLogger(__name__)
 
 
-def get_client_ip(request):
-    """
-    Extract client IP address from request, validating proxy headers.
-
-    Security: Only trusts X-Forwarded-For headers when behind known proxies
-    to prevent IP spoofing attacks. Falls back to REMOTE_ADDR if not behind
-    trusted proxy or header is missing.
-
-    Args:
-        request: Django request object
-
-    Returns:
-        str: Client IP address (validated)
-    """
-    from django.conf import settings
-    import ipaddress
-
-    # Get X-Forwarded-For header (set by proxies/load balancers)
-    x_forwarded_for = request.META.get('HTTP_X_FORWARDED_FOR')
-
-    if x_forwarded_for:
-        # Split comma-separated IP chain
-        ips = [ip.strip() for ip in x_forwarded_for.split(',')]
-
-        # Iterate from rightmost IP (closest to our server) backwards
-        # Stop at first IP that's NOT in our trusted proxy list
-        for ip in reversed(ips):
-            try:
-                ip_obj = ipaddress.ip_address(ip)
-
-                # Check if IP is in trusted proxy ranges
-                is_trusted_proxy = False
-                for proxy_range in getattr(settings, 'TRUSTED_PROXIES', []):
-                    if ip_obj in ipaddress.ip_network(proxy_range):
-                        is_trusted_proxy = True
-                        break
-
-                # If not a trusted proxy, this is the client IP
-                if not is_trusted_proxy:
-                    return ip
-
-            except ValueError:
-                # Invalid IP format, skip it
-                continue
-
-    # Fallback to REMOTE_ADDR (direct connection or no valid X-Forwarded-For)
-    return request.META.get('REMOTE_ADDR', '0.0.0.0')
-
-
 def _disable_all_notifications(email_preferences):
     """
     Disable all email notifications EXCEPT critical platform updates.
@@ -197,7 +150,7 @@ def unsubscribe_custom(request, token):
 
     Security Features:
         - IP spoofing protection via get_client_ip()
-        - SHA-256 hashing for cache keys (not MD5)
+        - Peppered SHA-256 IP hash for cache keys (shared request classifier)
         - Configurable rate limits from settings
         - Graceful cache error handling (fail open)
         - No token information in logs
@@ -214,11 +167,8 @@ def unsubscribe_custom(request, token):
     """
     from django.conf import settings
 
-    # Get client IP with spoofing protection
-    ip = get_client_ip(request)
-
-    # Create secure cache key with SHA-256
-    ip_hash = hashlib.sha256(ip.encode()).hexdigest()
+    # Client IP hash with spoofing protection (computed once per request)
+    ip_hash = classify_request(request).ip_hash
     cache_key = f'unsubscribe_ratelimit_{ip_hash}'
 
     # Get rate limit settings
@@ -61,6 +61,10 @@ BULK_GEN_MAX_CONCURRENT = int(os.environ.get('BULK_GEN_MAX_CONCURRENT', 4))
 # Current production values: BULK_GEN_MAX_CONCURRENT=1, OPENAI_INTER_BATCH_DELAY=3
 OPENAI_INTER_BATCH_DELAY = int(os.environ.get('OPENAI_INTER_BATCH_DELAY', 0))
 
+# Days of raw PromptView rows kept after they are rolled up into daily
+# PromptViewDaily rows (see rollup_prompt_views management command).
+PROMPT_VIEW_RETENTION_DAYS = int(os.environ.get('PROMPT_VIEW_RETENTION_DAYS', 90))
+
 
 ALLOWED_HOSTS = [
     '127.0.0.1',
@@ -421,15 +425,65 @@ SESSION_SAVE_EVERY_REQUEST = False  # Don't save session on every request
 SESSION_EXPIRE_AT_BROWSER_CLOSE = False
 
 # PERFORMANCE OPTIMIZATION: Caching configuration
+# 'default' is a two-tier cache (prompts/cache_backends.py): a process-local
+# LRU (L1, short TTL) in front of the shared DatabaseCache ('shared', L2).
+# Shared counters, rate limits and locks bypass L1 (L1_BYPASS_PREFIXES).
+CACHE_L1_MAX_ENTRIES = int(os.environ.get('CACHE_L1_MAX_ENTRIES', 2048))
+CACHE_L1_TIMEOUT = int(os.environ.get('CACHE_L1_TIMEOUT', 30))  # seconds
+CACHE_MAX_ENTRIES = int(os.environ.get('CACHE_MAX_ENTRIES', 20000))
+
+# Expensive cached aggregates (prompts/utils/cached_computation.py) serve the
+# stale value while a background thread recomputes it
+CACHED_COMPUTATION_BACKGROUND = True
+
+# Social-action notifications are queued as NotificationEvent rows and
+# written by the drain_notification_outbox task
+NOTIFICATION_OUTBOX_ASYNC = True
+
+# Vision moderation / AI analysis results are reused for images already
+# judged (exact or near-identical), see prompts/services/image_verdicts.py
+IMAGE_VERDICT_REUSE = True
+
+# Uploaded and generated images are hashed into the near-duplicate index
+# (upload warnings, related prompts), see prompts/services/near_duplicates.py
+NEAR_DUPLICATE_INDEX = True
+
+# Prompt and generated-image texts are MinHash-indexed for near-duplicate
+# lookups, see prompts/services/text_duplicates.py
+PROMPT_TEXT_INDEX = True
+
 CACHES = {
     'default': {
+        'BACKEND': 'prompts.cache_backends.TieredCache',
+        'LOCATION': 'shared',  # L2 cache alias
+        'TIMEOUT': 300,  # 5 minutes default cache timeout
+        'OPTIONS': {
+            'L1_MAX_ENTRIES': CACHE_L1_MAX_ENTRIES,
+            'L1_TIMEOUT': CACHE_L1_TIMEOUT,
+            'VERSION_CHECK_INTERVAL': 1,  # seconds between generation checks
+            'L1_BYPASS_PREFIXES': [
+                'rl:',  # django-ratelimit
+                'view_rate:',
+                'unsubscribe_ratelimit_',
+                'sysnotif_rate_',
+                'b2_upload_rate:',
+                'b2_avatar_upload_rate:',
+                'img_proxy_rate:',
+                'prepare_prompts_rate:',
+                'bulk_create_pages_rate:',
+                'nsfw_repeat_offender_notified:',
+                'cc_lock:',  # cached_computation single-flight locks
+            ],
+        },
+    },
+    'shared': {
         'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
         'LOCATION': 'cache_table',
-        'TIMEOUT': 300,  # 5 minutes default cache timeout
+        'TIMEOUT': 300,
         'OPTIONS': {
-            'MAX_ENTRIES': 1000,
+            'MAX_ENTRIES': CACHE_MAX_ENTRIES,
         }
-    }
+    },
 }
 
 # SECURITY: Rate limiting configuration
@@ -451,8 +505,11 @@ RATE_LIMIT_BACKEND = os.environ.get('RATE_LIMIT_BACKEND', 'package')
 
 # DJANGO-RATELIMIT: Configuration for package-based rate limiting
 RATELIMIT_ENABLE = True  # Set to False to disable all rate limiting globally
-RATELIMIT_USE_CACHE = 'default'  # Use default cache backend for rate limit tracking
+RATELIMIT_USE_CACHE = 'shared'  # Shared L2 cache directly (counters must not sit in L1)
 RATELIMIT_VIEW = 'prompts.views.ratelimited'  # Custom 429 error view (optional)
+# key='ip' uses the proxy-validated client IP from the shared request
+# classifier (REMOTE_ADDR is Heroku's router behind the proxy)
+RATELIMIT_IP_META_KEY = 'prompts.utils.request_classification.ratelimit_client_ip'
 
 # Rate limit behavior on cache failure
 # True = fail open (allow requests if cache down) - matches custom implementation
@@ -618,6 +675,19 @@ if 'test' in sys.argv:
             'NAME': ':memory:',
         }
     }
+    # Transaction rollback resets the shared cache table between tests but
+    # not a process-local L1 — run the tiered cache as a pass-through.
+    CACHES['default']['OPTIONS']['L1_TIMEOUT'] = 0
+    # Recompute stale values inline so tests stay deterministic
+    CACHED_COMPUTATION_BACKGROUND = False
+    # Drain the notification outbox inline so notifications exist on return
+    NOTIFICATION_OUTBOX_ASYNC = False
+    # No image downloads for fingerprinting unless a test opts in
+    IMAGE_VERDICT_REUSE = False
+    # No per-process image index unless a test opts in
+    NEAR_DUPLICATE_INDEX = False
+    # No text signatures on every Prompt save unless a test opts in
+    PROMPT_TEXT_INDEX = False
 
 # ==============================================================================
 # BACKBLAZE B2 STORAGE CONFIGURATION
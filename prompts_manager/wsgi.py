@@ -14,3 +14,9 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'prompts_manager.settings')
 
 application = get_wsgi_application()
+
+# Build the near-duplicate image index as the worker starts, not on the
+# first request that needs it
+from prompts.services import near_duplicates  # noqa: E402
+
+near_duplicates.warm_in_background()
@@ -722,8 +722,8 @@
             const collectionTitle = titleEl ? titleEl.textContent : 'this collection';
             actionEl.setAttribute('aria-label', `${!hasPrompt ? 'Remove from' : 'Add to'} ${collectionTitle}`);
 
-            // Update save button state on the page
-            updateSaveButtonState(currentPromptId, !hasPrompt);
+            // Update save button state on the page (saved while any collection still holds it)
+            updateSaveButtonState(currentPromptId, !!collectionGrid?.querySelector('.collection-card.has-prompt'));
 
         } catch (error) {
             console.error('CollectionsModal: Error toggling collection:', error);
@@ -410,6 +410,12 @@
             // For images, queue separate NSFW moderation
             queueNsfwModeration(data);
         }
+
+        // Near-duplicate warning: the image looks like an existing prompt's
+        if (data.duplicates && data.duplicates.length) {
+            const match = data.duplicates[0];
+            showFlaggedToast(`This image looks very similar to "${match.title}" (${match.url})`);
+        }
     }
 
     // ========================================